@@ -7,7 +7,7 @@ This script demonstrates how to use the system programmatically
 import os
 from datetime import datetime
 from src.fpl_expert.crew import FplExpert
-from src.fpl_expert.tools.custom_tool import get_football_season
+from src.fpl_expert.season_calendar import season_of
 
 def example_basic_usage():
     """Example of basic system usage"""
@@ -19,7 +19,7 @@ def example_basic_usage():
     
     # Get current context
     current_date = datetime.now()
-    current_season = get_football_season(current_date)
+    current_season = season_of(current_date)
     
     print(f"📅 Current Date: {current_date.strftime('%Y-%m-%d')}")
     print(f"⚽ Current Season: {current_season}")
@@ -0,0 +1,415 @@
+import asyncio
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .backtest import POLICIES, SeasonReplay
+from .bracket import long_horizon_scores, tournament_outlook
+from .crew import FplExpert
+from .history import HistoryArchive
+from .invalidation import InvalidationEngine
+from .lineup import LineupModel
+from .optimizer import SquadConstraints, select_squad
+from .prefetch import prefetch_metrics
+from .profiles import get_profile
+from .routing import routing_metrics
+from .season_calendar import season_calendar, season_of
+from .store import RecommendationStore
+from .entities import canonical_player
+from .tools.custom_tool import PlayerTeamVerificationTool
+from .tools.search_cache import SearchCache, search_cache
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_RESPONSE_TTL_SECONDS = 300
+
+MAX_REQUEST_LINE = 8192
+
+# Budgets (in millions) a squad can be built with
+MIN_BUDGET = 50.0
+MAX_BUDGET = 150.0
+
+
+class BadRequest(ValueError):
+    """A request parameter is missing or invalid (HTTP 400)."""
+
+
+class NotFound(LookupError):
+    """The path or the requested data does not exist (HTTP 404)."""
+
+
+class UpstreamError(RuntimeError):
+    """A data source the endpoint relies on failed (HTTP 502)."""
+
+
+def _normalize_budget(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        budget = float(value)
+    except ValueError:
+        raise BadRequest(f"Invalid budget: {value!r}")
+    if not math.isfinite(budget) or not MIN_BUDGET <= budget <= MAX_BUDGET:
+        raise BadRequest(f"Invalid budget {value!r}; expected {MIN_BUDGET:g} to {MAX_BUDGET:g}")
+    return f"{budget:g}"
+
+
+def _normalize_matchweek(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    season = season_of()
+    numbers = [gw.number for gw in season_calendar().gameweeks(season)]
+    if not value.strip().isdigit() or int(value) not in numbers:
+        raise BadRequest(f"Invalid matchweek {value!r}; season {season} has gameweeks {numbers[0]} to {numbers[-1]}")
+    return str(int(value))
+
+
+class RecommendationServer:
+    """
+    Local asynchronous HTTP API over the crew, the optimizer and the caches.
+
+    Endpoints (GET, JSON responses):
+        /health                                   Cache statistics
+        /squad?matchweek=&budget=&profile=        Team builder output for a matchweek
+        /squad?source=optimizer&budget=&policy=   Optimizer squad from the history archive
+               &horizon=                          ... valued over that many gameweeks (knockout odds included)
+        /captain?matchweek=&budget=&profile=      Captain selector output for a matchweek
+        /verify?player=                           Current team / eligibility check
+
+    Crew-backed answers come from the recommendation store when a run for the
+    same season, matchweek, budget and profile exists; otherwise the crew is
+    run once (incrementally, so another profile reuses the research) and the
+    result stored. ``refresh=1`` forces a new run. Responses are cached for a short
+    time, and concurrent identical requests share a single computation.
+    """
+
+    def __init__(
+        self,
+        build_inputs: Callable[[datetime], Dict[str, str]],
+        store: Optional[RecommendationStore] = None,
+        engine: Optional[InvalidationEngine] = None,
+        archive_root: Optional[str] = None,
+        response_ttl: float = DEFAULT_RESPONSE_TTL_SECONDS,
+        workers: int = 8,
+    ):
+        self.build_inputs = build_inputs
+        self.store = store or RecommendationStore()
+        self.engine = engine or InvalidationEngine()
+        self.archive_root = HistoryArchive(archive_root).root
+        self.lineups = LineupModel(HistoryArchive(self.archive_root), self.store)
+        self.responses = SearchCache(ttl=response_ttl, max_entries=512)
+        self.verification_tool = PlayerTeamVerificationTool()
+        # Crew runs are serialised: a second request for the same matchweek then
+        # finds the first one's outputs in the store instead of running again
+        self._crew_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fpl-crew")
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fpl-api")
+        self._in_flight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self._routes: Dict[str, Callable[[Dict[str, str]], Awaitable[Any]]] = {
+            "/health": self.health,
+            "/squad": self.squad,
+            "/captain": self.captain,
+            "/verify": self.verify,
+        }
+
+    # Request-level caching
+
+    async def _cached(self, key: Hashable, pool: ThreadPoolExecutor, fetch: Callable[[], Any],
+                      refresh: bool = False) -> Any:
+        if not refresh:
+            cached = self.responses.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+
+        pending = self._in_flight.get(key)
+        if pending is None:
+            self.misses += 1
+            pending = asyncio.ensure_future(asyncio.get_running_loop().run_in_executor(pool, fetch))
+            self._in_flight[key] = pending
+
+            def done(future: "asyncio.Future[Any]") -> None:
+                if not future.cancelled() and future.exception() is None:
+                    self.responses.put(key, future.result())
+                self._in_flight.pop(key, None)
+
+            pending.add_done_callback(done)
+        else:
+            self.hits += 1
+        # Shielded so a client disconnecting does not cancel work other requests wait on
+        return await asyncio.shield(pending)
+
+    # Blocking work, run on the thread pools
+
+    def _crew_task_output(self, task: str, matchweek: Optional[str], budget: Optional[str],
+                          profile: Optional[str], refresh: bool) -> Dict[str, Any]:
+        inputs = self.build_inputs(datetime.now())
+        if profile is not None:
+            inputs = get_profile(profile).inputs(inputs)
+        if matchweek is not None:
+            inputs["matchweek"] = matchweek
+        if budget is not None:
+            inputs["budget"] = budget
+        lookup = dict(
+            season=inputs["current_season"],
+            matchweek=inputs["matchweek"],
+            budget=inputs["budget"],
+            profile=inputs.get("profile"),
+        )
+
+        stored = None if refresh else self.store.latest_task_output(task, **lookup)
+        source = "store"
+        if stored is None:
+            output = self.engine.kickoff(FplExpert().crew(), inputs=inputs, force=refresh)
+            self.store.save_run(inputs, output)
+            stored = self.store.latest_task_output(task, **lookup)
+            source = "crew"
+        if stored is None:
+            raise NotFound(f"The crew produced no output for {task}")
+        return {"source": source, **stored}
+
+    def _optimizer_squad(self, budget: Optional[str], policy: str, season: Optional[str],
+                         horizon: Optional[str] = None) -> Dict[str, Any]:
+        if policy not in POLICIES:
+            raise BadRequest(f"Unknown policy {policy!r}; choose from {', '.join(POLICIES)}")
+        if horizon is not None and (not horizon.isdigit() or int(horizon) < 1):
+            raise BadRequest(f"Invalid horizon {horizon!r}; expected a number of gameweeks")
+        archive = HistoryArchive(self.archive_root)
+        seasons = archive.seasons()
+        if not seasons:
+            raise NotFound(f"No archived seasons found in {archive.root}")
+        season = season or seasons[-1]
+        if season not in seasons:
+            raise NotFound(f"Season {season} is not archived")
+
+        names = {pid: info["name"] for pid, info in archive.players.items()}
+        replay = SeasonReplay(archive.season(season), names)
+        # Pool and prices as of the last archived gameweek, with every archived gameweek as history
+        context = replay.deadline(replay.gameweeks[-1], include_gameweek=True)
+        # Start chances with the latest stored team news, rather than congestion alone
+        lineups = self.lineups.outlook(season)
+        context.availability = lineups.factors(context.table.player_ids)
+        selector = POLICIES[policy]()
+        scores = selector.projections(context)
+        if horizon is not None:
+            # Policy scores are per match: weight them by each club's expected matches over the horizon
+            # and each player's chance of starting them
+            start = int(replay.gameweeks[-1]) + 1
+            scores = long_horizon_scores(
+                context.table, selector.scores(context), start, int(horizon), tournament_outlook(season),
+                availability=lineups.availability(context.table.player_ids, start, int(horizon)),
+            )
+        constraints = SquadConstraints(budget=float(budget) if budget is not None else 100.0)
+        squad = select_squad(context.table, scores, constraints)
+
+        table = context.table
+        starts, sixties = lineups.probabilities(table.player_ids)
+        players = []
+        for row in squad.rows:
+            player = table[row]
+            players.append({
+                "player_id": player.player_id,
+                "name": player.name,
+                "club": player.club,
+                "position": player.position,
+                "price": round(float(player.price), 1),
+                "projected_points": round(float(scores[row]), 2),
+                "start_probability": None if np.isnan(starts[row]) else round(float(starts[row]), 2),
+                "sixty_minutes_probability": None if np.isnan(sixties[row]) else round(float(sixties[row]), 2),
+                "starting": row in squad.starting,
+                "captain": row == squad.captain,
+                "vice_captain": row == squad.vice_captain,
+            })
+        return {
+            "source": "optimizer",
+            "season": season,
+            "after_gameweek": int(replay.gameweeks[-1]),
+            "policy": policy,
+            "horizon": int(horizon) if horizon is not None else 1,
+            "budget": constraints.budget,
+            "cost": round(squad.cost, 1),
+            "projected_points": round(squad.score, 2),
+            "formation": squad.formation(table),
+            "players": players,
+        }
+
+    # Endpoints
+
+    @staticmethod
+    def _profile(params: Dict[str, str]) -> Optional[str]:
+        profile = params.get("profile")
+        if profile is not None:
+            try:
+                get_profile(profile)
+            except KeyError as e:
+                raise BadRequest(e.args[0])
+        return profile
+
+    async def health(self, params: Dict[str, str]) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "status": "ok",
+            "responses": {
+                "entries": self.responses.stats()["entries"],
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            },
+            "search_cache": search_cache.stats(),
+            "model_routing": routing_metrics.summary(),
+            "prefetch": prefetch_metrics.summary(),
+            "in_flight": len(self._in_flight),
+        }
+
+    async def squad(self, params: Dict[str, str]) -> Dict[str, Any]:
+        budget = _normalize_budget(params.get("budget"))
+        refresh = params.get("refresh") == "1"
+        if params.get("source", "crew") == "optimizer":
+            policy = params.get("policy", "form")
+            season = params.get("season")
+            horizon = params.get("horizon")
+            return await self._cached(
+                ("squad", "optimizer", budget, policy, season, horizon), self._pool,
+                lambda: self._optimizer_squad(budget, policy, season, horizon), refresh,
+            )
+        matchweek = _normalize_matchweek(params.get("matchweek"))
+        profile = self._profile(params)
+        return await self._cached(
+            ("squad", "crew", matchweek, budget, profile), self._crew_pool,
+            lambda: self._crew_task_output("build_optimal_team_task", matchweek, budget, profile, refresh),
+            refresh,
+        )
+
+    async def captain(self, params: Dict[str, str]) -> Dict[str, Any]:
+        budget = _normalize_budget(params.get("budget"))
+        matchweek = _normalize_matchweek(params.get("matchweek"))
+        profile = self._profile(params)
+        refresh = params.get("refresh") == "1"
+        return await self._cached(
+            ("captain", matchweek, budget, profile), self._crew_pool,
+            lambda: self._crew_task_output("select_captain_task", matchweek, budget, profile, refresh), refresh,
+        )
+
+    async def verify(self, params: Dict[str, str]) -> Dict[str, Any]:
+        player = " ".join(params.get("player", "").split())
+        if not player:
+            raise BadRequest("Missing required parameter: player")
+        # Different spellings of the same player share one cache entry
+        player = canonical_player(player)
+        try:
+            # Failed searches raise, so they are reported as errors and never cached
+            result = await self._cached(
+                ("verify", player), self._pool,
+                lambda: self.verification_tool.verify(player), params.get("refresh") == "1",
+            )
+        except Exception as e:
+            raise UpstreamError(f"Could not verify {player}: {e}") from e
+        return {"player": player, "result": result}
+
+    # HTTP plumbing
+
+    async def dispatch(self, method: str, target: str) -> Tuple[HTTPStatus, Any]:
+        url = urlsplit(target)
+        route = self._routes.get(url.path.rstrip("/") or "/")
+        if route is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint {url.path}"}
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Only GET is supported"}
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            return HTTPStatus.OK, await route(params)
+        except BadRequest as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except NotFound as e:
+            return HTTPStatus.NOT_FOUND, {"error": str(e)}
+        except UpstreamError as e:
+            return HTTPStatus.BAD_GATEWAY, {"error": str(e)}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            keep_alive = True
+            while keep_alive:
+                request_line = b""
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    headers = await self._read_headers(reader)
+                except (ValueError, asyncio.LimitOverrunError):
+                    # A line outgrew the stream limit and the rest of the request is unread: answer and close
+                    if request_line:
+                        status, body = HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {"error": "Request header too long"}
+                    else:
+                        status, body = HTTPStatus.BAD_REQUEST, {"error": "Request line too long"}
+                    keep_alive = False
+                else:
+                    parts = request_line.decode("latin-1").split()
+                    if len(parts) != 3 or len(request_line) > MAX_REQUEST_LINE:
+                        status, body = HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}
+                        keep_alive = False
+                    else:
+                        method, target, version = parts
+                        status, body = await self.dispatch(method, target)
+                        connection = headers.get("connection", "").lower()
+                        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                payload = json.dumps(body, default=str).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + payload
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def serve_forever(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving recommendations on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self._crew_pool.shutdown(wait=False, cancel_futures=True)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.store.close()
+
+
+def serve(build_inputs: Callable[[datetime], Dict[str, str]], host: Optional[str] = None,
+          port: Optional[int] = None) -> None:
+    """Run the HTTP API until interrupted."""
+    host = host or os.getenv("FPL_API_HOST") or DEFAULT_HOST
+    port = port or int(os.getenv("FPL_API_PORT", DEFAULT_PORT))
+    server = RecommendationServer(
+        build_inputs,
+        response_ttl=float(os.getenv("FPL_API_CACHE_TTL", DEFAULT_RESPONSE_TTL_SECONDS)),
+    )
+    try:
+        asyncio.run(server.serve_forever(host, port))
+    finally:
+        server.close()
@@ -0,0 +1,365 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+DEFAULT_ARCHIVE_PATH = os.path.join("output", "archive", "reports.sqlite3")
+DEFAULT_OUTPUT_DIR = "output"
+# Retention: entries older than this are dropped, except the latest of each report, profile and matchweek
+DEFAULT_MAX_AGE_DAYS = 42
+# Beyond this many entries the oldest go first (the latest per report, profile and matchweek stay)
+DEFAULT_MAX_ENTRIES = 20000
+# Dated files in output/ older than this are deleted once their content is archived
+DEFAULT_OUTPUT_KEEP_DAYS = 14
+
+_DATE_SUFFIX = re.compile(r"_(\d{4}-\d{2}-\d{2})$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    report TEXT NOT NULL,
+    task TEXT,
+    profile TEXT,
+    season TEXT,
+    matchweek TEXT,
+    date TEXT,
+    written TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES objects(hash)
+);
+CREATE INDEX IF NOT EXISTS entries_report ON entries (report, profile, matchweek, id);
+CREATE INDEX IF NOT EXISTS entries_task ON entries (task, profile, matchweek, id);
+CREATE INDEX IF NOT EXISTS entries_run ON entries (run_id);
+CREATE INDEX IF NOT EXISTS entries_hash ON entries (hash);
+"""
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def report_name(filename: str, profile: Optional[str] = None) -> str:
+    """
+    Report kind of an output file name: the stem without its date and
+    profile suffixes (``captain_analysis_aaron_2026-10-19.md`` -> ``captain_analysis``).
+    """
+    stem = _DATE_SUFFIX.sub("", os.path.splitext(os.path.basename(filename))[0])
+    if profile and stem.endswith(f"_{profile}"):
+        stem = stem[:-len(profile) - 1]
+    return stem
+
+
+@dataclass
+class ArchiveEntry:
+    """One archived report of one run (the content is stored once per distinct text)."""
+    id: int
+    run_id: str
+    report: str
+    task: Optional[str]
+    profile: Optional[str]
+    season: Optional[str]
+    matchweek: Optional[str]
+    date: Optional[str]
+    written: str
+    filename: str
+    hash: str
+    size: int
+
+
+class OutputArchive:
+    """
+    Compressed, content-addressed archive of crew reports.
+
+    Every report a run writes (task outputs, the rendered team report and
+    summary, files from the File Writer Tool) is stored once per distinct
+    content: the text is zlib-compressed under its SHA-256, and each run adds
+    only a small index entry (run id, report, task, profile, season,
+    matchweek, date) pointing at it. Hourly runs that reproduce a report cost
+    one index row. Lookups by report or task name, profile and matchweek go
+    through SQLite indexes.
+
+    ``enforce_retention()`` bounds the archive: old entries are dropped
+    (always keeping the latest of each report, profile and matchweek, so
+    earlier gameweeks stay findable all season), unreferenced content is
+    deleted and the freed pages are returned to the file system. Dated files
+    in ``output/`` are deleted once they are archived and old.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_ARCHIVE_PATH,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        output_keep_days: float = DEFAULT_OUTPUT_KEEP_DAYS,
+    ):
+        self.path = path
+        self.max_age = timedelta(days=max_age_days)
+        self.max_entries = max_entries
+        self.output_keep = timedelta(days=output_keep_days)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            # Only takes effect on a new database; lets retention shrink the file
+            self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # Writing
+
+    def add(
+        self,
+        run_id: str,
+        filename: str,
+        content: str,
+        inputs: Optional[Mapping[str, Any]] = None,
+        task: Optional[str] = None,
+        written: Optional[datetime] = None,
+    ) -> ArchiveEntry:
+        """
+        Archive one report of run ``run_id``.
+
+        Args:
+            run_id: Run the report belongs to
+            filename: Output file name (its stem, without date and profile, becomes the report name)
+            content: Report text
+            inputs: Crew inputs of the run (profile, season, matchweek and date are indexed)
+            task: Crew task that produced the report, if any
+            written: When it was written (defaults to now)
+        """
+        inputs = inputs or {}
+        profile = inputs.get("profile")
+        digest = content_hash(content)
+        data = content.encode("utf-8")
+        entry = ArchiveEntry(
+            id=0, run_id=run_id,
+            # Runs without a profile write their team report as ..._default_<date>.md
+            report=report_name(filename, profile or "default"), task=task, profile=profile,
+            season=inputs.get("current_season"),
+            matchweek=str(inputs["matchweek"]) if inputs.get("matchweek") is not None else None,
+            date=inputs.get("current_date"), written=(written or datetime.now()).isoformat(timespec="seconds"),
+            filename=os.path.basename(filename), hash=digest, size=len(data),
+        )
+        row = (
+            entry.run_id, entry.report, entry.task, entry.profile, entry.season, entry.matchweek,
+            entry.date, entry.written, entry.filename, entry.hash,
+        )
+        with self._lock, self._conn:
+            exists = self._conn.execute("SELECT 1 FROM objects WHERE hash = ?", (digest,)).fetchone()
+            if not exists:
+                self._conn.execute(
+                    "INSERT INTO objects (hash, size, data) VALUES (?, ?, ?)",
+                    (digest, len(data), zlib.compress(data, 9)),
+                )
+            cursor = self._conn.execute(
+                "INSERT INTO entries (run_id, report, task, profile, season, matchweek, date, written, filename, hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+        entry.id = int(cursor.lastrowid or 0)
+        return entry
+
+    def add_run(
+        self,
+        run_id: str,
+        inputs: Mapping[str, Any],
+        outputs: Sequence[Tuple[str, str, Optional[str]]] = (),
+        files: Sequence[str] = (),
+        written: Optional[datetime] = None,
+    ) -> List[ArchiveEntry]:
+        """
+        Archive a run's reports: ``outputs`` as (filename, content, task) and
+        ``files`` read from disk. Files that no longer exist are skipped.
+        """
+        written = written or datetime.now()
+        entries = [self.add(run_id, filename, content, inputs, task, written) for filename, content, task in outputs]
+        for path in files:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    content = f.read()
+            except OSError:
+                continue
+            entries.append(self.add(run_id, path, content, inputs, written=written))
+        return entries
+
+    # Lookup
+
+    _COLUMNS = (
+        "e.id, e.run_id, e.report, e.task, e.profile, e.season, e.matchweek, e.date, e.written, e.filename, "
+        "e.hash, o.size"
+    )
+
+    def find(
+        self,
+        name: Optional[str] = None,
+        profile: Optional[str] = None,
+        matchweek: Optional[Any] = None,
+        season: Optional[str] = None,
+        run_id: Optional[str] = None,
+        date: Optional[str] = None,
+        limit: Optional[int] = 20,
+    ) -> List[ArchiveEntry]:
+        """
+        Archived entries, newest first. ``name`` matches a report name
+        (``captain_analysis``) or a task name (``select_captain_task``).
+        """
+        query = f"SELECT {self._COLUMNS} FROM entries e JOIN objects o ON o.hash = e.hash WHERE 1 = 1"
+        params: List[Any] = []
+        if name is not None:
+            query += " AND (e.report = ? OR e.task = ?)"
+            params += [name, name]
+        for column, value in (("profile", profile), ("season", season), ("run_id", run_id), ("date", date)):
+            if value is not None:
+                query += f" AND e.{column} = ?"
+                params.append(value)
+        if matchweek is not None:
+            query += " AND e.matchweek = ?"
+            params.append(str(matchweek))
+        query += " ORDER BY e.id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [ArchiveEntry(*row) for row in rows]
+
+    def latest(
+        self,
+        name: str,
+        profile: Optional[str] = None,
+        matchweek: Optional[Any] = None,
+        season: Optional[str] = None,
+    ) -> Optional[ArchiveEntry]:
+        entries = self.find(name, profile=profile, matchweek=matchweek, season=season, limit=1)
+        return entries[0] if entries else None
+
+    def read(self, entry: ArchiveEntry) -> str:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM objects WHERE hash = ?", (entry.hash,)).fetchone()
+        if row is None:
+            raise KeyError(f"Archived content {entry.hash} is missing")
+        return zlib.decompress(row["data"]).decode("utf-8")
+
+    def contains(self, content: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM objects WHERE hash = ?", (content_hash(content),)
+            ).fetchone() is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT run_id) FROM entries").fetchone()
+            objects = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM objects"
+            ).fetchone()
+            referenced = self._conn.execute(
+                "SELECT COALESCE(SUM(o.size), 0) FROM entries e JOIN objects o ON o.hash = e.hash"
+            ).fetchone()[0]
+        return {
+            "entries": entries[0],
+            "runs": entries[1],
+            "objects": objects[0],
+            "content_bytes": referenced,       # what the entries would take as plain files
+            "unique_bytes": objects[1],        # after deduplication
+            "stored_bytes": objects[2],        # after compression
+            "file_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+    # Retention
+
+    def enforce_retention(
+        self, now: Optional[datetime] = None, output_dir: Optional[str] = DEFAULT_OUTPUT_DIR,
+    ) -> Dict[str, int]:
+        """
+        Drop old entries and unreferenced content, then delete old archived
+        files from ``output_dir`` (None to leave it alone).
+
+        Returns:
+            Counts of removed entries, objects and output files
+        """
+        now = now or datetime.now()
+        cutoff = (now - self.max_age).isoformat(timespec="seconds")
+        # The newest entry of every report, profile and matchweek is never dropped
+        protected = (
+            "SELECT MAX(id) FROM entries GROUP BY report, COALESCE(profile, ''), COALESCE(matchweek, '')"
+        )
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                f"DELETE FROM entries WHERE written < ? AND id NOT IN ({protected})", (cutoff,)
+            ).rowcount
+            excess = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+            if excess > 0:
+                removed += self._conn.execute(
+                    f"DELETE FROM entries WHERE id IN (SELECT id FROM entries WHERE id NOT IN ({protected}) "
+                    "ORDER BY id LIMIT ?)",
+                    (excess,),
+                ).rowcount
+            objects = self._conn.execute(
+                "DELETE FROM objects WHERE hash NOT IN (SELECT hash FROM entries)"
+            ).rowcount
+        if removed or objects:
+            with self._lock:
+                # The pragma frees one page per step, so it has to be read to the end
+                self._conn.execute("PRAGMA incremental_vacuum").fetchall()
+        files = self._prune_output_dir(output_dir, now) if output_dir else 0
+        return {"entries": removed, "objects": objects, "files": files}
+
+    def _prune_output_dir(self, directory: str, now: datetime) -> int:
+        """Delete dated reports (``*_YYYY-MM-DD.md``/``.txt``) older than output_keep whose content is archived."""
+        if not os.path.isdir(directory):
+            return 0
+        cutoff = (now - self.output_keep).strftime("%Y-%m-%d")
+        deleted = 0
+        for name in os.listdir(directory):
+            stem, ext = os.path.splitext(name)
+            match = _DATE_SUFFIX.search(stem)
+            if ext not in (".md", ".txt") or not match or match.group(1) >= cutoff:
+                continue
+            path = os.path.join(directory, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    archived = self.contains(f.read())
+                if archived:
+                    os.remove(path)
+                    deleted += 1
+            except (OSError, UnicodeDecodeError):
+                continue
+        return deleted
+
+
+def archive_enabled() -> bool:
+    return os.getenv("FPL_ARCHIVE", "1").lower() not in ("0", "false", "no")
+
+
+_archive: Optional[OutputArchive] = None
+_archive_lock = threading.Lock()
+
+
+def output_archive() -> OutputArchive:
+    """Process-wide archive at FPL_ARCHIVE_PATH (default output/archive/reports.sqlite3)."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = OutputArchive(
+                path=os.getenv("FPL_ARCHIVE_PATH", DEFAULT_ARCHIVE_PATH),
+                max_age_days=float(os.getenv("FPL_ARCHIVE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS)),
+                max_entries=int(os.getenv("FPL_ARCHIVE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                output_keep_days=float(os.getenv("FPL_OUTPUT_KEEP_DAYS", DEFAULT_OUTPUT_KEEP_DAYS)),
+            )
+        return _archive
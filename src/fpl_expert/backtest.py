@@ -0,0 +1,617 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .history import HistoryArchive, SeasonPartition
+from .lineup import build_outlook
+from .optimizer import XI_MAX, XI_MIN, XI_SIZE, SquadConstraints, Squad, best_transfers, select_squad
+from .player_table import POSITIONS, PlayerTable
+from .scoring import FREE_TRANSFERS_PER_GAMEWEEK, TRANSFER_HIT, captain_multipliers, score_stats
+
+
+# Price used when an archived row has no price recorded
+DEFAULT_PRICE = 5.0
+# Size of the synthetic field of rival managers used for rank-percentile estimates
+DEFAULT_FIELD_SIZE = 10_000
+
+
+@dataclass
+class DeadlineContext:
+    """
+    Everything a policy may look at when picking a team for ``gameweek``: the
+    player pool and prices at the deadline and stats from earlier gameweeks only.
+    """
+    season: str
+    gameweek: int
+    table: PlayerTable
+    # Per table row: points in each earlier gameweek (NaN where the player did not feature)
+    past_points: np.ndarray
+    # Per table row: ownership % at this deadline (0 if unknown)
+    ownership: np.ndarray
+    # Per table row: chance of starting this gameweek over the player's recent start rate (see lineup.py)
+    availability: Optional[np.ndarray] = None
+
+    def mean_points(self, window: Optional[int] = None) -> np.ndarray:
+        history = self.past_points if window is None else self.past_points[:, -window:]
+        if history.shape[1] == 0:
+            return np.zeros(len(self.table))
+        counts = np.sum(~np.isnan(history), axis=1)
+        totals = np.nansum(history, axis=1)
+        means = np.divide(totals, counts, out=np.zeros(len(self.table)), where=counts > 0)
+        # Players without history get the average of their position
+        for code in range(len(POSITIONS)):
+            mask = self.table.position_codes == code
+            seen = mask & (counts > 0)
+            means[mask & (counts == 0)] = means[seen].mean() if seen.any() else 0.0
+        return means
+
+
+class Policy:
+    """
+    A selection / captaincy / transfer strategy. Subclasses override ``scores``
+    (expected points per table row) and optionally ``captain_scores``.
+
+    Policies are looked up by name in POLICIES so they can be shipped to worker processes.
+    """
+    name = "base"
+    max_transfers = 3
+
+    def scores(self, context: DeadlineContext) -> np.ndarray:
+        raise NotImplementedError
+
+    def captain_scores(self, context: DeadlineContext, scores: np.ndarray) -> np.ndarray:
+        return scores
+
+    def projections(self, context: DeadlineContext) -> np.ndarray:
+        """``scores`` scaled by each player's expected availability, so rotation risks and injured players drop."""
+        scores = self.scores(context)
+        return scores if context.availability is None else scores * context.availability
+
+
+class FormPolicy(Policy):
+    """Pick on average points over the last few gameweeks."""
+    name = "form"
+
+    def __init__(self, window: int = 3):
+        self.window = window
+
+    def scores(self, context: DeadlineContext) -> np.ndarray:
+        return context.mean_points(self.window)
+
+
+class SeasonAveragePolicy(Policy):
+    """Pick on average points over every gameweek played so far."""
+    name = "season_average"
+
+    def scores(self, context: DeadlineContext) -> np.ndarray:
+        return context.mean_points()
+
+
+class TemplatePolicy(Policy):
+    """Follow the crowd: form weighted towards highly owned players."""
+    name = "template"
+
+    def scores(self, context: DeadlineContext) -> np.ndarray:
+        return context.mean_points(3) * (1.0 + context.ownership / 100.0)
+
+
+class DifferentialPolicy(Policy):
+    """
+    The aggressive strategy from knowledge/user_preference.txt: favour
+    high-ceiling attacking players with low ownership, and captain on ceiling.
+    """
+    name = "differential"
+
+    def __init__(self, window: int = 4, ownership_weight: float = 0.5):
+        self.window = window
+        self.ownership_weight = ownership_weight
+
+    def _ceiling(self, context: DeadlineContext) -> np.ndarray:
+        history = context.past_points[:, -self.window:]
+        if history.shape[1] == 0:
+            return context.mean_points()
+        with np.errstate(all="ignore"):
+            ceiling = np.nanmax(np.where(np.isnan(history), -np.inf, history), axis=1)
+        return np.where(np.isfinite(ceiling), ceiling, context.mean_points())
+
+    def scores(self, context: DeadlineContext) -> np.ndarray:
+        form = context.mean_points(self.window)
+        ceiling = self._ceiling(context)
+        attacking = np.isin(context.table.position_codes, [POSITIONS.index("MID"), POSITIONS.index("FWD")])
+        upside = 0.6 * form + 0.4 * ceiling + np.where(attacking, 0.5, 0.0)
+        return upside * (1.0 - context.ownership / 100.0) ** self.ownership_weight
+
+    def captain_scores(self, context: DeadlineContext, scores: np.ndarray) -> np.ndarray:
+        return self._ceiling(context)
+
+
+class SetAndForgetPolicy(FormPolicy):
+    """Pick a squad on form for the first deadline and never transfer."""
+    name = "set_and_forget"
+    max_transfers = 0
+
+
+POLICIES: Dict[str, type] = {
+    policy.name: policy
+    for policy in (FormPolicy, SeasonAveragePolicy, TemplatePolicy, DifferentialPolicy, SetAndForgetPolicy)
+}
+
+
+@dataclass
+class BacktestResult:
+    policy: str
+    season: str
+    total_points: int
+    gameweek_points: List[int] = field(default_factory=list)
+    transfers: int = 0
+    hits: int = 0
+    captains: List[str] = field(default_factory=list)
+    rank_percentile: float = 0.0  # share of the synthetic field finishing below this policy
+
+
+class SeasonReplay:
+    """Per-season data shared by every policy: the points matrix and per-gameweek pools."""
+
+    def __init__(self, partition: SeasonPartition, names: Dict[int, str]):
+        self.partition = partition
+        self.season = partition.season
+        self.gameweeks = partition.gameweeks
+        stats = partition.stats
+
+        self.player_ids = np.unique(stats["player_id"])
+        self.gameweek_index = {gw: i for i, gw in enumerate(self.gameweeks)}
+        self.points = np.full((len(self.player_ids), len(self.gameweeks)), np.nan)
+        self.minutes = np.zeros((len(self.player_ids), len(self.gameweeks)), dtype=np.int16)
+        rows = np.searchsorted(self.player_ids, stats["player_id"])
+        cols = np.searchsorted(self.gameweeks, stats["gameweek"])
+        self.points[rows, cols] = score_stats(stats)
+        self.minutes[rows, cols] = stats["minutes"]
+        self.names = names
+
+    def deadline(self, gameweek: int, include_gameweek: bool = False) -> DeadlineContext:
+        """
+        Build the information set available at the deadline of ``gameweek``.
+        With ``include_gameweek`` the gameweek's own points count as history,
+        i.e. the information set for the deadline that follows it.
+
+        The pool is every player seen before the deadline, with the price,
+        ownership, club and position from their latest archived row.
+        """
+        known = self.partition.before(gameweek + int(include_gameweek))
+        if not len(known):
+            # Nothing is archived before the opening deadline: the gameweek's rows stand
+            # in for the player list and prices the game publishes before it opens
+            known = self.partition.gameweek(gameweek)
+        _, last = np.unique(known["player_id"][::-1], return_index=True)
+        rows = known[len(known) - 1 - last]
+        prices = np.where(rows["price"] > 0, rows["price"], DEFAULT_PRICE)
+        table = PlayerTable(
+            player_ids=rows["player_id"].tolist(),
+            names=[self.names.get(int(pid), str(pid)) for pid in rows["player_id"]],
+            clubs=[self.partition.clubs[c] for c in rows["club"]],
+            positions=[POSITIONS[p] for p in rows["position"]],
+            prices=prices.tolist(),
+            n_gameweeks=1,
+        )
+        matrix_rows = np.searchsorted(self.player_ids, table.player_ids)
+        past = self.points[matrix_rows, :self.gameweek_index[gameweek] + int(include_gameweek)]
+
+        ownership_by_id = dict(zip(rows["player_id"].tolist(), rows["ownership"].tolist()))
+        ownership = np.array([ownership_by_id[int(pid)] for pid in table.player_ids], dtype=np.float64)
+
+        # Start chances from the same minutes (team news is not archived, so only congestion applies)
+        upcoming = gameweek + int(include_gameweek)
+        lineups = build_outlook(self.partition, upcoming - 1, [upcoming])
+        return DeadlineContext(self.season, gameweek, table, past, ownership, lineups.factors(table.player_ids))
+
+    def realised(self, player_ids: Sequence[int], gameweek: int) -> np.ndarray:
+        """Actual points (0 if absent) for players in a gameweek."""
+        col = self.gameweek_index[gameweek]
+        idx = np.searchsorted(self.player_ids, player_ids)
+        idx = np.clip(idx, 0, len(self.player_ids) - 1)
+        found = self.player_ids[idx] == np.asarray(player_ids)
+        return np.where(found, np.nan_to_num(self.points[idx, col]), 0.0)
+
+    def played(self, player_ids: Sequence[int], gameweek: int) -> np.ndarray:
+        col = self.gameweek_index[gameweek]
+        idx = np.clip(np.searchsorted(self.player_ids, player_ids), 0, len(self.player_ids) - 1)
+        found = self.player_ids[idx] == np.asarray(player_ids)
+        return found & (self.minutes[idx, col] > 0)
+
+
+def _score_gameweek(replay: SeasonReplay, table: PlayerTable, squad: Squad, gameweek: int) -> int:
+    """Realised points for a squad: automatic substitutions from the bench, then captaincy."""
+    starting = list(squad.starting)
+    bench = list(squad.bench)
+
+    def ids(rows: Sequence[int]) -> List[int]:
+        return [int(table.player_ids[r]) for r in rows]
+
+    played = dict(zip(starting + bench, replay.played(ids(starting + bench), gameweek)))
+    for i, row in enumerate(list(starting)):
+        if played[row]:
+            continue
+        for sub in bench:
+            if not played[sub]:
+                continue
+            same_role = (table.position_codes[sub] == 0) == (table.position_codes[row] == 0)
+            trial = starting[:i] + [sub] + starting[i + 1:]
+            counts = np.bincount(table.position_codes[trial], minlength=len(POSITIONS))
+            if same_role and counts[1] >= 3 and counts[2] >= 2 and counts[3] >= 1:
+                starting[i] = sub
+                bench.remove(sub)
+                break
+
+    points = replay.realised(ids(starting), gameweek)
+    captain, vice_captain = captain_multipliers(played[squad.captain])
+    for row, multiplier in ((squad.captain, captain), (squad.vice_captain, vice_captain)):
+        if row in starting:
+            points[starting.index(row)] *= multiplier
+    return int(round(points.sum()))
+
+
+def run_policy(replay: SeasonReplay, policy: Policy, budget: float = 100.0) -> BacktestResult:
+    """Walk through a season, letting the policy pick and transfer at each deadline."""
+    constraints = SquadConstraints(budget=budget)
+    result = BacktestResult(policy=policy.name, season=replay.season, total_points=0)
+    current_ids: Optional[List[int]] = None
+
+    for gameweek in replay.gameweeks:
+        context = replay.deadline(gameweek)
+        scores = policy.projections(context)
+        if current_ids is None:
+            squad = select_squad(context.table, scores, constraints)
+            chosen = 0
+        else:
+            squad, chosen = best_transfers(
+                context.table, scores, current_ids, constraints,
+                free_transfers=min(FREE_TRANSFERS_PER_GAMEWEEK, policy.max_transfers),
+                hit_cost=TRANSFER_HIT,
+                max_transfers=policy.max_transfers,
+            )
+        captain_scores = policy.captain_scores(context, scores)
+        ranked = sorted(squad.starting, key=lambda r: -captain_scores[r])
+        squad.captain, squad.vice_captain = ranked[0], ranked[1]
+
+        # Replacing players who left the pool is free; only chosen transfers can cost a hit
+        hits = max(0, chosen - FREE_TRANSFERS_PER_GAMEWEEK)
+        points = _score_gameweek(replay, context.table, squad, gameweek) - hits * TRANSFER_HIT
+        transfers = len(set(squad.player_ids) - set(current_ids or squad.player_ids))
+        current_ids = squad.player_ids
+
+        result.gameweek_points.append(points)
+        result.total_points += points
+        result.transfers += transfers
+        result.hits += hits
+        result.captains.append(context.table.names[squad.captain])
+    return result
+
+
+@dataclass
+class _Market:
+    """One deadline's player pool, indexed like SeasonReplay.player_ids."""
+    available: np.ndarray   # seen before the deadline
+    positions: np.ndarray
+    clubs: np.ndarray       # codes into the season partition's clubs
+    prices: np.ndarray
+    ownership: np.ndarray
+    form: np.ndarray        # average points so far
+
+    @classmethod
+    def at(cls, replay: SeasonReplay, context: DeadlineContext) -> "_Market":
+        table = context.table
+        n_players = len(replay.player_ids)
+        index = np.searchsorted(replay.player_ids, table.player_ids)
+        club_codes = np.array([replay.partition.clubs.index(club) for club in table.clubs], dtype=np.intp)
+        market = cls(
+            np.zeros(n_players, dtype=bool), np.zeros(n_players, dtype=np.intp), np.zeros(n_players, dtype=np.intp),
+            np.zeros(n_players), np.zeros(n_players), np.zeros(n_players),
+        )
+        market.available[index] = True
+        market.positions[index] = table.position_codes
+        market.clubs[index] = club_codes[table.club_codes]
+        market.prices[index] = table.prices
+        market.ownership[index] = context.ownership
+        market.form[index] = context.mean_points()
+        return market
+
+    def pool(self, code: int) -> np.ndarray:
+        return np.nonzero(self.available & (self.positions == code))[0]
+
+
+def _gumbel(rng: np.random.Generator, shape: Tuple[int, ...]) -> np.ndarray:
+    return -np.log(-np.log(np.maximum(rng.random(shape), 1e-300)))
+
+
+def _draft_field(
+    market: _Market, constraints: SquadConstraints, n_managers: int, rng: np.random.Generator
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Squads for ``n_managers`` rivals, sampled in proportion to ownership under
+    the quotas, budget and club limit. Slots are filled for every rival at
+    once (Gumbel-max sampling); each pick leaves enough money to fill the
+    remaining slots even if the rival has taken the cheapest players so far.
+
+    Returns:
+        (squads as player indices grouped by position, money left in the bank)
+    """
+    quotas = [constraints.quotas[position] for position in POSITIONS]
+    logits = np.log(market.ownership + 0.1)
+    cheapest = [np.sort(market.prices[market.pool(code)]) for code in range(len(POSITIONS))]
+    squads = np.empty((n_managers, sum(quotas)), dtype=np.intp)
+    bank = np.full(n_managers, constraints.budget)
+    club_counts = np.zeros((n_managers, int(market.clubs.max()) + 1), dtype=np.int32)
+    managers = np.arange(n_managers)
+
+    slot = 0
+    for code, quota in enumerate(quotas):
+        pool = market.pool(code)
+        if len(pool) < quota:
+            raise ValueError(f"Need at least {quota} {POSITIONS[code]} players to draft rival squads")
+        taken = np.zeros((n_managers, len(pool)), dtype=bool)
+        for k in range(quota):
+            reserve = cheapest[code][k + 1:quota].sum() + sum(
+                cheapest[later][:quotas[later]].sum() for later in range(code + 1, len(POSITIONS))
+            )
+            legal = ~taken & (club_counts[:, market.clubs[pool]] < constraints.max_per_club)
+            ok = legal & (market.prices[pool] <= (bank - reserve)[:, None] + 1e-6)
+            pick = np.argmax(np.where(ok, logits[pool] + _gumbel(rng, ok.shape), -np.inf), axis=1)
+            # The club limit can rule out the cheap players the reserve counted on: take the cheapest one left
+            stuck = ~ok.any(axis=1)
+            if stuck.any():
+                pick[stuck] = np.argmin(np.where(legal[stuck], market.prices[pool], np.inf), axis=1)
+            taken[managers, pick] = True
+            squads[:, slot] = pool[pick]
+            bank -= market.prices[pool[pick]]
+            club_counts[managers, market.clubs[pool[pick]]] += 1
+            slot += 1
+
+    for rival in np.nonzero(bank < -1e-6)[0]:
+        bank[rival] = _fit_budget(squads[rival], bank[rival], market, constraints)
+    return squads, bank
+
+
+def _fit_budget(squad: np.ndarray, bank: float, market: _Market, constraints: SquadConstraints) -> float:
+    """
+    Bring a drafted squad back within budget (in place) by swapping its dearest
+    players for the cheapest legal players in the same position.
+
+    Returns:
+        Money left in the bank afterwards
+    """
+    while bank < -1e-6:
+        clubs = np.bincount(market.clubs[squad], minlength=int(market.clubs.max()) + 1)
+        for slot in np.argsort(-market.prices[squad], kind="stable"):
+            out = squad[slot]
+            pool = market.pool(int(market.positions[out]))
+            ok = (
+                ~np.isin(pool, squad)
+                & (market.prices[pool] < market.prices[out])
+                & ((clubs[market.clubs[pool]] < constraints.max_per_club) | (market.clubs[pool] == market.clubs[out]))
+            )
+            if ok.any():
+                incoming = pool[ok][np.argmin(market.prices[pool[ok]])]
+                bank += market.prices[out] - market.prices[incoming]
+                squad[slot] = incoming
+                break
+        else:
+            break
+    return bank
+
+
+def _field_transfers(
+    squads: np.ndarray, bank: np.ndarray, market: _Market, constraints: SquadConstraints, rng: np.random.Generator
+) -> None:
+    """
+    Each rival's free transfer, made in place: the squad player with the worst
+    form so far is sold for an ownership-weighted pick in the same position
+    that is affordable, keeps the club limit and has better form. Rivals with
+    no such pick hold their squad.
+    """
+    n_managers = len(squads)
+    logits = np.log(market.ownership + 0.1)
+    form = market.form[squads] + 1e-3 * rng.random(squads.shape)
+    out_slot = np.argmin(form, axis=1)
+    out = squads[np.arange(n_managers), out_slot]
+
+    for code in range(len(POSITIONS)):
+        sellers = np.nonzero(market.positions[out] == code)[0]
+        pool = market.pool(code)
+        if not len(sellers) or not len(pool):
+            continue
+        rivals = np.arange(len(sellers))[:, None]
+        owned = np.zeros((len(sellers), len(market.available)), dtype=bool)
+        owned[rivals, squads[sellers]] = True
+        club_counts = np.zeros((len(sellers), int(market.clubs.max()) + 1), dtype=np.int32)
+        np.add.at(club_counts, (rivals, market.clubs[squads[sellers]]), 1)
+        club_counts[rivals[:, 0], market.clubs[out[sellers]]] -= 1
+
+        spend = bank[sellers] + market.prices[out[sellers]]
+        ok = (
+            ~owned[:, pool]
+            & (market.prices[pool] <= spend[:, None] + 1e-6)
+            & (club_counts[:, market.clubs[pool]] < constraints.max_per_club)
+            & (market.form[pool] > market.form[out[sellers]][:, None])
+        )
+        pick = np.argmax(np.where(ok, logits[pool] + _gumbel(rng, ok.shape), -np.inf), axis=1)
+        moving = ok.any(axis=1)
+        buyers, incoming = sellers[moving], pool[pick[moving]]
+        bank[buyers] += market.prices[out[buyers]] - market.prices[incoming]
+        squads[buyers, out_slot[buyers]] = incoming
+
+
+def _field_points(
+    replay: SeasonReplay, squads: np.ndarray, market: _Market, constraints: SquadConstraints, gameweek: int
+) -> np.ndarray:
+    """
+    Rival points for a gameweek. Rivals start their most-owned legal XI and
+    captain (and vice-captain) its two most-owned players; automatic
+    substitutions follow the same rules as _score_gameweek.
+    """
+    n_managers, size = squads.shape
+    managers = np.arange(n_managers)[:, None]
+    slot_codes = np.repeat(np.arange(len(POSITIONS)), [constraints.quotas[p] for p in POSITIONS])
+    col = replay.gameweek_index[gameweek]
+    points = np.nan_to_num(replay.points[squads, col])
+    played = replay.minutes[squads, col] > 0
+    ownership = market.ownership[squads]
+
+    starting = np.zeros((n_managers, size), dtype=bool)
+    extra = np.full((n_managers, size), -np.inf)
+    for code, position in enumerate(POSITIONS):
+        slots = np.nonzero(slot_codes == code)[0]
+        ranked = slots[np.argsort(-ownership[:, slots], axis=1, kind="stable")]
+        starting[managers, ranked[:, :XI_MIN[position]]] = True
+        optional = ranked[:, XI_MIN[position]:XI_MAX[position]]
+        extra[managers, optional] = ownership[managers, optional]
+    fill = XI_SIZE - sum(XI_MIN.values())
+    starting[managers, np.argsort(-extra, axis=1, kind="stable")[:, :fill]] = True
+
+    picks = np.argsort(-np.where(starting, ownership, -np.inf), axis=1, kind="stable")
+    captain, vice_captain = picks[:, 0], picks[:, 1]
+    bench = np.argsort(-np.where(starting, -np.inf, ownership), axis=1, kind="stable")[:, :size - XI_SIZE]
+
+    final = starting.copy()
+    counts = np.stack([starting[:, slot_codes == code].sum(axis=1) for code in range(len(POSITIONS))], axis=1)
+    minimum = np.array([XI_MIN[position] for position in POSITIONS])
+    used = np.zeros(bench.shape, dtype=bool)
+    rows = np.arange(n_managers)
+    for slot in range(size):
+        missing = starting[:, slot] & ~played[:, slot]
+        for b in range(bench.shape[1]):
+            sub = bench[:, b]
+            after = counts.copy()
+            after[:, slot_codes[slot]] -= 1
+            after[rows, slot_codes[sub]] += 1
+            ok = (
+                missing & ~used[:, b] & played[rows, sub]
+                & ((slot_codes[sub] == 0) == (slot_codes[slot] == 0))
+                & (after >= minimum).all(axis=1)
+            )
+            final[ok, slot] = False
+            final[rows[ok], sub[ok]] = True
+            used[ok, b] = True
+            counts[ok] = after[ok]
+            missing &= ~ok
+
+    captain_multiplier, vice_multiplier = captain_multipliers(played[rows, captain])
+    totals = (points * final).sum(axis=1)
+    totals += (captain_multiplier - 1.0) * points[rows, captain] * final[rows, captain]
+    totals += (vice_multiplier - 1.0) * points[rows, vice_captain] * final[rows, vice_captain]
+    return totals
+
+
+def simulate_field(
+    replay: SeasonReplay, n_managers: int = DEFAULT_FIELD_SIZE, seed: int = 0, budget: float = 100.0
+) -> np.ndarray:
+    """
+    Season totals for a synthetic field of rival managers playing by the same
+    rules as the policies.
+
+    Each rival drafts a 2-5-5-3 squad within the budget and club limit at the
+    first deadline, picking players in proportion to ownership, then uses one
+    free transfer per deadline (see _field_transfers). Every gameweek they
+    start their most-owned XI, with automatic substitutions from the bench
+    and the captain and vice-captain multipliers.
+    """
+    rng = np.random.default_rng(seed)
+    constraints = SquadConstraints(budget=budget)
+    totals = np.zeros(n_managers)
+    squads: Optional[np.ndarray] = None
+    bank = np.zeros(n_managers)
+    for gameweek in replay.gameweeks:
+        market = _Market.at(replay, replay.deadline(gameweek))
+        if squads is None:
+            squads, bank = _draft_field(market, constraints, n_managers, rng)
+        else:
+            _field_transfers(squads, bank, market, constraints, rng)
+        totals += _field_points(replay, squads, market, constraints, gameweek)
+    return totals
+
+
+def _run_season(root: str, season: str, policy_names: Sequence[str], budget: float,
+                field_size: int, seed: int) -> List[BacktestResult]:
+    archive = HistoryArchive(root)
+    names = {pid: info["name"] for pid, info in archive.players.items()}
+    replay = SeasonReplay(archive.season(season), names)
+    field_totals = simulate_field(replay, field_size, seed, budget) if field_size else None
+
+    results = []
+    for name in policy_names:
+        result = run_policy(replay, POLICIES[name](), budget)
+        if field_totals is not None:
+            result.rank_percentile = float((field_totals < result.total_points).mean() * 100.0)
+        results.append(result)
+    return results
+
+
+def run_backtest(
+    seasons: Optional[Sequence[str]] = None,
+    policies: Optional[Sequence[str]] = None,
+    budget: float = 100.0,
+    field_size: int = DEFAULT_FIELD_SIZE,
+    workers: Optional[int] = None,
+    root: Optional[str] = None,
+    seed: int = 0,
+) -> List[BacktestResult]:
+    """
+    Replay archived seasons through every policy in parallel.
+
+    Each (season, policy) pair runs in its own worker process; workers open
+    the memory-mapped archive themselves so nothing large is pickled.
+
+    Args:
+        seasons: Seasons to replay (defaults to every archived season)
+        policies: Policy names from POLICIES (defaults to all)
+        budget: Squad budget in millions
+        field_size: Number of synthetic rivals for rank-percentile estimates (0 disables)
+        workers: Worker processes (defaults to the CPU count)
+        root: History archive directory
+        seed: Seed for the synthetic field, so every policy faces the same rivals
+    """
+    archive = HistoryArchive(root)
+    seasons = list(seasons or archive.seasons())
+    if not seasons:
+        raise ValueError(f"No archived seasons found in {archive.root}")
+    policies = list(policies or POLICIES)
+    unknown = [p for p in policies if p not in POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown policies: {', '.join(unknown)}")
+
+    jobs = [(season, [policy]) for season in seasons for policy in policies]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        batches = [_run_season(archive.root, s, p, budget, field_size, seed) for s, p in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [
+                pool.submit(_run_season, archive.root, s, p, budget, field_size, seed) for s, p in jobs
+            ]
+            batches = [future.result() for future in futures]
+    return [result for batch in batches for result in batch]
+
+
+def format_results(results: Sequence[BacktestResult]) -> str:
+    """Markdown summary: one row per policy and season plus an all-seasons total."""
+    lines = [
+        "| Policy | Season | Points | Transfers | Hits | Est. rank percentile |",
+        "|---|---|---:|---:|---:|---:|",
+    ]
+    for r in sorted(results, key=lambda r: (r.season, -r.total_points)):
+        lines.append(
+            f"| {r.policy} | {r.season} | {r.total_points} | {r.transfers} | {r.hits} | "
+            f"top {100.0 - r.rank_percentile:.1f}% |"
+        )
+
+    totals: Dict[str, List[BacktestResult]] = {}
+    for r in results:
+        totals.setdefault(r.policy, []).append(r)
+    if len({r.season for r in results}) > 1:
+        lines += ["", "| Policy | Total points | Mean rank percentile |", "|---|---:|---:|"]
+        for policy, rs in sorted(totals.items(), key=lambda kv: -sum(r.total_points for r in kv[1])):
+            mean_pct = sum(r.rank_percentile for r in rs) / len(rs)
+            lines.append(f"| {policy} | {sum(r.total_points for r in rs)} | top {100.0 - mean_pct:.1f}% |")
+    return "\n".join(lines)
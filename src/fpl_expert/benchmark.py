@@ -0,0 +1,222 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .optimizer import IncrementalOptimizer, SquadConstraints, is_legal, select_squad
+from .player_table import LEAGUE_PHASE_GAMEWEEKS, POSITIONS, PlayerTable
+
+
+DEFAULT_POOL_SIZES = (100, 500, 1000, 2000, 5000)
+DEFAULT_HORIZONS = (1, 2, 4, 8)
+DEFAULT_REPEATS = 3
+# Incremental re-solves: players whose projection changes per update, and updates per pool size
+DEFAULT_CHANGES = 5
+DEFAULT_UPDATES = 20
+N_CLUBS = 36
+POSITION_SHARES = (0.1, 0.35, 0.35, 0.2)
+BUDGET_SWEEP = (85.0, 90.0, 95.0, 100.0, 105.0, 110.0)
+
+
+def synthetic_pool(n_players: int, n_gameweeks: int = LEAGUE_PHASE_GAMEWEEKS, seed: int = 0) -> PlayerTable:
+    """
+    Random player pool shaped like the real one: prices of €4.0m-€12.0m in
+    €0.5m steps, projections that grow with price plus noise, players spread
+    over 36 clubs.
+    """
+    rng = np.random.default_rng(seed)
+    positions = rng.choice(POSITIONS, size=n_players, p=POSITION_SHARES)
+    # Every position needs enough players to fill its quota
+    positions[:len(POSITIONS) * 5] = np.repeat(POSITIONS, 5)
+    prices = np.round(rng.uniform(4.0, 12.0, n_players) * 2) / 2
+    quality = (prices - 3.0) * 0.6 + rng.normal(0.0, 1.0, n_players)
+    projections = np.clip(quality[:, None] + rng.normal(0.0, 1.5, (n_players, n_gameweeks)), 0.0, None)
+    return PlayerTable(
+        player_ids=list(range(n_players)),
+        names=[f"Player {i}" for i in range(n_players)],
+        clubs=[f"Club {i % N_CLUBS}" for i in range(n_players)],
+        positions=positions.tolist(),
+        prices=prices,
+        projections=projections,
+    )
+
+
+def _locked_banned(table: PlayerTable, scores: np.ndarray) -> List[SquadConstraints]:
+    # Ban the 10 best players (injured), lock two mid-table ones (the manager's picks)
+    order = np.argsort(-scores, kind="stable")
+    banned = frozenset(int(table.player_ids[r]) for r in order[:10])
+    locked = set()
+    for code in (1, 2):
+        rows = [r for r in order[len(order) // 2:] if table.position_codes[r] == code]
+        locked.add(int(table.player_ids[rows[0]]))
+    return [SquadConstraints(locked=frozenset(locked), banned=banned)]
+
+
+def _budget_sweep(table: PlayerTable, scores: np.ndarray) -> List[SquadConstraints]:
+    # Budgets below the cheapest squad of the pool cannot be met; small pools skip them
+    quotas = SquadConstraints().quotas
+    cheapest = sum(
+        float(np.sort(table.prices[table.position_codes == code])[:quotas[position]].sum())
+        for code, position in enumerate(POSITIONS)
+    )
+    return [SquadConstraints(budget=budget) for budget in BUDGET_SWEEP if budget >= cheapest]
+
+
+# Scenario -> constraint sets solved (one solve per set)
+SCENARIOS: Dict[str, Callable[[PlayerTable, np.ndarray], List[SquadConstraints]]] = {
+    "default": lambda table, scores: [SquadConstraints()],
+    "club limit 2": lambda table, scores: [SquadConstraints(max_per_club=2)],
+    "locked/banned": _locked_banned,
+    "budget sweep": _budget_sweep,
+}
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of cold select_squad() solves for one pool size, horizon and scenario."""
+    pool_size: int
+    horizon: int
+    scenario: str
+    seconds: List[float] = field(default_factory=list)   # one per solve
+    legal: bool = True
+    score: float = 0.0                                  # mean squad score
+
+    @property
+    def median_ms(self) -> float:
+        return float(np.median(self.seconds)) * 1000 if self.seconds else 0.0
+
+    @property
+    def p95_ms(self) -> float:
+        return float(np.percentile(self.seconds, 95)) * 1000 if self.seconds else 0.0
+
+
+@dataclass
+class IncrementalResult:
+    """Warm-started IncrementalOptimizer.update() against a cold select_squad() on the same scores."""
+    pool_size: int
+    changes: int
+    warm_seconds: List[float] = field(default_factory=list)
+    cold_seconds: List[float] = field(default_factory=list)
+    score_ratios: List[float] = field(default_factory=list)   # warm score / cold score
+    swaps: List[int] = field(default_factory=list)
+    legal: bool = True
+
+    @property
+    def speedup(self) -> float:
+        warm = float(np.median(self.warm_seconds)) if self.warm_seconds else 0.0
+        return float(np.median(self.cold_seconds)) / warm if warm else 0.0
+
+
+def benchmark_cold(
+    table: PlayerTable, horizon: int, scenario: str, repeats: int = DEFAULT_REPEATS
+) -> BenchmarkResult:
+    result = BenchmarkResult(pool_size=len(table), horizon=horizon, scenario=scenario)
+    scores = table.total_projection(1, horizon)
+    constraint_sets = SCENARIOS[scenario](table, scores)
+    total_score = 0.0
+    for _ in range(repeats):
+        for constraints in constraint_sets:
+            started = time.perf_counter()
+            # Summing the horizon is part of every solve
+            squad = select_squad(table, table.total_projection(1, horizon), constraints)
+            result.seconds.append(time.perf_counter() - started)
+            result.legal &= is_legal(table, squad.rows, constraints)
+            total_score += squad.score
+    result.score = total_score / len(result.seconds)
+    return result
+
+
+def benchmark_incremental(
+    table: PlayerTable, changes: int = DEFAULT_CHANGES, updates: int = DEFAULT_UPDATES, seed: int = 0
+) -> IncrementalResult:
+    """Change ``changes`` random projections by -70%..+80% ``updates`` times; time warm and cold re-solves."""
+    rng = np.random.default_rng(seed)
+    optimizer = IncrementalOptimizer(table)
+    optimizer.solve()
+    result = IncrementalResult(pool_size=len(table), changes=changes)
+    for _ in range(updates):
+        rows = rng.choice(len(table), size=min(changes, len(table)), replace=False)
+        update = {
+            int(table.player_ids[row]): float(optimizer.scores[row] * rng.uniform(0.3, 1.8)) for row in rows
+        }
+        started = time.perf_counter()
+        warm = optimizer.update(update)
+        result.warm_seconds.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        cold = select_squad(table, optimizer.scores, optimizer.constraints)
+        result.cold_seconds.append(time.perf_counter() - started)
+
+        result.score_ratios.append(warm.score / cold.score if cold.score else 1.0)
+        result.swaps.append(optimizer.swaps)
+        result.legal &= is_legal(table, warm.rows, optimizer.constraints)
+    return result
+
+
+def run_benchmark(
+    pool_sizes: Sequence[int] = DEFAULT_POOL_SIZES,
+    horizons: Sequence[int] = DEFAULT_HORIZONS,
+    repeats: int = DEFAULT_REPEATS,
+    changes: int = DEFAULT_CHANGES,
+    updates: int = DEFAULT_UPDATES,
+    seed: int = 0,
+) -> Tuple[List[BenchmarkResult], List[IncrementalResult]]:
+    """
+    Time squad selection on synthetic pools for every pool size, horizon and
+    scenario, and incremental re-solves for every pool size.
+
+    Returns:
+        (cold solve results, incremental results)
+    """
+    cold: List[BenchmarkResult] = []
+    incremental: List[IncrementalResult] = []
+    for size in pool_sizes:
+        table = synthetic_pool(size, max(LEAGUE_PHASE_GAMEWEEKS, max(horizons)), seed)
+        # One untimed solve so first-call overheads do not land in the smallest case
+        select_squad(table)
+        for horizon in horizons:
+            for scenario in SCENARIOS:
+                cold.append(benchmark_cold(table, horizon, scenario, repeats))
+        incremental.append(benchmark_incremental(table, changes, updates, seed))
+    return cold, incremental
+
+
+def format_benchmark(cold: Sequence[BenchmarkResult], incremental: Sequence[IncrementalResult]) -> str:
+    """Markdown report: cold solve times per pool size and scenario (one column per horizon), then re-solves."""
+    horizons = sorted({r.horizon for r in cold})
+    lines = [
+        "### Cold solves (median / p95 ms per solve)",
+        "",
+        "| Players | Scenario | " + " | ".join(f"{h} GW" for h in horizons) + " | Legal |",
+        "|---:|---|" + "---:|" * len(horizons) + "---|",
+    ]
+    cases: Dict[Tuple[int, str], Dict[int, BenchmarkResult]] = {}
+    for result in cold:
+        cases.setdefault((result.pool_size, result.scenario), {})[result.horizon] = result
+    for (size, scenario), by_horizon in cases.items():
+        cells = [
+            f"{by_horizon[h].median_ms:.1f} / {by_horizon[h].p95_ms:.1f}" if h in by_horizon else "-"
+            for h in horizons
+        ]
+        legal = all(result.legal for result in by_horizon.values())
+        lines.append(f"| {size} | {scenario} | " + " | ".join(cells) + f" | {'yes' if legal else 'NO'} |")
+
+    if incremental:
+        lines += [
+            "",
+            "### Incremental re-solves",
+            "",
+            "| Players | Changed | Warm median (ms) | Warm p95 (ms) | Cold median (ms) | Speed-up "
+            "| Mean swaps | Score vs cold (mean / min) | Legal |",
+            "|---:|---:|---:|---:|---:|---:|---:|---:|---|",
+        ]
+        for update in incremental:
+            lines.append(
+                f"| {update.pool_size} | {update.changes} | {np.median(update.warm_seconds) * 1000:.2f} "
+                f"| {np.percentile(update.warm_seconds, 95) * 1000:.2f} | {np.median(update.cold_seconds) * 1000:.2f} "
+                f"| {update.speedup:.1f}x | {np.mean(update.swaps):.1f} "
+                f"| {np.mean(update.score_ratios):.1%} / {min(update.score_ratios):.1%} "
+                f"| {'yes' if update.legal else 'NO'} |"
+            )
+    return "\n".join(lines)
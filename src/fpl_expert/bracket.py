@@ -0,0 +1,280 @@
+import logging
+import os
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+from .entities import canonical_club
+from .player_table import PlayerTable
+from .season_calendar import LEAGUE_STAGE, _season_start_year, season_calendar, season_of
+
+
+TOURNAMENT_FILE = os.path.join(os.path.dirname(__file__), "config", "tournament.yaml")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIMULATIONS = 20_000
+
+LEAGUE_MATCHES = 8
+# League positions (1-based): 1-8 go straight to the round of 16, 9-24 play off, the rest are out
+DIRECT_QUALIFIERS = 8
+PLAYOFF_LAST = 24
+
+# Knockout stages in order, as named in config/calendar.yaml, plus the trophy
+KNOCKOUT_STAGES: Tuple[str, ...] = ("playoff", "round_of_16", "quarter_final", "semi_final", "final")
+WINNER = "winner"
+
+# Share of single matches drawn, whatever the ratings
+DRAW_RATE = 0.26
+# A two-legged tie is more decisive than one match: the rating gap counts this much more
+TWO_LEG_FACTOR = 1.4
+
+
+def win_expectancy(rating: np.ndarray, opponent: np.ndarray, factor: float = 1.0) -> np.ndarray:
+    """Elo expectancy of ``rating`` beating ``opponent``."""
+    return 1.0 / (1.0 + 10.0 ** (-(rating - opponent) * factor / 400.0))
+
+
+class TournamentOutlook:
+    """
+    How far each club is likely to go, from a TournamentSimulator run.
+
+    ``reach[stage]`` is the probability of playing in that stage. League
+    gameweeks are played by every club, and a knockout gameweek is played
+    by a club with the probability of reaching its stage.
+    """
+
+    def __init__(self, season: str, clubs: Sequence[str], reach: Dict[str, np.ndarray], n_simulations: int,
+                 stages: Dict[int, str]):
+        self.season = season
+        self.clubs = tuple(clubs)
+        self.reach = reach
+        self.n_simulations = n_simulations
+        self.stages = stages   # gameweek number -> stage
+        self._index: Optional[Dict[str, int]] = None
+
+    def index(self, club: str) -> Optional[int]:
+        """Position of ``club`` in ``clubs``, matching any name the entity index knows for it."""
+        if self._index is None:
+            self._index = {canonical_club(name): i for i, name in enumerate(self.clubs)}
+            self._index.update((name, i) for i, name in enumerate(self.clubs))
+        index = self._index.get(club)
+        return index if index is not None else self._index.get(canonical_club(club))
+
+    def play_probability(self, gameweek: int) -> np.ndarray:
+        """Probability of each club playing in ``gameweek``."""
+        stage = self.stages.get(gameweek)
+        if stage == LEAGUE_STAGE:
+            return np.ones(len(self.clubs))
+        if stage is None:
+            return np.zeros(len(self.clubs))
+        return self.reach[stage]
+
+    def expected_matches(self, start_gameweek: int, horizon: Optional[int] = None) -> np.ndarray:
+        """
+        Expected number of matches per club from ``start_gameweek`` over
+        ``horizon`` gameweeks (defaults to the rest of the season).
+        """
+        last = max(self.stages) if horizon is None else start_gameweek + horizon - 1
+        total = np.zeros(len(self.clubs))
+        for gameweek in range(start_gameweek, last + 1):
+            total += self.play_probability(gameweek)
+        return total
+
+    def report(self, start_gameweek: int = 1) -> str:
+        """Markdown table: stage probabilities and expected remaining matches, most matches first."""
+        remaining = self.expected_matches(start_gameweek)
+        stages = list(KNOCKOUT_STAGES) + [WINNER]
+        lines = [
+            f"Tournament outlook for {self.season} from gameweek {start_gameweek} "
+            f"({self.n_simulations:,} simulations):",
+            "",
+            "| Club | Matches left | " + " | ".join(s.replace("_", " ").title() for s in stages) + " |",
+            "|---|---:|" + "---:|" * len(stages),
+        ]
+        for i in np.argsort(-remaining, kind="stable"):
+            cells = " | ".join(f"{self.reach[s][i]:.0%}" for s in stages)
+            lines.append(f"| {self.clubs[i]} | {remaining[i]:.2f} | {cells} |")
+        return "\n".join(lines)
+
+
+class TournamentSimulator:
+    """
+    Monte Carlo simulator of the rest of a Champions League season.
+
+    Every simulation plays out the remaining league-phase matches against
+    random opponents (the real draw is not configured), ranks the 36-club
+    table, plays the knockout play-offs (9-10 against 23-24, 11-12 against
+    21-22 and so on), then a seeded bracket: clubs 1-2 meet the play-off
+    winners from 15-18, clubs 3-4 those from 13-14/19-20, and so on, with
+    each seeded pair split across the two halves. Results come from Elo
+    expectancies. All simulations run at once as arrays of shape
+    (simulations, clubs).
+    """
+
+    def __init__(self, clubs: Sequence[str], ratings: Sequence[float], points: Optional[Sequence[int]] = None,
+                 played: Optional[Sequence[int]] = None, season: Optional[str] = None):
+        if len(clubs) < PLAYOFF_LAST:
+            raise ValueError(f"Need at least {PLAYOFF_LAST} clubs, got {len(clubs)}")
+        self.clubs = list(clubs)
+        self.ratings = np.asarray(ratings, dtype=np.float64)
+        self.points = np.zeros(len(clubs)) if points is None else np.asarray(points, dtype=np.float64)
+        self.played = np.zeros(len(clubs), dtype=int) if played is None else np.asarray(played, dtype=int)
+        self.season = season or season_of()
+
+    @classmethod
+    def from_config(cls, season: Optional[str] = None, path: str = TOURNAMENT_FILE) -> "TournamentSimulator":
+        """Clubs, ratings and table of ``season`` (defaults to the current one) from config/tournament.yaml."""
+        season = season or season_of()
+        with open(path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        if not config:
+            raise KeyError("No seasons configured in the tournament file")
+        source = season if season in config else min(
+            config, key=lambda s: abs(_season_start_year(str(s)) - _season_start_year(season))
+        )
+        if source != season:
+            # Clubs outside the stand-in field get no knockout gameweeks in long-horizon scores
+            logger.warning(
+                "Season %s is not in %s; simulating with %s's clubs and ratings",
+                season, os.path.basename(path), source,
+            )
+        entries = config[source]
+        clubs = list(entries)
+        return cls(
+            clubs=clubs,
+            ratings=[entries[club]["rating"] for club in clubs],
+            points=[entries[club].get("points", 0) for club in clubs],
+            played=[entries[club].get("played", 0) for club in clubs],
+            season=season,
+        )
+
+    def _two_legs(self, rng: np.random.Generator, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Winners of ties between club indices ``a`` and ``b`` (arrays of the same shape)."""
+        p = win_expectancy(self.ratings[a], self.ratings[b], TWO_LEG_FACTOR)
+        return np.where(rng.random(a.shape) < p, a, b)
+
+    def _league_table(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Club indices in finishing order, shape (n, clubs)."""
+        n_clubs = len(self.clubs)
+        opponents = rng.integers(0, n_clubs - 1, (n, n_clubs, LEAGUE_MATCHES))
+        opponents += opponents >= np.arange(n_clubs)[None, :, None]   # never yourself
+        expected = win_expectancy(self.ratings[None, :, None], self.ratings[opponents])
+        roll = rng.random(expected.shape)
+        win = (1.0 - DRAW_RATE) * expected
+        points = np.where(roll < win, 3.0, np.where(roll < win + DRAW_RATE, 1.0, 0.0))
+        remaining = np.arange(LEAGUE_MATCHES)[None, None, :] < (LEAGUE_MATCHES - self.played)[None, :, None]
+        totals = self.points[None, :] + (points * remaining).sum(axis=2)
+        # Goal difference and the other tie-breakers are not modelled: break ties at random
+        totals += rng.random(totals.shape) * 0.5
+        return np.argsort(-totals, axis=1, kind="stable")
+
+    def simulate(self, n_simulations: int = DEFAULT_SIMULATIONS, seed: int = 0) -> TournamentOutlook:
+        rng = np.random.default_rng(seed)
+        n = n_simulations
+        rows = np.arange(n)
+        order = self._league_table(rng, n)
+        counts = {stage: np.zeros(len(self.clubs)) for stage in KNOCKOUT_STAGES + (WINNER,)}
+
+        def count(stage: str, clubs: np.ndarray) -> None:
+            counts[stage] += np.bincount(clubs.ravel(), minlength=len(self.clubs))
+
+        def position(p: int) -> np.ndarray:
+            return order[:, p - 1]
+
+        def coin() -> np.ndarray:
+            return rng.random(n) < 0.5
+
+        count("playoff", order[:, DIRECT_QUALIFIERS:PLAYOFF_LAST])
+        # Play-off blocks: 9-10 v 23-24, 11-12 v 21-22, 13-14 v 19-20, 15-16 v 17-18
+        playoff_winners = []
+        for block in range(4):
+            seeded = (position(9 + 2 * block), position(10 + 2 * block))
+            unseeded = (position(23 - 2 * block), position(24 - 2 * block))
+            flip = coin()
+            first = self._two_legs(rng, seeded[0], np.where(flip, unseeded[0], unseeded[1]))
+            second = self._two_legs(rng, seeded[1], np.where(flip, unseeded[1], unseeded[0]))
+            playoff_winners.append((first, second))
+
+        # Round of 16: seeds 1-2 meet block 3's winners, 3-4 block 2's, 5-6 block 1's, 7-8 block 0's.
+        # One club of each seeded pair goes to each half of the bracket.
+        halves: List[List[np.ndarray]] = [[], []]
+        for pair in range(4):
+            seeds = (position(1 + 2 * pair), position(2 + 2 * pair))
+            challengers = playoff_winners[3 - pair]
+            flip, side = coin(), coin()
+            ties = (
+                (seeds[0], np.where(flip, challengers[0], challengers[1])),
+                (seeds[1], np.where(flip, challengers[1], challengers[0])),
+            )
+            for i, (seeded_club, challenger) in enumerate(ties):
+                count("round_of_16", seeded_club)
+                count("round_of_16", challenger)
+                winner = self._two_legs(rng, seeded_club, challenger)
+                which = np.where(side, i, 1 - i)
+                halves[0].append(np.where(which == 0, winner, -1))
+                halves[1].append(np.where(which == 1, winner, -1))
+
+        # Within a half, quarter-finals pair the 1-2 tie with the 7-8 tie and the 3-4 tie with the 5-6 tie
+        finalists = []
+        for half in halves:
+            winners = np.stack(half, axis=1)                      # (n, 8); each row has 4 filled slots
+            slots = np.sort(np.where(winners >= 0, np.arange(8)[None, :], 99), axis=1)[:, :4]
+            clubs = winners[rows[:, None], slots]                 # by pair: 1-2, 3-4, 5-6, 7-8
+            quarter = (self._two_legs(rng, clubs[:, 0], clubs[:, 3]), self._two_legs(rng, clubs[:, 1], clubs[:, 2]))
+            count("quarter_final", clubs)
+            count("semi_final", np.stack(quarter, axis=1))
+            finalists.append(self._two_legs(rng, *quarter))
+        count("final", np.stack(finalists, axis=1))
+        # One match at a neutral venue; a draw goes to extra time and penalties
+        p = win_expectancy(self.ratings[finalists[0]], self.ratings[finalists[1]])
+        count(WINNER, np.where(rng.random(n) < p, finalists[0], finalists[1]))
+
+        reach = {stage: total / n for stage, total in counts.items()}
+        stages = {gw.number: gw.stage for gw in season_calendar().gameweeks(self.season)}
+        return TournamentOutlook(self.season, self.clubs, reach, n, stages)
+
+
+_outlooks: Dict[Tuple[str, date], TournamentOutlook] = {}
+_outlooks_lock = threading.Lock()
+
+
+def tournament_outlook(season: Optional[str] = None, n_simulations: int = DEFAULT_SIMULATIONS) -> TournamentOutlook:
+    """Outlook for ``season`` (defaults to the current one), simulated once per day."""
+    season = season or season_of()
+    key = (season, datetime.now().date())
+    with _outlooks_lock:
+        if key not in _outlooks:
+            _outlooks[key] = TournamentSimulator.from_config(season).simulate(n_simulations)
+        return _outlooks[key]
+
+
+def long_horizon_scores(
+    table: PlayerTable,
+    per_match: np.ndarray,
+    start_gameweek: int,
+    horizon: int,
+    outlook: Optional[TournamentOutlook] = None,
+    availability: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Expected points per table row over ``horizon`` gameweeks from
+    ``start_gameweek``: points per match times the club's expected number of
+    matches. Clubs the outlook does not know only count league gameweeks.
+    ``availability`` (rows x horizon, see LineupOutlook.availability()) scales
+    each gameweek by the player's chance of starting it.
+    """
+    outlook = outlook or tournament_outlook()
+    gameweeks = range(start_gameweek, start_gameweek + horizon)
+    plays = np.column_stack([outlook.play_probability(gameweek) for gameweek in gameweeks])
+    league_only = np.array([outlook.stages.get(gameweek) == LEAGUE_STAGE for gameweek in gameweeks], dtype=np.float64)
+    by_code = np.array([
+        plays[index] if (index := outlook.index(club)) is not None else league_only for club in table.clubs
+    ])
+    matches = by_code[table.club_codes]
+    if availability is not None:
+        matches = matches * availability
+    return np.asarray(per_match, dtype=np.float64) * matches.sum(axis=1)
@@ -0,0 +1,297 @@
+import copy
+import json
+import os
+import re
+import shutil
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from crewai.llms.base_llm import BaseLLM
+
+from .entities import slugify
+
+
+DEFAULT_TRANSCRIPT_DIR = os.path.join("output", "transcripts")
+# Runs whose transcripts are kept; older run directories are deleted when a new window starts
+DEFAULT_TRANSCRIPT_KEEP_DAYS = 14
+RUN_ID_FORMAT = "%Y-%m-%d_%H%M%S"
+
+# Agent steps (assistant messages and the feedback between them) kept verbatim in the prompt
+DEFAULT_WINDOW_STEPS = 6
+# Prompt size above which older kept observations are shortened as well
+DEFAULT_MAX_CHARS = 32000
+# Characters of each shortened observation kept in the prompt
+OBSERVATION_CHARS = 400
+# Characters of each dropped step's observation kept in the summary
+SUMMARY_OBSERVATION_CHARS = 160
+# Lines of the earlier-steps summary kept in the prompt (newest first to go)
+SUMMARY_LINES = 20
+# Transcripts (executor message lists) tracked at once
+MAX_TRACKED = 64
+
+SUMMARY_HEADER = "Summary of earlier steps"
+
+_ACTION = re.compile(r"^Action:\s*(.+)$", re.MULTILINE)
+_ACTION_INPUT = re.compile(r"^Action Input:\s*(.+)$", re.MULTILINE)
+_OBSERVATION = re.compile(r"\nObservation:\s*(.*)", re.DOTALL)
+
+
+def dedupe_tools(tools: Sequence[Any]) -> List[Any]:
+    """Tools in order, without repeats (by object, then by tool name)."""
+    unique: List[Any] = []
+    names = set()
+    for tool in tools:
+        name = getattr(tool, "name", None)
+        if any(tool is seen for seen in unique) or (name is not None and name in names):
+            continue
+        unique.append(tool)
+        names.add(name)
+    return unique
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit].rstrip() + " ..."
+
+
+def summarize_step(message: Dict[str, str], observation_chars: int = SUMMARY_OBSERVATION_CHARS) -> str:
+    """One summary line for a transcript message: the action taken and the start of what it returned."""
+    content = message.get("content") or ""
+    if message.get("role") != "assistant":
+        return f"- Feedback: {_shorten(content, observation_chars)}"
+    action = _ACTION.search(content)
+    if action is None:
+        return f"- Note: {_shorten(content, observation_chars)}"
+    action_input = _ACTION_INPUT.search(content)
+    observation = _OBSERVATION.search(content)
+    line = f"- {action.group(1).strip()}"
+    if action_input:
+        line += f" {_shorten(action_input.group(1), 120)}"
+    if observation:
+        line += f": {_shorten(observation.group(1), observation_chars)}"
+    return line
+
+
+def _message_chars(messages: Sequence[Dict[str, str]]) -> int:
+    return sum(len(m.get("content") or "") for m in messages)
+
+
+@dataclass
+class _Transcript:
+    """Bookkeeping for one agent executor's message list."""
+    head: Dict[str, str]       # first message of the list, to tell a reused list id apart
+    head_size: int             # system and task messages, always kept
+    path: str
+    written: int = 0           # messages of the list already spilled to disk
+    summary: List[str] = field(default_factory=list)   # newest SUMMARY_LINES lines
+    omitted: int = 0           # summary lines no longer shown
+    dropped: int = 0           # messages replaced by the summary
+
+
+class ContextWindow:
+    """
+    Keeps agent transcripts bounded in memory and in the prompt.
+
+    Before each LLM call the executor's message list is compacted in place:
+    the system and task messages stay, the last ``window_steps`` messages stay
+    verbatim, and everything older is replaced by a single summary message
+    listing the actions taken and the start of each result. Every message is
+    appended to a JSONL file under ``directory`` before it can be dropped, so
+    the full transcript can be read back with ``read_transcript()``.
+    """
+
+    def __init__(
+        self,
+        window_steps: int = DEFAULT_WINDOW_STEPS,
+        max_chars: int = DEFAULT_MAX_CHARS,
+        directory: str = DEFAULT_TRANSCRIPT_DIR,
+        observation_chars: int = OBSERVATION_CHARS,
+    ):
+        self.window_steps = max(1, window_steps)
+        self.max_chars = max_chars
+        self.directory = directory
+        self.observation_chars = observation_chars
+        self.run_id = datetime.now().strftime(RUN_ID_FORMAT)
+        self._transcripts: Dict[int, _Transcript] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _transcript(self, messages: List[Dict[str, str]], name: str) -> _Transcript:
+        state = self._transcripts.get(id(messages))
+        if state is None or state.head is not messages[0]:
+            head_size = next((i for i, m in enumerate(messages) if m.get("role") == "assistant"), len(messages))
+            self._count += 1
+            path = os.path.join(self.directory, self.run_id, f"{self._count:03d}_{slugify(name) or 'agent'}.jsonl")
+            state = _Transcript(head=messages[0], head_size=min(head_size, 2), path=path)
+            self._transcripts[id(messages)] = state
+            # Finished executors never call again; only the most recent lists need tracking
+            while len(self._transcripts) > MAX_TRACKED:
+                del self._transcripts[next(iter(self._transcripts))]
+        return state
+
+    def _spill(self, state: _Transcript, messages: List[Dict[str, str]]) -> None:
+        if len(messages) <= state.written:
+            return
+        os.makedirs(os.path.dirname(state.path), exist_ok=True)
+        with open(state.path, "a", encoding="utf-8") as f:
+            for message in messages[state.written:]:
+                f.write(json.dumps({"role": message.get("role"), "content": message.get("content")},
+                                   ensure_ascii=False) + "\n")
+        state.written = len(messages)
+
+    def _summary_message(self, state: _Transcript) -> Dict[str, str]:
+        text = f"{SUMMARY_HEADER} ({state.dropped} messages; full transcript in {state.path}):\n"
+        if state.omitted:
+            text += f"- ({state.omitted} earlier steps not shown)\n"
+        return {"role": "user", "content": text + "\n".join(state.summary)}
+
+    def compact(self, messages: List[Dict[str, str]], name: str = "agent") -> int:
+        """
+        Spill new messages to disk and shrink ``messages`` in place.
+
+        Returns:
+            Number of messages removed from the list
+        """
+        if not isinstance(messages, list) or not messages:
+            return 0
+        with self._lock:
+            state = self._transcript(messages, name)
+            if len(messages) < state.written:
+                # Rewritten by someone else (crewai's own context-length summary): start over
+                state.written = len(messages)
+            self._spill(state, messages)
+
+            body_start = state.head_size + (1 if state.dropped else 0)
+            body = messages[body_start:]
+            removed = 0
+            if len(body) > self.window_steps:
+                old = body[:-self.window_steps]
+                state.summary.extend(summarize_step(m) for m in old)
+                state.omitted += max(0, len(state.summary) - SUMMARY_LINES)
+                state.summary = state.summary[-SUMMARY_LINES:]
+                state.dropped += len(old)
+                removed = len(old)
+                messages[state.head_size:] = [self._summary_message(state), *body[-self.window_steps:]]
+                state.written = len(messages)
+
+            # Still too large: shorten kept observations, oldest first, never the latest step
+            if _message_chars(messages) > self.max_chars:
+                for i in range(state.head_size + (1 if state.dropped else 0), len(messages) - 1):
+                    content = messages[i].get("content") or ""
+                    observation = _OBSERVATION.search(content)
+                    if observation and len(observation.group(1)) > self.observation_chars:
+                        shortened = _shorten(observation.group(1), self.observation_chars)
+                        messages[i] = {**messages[i], "content": content[:observation.start(1)] + shortened}
+                        if _message_chars(messages) <= self.max_chars:
+                            break
+            return removed
+
+
+def prune_transcripts(directory: str, keep_days: float = DEFAULT_TRANSCRIPT_KEEP_DAYS,
+                      now: Optional[datetime] = None) -> int:
+    """
+    Delete the transcript directories of runs that started more than
+    ``keep_days`` ago. Returns the number of runs removed.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = (now or datetime.now()) - timedelta(days=keep_days)
+    removed = 0
+    for name in os.listdir(directory):
+        try:
+            started = datetime.strptime(name, RUN_ID_FORMAT)
+        except ValueError:
+            continue
+        path = os.path.join(directory, name)
+        if started < cutoff and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def call_with_stop(llm: BaseLLM, stop: Sequence[str], messages, **kwargs) -> Union[str, Any]:
+    """Call ``llm`` with the given stop words, leaving the (possibly shared) instance untouched."""
+    if list(llm.stop or []) != list(stop):
+        llm = copy.copy(llm)
+        llm.stop = list(stop)
+    return llm.call(messages, **kwargs)
+
+
+def read_transcript(path: str) -> List[Dict[str, str]]:
+    """Full transcript spilled by a ContextWindow, as chat messages."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class WindowedLLM(BaseLLM):
+    """LLM that compacts the agent transcript with a ContextWindow before every call."""
+
+    def __init__(self, inner: BaseLLM, window: ContextWindow):
+        super().__init__(model=inner.model, temperature=inner.temperature, stop=inner.stop)
+        self.inner = inner
+        self.window = window
+
+    @property
+    def seed(self) -> Optional[int]:
+        return getattr(self.inner, "seed", None)
+
+    @seed.setter
+    def seed(self, value: Optional[int]) -> None:
+        if hasattr(self.inner, "seed"):
+            self.inner.seed = value
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None,
+    ) -> Union[str, Any]:
+        if isinstance(messages, list):
+            agent = from_agent or getattr(from_task, "agent", None)
+            task_name = getattr(from_task, "name", None) or ""
+            self.window.compact(messages, f"{task_name} {getattr(agent, 'role', '')}".strip() or "agent")
+        return call_with_stop(
+            self.inner, self.stop, messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+            from_task=from_task, from_agent=from_agent,
+        )
+
+    def supports_function_calling(self) -> bool:
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
+
+
+def context_window_enabled() -> bool:
+    return os.getenv("FPL_CONTEXT_WINDOW", "1").lower() not in ("0", "false", "no")
+
+
+def bound_agent_context(agents: Sequence[Any], window: Optional[ContextWindow] = None) -> Optional[ContextWindow]:
+    """
+    Wrap every agent's LLM in a WindowedLLM sharing one ContextWindow, unless
+    disabled with FPL_CONTEXT_WINDOW=0. Call after route_agent_llms() so the
+    window applies to whichever tier answers. Transcripts of runs older than
+    FPL_TRANSCRIPT_KEEP_DAYS are deleted.
+    """
+    if not context_window_enabled():
+        return None
+    if window is None:
+        directory = os.getenv("FPL_TRANSCRIPT_DIR", DEFAULT_TRANSCRIPT_DIR)
+        prune_transcripts(directory, float(os.getenv("FPL_TRANSCRIPT_KEEP_DAYS", DEFAULT_TRANSCRIPT_KEEP_DAYS)))
+        window = ContextWindow(
+            window_steps=int(os.getenv("FPL_CONTEXT_WINDOW_STEPS", DEFAULT_WINDOW_STEPS)),
+            max_chars=int(os.getenv("FPL_CONTEXT_MAX_CHARS", DEFAULT_MAX_CHARS)),
+            directory=directory,
+        )
+    for agent in agents:
+        if isinstance(agent.llm, BaseLLM) and not isinstance(agent.llm, WindowedLLM):
+            agent.llm = WindowedLLM(agent.llm, window)
+    return window
@@ -1,15 +1,13 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, after_kickoff, agent, before_kickoff, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-try:
-    from crewai.knowledge.source.file_knowledge_source import FileKnowledgeSource
-except ImportError:
-    try:
-        from crewai.knowledge import FileKnowledgeSource
-    except ImportError:
-        # Fallback: knowledge sources not available in this version
-        FileKnowledgeSource = None
-from crewai_tools import SerperDevTool
+from .archive import archive_enabled, output_archive
+from .context_window import bound_agent_context, dedupe_tools
+from .knowledge import shared_knowledge_sources
+from .prefetch import prefetch_enabled, prefetcher
+from .reports import LATEST_TEAM_FILE, TeamSelection, write_team_reports
+from .routing import route_agent_llms
+from .tools.search_cache import CachedSerperDevTool
 from .tools.custom_tool import (
     PlayerStatsTool, 
     FixtureAnalysisTool, 
@@ -18,9 +16,16 @@ from .tools.custom_tool import (
     FantasyNewsTool,
     InjuryReportTool,
     FileWriterTool,
+    EffectiveOwnershipTool,
+    ExpectedLineupTool,
+    PriceChangeTool,
+    PastResearchTool,
     PlayerTeamVerificationTool
 )
+import os
+from datetime import datetime
 from typing import List
+from uuid import uuid4
 
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
@@ -34,8 +39,16 @@ class FplExpert():
     tasks: List[Task]
 
     def __init__(self):
+        # Inputs of the current kickoff, for the rendered reports
+        self.run_inputs = {}
+        self.run_id = None
+        # Team report and summary written by the current run, for the archive
+        self.team_report_paths = []
+        # Where the latest team report is copied (profile runs use one file per profile)
+        self.team_report_file = LATEST_TEAM_FILE
+
         # Initialize all tools
-        self.serper_tool = SerperDevTool()
+        self.serper_tool = CachedSerperDevTool()
         self.player_stats_tool = PlayerStatsTool()
         self.fixture_analysis_tool = FixtureAnalysisTool()
         self.ownership_analysis_tool = OwnershipAnalysisTool()
@@ -44,38 +57,17 @@ class FplExpert():
         self.injury_report_tool = InjuryReportTool()
         self.file_writer_tool = FileWriterTool()
         self.player_team_verification_tool = PlayerTeamVerificationTool()
+        self.past_research_tool = PastResearchTool()
+        self.effective_ownership_tool = EffectiveOwnershipTool()
+        self.price_change_tool = PriceChangeTool()
+        self.expected_lineup_tool = ExpectedLineupTool()
         
-        # Initialize knowledge sources (if available)
-        if FileKnowledgeSource is not None:
-            self.fantasy_rules_knowledge = FileKnowledgeSource(
-                file_path="knowledge/champions_league_fantasy_rules.md",
-                chunk_size=1000,
-                chunk_overlap=200
-            )
-            
-            self.teams_knowledge = FileKnowledgeSource(
-                file_path="knowledge/top_champions_league_teams.md",
-                chunk_size=1000,
-                chunk_overlap=200
-            )
-            
-            self.strategies_knowledge = FileKnowledgeSource(
-                file_path="knowledge/fantasy_strategies.md",
-                chunk_size=1000,
-                chunk_overlap=200
-            )
-            
-            self.user_preference_knowledge = FileKnowledgeSource(
-                file_path="knowledge/user_preference.txt",
-                chunk_size=500,
-                chunk_overlap=100
-            )
-        else:
-            # Fallback: knowledge sources not available
-            self.fantasy_rules_knowledge = None
-            self.teams_knowledge = None
-            self.strategies_knowledge = None
-            self.user_preference_knowledge = None
+        # Knowledge sources are shared across crews so files are only embedded once per process
+        (
+            self.fantasy_rules_knowledge,
+            self.teams_knowledge,
+            self.strategies_knowledge,
+        ) = shared_knowledge_sources()
         
         # Create tool sets for different agent types
         self.research_tools = [
@@ -83,6 +75,7 @@ class FplExpert():
             self.player_stats_tool,
             self.form_analysis_tool,
             self.player_team_verification_tool,
+            self.past_research_tool,
             self.file_writer_tool
         ]
         
@@ -90,7 +83,9 @@ class FplExpert():
             self.serper_tool,
             self.fixture_analysis_tool,
             self.injury_report_tool,
+            self.expected_lineup_tool,
             self.player_team_verification_tool,
+            self.past_research_tool,
             self.file_writer_tool
         ]
         
@@ -98,7 +93,9 @@ class FplExpert():
             self.serper_tool,
             self.ownership_analysis_tool,
             self.fantasy_news_tool,
+            self.effective_ownership_tool,
             self.player_team_verification_tool,
+            self.past_research_tool,
             self.file_writer_tool
         ]
 
@@ -137,7 +134,7 @@ class FplExpert():
     def captain_selector(self) -> Agent:
         return Agent(
             config=self.agents_config['captain_selector'], # type: ignore[index]
-            tools=self.research_tools + self.analysis_tools,
+            tools=dedupe_tools(self.research_tools + self.analysis_tools + [self.effective_ownership_tool]),
             verbose=True
         )
 
@@ -145,7 +142,7 @@ class FplExpert():
     def budget_optimizer(self) -> Agent:
         return Agent(
             config=self.agents_config['budget_optimizer'], # type: ignore[index]
-            tools=[self.serper_tool, self.player_stats_tool],
+            tools=[self.serper_tool, self.player_stats_tool, self.price_change_tool],
             verbose=True
         )
 
@@ -165,6 +162,58 @@ class FplExpert():
             verbose=True
         )
 
+    @before_kickoff
+    def remember_inputs(self, inputs):
+        self.run_inputs = dict(inputs or {})
+        self.run_id = f"{datetime.now():%Y-%m-%d_%H%M%S}_{uuid4().hex[:6]}"
+        self.team_report_paths = []
+        self.file_writer_tool.pop_written()
+        return inputs
+
+    @after_kickoff
+    def render_team_reports(self, result):
+        """Render the team report and summary from the team builder's structured answer."""
+        # A hook rather than a task callback: `crewai test` (CrewEvaluator) replaces every task callback
+        output = next(
+            (output for output in getattr(result, "tasks_output", None) or []
+             if output is not None and output.name == "build_optimal_team_task"),
+            None,
+        )
+        if output is None:
+            return result
+        selection = output.pydantic
+        if selection is None and output.json_dict:
+            selection = TeamSelection.model_validate(output.json_dict)
+        if selection is not None:
+            paths = write_team_reports(selection, self.run_inputs, latest_file=self.team_report_file)
+            # The latest copy duplicates the dated report
+            self.team_report_paths = [path for kind, path in paths.items() if kind != "latest"]
+        return result
+
+    @after_kickoff
+    def archive_outputs(self, result):
+        """Archive the run's task outputs and written reports (compressed, deduplicated), then apply retention."""
+        if not archive_enabled() or result is None:
+            return result
+        tasks = {task.name: task for task in self.tasks}
+        outputs = []
+        for output in result.tasks_output:
+            task = tasks.get(output.name)
+            if not output.raw:
+                continue
+            output_file = getattr(task, "output_file", None) if task is not None else None
+            filename = os.path.basename(output_file) if output_file else f"{output.name}.md"
+            outputs.append((filename, output.raw, output.name))
+        archive = output_archive()
+        archive.add_run(
+            self.run_id or f"{datetime.now():%Y-%m-%d_%H%M%S}",
+            self.run_inputs,
+            outputs=outputs,
+            files=self.team_report_paths + self.file_writer_tool.pop_written(),
+        )
+        archive.enforce_retention()
+        return result
+
     # Task definitions with proper dependencies
     @task
     def scout_players_task(self) -> Task:
@@ -206,7 +255,8 @@ class FplExpert():
     def build_optimal_team_task(self) -> Task:
         return Task(
             config=self.tasks_config['build_optimal_team_task'], # type: ignore[index]
-            output_file='champions_league_team.md'
+            # The agent answers with the selection; tables and files are rendered from it after kickoff (reports.py)
+            output_pydantic=TeamSelection,
         )
 
     @crew
@@ -223,9 +273,12 @@ class FplExpert():
             knowledge_sources.append(self.teams_knowledge)
         if self.strategies_knowledge is not None:
             knowledge_sources.append(self.strategies_knowledge)
-        if self.user_preference_knowledge is not None:
-            knowledge_sources.append(self.user_preference_knowledge)
         
+        # Cheap steps (reading tool results, extraction) go to faster models; see config/model_routing.yaml
+        route_agent_llms(self.agents)
+        # Long tool-heavy tasks keep a sliding window of steps in the prompt; full transcripts go to output/transcripts/
+        bound_agent_context(self.agents)
+
         # Create crew with or without knowledge sources
         crew_kwargs = {
             'agents': self.agents, # Automatically created by the @agent decorator
@@ -238,5 +291,9 @@ class FplExpert():
         # Add knowledge sources if available
         if knowledge_sources:
             crew_kwargs['knowledge_sources'] = knowledge_sources
+
+        # Warm the search cache with the verification and injury searches for players and clubs each task names
+        if prefetch_enabled():
+            crew_kwargs['task_callback'] = prefetcher().on_task_output
         
         return Crew(**crew_kwargs)
\ No newline at end of file
@@ -0,0 +1,354 @@
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import yaml
+
+
+ENTITIES_FILE = os.path.join(os.path.dirname(__file__), "config", "entities.yaml")
+
+PLAYER = "player"
+CLUB = "club"
+
+# Champions League Fantasy club limit
+MAX_PER_CLUB = 3
+
+# Minimum trigram similarity (Dice coefficient) for a fuzzy match
+TRIGRAM_THRESHOLD = 0.8
+
+# Letters NFKD does not decompose into a base letter + accent
+_TRANSLITERATE = str.maketrans({"ø": "o", "æ": "ae", "ß": "ss", "ı": "i", "ł": "l", "đ": "d", "œ": "oe"})
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, accent- and punctuation-free form of a name used for matching."""
+    name = unicodedata.normalize("NFKD", name.lower().translate(_TRANSLITERATE))
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name).split())
+
+
+def slugify(name: str) -> str:
+    return normalize_name(name).replace(" ", "-")
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def token_tolerance(token: str) -> int:
+    """Typos allowed in one word of a name: none in short words, one or two in longer ones."""
+    return 0 if len(token) <= 3 else 1 if len(token) <= 7 else 2
+
+
+def tokens_agree(a: str, b: str) -> bool:
+    """
+    Whether every word of one normalized name matches a word of the other,
+    allowing a typo or two in longer words and any order. Keeps the words
+    that tell names apart from being outvoted by the ones they share
+    ("Manchester United" vs "Manchester City", "Edson Alvarez" vs "Julian Alvarez").
+    """
+    words_a, words_b = a.split(), b.split()
+    if len(words_a) != len(words_b):
+        return False
+
+    def covered(words: List[str], others: List[str]) -> bool:
+        return all(
+            any(edit_distance(word, other) <= token_tolerance(min(word, other, key=len)) for other in others)
+            for word in words
+        )
+
+    return covered(words_a, words_b) and covered(words_b, words_a)
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings for edit-distance lookups."""
+
+    def __init__(self):
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Words within ``max_distance`` of ``word``, closest first."""
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            candidate, children = stack.pop()
+            distance = edit_distance(word, candidate)
+            if distance <= max_distance:
+                found.append((distance, candidate))
+            for edge in range(distance - max_distance, distance + max_distance + 1):
+                if edge in children:
+                    stack.append(children[edge])
+        return sorted(found)
+
+
+@dataclass
+class Entity:
+    """A canonical player or club."""
+    id: str
+    kind: str
+    name: str
+    club: Optional[str] = None          # club entity id, players only
+    archive_id: Optional[int] = None    # player id in the history archive, if known
+    aliases: List[str] = field(default_factory=list)
+
+
+class EntityIndex:
+    """
+    Canonical players and clubs with alias tables and fuzzy matching.
+
+    Names resolve in three steps: an exact lookup of the normalized name in the
+    alias table, then a BK-tree search for small typos, then trigram similarity
+    for reordered names. Fuzzy matches must agree word for word with the alias
+    (``tokens_agree``), so a shared club prefix or surname is not enough.
+    Results are memoised, so repeated lookups of the same spelling cost a dict
+    access. ``canonical_name`` only rewrites exact alias matches.
+    """
+
+    def __init__(self):
+        self.entities: Dict[str, Entity] = {}
+        self._aliases: Dict[str, Dict[str, Set[str]]] = {PLAYER: defaultdict(set), CLUB: defaultdict(set)}
+        self._trees: Dict[str, BKTree] = {PLAYER: BKTree(), CLUB: BKTree()}
+        self._trigrams: Dict[str, Dict[str, Set[str]]] = {PLAYER: defaultdict(set), CLUB: defaultdict(set)}
+        self._resolved: Dict[Tuple[str, str, Optional[str]], Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = ENTITIES_FILE, archive_players: Optional[Dict[int, Dict[str, str]]] = None
+             ) -> "EntityIndex":
+        """
+        Build the index from the entities config plus, optionally, the players
+        of the history archive (``HistoryArchive.players``).
+        """
+        index = cls()
+        with open(path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        for name, aliases in (config.get("clubs") or {}).items():
+            index.add_club(name, aliases or [])
+        for name, entry in (config.get("players") or {}).items():
+            entry = entry or {}
+            index.add_player(name, entry.get("club"), entry.get("aliases") or [])
+        for archive_id, info in (archive_players or {}).items():
+            index.add_player(info["name"], info.get("club"), archive_id=archive_id)
+        index.add_surname_aliases()
+        return index
+
+    # Building
+
+    def _add_alias(self, kind: str, alias: str, entity_id: str) -> None:
+        key = normalize_name(alias)
+        if not key:
+            return
+        if key not in self._aliases[kind]:
+            self._trees[kind].add(key)
+            for gram in trigrams(key):
+                self._trigrams[kind][gram].add(key)
+        self._aliases[kind][key].add(entity_id)
+        entity = self.entities[entity_id]
+        if alias != entity.name and alias not in entity.aliases:
+            entity.aliases.append(alias)
+        self._resolved.clear()
+
+    def add_club(self, name: str, aliases: Iterable[str] = ()) -> Entity:
+        existing = self.resolve(name, CLUB, fuzzy=False)
+        entity = existing or Entity(id=f"{CLUB}:{slugify(name)}", kind=CLUB, name=name)
+        self.entities[entity.id] = entity
+        for alias in [name, *aliases]:
+            self._add_alias(CLUB, alias, entity.id)
+        return entity
+
+    def add_player(self, name: str, club: Optional[str] = None, aliases: Iterable[str] = (),
+                   archive_id: Optional[int] = None) -> Entity:
+        """
+        Add a player, or merge into the known player with the same name at the
+        same club (a player already known from config keeps its club).
+        """
+        club_entity = (self.resolve(club, CLUB, fuzzy=False) or self.add_club(club)) if club else None
+        club_id = club_entity.id if club_entity else None
+        existing = self.resolve(name, PLAYER, club=club, fuzzy=False)
+        if existing is not None and existing.archive_id is not None and archive_id not in (None, existing.archive_id):
+            existing = None
+        entity = existing or Entity(
+            id=f"{PLAYER}:{slugify(name)}" + (f"-{archive_id}" if archive_id is not None else ""),
+            kind=PLAYER, name=name, club=club_id,
+        )
+        if entity.archive_id is None:
+            entity.archive_id = archive_id
+        if entity.club is None:
+            entity.club = club_id
+        self.entities[entity.id] = entity
+        for alias in [name, *aliases]:
+            self._add_alias(PLAYER, alias, entity.id)
+        return entity
+
+    def add_surname_aliases(self) -> None:
+        """Let a player be found by surname alone when no other player shares it."""
+        players = [entity for entity in self.entities.values() if entity.kind == PLAYER]
+        surnames = Counter(normalize_name(entity.name).split()[-1] for entity in players if " " in entity.name)
+        for entity in players:
+            if " " not in entity.name:
+                continue
+            surname = normalize_name(entity.name).split()[-1]
+            if surnames[surname] == 1 and len(surname) > 2 and surname not in self._aliases[PLAYER]:
+                self._add_alias(PLAYER, surname, entity.id)
+
+    # Lookups
+
+    def _pick(self, candidates: Iterable[str], club_id: Optional[str]) -> Optional[str]:
+        candidates = set(candidates)
+        if club_id is not None and len(candidates) > 1:
+            candidates = {c for c in candidates if self.entities[c].club == club_id} or candidates
+        return next(iter(candidates)) if len(candidates) == 1 else None
+
+    def _fuzzy(self, kind: str, key: str, club_id: Optional[str]) -> Optional[str]:
+        max_distance = 1 if len(key) <= 6 else 2
+        matches = [(d, alias) for d, alias in self._trees[kind].search(key, max_distance) if tokens_agree(key, alias)]
+        if matches:
+            nearest = matches[0][0]
+            candidates = set().union(*(self._aliases[kind][alias] for d, alias in matches if d == nearest))
+            return self._pick(candidates, club_id)
+
+        grams = trigrams(key)
+        overlap: Counter = Counter()
+        for gram in grams:
+            overlap.update(self._trigrams[kind].get(gram, ()))
+        scored = [
+            (2 * shared / (len(grams) + len(trigrams(alias))), alias) for alias, shared in overlap.items()
+        ]
+        scored = [(score, alias) for score, alias in scored if score >= TRIGRAM_THRESHOLD and tokens_agree(key, alias)]
+        if not scored:
+            return None
+        best = max(score for score, _ in scored)
+        candidates = set().union(*(self._aliases[kind][alias] for score, alias in scored if score == best))
+        return self._pick(candidates, club_id)
+
+    def resolve(self, name: Optional[str], kind: str = PLAYER, club: Optional[str] = None,
+                fuzzy: bool = True) -> Optional[Entity]:
+        """
+        The entity ``name`` refers to, or None if it is unknown or ambiguous.
+        ``club`` (any spelling) breaks ties between players with the same name.
+        """
+        key = normalize_name(name or "")
+        if not key:
+            return None
+        cache_key = (kind, key, club if fuzzy else f"exact:{club}")
+        if cache_key in self._resolved:
+            entity_id = self._resolved[cache_key]
+            return self.entities[entity_id] if entity_id else None
+
+        club_entity = self.resolve(club, CLUB) if kind == PLAYER and club else None
+        club_id = club_entity.id if club_entity else None
+        entity_id = self._pick(self._aliases[kind].get(key, ()), club_id)
+        if entity_id is None and fuzzy and key not in self._aliases[kind]:
+            entity_id = self._fuzzy(kind, key, club_id)
+        with self._lock:
+            self._resolved[cache_key] = entity_id
+        return self.entities[entity_id] if entity_id else None
+
+    def canonical_name(self, name: str, kind: str = PLAYER, club: Optional[str] = None) -> str:
+        """
+        Canonical spelling of ``name`` when it is an exact alias, or the name
+        with whitespace tidied otherwise. Tool queries and stored records go
+        through this, so a near miss is left as written rather than turned
+        into a different player or club.
+        """
+        entity = self.resolve(name, kind, club, fuzzy=False)
+        return entity.name if entity else " ".join(name.split())
+
+    def club_of(self, player: str, club: Optional[str] = None) -> Optional[Entity]:
+        entity = self.resolve(player, PLAYER, club)
+        return self.entities.get(entity.club) if entity and entity.club else None
+
+    def find_mentions(self, text: str, kind: str = PLAYER, max_words: int = 4) -> List[Entity]:
+        """
+        Players (or clubs) mentioned in ``text`` by any exact alias, in order of
+        first mention. Longer aliases win over the shorter aliases they contain.
+        """
+        words = normalize_name(text).split()
+        found: List[Entity] = []
+        i = 0
+        while i < len(words):
+            for size in range(min(max_words, len(words) - i), 0, -1):
+                ids = self._aliases[kind].get(" ".join(words[i:i + size]))
+                entity_id = self._pick(ids, None) if ids else None
+                if entity_id:
+                    if self.entities[entity_id] not in found:
+                        found.append(self.entities[entity_id])
+                    i += size
+                    break
+            else:
+                i += 1
+        return found
+
+    def find_players(self, text: str, max_words: int = 4) -> List[Entity]:
+        return self.find_mentions(text, PLAYER, max_words)
+
+    def find_clubs(self, text: str, max_words: int = 4) -> List[Entity]:
+        return self.find_mentions(text, CLUB, max_words)
+
+    def club_limit_violations(self, players: Sequence[Entity], limit: int = MAX_PER_CLUB) -> Dict[str, List[str]]:
+        """Clubs with more than ``limit`` of ``players``: club name -> player names."""
+        by_club: Dict[str, List[str]] = defaultdict(list)
+        for player in players:
+            if player.club:
+                by_club[player.club].append(player.name)
+        return {
+            self.entities[club_id].name: names for club_id, names in by_club.items() if len(names) > limit
+        }
+
+
+_index: Optional[EntityIndex] = None
+_index_lock = threading.Lock()
+
+
+def entity_index() -> EntityIndex:
+    """Process-wide index built from the entities config and the history archive."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from .history import HistoryArchive
+
+            _index = EntityIndex.load(archive_players=HistoryArchive().players)
+        return _index
+
+
+def canonical_player(name: str, club: Optional[str] = None) -> str:
+    return entity_index().canonical_name(name, PLAYER, club)
+
+
+def canonical_club(name: str) -> str:
+    return entity_index().canonical_name(name, CLUB)
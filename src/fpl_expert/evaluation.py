@@ -0,0 +1,85 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from statistics import mean, pstdev
+from typing import Any, Dict, List, Optional
+
+from crewai.utilities.evaluators.crew_evaluator_handler import CrewEvaluator
+from crewai.utilities.llm_utils import create_llm
+
+from .crew import FplExpert
+from .tools.search_cache import search_cache
+
+
+def _seed_crew(crew, seed: int) -> None:
+    """Give every agent LLM a fixed seed so an iteration can be reproduced."""
+    for agent in crew.agents:
+        if hasattr(agent.llm, "seed"):
+            agent.llm.seed = seed
+
+
+def _run_iteration(iteration: int, eval_llm: Any, inputs: Dict[str, Any], seed: int) -> CrewEvaluator:
+    # Each iteration gets its own crew (tasks and agents hold per-run state), but all of
+    # them share the process-wide search cache and embedded knowledge sources
+    crew = FplExpert().crew()
+    _seed_crew(crew, seed + iteration)
+    evaluator = CrewEvaluator(crew, eval_llm)
+    evaluator.set_iteration(iteration)
+    crew.kickoff(inputs=inputs)
+    return evaluator
+
+
+def evaluate_in_parallel(
+    n_iterations: int,
+    eval_llm: str,
+    inputs: Optional[Dict[str, Any]] = None,
+    workers: int = 4,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """
+    Parallel counterpart of ``Crew.test``: run evaluation iterations across a
+    thread pool and merge their scores into a single evaluation table.
+
+    Iteration ``i`` always runs with LLM seed ``seed + i`` regardless of
+    scheduling order, so results are reproducible with the same worker count.
+
+    Args:
+        n_iterations: Number of evaluation runs
+        eval_llm: Model used to score each task output
+        inputs: Crew inputs
+        workers: Maximum number of iterations running at once
+        seed: Base seed
+
+    Returns:
+        Per-task and crew score summaries plus search-cache statistics
+    """
+    random.seed(seed)
+    llm = create_llm(eval_llm)
+    if not llm:
+        raise ValueError(f"Failed to create evaluation LLM from {eval_llm!r}")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, n_iterations))) as pool:
+        futures = [
+            pool.submit(_run_iteration, i, llm, inputs or {}, seed) for i in range(1, n_iterations + 1)
+        ]
+        evaluators = [future.result() for future in futures]
+
+    # Fold every iteration into one evaluator so crewai prints its usual table
+    combined = CrewEvaluator(FplExpert().crew(), llm)
+    for evaluator in evaluators:
+        combined.tasks_scores[evaluator.iteration] = evaluator.tasks_scores[evaluator.iteration]
+        combined.run_execution_times[evaluator.iteration] = evaluator.run_execution_times[evaluator.iteration]
+        for task, run_task in zip(combined.crew.tasks, evaluator.crew.tasks):
+            task.processed_by_agents.update(run_task.processed_by_agents)
+    combined.print_crew_evaluation_result()
+
+    summary: Dict[str, Any] = {"tasks": {}, "iterations": n_iterations, "search_cache": search_cache.stats()}
+    for index, task in enumerate(combined.crew.tasks):
+        scores: List[float] = [combined.tasks_scores[i][index] for i in sorted(combined.tasks_scores)]
+        summary["tasks"][task.name or f"Task {index + 1}"] = {
+            "mean": mean(scores),
+            "stdev": pstdev(scores),
+            "scores": scores,
+        }
+    run_scores = [mean(scores) for _, scores in sorted(combined.tasks_scores.items())]
+    summary["crew"] = {"mean": mean(run_scores), "stdev": pstdev(run_scores), "scores": run_scores}
+    return summary
@@ -0,0 +1,315 @@
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .entities import normalize_name
+from .player_table import POSITIONS, normalize_position
+from .season_calendar import football_season, season_calendar
+
+
+# One row per player per gameweek. Fixed-width so a season partition can be
+# memory-mapped and sliced without parsing.
+STATS_DTYPE = np.dtype([
+    ("gameweek", np.uint8),
+    ("position", np.uint8),
+    ("club", np.uint16),
+    ("player_id", np.int32),
+    ("minutes", np.uint8),
+    ("started", np.uint8),
+    ("goals", np.uint8),
+    ("assists", np.uint8),
+    ("clean_sheet", np.uint8),
+    ("goals_conceded", np.uint8),
+    ("ball_recoveries", np.uint8),
+    ("saves", np.uint8),
+    ("yellow_cards", np.uint8),
+    ("red_cards", np.uint8),
+    ("player_of_match", np.uint8),
+    ("points", np.int16),
+    ("price", np.float32),
+    ("ownership", np.float32),
+    ("transfers_in", np.int32),
+    ("transfers_out", np.int32),
+])
+
+# Numeric CSV columns copied straight into STATS_DTYPE (missing columns default to 0)
+NUMERIC_COLUMNS: Tuple[str, ...] = tuple(
+    name for name in STATS_DTYPE.names or () if name not in ("gameweek", "position", "club", "player_id")
+)
+
+# Columns every ingested row must carry, besides a gameweek or match date
+REQUIRED_COLUMNS: Tuple[str, ...] = ("name", "club", "position")
+
+DEFAULT_HISTORY_DIR = os.path.join("data", "history")
+
+
+def season_slug(season: str) -> str:
+    """Turn a season label like "2024/25" into a directory-safe "2024-25"."""
+    return season.replace("/", "-")
+
+
+def _season_label(slug: str) -> str:
+    return slug.replace("-", "/")
+
+
+def _check_row(row: Mapping[str, str], label: str) -> None:
+    for key in REQUIRED_COLUMNS:
+        if not row.get(key):
+            raise ValueError(f"{label} has no '{key}'")
+    if not row.get("gameweek") and not row.get("date"):
+        raise ValueError(f"{label} has no 'gameweek' or 'date'")
+
+
+def _player_key(name: str, club: str) -> Tuple[str, str]:
+    """Registry match key: namesakes at different clubs are different players."""
+    return normalize_name(name), normalize_name(club)
+
+
+def _row_keys(stats: np.ndarray) -> np.ndarray:
+    """One int64 per row identifying its (gameweek, player) pair."""
+    return stats["gameweek"].astype(np.int64) << 32 | stats["player_id"].astype(np.int64)
+
+
+class SeasonPartition:
+    """
+    Read-only, memory-mapped view of one season of per-gameweek stats.
+
+    Rows are sorted by (gameweek, player_id). ``gameweek_offsets[gw]`` is the
+    first row of gameweek ``gw`` so a gameweek is a contiguous slice, and
+    ``player_order`` sorts rows by player for per-player lookups.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.season = _season_label(os.path.basename(path))
+        self.stats = np.load(os.path.join(path, "stats.npy"), mmap_mode="r")
+        self.gameweek_offsets = np.load(os.path.join(path, "gameweek_offsets.npy"))
+        self.player_order = np.load(os.path.join(path, "player_order.npy"), mmap_mode="r")
+        with open(os.path.join(path, "clubs.json"), "r", encoding="utf-8") as f:
+            self.clubs: List[str] = json.load(f)
+        self._sorted_ids: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    @property
+    def gameweeks(self) -> List[int]:
+        counts = np.diff(self.gameweek_offsets)
+        return [int(gw) for gw in np.nonzero(counts)[0]]
+
+    def gameweek(self, gameweek: int) -> np.ndarray:
+        """All rows for one gameweek (a view into the memory map)."""
+        if gameweek + 1 >= len(self.gameweek_offsets):
+            return self.stats[0:0]
+        start, stop = self.gameweek_offsets[gameweek], self.gameweek_offsets[gameweek + 1]
+        return self.stats[start:stop]
+
+    def player(self, player_id: int) -> np.ndarray:
+        """All gameweek rows for one player, in gameweek order."""
+        if self._sorted_ids is None:
+            self._sorted_ids = self.stats["player_id"][self.player_order]
+        start = int(np.searchsorted(self._sorted_ids, player_id, side="left"))
+        stop = int(np.searchsorted(self._sorted_ids, player_id, side="right"))
+        return self.stats[np.sort(self.player_order[start:stop])]
+
+    def before(self, gameweek: int) -> np.ndarray:
+        """Rows for every gameweek strictly before ``gameweek`` (what was known at its deadline)."""
+        stop = self.gameweek_offsets[min(gameweek, len(self.gameweek_offsets) - 1)]
+        return self.stats[:stop]
+
+    def iter_chunks(self, chunk_rows: int = 1_000_000) -> Iterator[np.ndarray]:
+        for start in range(0, len(self.stats), chunk_rows):
+            yield self.stats[start:start + chunk_rows]
+
+
+class HistoryArchive:
+    """
+    Season-partitioned archive of historical per-player per-gameweek stats.
+
+    Layout on disk::
+
+        data/history/
+            players.json            # player_id -> {name, club, position}, shared by all seasons
+            2024-25/
+                stats.npy           # STATS_DTYPE rows, memory-mapped on read
+                gameweek_offsets.npy
+                player_order.npy
+                clubs.json          # club code -> club name for this season
+
+    Partitions are opened lazily and memory-mapped, so scanning several
+    seasons only pages in the rows that are actually touched.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root: str = root or os.getenv("FPL_HISTORY_DIR") or DEFAULT_HISTORY_DIR
+        self._partitions: Dict[str, SeasonPartition] = {}
+        self._players: Optional[Dict[int, Dict[str, str]]] = None
+
+    @property
+    def players(self) -> Dict[int, Dict[str, str]]:
+        if self._players is None:
+            path = os.path.join(self.root, "players.json")
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self._players = {int(pid): info for pid, info in json.load(f).items()}
+            else:
+                self._players = {}
+        return self._players
+
+    def seasons(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            _season_label(name) for name in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, name, "stats.npy"))
+        )
+
+    def season(self, season: str) -> SeasonPartition:
+        slug = season_slug(season)
+        if slug not in self._partitions:
+            path = os.path.join(self.root, slug)
+            if not os.path.exists(os.path.join(path, "stats.npy")):
+                raise KeyError(f"No archived data for season {season}")
+            self._partitions[slug] = SeasonPartition(path)
+        return self._partitions[slug]
+
+    def iter_chunks(
+        self, seasons: Optional[Sequence[str]] = None, chunk_rows: int = 1_000_000
+    ) -> Iterator[Tuple[str, np.ndarray]]:
+        """Scan the archive season by season in bounded-size chunks."""
+        for season in seasons or self.seasons():
+            for chunk in self.season(season).iter_chunks(chunk_rows):
+                yield season, chunk
+
+    def player_name(self, player_id: int) -> str:
+        return self.players.get(player_id, {}).get("name", str(player_id))
+
+    def ingest(self, season: str, rows: Iterable[Mapping[str, str]]) -> int:
+        """
+        Add or replace rows for a season.
+
+        Each row needs ``gameweek`` (or a match ``date``, mapped to the gameweek
+        through the season calendar), ``name``, ``club`` and ``position``; an optional
+        ``player_id`` is kept, otherwise players are matched by name and club
+        (ignoring case and accents) against the shared player registry and new
+        ids are allocated. Rows for a (gameweek, player) pair that is already
+        archived replace the old row, as does a later row for the same pair
+        within ``rows``.
+
+        Returns:
+            Number of rows in the season partition after ingestion
+
+        Raises:
+            ValueError: If a row is missing a required field
+        """
+        rows = list(rows)
+        for i, row in enumerate(rows):
+            _check_row(row, f"Row {i} for {season}")
+        undated = [i for i, row in enumerate(rows) if not row.get("gameweek")]
+        if undated:
+            # Rows without a gameweek are placed by match date in one vectorised lookup;
+            # matches before the first gameweek (qualifiers) are not part of the game
+            _, numbers = season_calendar().locate([rows[i]["date"] for i in undated], season=season)
+            for i, number in zip(undated, numbers):
+                rows[i] = {**rows[i], "gameweek": str(int(number))}
+            rows = [row for row in rows if int(row["gameweek"])]
+
+        players = self.players
+        by_name = {_player_key(info["name"], info["club"]): pid for pid, info in players.items()}
+        next_id = max(players, default=0) + 1
+
+        slug = season_slug(season)
+        path = os.path.join(self.root, slug)
+        existing = None
+        clubs: List[str] = []
+        if os.path.exists(os.path.join(path, "stats.npy")):
+            partition = SeasonPartition(path)
+            existing = np.array(partition.stats)
+            clubs = list(partition.clubs)
+            self._partitions.pop(slug, None)
+        club_codes = {club: code for code, club in enumerate(clubs)}
+
+        new_rows = []
+        for row in rows:
+            name = row["name"].strip()
+            club = row["club"].strip()
+            position = normalize_position(row["position"])
+            player_key = _player_key(name, club)
+            player_id = int(row["player_id"]) if row.get("player_id") else by_name.get(player_key)
+            if player_id is None:
+                player_id = next_id
+                next_id += 1
+            by_name[player_key] = player_id
+            players[player_id] = {"name": name, "club": club, "position": position}
+            if club not in club_codes:
+                club_codes[club] = len(clubs)
+                clubs.append(club)
+
+            record: List[float] = [int(row["gameweek"]), POSITIONS.index(position), club_codes[club], player_id]
+            for column in NUMERIC_COLUMNS:
+                value = row.get(column) or 0
+                record.append(float(value) if STATS_DTYPE[column].kind == "f" else int(float(value)))
+            new_rows.append(tuple(record))
+
+        incoming = np.array(new_rows, dtype=STATS_DTYPE)
+        # Within the batch the last row for a (gameweek, player) pair wins
+        _, last = np.unique(_row_keys(incoming)[::-1], return_index=True)
+        incoming = incoming[np.sort(len(incoming) - 1 - last)]
+        if existing is not None and len(existing):
+            # Later rows win: keep only existing rows whose (gameweek, player) is not re-ingested
+            incoming = np.concatenate([existing[~np.isin(_row_keys(existing), _row_keys(incoming))], incoming])
+
+        self._write_partition(path, incoming, clubs)
+        self._write_players(players)
+        return len(incoming)
+
+    def ingest_csv(self, csv_path: str, season: Optional[str] = None) -> Dict[str, int]:
+        """
+        Ingest a CSV export. If ``season`` is not given the CSV must have a
+        ``season`` or ``date`` column, and rows are split into one partition per season.
+
+        Returns:
+            Row count per ingested season
+        """
+        by_season: Dict[str, List[Dict[str, str]]] = {}
+        with open(csv_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                row_season = season or row.get("season")
+                if not row_season and row.get("date"):
+                    row_season = football_season(datetime.strptime(row["date"][:10], "%Y-%m-%d"))
+                if not row_season:
+                    raise ValueError(f"{csv_path}: no season given and row has no 'season' or 'date' column")
+                by_season.setdefault(row_season, []).append(row)
+        return {s: self.ingest(s, rows) for s, rows in by_season.items()}
+
+    def _write_partition(self, path: str, stats: np.ndarray, clubs: List[str]) -> None:
+        os.makedirs(path, exist_ok=True)
+        stats = stats[np.lexsort((stats["player_id"], stats["gameweek"]))]
+
+        # Write through a memory map so large partitions never need a second in-memory copy
+        target = np.lib.format.open_memmap(
+            os.path.join(path, "stats.npy"), mode="w+", dtype=STATS_DTYPE, shape=stats.shape
+        )
+        target[:] = stats
+        target.flush()
+        del target
+
+        max_gameweek = int(stats["gameweek"].max()) if len(stats) else 0
+        offsets = np.searchsorted(stats["gameweek"], np.arange(max_gameweek + 2)).astype(np.int64)
+        np.save(os.path.join(path, "gameweek_offsets.npy"), offsets)
+        np.save(
+            os.path.join(path, "player_order.npy"),
+            np.argsort(stats["player_id"], kind="stable").astype(np.int64),
+        )
+        with open(os.path.join(path, "clubs.json"), "w", encoding="utf-8") as f:
+            json.dump(clubs, f, ensure_ascii=False)
+
+    def _write_players(self, players: Dict[int, Dict[str, str]]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "players.json"), "w", encoding="utf-8") as f:
+            json.dump({str(pid): info for pid, info in sorted(players.items())}, f, ensure_ascii=False)
+        self._players = players
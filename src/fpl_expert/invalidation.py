@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+from crewai import Crew
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.types.usage_metrics import UsageMetrics
+from crewai.utilities.constants import NOT_SPECIFIED
+
+from .knowledge import KNOWLEDGE_FILES
+
+
+DEFAULT_STATE_PATH = os.path.join("output", "state", "last_run.json")
+
+# Inputs that change from run to run without changing what a task should produce
+VOLATILE_INPUTS = ("current_date", "current_year", "month_year")
+
+# Inputs every task depends on, whether or not its description mentions them
+GLOBAL_INPUTS = ("current_season", "matchweek", "competition")
+
+# Inputs that make a task's output specific to one manager profile
+PROFILE_INPUTS = ("profile", "manager_profile")
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def fingerprint_items(items: Iterable[str]) -> str:
+    """Order-independent fingerprint of a collection of items (e.g. news item hashes)."""
+    return _digest(sorted(items))
+
+
+def knowledge_fingerprint() -> str:
+    """Fingerprint of the knowledge files every agent reads from."""
+    contents: Dict[str, Optional[str]] = {}
+    for path, _, _ in KNOWLEDGE_FILES:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                contents[path] = f.read()
+        except FileNotFoundError:
+            contents[path] = None
+    return _digest(contents)
+
+
+def context_tasks(crew: Crew, task) -> List:
+    """
+    Tasks whose output ``task`` takes as context. A task without a
+    ``context`` list gets the output of every task before it.
+    """
+    if task.context is NOT_SPECIFIED:
+        return crew.tasks[:crew.tasks.index(task)]
+    return list(task.context or [])
+
+
+def task_graph(crew: Crew) -> Dict[str, List[str]]:
+    """Task name -> names of the tasks whose output it takes as context."""
+    return {task.name: [dep.name for dep in context_tasks(crew, task)] for task in crew.tasks}
+
+
+def task_tools(crew: Crew) -> Dict[str, List[str]]:
+    """Task name -> names of the tools available while it runs (its own or its agent's)."""
+    tools = {}
+    for task in crew.tasks:
+        available = task.tools or (task.agent.tools if task.agent else None) or []
+        tools[task.name] = sorted({tool.name for tool in available})
+    return tools
+
+
+def _prompt(task) -> Dict[str, Any]:
+    """The uninterpolated prompt text of a task and its agent."""
+    agent = task.agent
+    return {
+        "description": task._original_description or task.description,
+        "expected_output": task._original_expected_output or task.expected_output,
+        # The agent's prompt counts too: e.g. {manager_profile} lives in the backstory
+        "agent": [
+            agent._original_role or agent.role,
+            agent._original_goal or agent.goal,
+            agent._original_backstory or agent.backstory,
+        ] if agent else [],
+    }
+
+
+def _placeholders(prompt: Mapping[str, Any]) -> Set[str]:
+    used: Set[str] = set()
+    for text in [prompt["description"], prompt["expected_output"]] + prompt["agent"]:
+        used.update(_PLACEHOLDER.findall(text))
+    return used
+
+
+def downstream(graph: Mapping[str, List[str]], names: Iterable[str]) -> Set[str]:
+    """``names`` plus every task that (transitively) depends on one of them."""
+    affected = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for task, deps in graph.items():
+            if task not in affected and affected.intersection(deps):
+                affected.add(task)
+                changed = True
+    return affected
+
+
+def _dump_output(output: TaskOutput) -> Dict[str, Any]:
+    return {
+        "description": output.description,
+        "name": output.name,
+        "expected_output": output.expected_output,
+        "raw": output.raw,
+        "json_dict": output.json_dict or (output.pydantic.model_dump() if output.pydantic else None),
+        "agent": output.agent,
+        "output_format": output.output_format.value,
+    }
+
+
+def _load_output(task, stored: Dict[str, Any]) -> TaskOutput:
+    pydantic = None
+    if task.output_pydantic is not None and stored.get("json_dict") is not None:
+        pydantic = task.output_pydantic.model_validate(stored["json_dict"])
+    return TaskOutput(
+        description=stored["description"],
+        name=stored.get("name"),
+        expected_output=stored.get("expected_output"),
+        raw=stored["raw"],
+        pydantic=pydantic,
+        json_dict=stored.get("json_dict") if task.output_json is not None else None,
+        agent=stored["agent"],
+        output_format=stored["output_format"],
+    )
+
+
+class InvalidationEngine:
+    """
+    Dependency-aware re-runs of the crew.
+
+    Every task gets a fingerprint built from the inputs its prompt uses,
+    the matchweek/season, the knowledge files and a signal per tool it can
+    call (e.g. a hash of the latest injury news for the Injury Report Tool).
+    On the next run only tasks whose fingerprint changed, plus everything that
+    takes their output as context, are executed; every other task gets its
+    stored output injected so the re-run tasks still see it as context.
+    Outputs of tasks that work for a manager profile are kept per profile.
+    """
+
+    def __init__(self, state_path: str = DEFAULT_STATE_PATH):
+        self.state_path = state_path
+
+    def load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"tasks": {}}
+
+    def save_state(self, state: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def fingerprints(
+        self, crew: Crew, inputs: Mapping[str, Any], signals: Optional[Mapping[str, str]] = None
+    ) -> Dict[str, str]:
+        signals = signals or {}
+        tools = task_tools(crew)
+        shared = {
+            "globals": {key: inputs.get(key) for key in GLOBAL_INPUTS},
+            "knowledge": knowledge_fingerprint(),
+        }
+        prints = {}
+        for task in crew.tasks:
+            prompt = _prompt(task)
+            used = _placeholders(prompt)
+            prints[task.name] = _digest({
+                "shared": shared,
+                **prompt,
+                "inputs": {key: inputs.get(key) for key in sorted(used) if key not in VOLATILE_INPUTS},
+                "signals": {tool: signals.get(tool) for tool in tools[task.name]},
+            })
+        return prints
+
+    def state_keys(self, crew: Crew, inputs: Mapping[str, Any]) -> Dict[str, str]:
+        """
+        Task name -> key its output is stored under. Tasks that work for a
+        manager profile, directly or through their context, are stored per
+        profile so runs for different profiles do not overwrite each other.
+        """
+        profile = inputs.get("profile")
+        personal = [task.name for task in crew.tasks if _placeholders(_prompt(task)).intersection(PROFILE_INPUTS)]
+        per_profile = downstream(task_graph(crew), personal) if profile else set()
+        return {
+            task.name: f"{task.name}@{profile}" if task.name in per_profile else task.name
+            for task in crew.tasks
+        }
+
+    def plan(
+        self, crew: Crew, inputs: Mapping[str, Any], signals: Optional[Mapping[str, str]] = None
+    ) -> Set[str]:
+        """
+        Names of the tasks that have to run for these inputs and signals
+        (the signals of the last run when ``signals`` is None).
+        """
+        state = self.load_state()
+        stored = state["tasks"]
+        prints = self.fingerprints(crew, inputs, state.get("signals") if signals is None else signals)
+        keys = self.state_keys(crew, inputs)
+        dirty = [
+            name for name, print_ in prints.items()
+            if keys[name] not in stored or stored[keys[name]].get("fingerprint") != print_
+        ]
+        return downstream(task_graph(crew), dirty)
+
+    def kickoff(
+        self,
+        crew: Crew,
+        inputs: Dict[str, Any],
+        signals: Optional[Mapping[str, str]] = None,
+        force: bool = False,
+    ) -> CrewOutput:
+        """
+        Run only the affected part of ``crew`` and record the new state.
+
+        ``crew`` should be a fresh crew (or ``Crew.copy()``); its task list is
+        narrowed to the affected tasks for this run. Tasks without a
+        ``context`` list are pinned to every earlier task for the run, so they
+        see the reused outputs too, as they would in a full run.
+
+        Args:
+            crew: Crew to run
+            inputs: Crew inputs
+            signals: Tool name -> fingerprint of the data that tool currently returns.
+                Callers that do not track tool data (None) keep the last run's signals,
+                so they do not invalidate tasks another caller ran with fresh data.
+            force: Run every task regardless of the stored state
+        """
+        state = self.load_state()
+        if signals is None:
+            signals = state.get("signals", {})
+        prints = self.fingerprints(crew, inputs, signals)
+        keys = self.state_keys(crew, inputs)
+        all_tasks = list(crew.tasks)
+        affected = {task.name for task in all_tasks} if force else self.plan(crew, inputs, signals)
+
+        for task in all_tasks:
+            if task.name not in affected:
+                task.output = _load_output(task, state["tasks"][keys[task.name]]["output"])
+
+        to_run = [task for task in all_tasks if task.name in affected]
+        reused = [task.name for task in all_tasks if task.name not in affected]
+        print(f"Re-running {len(to_run)} of {len(all_tasks)} tasks"
+              + (f" (reusing {', '.join(reused)})" if reused else ""))
+
+        if to_run:
+            implicit = {task: context_tasks(crew, task) for task in to_run if task.context is NOT_SPECIFIED}
+            for task, context in implicit.items():
+                task.context = context
+            crew.tasks = to_run
+            try:
+                result = crew.kickoff(inputs=inputs)
+            finally:
+                crew.tasks = all_tasks
+                for task in implicit:
+                    task.context = NOT_SPECIFIED
+            token_usage = result.token_usage
+        else:
+            token_usage = UsageMetrics()
+
+        now = datetime.now().isoformat(timespec="seconds")
+        for task in to_run:
+            if task.output is not None:
+                state["tasks"][keys[task.name]] = {
+                    "fingerprint": prints[task.name],
+                    "updated": now,
+                    "output": _dump_output(task.output),
+                }
+        state["inputs"] = dict(inputs)
+        state["signals"] = dict(signals)
+        self.save_state(state)
+
+        outputs = [task.output for task in all_tasks]
+        final = outputs[-1]
+        return CrewOutput(
+            raw=final.raw,
+            pydantic=final.pydantic,
+            json_dict=final.json_dict,
+            tasks_output=outputs,
+            token_usage=token_usage,
+        )
@@ -0,0 +1,74 @@
+import hashlib
+import threading
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+try:
+    from crewai.knowledge.source.file_knowledge_source import FileKnowledgeSource
+except ImportError:
+    try:
+        from crewai.knowledge import FileKnowledgeSource
+    except ImportError:
+        # Fallback: knowledge sources not available in this version
+        FileKnowledgeSource = None
+
+
+# (file path, chunk size, chunk overlap) for every knowledge file given to the crew.
+# User preferences are not crew knowledge: they belong to a manager profile (see profiles.py).
+KNOWLEDGE_FILES: Tuple[Tuple[str, int, int], ...] = (
+    ("knowledge/champions_league_fantasy_rules.md", 1000, 200),
+    ("knowledge/top_champions_league_teams.md", 1000, 200),
+    ("knowledge/fantasy_strategies.md", 1000, 200),
+)
+
+# Content hashes of sources already embedded into storage by this process
+_embedded: set = set()
+_embedded_lock = threading.Lock()
+
+
+if FileKnowledgeSource is not None:
+    class SharedFileKnowledgeSource(FileKnowledgeSource):
+        """
+        FileKnowledgeSource that is chunked and embedded once per process.
+
+        Every Crew (including ``Crew.copy()`` during train/test) re-adds its
+        knowledge sources; with a shared instance the second and later adds
+        are skipped as long as the file content has not changed.
+        """
+
+        def _content_key(self) -> str:
+            digest = hashlib.sha256()
+            for path, text in sorted(self.content.items(), key=lambda item: str(item[0])):
+                digest.update(str(path).encode("utf-8"))
+                digest.update(text.encode("utf-8"))
+            digest.update(f"{self.chunk_size}:{self.chunk_overlap}".encode("utf-8"))
+            return digest.hexdigest()
+
+        def add(self) -> None:
+            key = self._content_key()
+            with _embedded_lock:
+                if key in _embedded:
+                    return
+                self.chunks.clear()
+                super().add()
+                _embedded.add(key)
+else:
+    SharedFileKnowledgeSource = None  # type: ignore[assignment,misc]
+
+
+@lru_cache(maxsize=1)
+def shared_knowledge_sources() -> Tuple[Optional[object], ...]:
+    """
+    Knowledge sources for the crew, built once per process and shared by every
+    FplExpert instance. Entries are None when knowledge sources are unavailable.
+    """
+    if SharedFileKnowledgeSource is None:
+        return tuple(None for _ in KNOWLEDGE_FILES)
+    return tuple(
+        SharedFileKnowledgeSource(file_path=path, chunk_size=size, chunk_overlap=overlap)
+        for path, size, overlap in KNOWLEDGE_FILES
+    )
+
+
+def available_knowledge_sources() -> List[object]:
+    return [source for source in shared_knowledge_sources() if source is not None]
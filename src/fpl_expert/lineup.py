@@ -0,0 +1,397 @@
+import os
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import yaml
+
+from .entities import canonical_club, canonical_player, normalize_name
+from .history import HistoryArchive, SeasonPartition
+from .player_table import POSITIONS
+from .price_changes import _checksum
+from .season_calendar import season_calendar
+from .store import RecommendationStore, default_store
+
+
+DOMESTIC_FIXTURES_FILE = os.path.join(os.path.dirname(__file__), "config", "domestic_fixtures.yaml")
+
+# Weight of a gameweek relative to the one after it in the recent start and 60+ minute rates
+RECENT_DECAY = 0.7
+# Gameweeks' worth of the position average mixed into each player's rates, so one start is not 100%
+PRIOR_WEIGHT = 2.0
+DEFAULT_START_PRIOR = 0.5
+DEFAULT_SIXTY_PRIOR = 0.8
+
+# Days either side of a gameweek counted for congestion, and the matches a club plays in
+# that window anyway (the league weekends before and after)
+CONGESTION_DAYS = 7
+USUAL_MATCHES = 2
+# Start log-odds lost per match above the usual load
+ROTATION_LOGIT = 0.6
+
+OUT, DOUBTFUL, AVAILABLE = "out", "doubtful", "available"
+# Share of the start probability kept in the next gameweek; the effect halves every gameweek after
+NEWS_FACTORS = {OUT: 0.0, DOUBTFUL: 0.5}
+NEWS_DECAY = 0.5
+# Team news older than this is ignored
+NEWS_MAX_AGE_DAYS = 10
+# Store record kinds with availability news (PlayerRecord and TeamNewsRecord in tools/records.py)
+NEWS_KINDS = ["player", "team"]
+
+
+class MinutesProfile:
+    """Recent start rate and 60+ minute rate (given a start) per player, from archived gameweek rows."""
+
+    def __init__(self, player_ids: np.ndarray, club_codes: np.ndarray, position_codes: np.ndarray,
+                 start_rate: np.ndarray, sixty_rate: np.ndarray):
+        self.player_ids = player_ids          # sorted
+        self.club_codes = club_codes          # into the partition's clubs, from each player's latest row
+        self.position_codes = position_codes
+        self.start_rate = start_rate
+        self.sixty_rate = sixty_rate
+
+    def __len__(self) -> int:
+        return len(self.player_ids)
+
+
+def minutes_profile(rows: np.ndarray) -> MinutesProfile:
+    """
+    Exponentially weighted start and 60+ minute rates of every player in
+    ``rows`` (STATS_DTYPE, in gameweek order), shrunk towards the average of
+    the player's position. A gameweek counts for a player when their club
+    played in it; not appearing in it counts as not starting.
+    """
+    if not len(rows):
+        empty = np.zeros(0)
+        return MinutesProfile(empty.astype(np.int64), empty.astype(np.int64), empty.astype(np.int64), empty, empty)
+
+    gameweeks = np.unique(rows["gameweek"])
+    ids = np.unique(rows["player_id"])
+    p = np.searchsorted(ids, rows["player_id"])
+    g = np.searchsorted(gameweeks, rows["gameweek"])
+    started = rows["started"] > 0
+    if not started.any():
+        # Archive without a started column: 45 minutes or more counts as a start
+        started = rows["minutes"] >= 45
+    starts = np.zeros((len(ids), len(gameweeks)))
+    starts[p, g] = started
+    sixties = np.zeros((len(ids), len(gameweeks)))
+    sixties[p, g] = rows["minutes"] >= 60
+
+    # Rows are in gameweek order, so the latest row's club and position win
+    club = np.zeros(len(ids), dtype=np.int64)
+    club[p] = rows["club"]
+    position = np.zeros(len(ids), dtype=np.int64)
+    position[p] = rows["position"]
+    played = np.zeros((int(rows["club"].max()) + 1, len(gameweeks)), dtype=bool)
+    played[rows["club"], g] = True
+    counted = played[club]
+    weights = counted * RECENT_DECAY ** np.arange(len(gameweeks) - 1, -1, -1)
+
+    def prior(hits: np.ndarray, trials: np.ndarray, default: float) -> np.ndarray:
+        hits = np.bincount(position, weights=hits, minlength=len(POSITIONS))
+        trials = np.bincount(position, weights=trials, minlength=len(POSITIONS))
+        return np.divide(hits, trials, out=np.full(len(hits), default), where=trials > 0)
+
+    start_prior = prior((starts * counted).sum(axis=1), counted.sum(axis=1), DEFAULT_START_PRIOR)
+    sixty_prior = prior(sixties.sum(axis=1), starts.sum(axis=1), DEFAULT_SIXTY_PRIOR)
+    weighted_starts = (starts * weights).sum(axis=1)
+    start_rate = (weighted_starts + PRIOR_WEIGHT * start_prior[position]) / (weights.sum(axis=1) + PRIOR_WEIGHT)
+    sixty_rate = ((sixties * weights).sum(axis=1) + PRIOR_WEIGHT * sixty_prior[position]) / (weighted_starts + PRIOR_WEIGHT)
+    return MinutesProfile(ids, club, position, np.clip(start_rate, 0.0, 1.0), np.clip(sixty_rate, 0.0, 1.0))
+
+
+@lru_cache(maxsize=8)
+def load_domestic_fixtures(season: str, path: str = DOMESTIC_FIXTURES_FILE) -> Dict[str, Tuple[date, ...]]:
+    """Extra midweek domestic match dates of ``season`` per canonical club name (config/domestic_fixtures.yaml)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    entries = config.get(season) or {}
+    return {
+        canonical_club(str(club)): tuple(
+            day if isinstance(day, date) else date.fromisoformat(str(day)) for day in days or []
+        )
+        for club, days in entries.items()
+    }
+
+
+def fixture_congestion(season: str, clubs: Sequence[str], gameweeks: Sequence[int],
+                       domestic: Optional[Mapping[str, Sequence[date]]] = None) -> np.ndarray:
+    """
+    Matches each club plays within CONGESTION_DAYS of each gameweek beyond
+    USUAL_MATCHES: a league match every weekend, neighbouring Champions
+    League gameweeks and the listed midweek domestic fixtures.
+
+    Returns:
+        (len(clubs), len(gameweeks)) array of extra matches
+    """
+    domestic = load_domestic_fixtures(season) if domestic is None else domestic
+    extra = [domestic.get(canonical_club(club), ()) for club in clubs] if domestic else [()] * len(clubs)
+    schedule = {gw.number: gw for gw in season_calendar().gameweeks(season)}
+    congestion = np.zeros((len(clubs), len(gameweeks)))
+    for j, number in enumerate(gameweeks):
+        current = schedule.get(number)
+        if current is None:
+            continue
+        first = current.start - timedelta(days=CONGESTION_DAYS)
+        last = current.end + timedelta(days=CONGESTION_DAYS)
+        weekends = sum(1 for k in range((last - first).days + 1) if (first + timedelta(days=k)).weekday() == 5)
+        european = sum(1 for gw in schedule.values() if gw.number != number and gw.start <= last and gw.end >= first)
+        for i, days in enumerate(extra):
+            congestion[i, j] = weekends + european + sum(1 for day in days if first <= day <= last)
+    return np.maximum(congestion - USUAL_MATCHES, 0.0)
+
+
+def team_news(store: RecommendationStore, season: str, now: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    Availability from the injury report and verification records in the
+    store: normalized canonical player name -> OUT, DOUBTFUL or AVAILABLE,
+    the newest news winning. News older than NEWS_MAX_AGE_DAYS is ignored.
+    """
+    cutoff = ((now or datetime.now()) - timedelta(days=NEWS_MAX_AGE_DAYS)).isoformat(timespec="seconds")
+    news: List[Tuple[str, str, Optional[str], str]] = []
+    for record in store.subject_records("team", season):
+        if record["created"] < cutoff:
+            continue
+        for status, names in ((OUT, record.get("unavailable")), (OUT, record.get("suspended")),
+                              (DOUBTFUL, record.get("doubtful"))):
+            news.extend((record["created"], name, record["subject"], status) for name in names or [])
+    for record in store.subject_records("player", season):
+        injury = record.get("injury_status")
+        if injury and record["created"] >= cutoff:
+            news.append((record["created"], record["subject"], record.get("team"),
+                         OUT if injury == "suspended" else injury))
+
+    statuses: Dict[str, str] = {}
+    for _, name, club, status in sorted(news, key=lambda item: item[0]):
+        # Only exact aliases are rewritten, so news about an unknown namesake stays with its own name
+        statuses[normalize_name(canonical_player(name, club))] = status
+    return statuses
+
+
+class LineupOutlook:
+    """
+    Start and 60+ minute probabilities of every archived player for the
+    gameweeks after ``after_gameweek``.
+
+    ``start[i, j]`` is player i's chance of starting ``gameweeks[j]`` and
+    ``sixty[i, j]`` of playing 60 minutes or more in it. ``recent_start`` is
+    the start rate recent minutes alone imply, so the ratio of the two
+    (``availability()``) rescales a projection built from recent points for
+    congestion and team news.
+    """
+
+    def __init__(self, season: str, after_gameweek: int, gameweeks: Sequence[int], profile: MinutesProfile,
+                 start: np.ndarray, sixty: np.ndarray, status: Sequence[Optional[str]],
+                 names: Sequence[str], clubs: Sequence[str]):
+        self.season = season
+        self.after_gameweek = after_gameweek
+        self.gameweeks = list(gameweeks)
+        self.player_ids = profile.player_ids
+        self.position_codes = profile.position_codes
+        self.recent_start = profile.start_rate
+        self.start = start
+        self.sixty = sixty
+        self.status = list(status)
+        self.names = list(names)
+        self.clubs = list(clubs)
+        self._columns = {gw: j for j, gw in enumerate(self.gameweeks)}
+
+    def __len__(self) -> int:
+        return len(self.player_ids)
+
+    def rows(self, player_ids: Union[Sequence[int], np.ndarray]) -> np.ndarray:
+        """Row of each player id, -1 for players without archived minutes."""
+        ids = np.asarray(player_ids, dtype=np.int64)
+        rows = np.clip(np.searchsorted(self.player_ids, ids), 0, max(len(self.player_ids) - 1, 0))
+        found = self.player_ids[rows] == ids if len(self.player_ids) else np.zeros(len(ids), dtype=bool)
+        return np.where(found, rows, -1)
+
+    def availability(self, player_ids: Union[Sequence[int], np.ndarray], start_gameweek: Optional[int] = None,
+                     horizon: int = 1) -> np.ndarray:
+        """
+        Start probability over the recent start rate, per player and gameweek
+        from ``start_gameweek`` (the first outlook gameweek by default): 1 for
+        a player whose outlook is unchanged, lower for rotation risks and
+        injured players. Unknown players and gameweeks get 1.
+
+        Returns:
+            (len(player_ids), horizon) array
+        """
+        start_gameweek = self.after_gameweek + 1 if start_gameweek is None else start_gameweek
+        rows = self.rows(player_ids)
+        known = rows >= 0
+        factors = np.ones((len(rows), horizon))
+        for k in range(horizon):
+            column = self._columns.get(start_gameweek + k)
+            if column is not None:
+                factors[known, k] = self.start[rows[known], column] / self.recent_start[rows[known]]
+        return factors
+
+    def probabilities(self, player_ids: Union[Sequence[int], np.ndarray],
+                      gameweek: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Start and 60+ minute probabilities per player in ``gameweek`` (the first by default), NaN if unknown."""
+        column = self._columns.get(self.after_gameweek + 1 if gameweek is None else gameweek)
+        rows = self.rows(player_ids)
+        start = np.full(len(rows), np.nan)
+        sixty = np.full(len(rows), np.nan)
+        known = rows >= 0
+        if column is not None:
+            start[known] = self.start[rows[known], column]
+            sixty[known] = self.sixty[rows[known], column]
+        return start, sixty
+
+    def factors(self, player_ids: Union[Sequence[int], np.ndarray], gameweek: Optional[int] = None) -> np.ndarray:
+        """availability() for one gameweek (the first outlook gameweek by default)."""
+        return self.availability(player_ids, gameweek, 1)[:, 0]
+
+    def select(self, players: Optional[Sequence[str]] = None, club: Optional[str] = None) -> List[int]:
+        """
+        Rows of the named players or of one club's players, likeliest starters
+        first. Without either, the players whose start probability drops most.
+        """
+        rows: Sequence[int] = range(len(self))
+        if players:
+            wanted = {normalize_name(canonical_player(name)) for name in players}
+            rows = [i for i in rows if normalize_name(self.names[i]) in wanted
+                    or normalize_name(canonical_player(self.names[i])) in wanted]
+        if club:
+            club = canonical_club(club)
+            rows = [i for i in rows if canonical_club(self.clubs[i]) == club]
+        if not self.gameweeks:
+            return list(rows)
+        if players or club:
+            return sorted(rows, key=lambda i: -self.start[i, 0])
+        return sorted(rows, key=lambda i: self.start[i, 0] - self.recent_start[i])
+
+    def report(self, rows: Sequence[int], n_gameweeks: int = 3) -> str:
+        """Markdown table of start / 60+ minute probabilities of ``rows`` over the next gameweeks."""
+        shown = self.gameweeks[:n_gameweeks]
+        lines = [
+            f"Expected lineups for {self.season} after gameweek {self.after_gameweek} "
+            "(start / 60+ minute probability):",
+            "",
+            "| Player | Club | Pos | Recent starts | " + " | ".join(f"GW{gw}" for gw in shown) + " | News |",
+            "|---|---|---|---:|" + "---:|" * len(shown) + "---|",
+        ]
+        for i in rows:
+            cells = " | ".join(f"{self.start[i, j]:.0%} / {self.sixty[i, j]:.0%}" for j in range(len(shown)))
+            lines.append(
+                f"| {self.names[i]} | {self.clubs[i]} | {POSITIONS[self.position_codes[i]]} | "
+                f"{self.recent_start[i]:.0%} | {cells} | {self.status[i] or ''} |"
+            )
+        return "\n".join(lines)
+
+
+def build_outlook(partition: SeasonPartition, after_gameweek: int, gameweeks: Sequence[int],
+                  players: Optional[Mapping[int, Mapping[str, str]]] = None,
+                  news: Optional[Mapping[str, str]] = None) -> LineupOutlook:
+    """
+    Lineup outlook for ``gameweeks`` from the partition's rows up to
+    ``after_gameweek``, fixture congestion and ``news`` (see team_news()), in
+    one pass over all clubs.
+    """
+    profile = minutes_profile(partition.before(after_gameweek + 1))
+    players = players or {}
+    names = [players.get(int(pid), {}).get("name", str(pid)) for pid in profile.player_ids]
+    clubs = [partition.clubs[code] for code in profile.club_codes]
+
+    congestion = fixture_congestion(partition.season, partition.clubs, gameweeks)
+    rate = np.clip(profile.start_rate, 1e-3, 1 - 1e-3)
+    logits = np.log(rate / (1 - rate))[:, None] - ROTATION_LOGIT * congestion[profile.club_codes]
+    start = 1.0 / (1.0 + np.exp(-logits))
+
+    status: List[Optional[str]] = [None] * len(profile)
+    if news:
+        # Archived names as ingested and as the entity index spells them
+        by_name = {normalize_name(canonical_player(name, club)): i for i, (name, club) in enumerate(zip(names, clubs))}
+        by_name.update((normalize_name(name), i) for i, name in enumerate(names))
+        for name, value in news.items():
+            i = by_name.get(name)
+            if i is None:
+                continue
+            status[i] = value
+            if value in NEWS_FACTORS:
+                decay = NEWS_DECAY ** np.arange(len(gameweeks))
+                start[i] *= 1.0 - (1.0 - NEWS_FACTORS[value]) * decay
+    sixty = start * profile.sixty_rate[:, None]
+    return LineupOutlook(partition.season, after_gameweek, gameweeks, profile, start, sixty, status, names, clubs)
+
+
+class LineupModel:
+    """
+    Expected lineups for every archived player, without searching.
+
+    One batched pass over a season partition gives each player's recent
+    start and 60+ minute rates; domestic and European fixture congestion
+    lowers the start odds of every club's players in busy weeks, and the
+    injury and availability records the search tools left in the store
+    (out, doubtful, suspended) apply to the next gameweeks. Outlooks are
+    cached until the archive grows or new team news is stored.
+    """
+
+    def __init__(self, archive: Optional[HistoryArchive] = None, store: Optional[RecommendationStore] = None):
+        self.archive = archive or HistoryArchive()
+        self.store = store or default_store()
+        self._outlooks: Dict[Tuple[str, int, bool], Tuple[Tuple, LineupOutlook]] = {}
+        self._lock = threading.Lock()
+
+    def signature(self, season: str, news: bool = True, now: Optional[datetime] = None) -> Tuple:
+        """
+        What outlooks of ``season`` depend on: the archived rows (their count
+        and a checksum, so a re-ingested gameweek counts too), the date (news
+        ages out by the day) and the newest team-news record. Anything derived
+        from an outlook is stale once this changes.
+
+        Raises:
+            KeyError: If the season is not archived
+        """
+        partition = self.archive.season(season)
+        return (
+            len(partition), _checksum(partition.stats), (now or datetime.now()).date(),
+            self.store.records_version(NEWS_KINDS, season) if news else None,
+        )
+
+    def outlook(self, season: str, after_gameweek: Optional[int] = None, news: bool = True,
+                now: Optional[datetime] = None) -> LineupOutlook:
+        """
+        Outlook for the gameweeks of ``season`` after ``after_gameweek`` (the
+        last archived one by default), with team news unless ``news`` is False.
+
+        Raises:
+            KeyError: If the season is not archived
+        """
+        now = now or datetime.now()
+        partition = self.archive.season(season)
+        if after_gameweek is None:
+            after_gameweek = partition.gameweeks[-1] if partition.gameweeks else 0
+        signature = self.signature(season, news, now)
+        key = (season, after_gameweek, news)
+        with self._lock:
+            cached = self._outlooks.get(key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            gameweeks = [gw.number for gw in season_calendar().gameweeks(season) if gw.number > after_gameweek]
+            outlook = build_outlook(
+                partition, after_gameweek, gameweeks, self.archive.players,
+                team_news(self.store, season, now) if news else None,
+            )
+            self._outlooks[key] = (signature, outlook)
+            return outlook
+
+
+_model: Optional[LineupModel] = None
+_model_lock = threading.Lock()
+
+
+def lineup_model() -> LineupModel:
+    """Process-wide lineup model over the default archive and store."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = LineupModel()
+        return _model
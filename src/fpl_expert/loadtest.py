@@ -0,0 +1,622 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from crewai.events import (
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    crewai_event_bus,
+)
+
+from .crew import FplExpert
+from .history import DEFAULT_HISTORY_DIR
+from .knowledge import shared_knowledge_sources
+from .profiles import load_profiles
+from .tools.search_cache import search_cache
+
+
+DEFAULT_LEVELS = (1, 2, 4, 8)
+# Simulated latency of the fake backend, in seconds
+DEFAULT_SEARCH_LATENCY = 0.05
+DEFAULT_LLM_LATENCY = 0.2
+EMBEDDING_DIMENSIONS = 1536
+PERCENTILES = (50, 95, 99)
+
+# Squad the fake model answers with when a task asks for a TeamSelection
+SAMPLE_SQUAD = (
+    ("David Raya", "Arsenal", "GK", 5.5, True), ("Yann Sommer", "Inter Milan", "GK", 5.0, False),
+    ("William Saliba", "Arsenal", "DEF", 6.0, True), ("Achraf Hakimi", "Paris Saint-Germain", "DEF", 6.5, True),
+    ("Joshua Kimmich", "Bayern Munich", "DEF", 6.0, True), ("Federico Dimarco", "Inter Milan", "DEF", 5.5, True),
+    ("Josko Gvardiol", "Manchester City", "DEF", 5.5, False), ("Mohamed Salah", "Liverpool", "MID", 9.5, True),
+    ("Lamine Yamal", "Barcelona", "MID", 9.5, True), ("Bukayo Saka", "Arsenal", "MID", 8.5, True),
+    ("Michael Olise", "Bayern Munich", "MID", 8.0, True), ("Ousmane Dembele", "Paris Saint-Germain", "MID", 8.0, False),
+    ("Harry Kane", "Bayern Munich", "FWD", 10.5, True), ("Kylian Mbappe", "Real Madrid", "FWD", 10.5, True),
+    ("Lautaro Martinez", "Inter Milan", "FWD", 8.0, False),
+)
+
+# Tools the fake model calls (once per task) when the agent has them: tool name -> argument name
+FAKE_TOOL_CALLS = (
+    ("Player Team Verification Tool", "player_name"),
+    ("Injury Report Tool", "team_name"),
+    ("Search the internet with Serper", "search_query"),
+)
+
+
+def _pick(seed: str, options: Sequence[Any]) -> Any:
+    return options[int(hashlib.sha1(seed.encode("utf-8")).hexdigest(), 16) % len(options)]
+
+
+def fake_search_results(query: str, n_results: int = 10) -> Dict[str, Any]:
+    """Serper-shaped response that names a few players and clubs, the same for the same query."""
+    results = []
+    for i in range(min(n_results, 5)):
+        name, club, position, price, _ = _pick(f"{query}:{i}", SAMPLE_SQUAD)
+        result = {
+            "title": f"{name} ({club}) - {query}",
+            "link": f"https://example.com/{hashlib.sha1(f'{query}:{i}'.encode()).hexdigest()[:12]}",
+            "snippet": f"{name} plays for {club} as a {position}, priced at €{price}m. Fit and expected to start.",
+            "date": "1 day ago",
+            "position": i + 1,
+        }
+        results.append(result)
+    return {"searchParameters": {"q": query}, "organic": results, "news": results, "credits": 1}
+
+
+def fake_completion(messages: List[Dict[str, Any]]) -> str:
+    """
+    Reply of the fake model to a ReAct-style agent prompt: one tool call
+    per task (if the agent has one of FAKE_TOOL_CALLS), then a final answer.
+    Tasks with a TeamSelection output get SAMPLE_SQUAD as JSON.
+    """
+    prompt = "\n".join(str(m.get("content") or "") for m in messages)
+    observed = any(m.get("role") == "assistant" and "Observation:" in str(m.get("content") or "") for m in messages)
+    if not observed:
+        for tool, argument in FAKE_TOOL_CALLS:
+            if f"Tool Name: {tool}" in prompt:
+                name, club = _pick(prompt[-500:], SAMPLE_SQUAD)[:2]
+                value = {"player_name": name, "team_name": club}.get(argument, f"{name} {club} latest news")
+                return f"Thought: Let me check\nAction: {tool}\nAction Input: {json.dumps({argument: value})}"
+
+    if "vice_captain" in prompt:
+        players = [
+            {"name": name, "club": club, "position": position, "price": price, "starting": starting,
+             "justification": f"{name} is a reliable pick from {club}."}
+            for name, club, position, price, starting in SAMPLE_SQUAD
+        ]
+        team = {
+            "summary": "A balanced squad built around the strongest attacks.",
+            "players": players, "captain": "Harry Kane", "vice_captain": "Kylian Mbappe",
+            "transfer_strategy": "Hold transfers until team news is confirmed.",
+            "risk_assessment": "Rotation risk at the big clubs; the bench covers it.",
+        }
+        return "Thought: I now know the final answer\nFinal Answer: " + json.dumps(team)
+    picks = ", ".join(f"{name} ({club})" for name, club, *_ in (_pick(f"{prompt[-300:]}:{i}", SAMPLE_SQUAD) for i in range(3)))
+    return f"Thought: I now know the final answer\nFinal Answer: Recommended: {picks}."
+
+
+class FakeBackend:
+    """
+    Local HTTP server standing in for Serper, the DeepSeek chat API and the
+    OpenAI embeddings API, with a fixed latency per request. Searches above
+    ``search_qps`` per second (0 = no limit) get HTTP 429, like a shared
+    Serper quota running out.
+    """
+
+    def __init__(
+        self,
+        search_latency: float = DEFAULT_SEARCH_LATENCY,
+        llm_latency: float = DEFAULT_LLM_LATENCY,
+        search_qps: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.search_latency = search_latency
+        self.llm_latency = llm_latency
+        self.search_qps = search_qps
+        self.requests: Counter = Counter()    # "search", "rate_limited", "llm", "embedding"
+        self._lock = threading.Lock()
+        self._window: List[float] = []         # search times in the last second
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self._server.server_address[0]!s}:{self._server.server_port}"
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _admit_search(self) -> bool:
+        if not self.search_qps:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            self._window = [t for t in self._window if now - t < 1.0]
+            if len(self._window) >= self.search_qps:
+                return False
+            self._window.append(now)
+            return True
+
+    def respond(self, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if path.endswith("/chat/completions"):
+            self.count("llm")
+            time.sleep(self.llm_latency)
+            messages = body.get("messages") or []
+            text = fake_completion(messages)
+            prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+            return 200, {
+                "id": f"chatcmpl-{self.requests['llm']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 4,
+                          "total_tokens": prompt_tokens + len(text) // 4},
+            }
+        if path.endswith("/embeddings"):
+            self.count("embedding")
+            inputs = body.get("input") or []
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            data = []
+            for i, text in enumerate(inputs):
+                rng = np.random.default_rng(int(hashlib.sha1(str(text).encode("utf-8")).hexdigest()[:8], 16))
+                vector = rng.standard_normal(EMBEDDING_DIMENSIONS)
+                data.append({"object": "embedding", "index": i, "embedding": (vector / np.linalg.norm(vector)).tolist()})
+            return 200, {"object": "list", "data": data, "model": body.get("model", "fake"),
+                         "usage": {"prompt_tokens": 0, "total_tokens": 0}}
+        # Anything else is a Serper search (/search, /news, ...)
+        if not self._admit_search():
+            self.count("rate_limited")
+            return 429, {"message": "Rate limit exceeded", "statusCode": 429}
+        self.count("search")
+        time.sleep(self.search_latency)
+        return 200, fake_search_results(str(body.get("q", "")), int(body.get("num", 10)))
+
+    def _handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    body = {}
+                status, payload = backend.respond(self.path, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeBackend":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    @contextmanager
+    def environment(self) -> Iterator[None]:
+        """Point Serper, DeepSeek and OpenAI clients of this process at the fake backend."""
+        overrides = {
+            "FPL_SERPER_BASE_URL": self.url,
+            "DEEPSEEK_API_BASE": self.url,
+            "OPENAI_BASE_URL": self.url,
+            "OPENAI_API_BASE": self.url,
+            "SERPER_API_KEY": os.getenv("SERPER_API_KEY") or "load-test",
+            "DEEPSEEK_API_KEY": os.getenv("DEEPSEEK_API_KEY") or "load-test",
+            "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY") or "load-test",
+        }
+        previous = {name: os.environ.get(name) for name in overrides}
+        os.environ.update(overrides)
+        try:
+            yield
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+@contextmanager
+def scratch_workspace() -> Iterator[str]:
+    """
+    Temporary directory for load-test runs to write into, so fake reports
+    and records never reach the real output directory, store, archive or
+    report index. Stores, archive and index are pointed at it through their
+    FPL_* settings; inputs that are read relative to the working directory
+    (the history archive, knowledge files) are pinned to their real
+    locations first. Yields the directory; it is deleted afterwards.
+
+    The store, archive and index are process-wide and opened on first use,
+    so this has to be entered before anything in the process opens them.
+    """
+    root = tempfile.mkdtemp(prefix="fpl-loadtest-")
+    overrides = {
+        "FPL_HISTORY_DIR": os.path.abspath(os.getenv("FPL_HISTORY_DIR", DEFAULT_HISTORY_DIR)),
+        "FPL_STORE_PATH": os.path.join(root, "state", "fpl_expert.sqlite3"),
+        "FPL_ARCHIVE_PATH": os.path.join(root, "archive", "reports.sqlite3"),
+        "FPL_OUTPUT_INDEX_DIR": os.path.join(root, "index"),
+        "FPL_TRANSCRIPT_DIR": os.path.join(root, "transcripts"),
+    }
+    previous = {name: os.environ.get(name) for name in overrides}
+    cwd = os.getcwd()
+    # Knowledge files are read (relative to the project) when the shared sources are built
+    shared_knowledge_sources()
+    os.environ.update(overrides)
+    try:
+        yield root
+    finally:
+        os.chdir(cwd)
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(root, ignore_errors=True)
+
+
+class MemorySampler:
+    """Peak resident memory of the process while running, sampled every ``interval`` seconds."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def rss() -> int:
+        """Resident set size in bytes (peak so far where the current size is not available)."""
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, AttributeError):
+            try:
+                import resource
+            except ImportError:
+                return 0
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def __enter__(self) -> "MemorySampler":
+        self.baseline = self.peak = self.rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="memory-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak = max(self.peak, self.rss())
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.rss())
+
+
+@dataclass
+class LevelResult:
+    """Measurements of ``runs`` crew runs made ``concurrency`` at a time."""
+    concurrency: int
+    runs: int
+    wall_seconds: float = 0.0
+    run_seconds: List[float] = field(default_factory=list)
+    task_seconds: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    tool_seconds: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Counter = field(default_factory=Counter)         # kind -> count
+    backend_requests: Counter = field(default_factory=Counter)
+    baseline_memory: int = 0
+    peak_memory: int = 0
+    # Output file -> runs that wrote it (more than one run means they overwrote each other)
+    output_writers: Dict[str, set] = field(default_factory=lambda: defaultdict(set))
+
+    @property
+    def failed_runs(self) -> int:
+        return self.errors["run"]
+
+    @property
+    def throughput(self) -> float:
+        """Completed runs per minute."""
+        return (self.runs - self.failed_runs) / self.wall_seconds * 60 if self.wall_seconds else 0.0
+
+    @property
+    def shared_outputs(self) -> List[str]:
+        return sorted(path for path, runs in self.output_writers.items() if len(runs) > 1)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "error_rate": self.failed_runs / self.runs if self.runs else 0.0,
+            "errors": dict(self.errors),
+            "wall_seconds": self.wall_seconds,
+            "throughput_per_minute": self.throughput,
+            "run_latency": percentiles(self.run_seconds),
+            "task_latency": {name: percentiles(values) for name, values in self.task_seconds.items()},
+            "tool_latency": {name: percentiles(values) for name, values in self.tool_seconds.items()},
+            "peak_memory_mb": self.peak_memory / 2 ** 20,
+            "memory_per_run_mb": max(0, self.peak_memory - self.baseline_memory) / 2 ** 20 / self.concurrency,
+            "backend_requests": dict(self.backend_requests),
+            "shared_output_files": self.shared_outputs,
+        }
+
+
+def percentiles(values: Sequence[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    result: Dict[str, float] = {"count": len(values)}
+    for q, value in zip(PERCENTILES, np.percentile(np.asarray(values, dtype=float), PERCENTILES)):
+        result[f"p{q}"] = float(value)
+    return result
+
+
+# The level being measured; crewai's event bus has no way to remove handlers, so they are
+# registered once and record into whichever level is active
+_active: Optional[LevelResult] = None
+_task_runs: Dict[int, int] = {}        # id(task) -> run number
+_task_started: Dict[int, float] = {}
+_events_lock = threading.Lock()
+_handlers_registered = False
+
+
+def _on_task_started(source, event) -> None:
+    with _events_lock:
+        if _active is not None:
+            _task_started[id(event.task)] = time.perf_counter()
+
+
+def _on_task_completed(source, event) -> None:
+    with _events_lock:
+        started = _task_started.pop(id(event.task), None)
+        if _active is None or started is None:
+            return
+        _active.task_seconds[event.task.name or "task"].append(time.perf_counter() - started)
+        if event.task.output_file:
+            _active.output_writers[event.task.output_file].add(_task_runs.get(id(event.task)))
+
+
+def _on_task_failed(source, event) -> None:
+    with _events_lock:
+        _task_started.pop(id(event.task), None)
+        if _active is not None:
+            _active.errors["task"] += 1
+
+
+def _on_tool_finished(source, event) -> None:
+    with _events_lock:
+        if _active is not None:
+            _active.tool_seconds[event.tool_name].append((event.finished_at - event.started_at).total_seconds())
+
+
+def _on_tool_failed(source, event) -> None:
+    with _events_lock:
+        if _active is not None:
+            _active.errors["tool"] += 1
+
+
+_HANDLERS = (
+    (TaskStartedEvent, _on_task_started),
+    (TaskCompletedEvent, _on_task_completed),
+    (TaskFailedEvent, _on_task_failed),
+    (ToolUsageFinishedEvent, _on_tool_finished),
+    (ToolUsageErrorEvent, _on_tool_failed),
+)
+
+
+def _register_handlers() -> None:
+    global _handlers_registered
+    with _events_lock:
+        if _handlers_registered:
+            return
+        _handlers_registered = True
+    for event_type, handler in _HANDLERS:
+        crewai_event_bus.on(event_type)(handler)
+
+
+class LoadTest:
+    """
+    Concurrent crew runs against a FakeBackend, one level of concurrency at a time.
+
+    Every run is a separate FplExpert crew for a manager profile (profiles
+    are used in turn, as when many managers are served at once). All runs
+    share the process: the search cache, knowledge sources, output directory
+    and fake Serper quota, as in a multi-tenant deployment. The search
+    cache is cleared before each level, so every level starts cold.
+
+    Runs write into a scratch workspace (``scratch_workspace``), each level
+    from its own working directory, so nothing they write is left in the
+    project's output directory, store or archive.
+    """
+
+    def __init__(self, inputs: Dict[str, str], backend: FakeBackend, profiles: Optional[Sequence[str]] = None):
+        self.inputs = inputs
+        self.backend = backend
+        # Loaded up front: preference files are read relative to the project, not the workspace
+        self._profiles = load_profiles()
+        self.profiles = list(profiles or self._profiles)
+
+    def _run(self, number: int, level: LevelResult) -> None:
+        profile = self._profiles[self.profiles[number % len(self.profiles)]]
+        started = time.perf_counter()
+        try:
+            crew = FplExpert().crew()
+            crew.verbose = False
+            for agent in crew.agents:
+                agent.verbose = False
+            with _events_lock:
+                _task_runs.update({id(task): number for task in crew.tasks})
+            crew.kickoff(inputs=profile.inputs(self.inputs))
+        except Exception as e:
+            with _events_lock:
+                level.errors["run"] += 1
+                level.errors[f"run: {type(e).__name__}"] += 1
+        finally:
+            with _events_lock:
+                level.run_seconds.append(time.perf_counter() - started)
+
+    def run_level(self, concurrency: int, runs: Optional[int] = None, workspace: Optional[str] = None) -> LevelResult:
+        global _active
+        level = LevelResult(concurrency=concurrency, runs=runs or concurrency)
+        if workspace is not None:
+            directory = os.path.join(workspace, f"level_{concurrency}")
+            os.makedirs(directory, exist_ok=True)
+            os.chdir(directory)
+        search_cache.clear()
+        before = Counter(self.backend.requests)
+        with _events_lock:
+            _active = level
+            _task_runs.clear()
+            _task_started.clear()
+
+        started = time.perf_counter()
+        with MemorySampler() as memory:
+            pending = list(range(level.runs))
+            pending_lock = threading.Lock()
+
+            def worker():
+                while True:
+                    with pending_lock:
+                        if not pending:
+                            return
+                        number = pending.pop(0)
+                    self._run(number, level)
+
+            threads = [threading.Thread(target=worker, name=f"load-{i}") for i in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        level.wall_seconds = time.perf_counter() - started
+
+        with _events_lock:
+            _active = None
+        level.baseline_memory, level.peak_memory = memory.baseline, memory.peak
+        level.backend_requests = Counter(self.backend.requests) - before
+        return level
+
+    def run(self, levels: Sequence[int] = DEFAULT_LEVELS, runs_per_level: Optional[int] = None) -> List[LevelResult]:
+        _register_handlers()
+        with self.backend.environment(), scratch_workspace() as workspace:
+            return [self.run_level(concurrency, runs_per_level, workspace) for concurrency in levels]
+
+
+def run_load_test(
+    inputs: Dict[str, str],
+    levels: Sequence[int] = DEFAULT_LEVELS,
+    runs_per_level: Optional[int] = None,
+    search_latency: float = DEFAULT_SEARCH_LATENCY,
+    llm_latency: float = DEFAULT_LLM_LATENCY,
+    search_qps: float = 0.0,
+    profiles: Optional[Sequence[str]] = None,
+) -> List[LevelResult]:
+    """
+    Run the crew at each level of concurrency against a local fake Serper
+    and model server.
+
+    Args:
+        inputs: Crew inputs shared by all runs (each run adds its manager profile)
+        levels: Numbers of concurrent runs to measure
+        runs_per_level: Runs per level (default: as many as the level's concurrency)
+        search_latency: Seconds the fake Serper takes per search
+        llm_latency: Seconds the fake model takes per completion
+        search_qps: Shared search quota per second; searches above it fail with HTTP 429 (0 = unlimited)
+        profiles: Manager profiles to cycle through (default: all)
+
+    Returns:
+        One result per level
+    """
+    backend = FakeBackend(search_latency=search_latency, llm_latency=llm_latency, search_qps=search_qps).start()
+    try:
+        return LoadTest(inputs, backend, profiles).run(levels, runs_per_level)
+    finally:
+        backend.stop()
+
+
+def _ms(stats: Dict[str, float], q: int) -> str:
+    return f"{stats[f'p{q}'] * 1000:.0f}" if stats.get("count") else "-"
+
+
+def format_load_report(results: Sequence[LevelResult]) -> str:
+    """Markdown report: one row per level, then task and tool latency per level."""
+    lines = [
+        "| Concurrency | Runs | Failed | Runs/min | Run p50 (s) | Run p95 (s) | Run p99 (s) | Peak RSS (MB) "
+        "| MB per run | Searches | Rate-limited | LLM calls | Shared outputs |",
+        "|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for result in results:
+        s = result.summary()
+        run = s["run_latency"]
+        requests = s["backend_requests"]
+        lines.append(
+            f"| {s['concurrency']} | {s['runs']} | {s['failed_runs']} | {s['throughput_per_minute']:.1f} "
+            f"| {run.get('p50', 0):.2f} | {run.get('p95', 0):.2f} | {run.get('p99', 0):.2f} "
+            f"| {s['peak_memory_mb']:.0f} | {s['memory_per_run_mb']:.1f} | {requests.get('search', 0)} "
+            f"| {requests.get('rate_limited', 0)} | {requests.get('llm', 0)} | {len(s['shared_output_files'])} |"
+        )
+
+    for kind in ("task", "tool"):
+        names = sorted({name for r in results for name in getattr(r, f"{kind}_seconds")})
+        if not names:
+            continue
+        lines += ["", f"### {kind.capitalize()} latency (ms, p50 / p95 / p99)", ""]
+        lines.append("| " + kind.capitalize() + " | " + " | ".join(f"N={r.concurrency}" for r in results) + " |")
+        lines.append("|---|" + "---:|" * len(results))
+        for name in names:
+            cells = []
+            for r in results:
+                stats = percentiles(getattr(r, f"{kind}_seconds").get(name, []))
+                cells.append(" / ".join(_ms(stats, q) for q in PERCENTILES))
+            lines.append(f"| {name} | " + " | ".join(cells) + " |")
+
+    errors = [(r.concurrency, kind, count) for r in results for kind, count in sorted(r.errors.items())]
+    if errors:
+        lines += ["", "### Errors", "", "| Concurrency | Kind | Count |", "|---:|---|---:|"]
+        lines += [f"| {n} | {kind} | {count} |" for n, kind, count in errors]
+    shared = sorted({path for r in results for path in r.shared_outputs})
+    if shared:
+        lines += ["", "### Output files written by more than one run (later runs overwrite earlier ones)", ""]
+        lines += [f"- `{path}`" for path in shared]
+    return "\n".join(lines)
+
+
+def write_load_report(results: Sequence[LevelResult], directory: str = "output") -> str:
+    """Write the markdown report and the raw summaries (JSON) next to it; returns the report path."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(directory, f"loadtest_{stamp}.md")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# Load Test\n\n" + format_load_report(results) + "\n")
+    with open(re.sub(r"\.md$", ".json", path), "w", encoding="utf-8") as f:
+        json.dump([r.summary() for r in results], f, indent=2)
+    return path
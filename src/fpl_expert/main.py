@@ -1,11 +1,32 @@
 #!/usr/bin/env python
+import os
 import sys
 import warnings
 
 from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from fpl_expert.api import serve as serve_api
+from fpl_expert.archive import output_archive
 from fpl_expert.crew import FplExpert
-from fpl_expert.tools.custom_tool import get_football_season
+from fpl_expert.evaluation import evaluate_in_parallel
+from fpl_expert.backtest import format_results, run_backtest
+from fpl_expert.benchmark import DEFAULT_HORIZONS, DEFAULT_POOL_SIZES, DEFAULT_REPEATS, format_benchmark, run_benchmark
+from fpl_expert.bracket import DEFAULT_SIMULATIONS, TournamentSimulator
+from fpl_expert.history import HistoryArchive
+from fpl_expert.lineup import lineup_model
+from fpl_expert.loadtest import (
+    DEFAULT_LEVELS, DEFAULT_LLM_LATENCY, DEFAULT_SEARCH_LATENCY, format_load_report, run_load_test, write_load_report
+)
+from fpl_expert.output_index import output_index
+from fpl_expert.prefetch import prefetch_metrics
+from fpl_expert.price_changes import PricePredictor
+from fpl_expert.profiler import DEFAULT_INTERVAL, SamplingProfiler
+from fpl_expert.profiles import get_profile, run_profiles
+from fpl_expert.routing import routing_metrics
+from fpl_expert.scheduler import PreDeadlineScheduler
+from fpl_expert.season_calendar import current_matchweek, season_of
+from fpl_expert.tools.search_cache import record_searches, replay_searches
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -14,41 +35,57 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
 
-def run():
+def build_run_inputs(current_date: Optional[datetime] = None, profile: Optional[str] = None) -> dict:
     """
-    Run the Champions League Fantasy crew.
+    Build the crew inputs for a run at ``current_date`` (defaults to now) on
+    behalf of a manager profile (defaults to FPL_PROFILE or "aaron").
     """
     # Dynamic date and season calculation
-    current_date = datetime.now()
-    current_season = get_football_season(current_date)
+    current_date = current_date or datetime.now()
+    current_season = season_of(current_date)
     
-    # Auto-detect approximate gameweek based on date (Champions League typically starts in September)
-    # New format: 36 teams, 8 gameweeks in league phase (not 6 like old groups)
-    if current_date.month >= 9:  # September onwards
-        weeks_since_start = (current_date - datetime(current_date.year, 9, 1)).days // 14  # Rough 2-week intervals
-        estimated_matchweek = min(max(weeks_since_start + 1, 1), 8)  # New league phase has 8 gameweeks
-    else:
-        estimated_matchweek = 1
+    # Gameweek to pick for: the next open deadline in the UEFA calendar (config/calendar.yaml)
+    # New format: 36 teams, 8 gameweeks in league phase, then knockout gameweeks up to the final
+    matchweek = current_matchweek(current_date)
     
-    inputs = {
+    return get_profile(profile).inputs({
         'current_year': str(current_date.year),
         'current_date': current_date.strftime('%Y-%m-%d'),
         'current_season': current_season,
         'budget': '100',  # Typical Champions League Fantasy budget
-        'matchweek': str(estimated_matchweek),
+        'matchweek': str(matchweek),
         'competition': 'UEFA Champions League',
         'month_year': current_date.strftime('%B %Y')
-    }
+    })
+
+
+def run():
+    """
+    Run the Champions League Fantasy crew.
+    """
+    if sys.argv[1:2] == ["schedule"]:
+        return schedule()
+
+    current_date = datetime.now()
+    inputs = build_run_inputs(current_date)
+    current_season = inputs['current_season']
+    matchweek = inputs['matchweek']
     
     try:
         result = FplExpert().crew().kickoff(inputs=inputs)
         print("\n" + "="*50)
         print("CHAMPIONS LEAGUE FANTASY TEAM SELECTION COMPLETE!")
         print(f"Season: {current_season}")
-        print(f"Estimated Gameweek: {estimated_matchweek}")
+        print(f"Gameweek: {matchweek}")
         print(f"Analysis Date: {current_date.strftime('%B %d, %Y')}")
         print("="*50)
         print("Check the 'champions_league_team.md' file for your optimal team selection.")
+        if routing_metrics.tiers:
+            print("\nModel routing:")
+            print(routing_metrics.report())
+        if prefetch_metrics.tools:
+            print("\nSearch prefetching:")
+            print(prefetch_metrics.report())
         return result
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
@@ -58,12 +95,7 @@ def train():
     """
     Train the crew for a given number of iterations.
     """
-    inputs = {
-        'current_year': str(datetime.now().year),
-        'budget': '100',
-        'matchweek': '1',
-        'competition': 'UEFA Champions League'
-    }
+    inputs = build_run_inputs()
     try:
         FplExpert().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
 
@@ -83,15 +115,18 @@ def replay():
 def test():
     """
     Test the crew execution and returns the results.
+
+    An optional third argument runs the iterations concurrently on that many
+    workers, sharing search results and knowledge embeddings between them.
     """
-    inputs = {
-        'current_year': str(datetime.now().year),
-        'budget': '100',
-        'matchweek': '1',
-        'competition': 'UEFA Champions League'
-    }
+    inputs = build_run_inputs()
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 1
     
     try:
+        if workers > 1:
+            return evaluate_in_parallel(
+                n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs, workers=workers
+            )
         FplExpert().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
 
     except Exception as e:
@@ -101,12 +136,8 @@ def run_for_matchweek(matchweek: str, budget: str = '100'):
     """
     Run the crew for a specific gameweek with custom budget.
     """
-    inputs = {
-        'current_year': str(datetime.now().year),
-        'budget': budget,
-        'matchweek': matchweek,
-        'competition': 'UEFA Champions League'
-    }
+    inputs = build_run_inputs()
+    inputs.update({'budget': budget, 'matchweek': str(matchweek)})
     
     try:
         result = FplExpert().crew().kickoff(inputs=inputs)
@@ -115,25 +146,344 @@ def run_for_matchweek(matchweek: str, budget: str = '100'):
     except Exception as e:
         raise Exception(f"An error occurred while running the crew for matchweek {matchweek}: {e}")
 
+def run_for_profiles(profiles: Optional[list] = None):
+    """
+    Run the crew for several manager profiles: the research tasks run once and
+    only the captain, budget and team-building tasks run per profile.
+    """
+    if profiles is None:
+        profiles = sys.argv[1:]
+
+    try:
+        results = run_profiles(build_run_inputs(), profile_names=profiles or None)
+        for name in results:
+            print(f"Team selection for profile '{name}' saved to champions_league_team_{name}.md")
+        return results
+    except Exception as e:
+        raise Exception(f"An error occurred while running the crew for profiles: {e}")
+
+def ingest_history(csv_path: Optional[str] = None, season: Optional[str] = None):
+    """
+    Ingest a CSV of historical per-player per-gameweek stats into the local archive.
+    """
+    if csv_path is None:
+        csv_path = sys.argv[1]
+        season = sys.argv[2] if len(sys.argv) > 2 else None
+
+    try:
+        archive = HistoryArchive()
+        counts = archive.ingest_csv(csv_path, season)
+        predictor = PricePredictor(archive=archive)
+        for ingested_season, rows in counts.items():
+            print(f"Archived {rows} rows for season {ingested_season}")
+            # Fold the new gameweeks into the price-change features
+            predictor.refresh(ingested_season)
+        return counts
+    except Exception as e:
+        raise Exception(f"An error occurred while ingesting historical stats: {e}")
+
+def index_outputs():
+    """
+    Add new and changed analysis reports from earlier runs to the local
+    research index used by the Past Research Tool, evicting old entries.
+    """
+    try:
+        index = output_index(refresh=False)
+        added = index.refresh()
+        print(f"Indexed {added} new chunks; {len(index)} chunks from earlier runs are searchable")
+        return index
+    except Exception as e:
+        raise Exception(f"An error occurred while indexing earlier outputs: {e}")
+
+def archive(args: Optional[list] = None):
+    """
+    Print the latest archived copy of a report, or archive statistics.
+
+    ``archive <report|task> [--matchweek <n>] [--profile <name>]`` prints the
+    newest matching report (a report name like captain_analysis, or a task
+    name like select_captain_task). Without a name, prints what the archive
+    holds and applies retention.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    name = args[0] if args and not args[0].startswith("--") else None
+    options = dict(zip(args[1 if name else 0::2], args[2 if name else 1::2]))
+    store = output_archive()
+
+    if name is None:
+        removed = store.enforce_retention()
+        stats = store.stats()
+        saved = 1 - stats["stored_bytes"] / stats["content_bytes"] if stats["content_bytes"] else 0.0
+        print(
+            f"{stats['entries']} reports from {stats['runs']} runs in {stats['objects']} distinct documents; "
+            f"{stats['content_bytes']:,} bytes stored as {stats['stored_bytes']:,} ({saved:.0%} saved), "
+            f"archive file {stats['file_bytes']:,} bytes"
+        )
+        print(
+            f"Retention removed {removed['entries']} entries, {removed['objects']} documents "
+            f"and {removed['files']} output files"
+        )
+        return stats
+
+    entry = store.latest(name, profile=options.get("--profile"), matchweek=options.get("--matchweek"))
+    if entry is None:
+        print(f"No archived report matches {name}")
+        return None
+    print(f"# {entry.filename} (run {entry.run_id}, written {entry.written})\n")
+    print(store.read(entry))
+    return entry
+
+def profile_run(args: Optional[list] = None):
+    """
+    Run the crew under a sampling profiler and write a flame graph, a hotspot
+    report and folded stacks to output/profile_<timestamp>/.
+
+    Options: --replay <file> answers searches from responses recorded earlier,
+    --record <file> saves this run's search responses, --interval <ms> sets the
+    sampling interval.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    options = dict(zip(args[::2], args[1::2]))
+    interval = float(options.get("--interval", DEFAULT_INTERVAL * 1000)) / 1000
+
+    if "--replay" in options:
+        print(f"Replaying {replay_searches(options['--replay'])} recorded search responses")
+
+    profiler = SamplingProfiler(interval=interval)
+    try:
+        with profiler:
+            result = FplExpert().crew().kickoff(inputs=build_run_inputs())
+    except Exception as e:
+        raise Exception(f"An error occurred while profiling the crew: {e}")
+    finally:
+        paths = profiler.write()
+        for kind, path in paths.items():
+            print(f"{kind.replace('_', ' ').capitalize()} saved to {path}")
+
+    if "--record" in options:
+        print(f"Recorded {record_searches(options['--record'])} search responses to {options['--record']}")
+    return result
+
+def loadtest(args: Optional[list] = None):
+    """
+    Run several crews at once against a local fake Serper and model server
+    and report throughput, latency percentiles per run, task and tool, peak
+    memory and errors for each level of concurrency.
+
+    Options: --levels <n,n,...> concurrent runs per level (default 1,2,4,8),
+    --runs <n> runs per level (default: the level), --search-latency <ms> and
+    --llm-latency <ms> for the fake backend, --search-qps <n> shared search
+    quota per second (default unlimited).
+    """
+    if args is None:
+        args = sys.argv[1:]
+    options = dict(zip(args[::2], args[1::2]))
+    levels = [int(n) for n in options["--levels"].split(",")] if "--levels" in options else DEFAULT_LEVELS
+
+    try:
+        results = run_load_test(
+            build_run_inputs(),
+            levels=levels,
+            runs_per_level=int(options["--runs"]) if "--runs" in options else None,
+            search_latency=float(options.get("--search-latency", DEFAULT_SEARCH_LATENCY * 1000)) / 1000,
+            llm_latency=float(options.get("--llm-latency", DEFAULT_LLM_LATENCY * 1000)) / 1000,
+            search_qps=float(options.get("--search-qps", 0)),
+        )
+    except Exception as e:
+        raise Exception(f"An error occurred while load testing the crew: {e}")
+
+    print(format_load_report(results))
+    print(f"\nLoad test report saved to {write_load_report(results)}")
+    return results
+
+def benchmark(args: Optional[list] = None):
+    """
+    Time squad selection on synthetic player pools across pool sizes,
+    horizons and constraint scenarios, and warm-started re-solves after a
+    few projections change.
+
+    Options: --sizes <n,n,...> pool sizes (default 100,500,1000,2000,5000),
+    --horizons <n,n,...> gameweeks (default 1,2,4,8), --repeats <n>.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    options = dict(zip(args[::2], args[1::2]))
+    sizes = [int(n) for n in options["--sizes"].split(",")] if "--sizes" in options else DEFAULT_POOL_SIZES
+    horizons = [int(n) for n in options["--horizons"].split(",")] if "--horizons" in options else DEFAULT_HORIZONS
+
+    try:
+        cold, incremental = run_benchmark(sizes, horizons, int(options.get("--repeats", DEFAULT_REPEATS)))
+    except Exception as e:
+        raise Exception(f"An error occurred while benchmarking the optimizer: {e}")
+
+    report = format_benchmark(cold, incremental)
+    print(report)
+    os.makedirs("output", exist_ok=True)
+    report_path = os.path.join("output", f"optimizer_benchmark_{datetime.now().strftime('%Y-%m-%d')}.md")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("# Optimizer Benchmark\n\n" + report + "\n")
+    print(f"\nBenchmark saved to {report_path}")
+    return cold, incremental
+
+def backtest(seasons: Optional[list] = None):
+    """
+    Replay archived seasons through the built-in selection policies and report
+    total points and estimated rank percentile per policy.
+    """
+    if seasons is None:
+        seasons = sys.argv[1:]
+
+    try:
+        results = run_backtest(seasons=seasons or None)
+        report = format_results(results)
+        print(report)
+
+        os.makedirs("output", exist_ok=True)
+        report_path = os.path.join("output", f"backtest_{datetime.now().strftime('%Y-%m-%d')}.md")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write("# Strategy Backtest\n\n" + report + "\n")
+        print(f"\nBacktest report saved to {report_path}")
+        return results
+    except Exception as e:
+        raise Exception(f"An error occurred while running the backtest: {e}")
+
+def bracket(n_simulations: Optional[int] = None):
+    """
+    Simulate the rest of this season's Champions League (league phase,
+    play-offs and knockout bracket) and report each club's chances of
+    reaching every stage and its expected number of remaining matches.
+    """
+    if n_simulations is None:
+        n_simulations = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIMULATIONS
+
+    try:
+        outlook = TournamentSimulator.from_config().simulate(n_simulations)
+        report = outlook.report(current_matchweek())
+        print(report)
+
+        os.makedirs("output", exist_ok=True)
+        report_path = os.path.join("output", f"bracket_{datetime.now().strftime('%Y-%m-%d')}.md")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write("# Tournament Outlook\n\n" + report + "\n")
+        print(f"\nTournament outlook saved to {report_path}")
+        return outlook
+    except Exception as e:
+        raise Exception(f"An error occurred while simulating the tournament: {e}")
+
+def lineups(args: Optional[list] = None):
+    """
+    Report start and 60+ minute probabilities for the next gameweeks from
+    the stats archive, fixture congestion and stored team news.
+
+    Options: --team <club> for one club's players, --top <n>; other
+    arguments are player names. Without either, lists the biggest rotation risks.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    options = {}
+    players = []
+    i = 0
+    while i < len(args):
+        if args[i].startswith("--") and i + 1 < len(args):
+            options[args[i]] = args[i + 1]
+            i += 2
+        else:
+            players.append(args[i])
+            i += 1
+
+    try:
+        model = lineup_model()
+        seasons = model.archive.seasons()
+        if not seasons:
+            raise KeyError("no archived seasons; ingest gameweek stats with `main.py ingest`")
+        current_season = season_of()
+        season = current_season if current_season in seasons else seasons[-1]
+        outlook = model.outlook(season)
+    except Exception as e:
+        raise Exception(f"An error occurred while estimating lineups: {e}")
+
+    rows = outlook.select(players, options.get("--team"))
+    report = outlook.report(rows[:int(options.get("--top", 20))])
+    print(report)
+    return outlook
+
+def schedule():
+    """
+    Run as a long-lived daemon that keeps the crew and caches warm, polls team
+    news more often as the deadline approaches and re-runs the crew only when
+    the news materially changes.
+    """
+    try:
+        PreDeadlineScheduler(build_inputs=build_run_inputs).run_forever()
+    except KeyboardInterrupt:
+        print("\nScheduler stopped.")
+
+def serve(port: Optional[int] = None):
+    """
+    Serve squad, captain and player verification recommendations over a local
+    HTTP API backed by the recommendation store and caches.
+    """
+    if port is None and len(sys.argv) > 1:
+        port = int(sys.argv[1])
+
+    try:
+        serve_api(build_inputs=build_run_inputs, port=port)
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+
+USAGE = """Usage:
+python main.py                           - Run with default settings
+python main.py train <iterations> <filename>
+python main.py replay <task_id>
+python main.py test <iterations> <eval_llm> [workers]
+python main.py matchweek <gameweek> [budget]
+python main.py profiles [profile ...]   - Run for several manager profiles
+python main.py ingest <stats.csv> [season]
+python main.py profile [--replay <searches.json>] [--record <searches.json>] [--interval <ms>]
+python main.py loadtest [--levels 1,2,4,8] [--runs <n>] [--search-latency <ms>] [--llm-latency <ms>] [--search-qps <n>]
+python main.py index                     - Index earlier reports for the Past Research Tool
+python main.py archive [report|task] [--matchweek <n>] [--profile <name>]
+python main.py backtest [season ...]
+python main.py benchmark [--sizes <n,n,...>] [--horizons <n,n,...>] [--repeats <n>]
+python main.py bracket [simulations]     - Simulate the knockout bracket
+python main.py lineups [player ...] [--team <club>] [--top <n>]
+python main.py schedule                  - Run as a pre-deadline daemon
+python main.py serve [port]              - Serve recommendations over HTTP"""
+
+# Command -> (least number of arguments after it, handler given those arguments)
+COMMANDS: Dict[str, Tuple[int, Callable[[List[str]], Any]]] = {
+    "train": (2, lambda args: train()),
+    "replay": (1, lambda args: replay()),
+    "test": (2, lambda args: test()),
+    "matchweek": (1, lambda args: run_for_matchweek(args[0], args[1] if len(args) > 1 else '100')),
+    "profiles": (0, run_for_profiles),
+    "ingest": (1, lambda args: ingest_history(args[0], args[1] if len(args) > 1 else None)),
+    "profile": (0, profile_run),
+    "loadtest": (0, loadtest),
+    "index": (0, lambda args: index_outputs()),
+    "archive": (0, archive),
+    "backtest": (0, backtest),
+    "benchmark": (0, benchmark),
+    "bracket": (0, lambda args: bracket(int(args[0]) if args else None)),
+    "lineups": (0, lineups),
+    "schedule": (0, lambda args: schedule()),
+    "serve": (0, lambda args: serve(int(args[0]) if args else None)),
+}
+
+
+def main(args: Optional[List[str]] = None) -> Any:
+    """Run the command named by ``args`` (sys.argv by default); print the usage and do a default run otherwise."""
+    if args is None:
+        args = sys.argv[1:]
+    if not args:
+        return run()
+    command = COMMANDS.get(args[0])
+    if command is None or len(args) - 1 < command[0]:
+        print(USAGE)
+        return run()
+    return command[1](args[1:])
+
+
 if __name__ == "__main__":
-    # Default run if no arguments provided
-    if len(sys.argv) == 1:
-        run()
-    elif sys.argv[1] == "train" and len(sys.argv) >= 4:
-        train()
-    elif sys.argv[1] == "replay" and len(sys.argv) >= 3:
-        replay()
-    elif sys.argv[1] == "test" and len(sys.argv) >= 4:
-        test()
-    elif sys.argv[1] == "matchweek" and len(sys.argv) >= 3:
-        matchweek = sys.argv[2]
-        budget = sys.argv[3] if len(sys.argv) > 3 else '100'
-        run_for_matchweek(matchweek, budget)
-    else:
-        print("Usage:")
-        print("python main.py                           - Run with default settings")
-        print("python main.py train <iterations> <filename>")
-        print("python main.py replay <task_id>")
-        print("python main.py test <iterations> <eval_llm>")
-        print("python main.py matchweek <gameweek> [budget]")
-        run()
\ No newline at end of file
+    main()
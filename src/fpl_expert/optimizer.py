@@ -0,0 +1,540 @@
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .player_table import POSITIONS, PlayerTable
+
+
+# 2 GK, 5 DEF, 5 MID, 3 FWD
+SQUAD_QUOTAS: Dict[str, int] = {"GK": 2, "DEF": 5, "MID": 5, "FWD": 3}
+# Starting XI limits per position: exactly 1 GK, 3-5 DEF, 2-5 MID, 1-3 FWD
+XI_MIN: Dict[str, int] = {"GK": 1, "DEF": 3, "MID": 2, "FWD": 1}
+XI_MAX: Dict[str, int] = {"GK": 1, "DEF": 5, "MID": 5, "FWD": 3}
+XI_SIZE = 11
+
+_EPSILON = 1e-6
+
+
+@dataclass
+class SquadConstraints:
+    """Rules a squad has to satisfy (defaults are the Champions League Fantasy rules)."""
+    budget: float = 100.0
+    max_per_club: int = 3
+    quotas: Dict[str, int] = field(default_factory=lambda: dict(SQUAD_QUOTAS))
+    locked: FrozenSet[int] = frozenset()   # player ids that must be in the squad
+    banned: FrozenSet[int] = frozenset()   # player ids that must not be in the squad
+
+
+@dataclass
+class Squad:
+    """A selected squad, expressed as PlayerTable row numbers plus derived picks."""
+    rows: List[int]
+    player_ids: List[int]
+    cost: float
+    score: float
+    starting: List[int]
+    bench: List[int]
+    captain: int
+    vice_captain: int
+
+    def formation(self, table: PlayerTable) -> str:
+        counts = [0] * len(POSITIONS)
+        for row in self.starting:
+            counts[table.position_codes[row]] += 1
+        return "-".join(str(c) for c in counts[1:])
+
+
+def _position_quota_array(constraints: SquadConstraints) -> np.ndarray:
+    return np.array([constraints.quotas[p] for p in POSITIONS], dtype=np.int32)
+
+
+class _FillBound:
+    """
+    Lower bound on the cost of filling the remaining slots per position with
+    the cheapest eligible players, for one squad state.
+
+    Holds the prefix sums of the sorted eligible prices per position, so the
+    bound after taking one candidate is answered in O(1): one slot fewer in
+    its position, with the next cheapest player replacing the candidate if
+    it was among the cheapest.
+    """
+
+    def __init__(self, table: PlayerTable, eligible: np.ndarray, remaining: np.ndarray):
+        self.remaining = remaining.copy()
+        self.prefix: List[np.ndarray] = []
+        for code in range(len(POSITIONS)):
+            prices = np.sort(table.prices[eligible & (table.position_codes == code)]).astype(np.float64)
+            self.prefix.append(np.concatenate(([0.0], np.cumsum(prices))))
+        self.total = sum(self._sum(code, slots) for code, slots in enumerate(self.remaining))
+
+    def _sum(self, code: int, slots: int) -> float:
+        prefix = self.prefix[code]
+        return float(prefix[min(max(int(slots), 0), len(prefix) - 1)])
+
+    def without(self, code: int, price: float) -> float:
+        """Bound after taking an eligible player at ``price`` for one of the ``code`` slots."""
+        slots = int(self.remaining[code]) - 1
+        prefix = self.prefix[code]
+        if slots <= 0:
+            after = 0.0
+        elif slots < len(prefix) - 1 and price <= prefix[slots] - prefix[slots - 1] + _EPSILON:
+            # The candidate is one of the ``slots`` cheapest: the next one replaces it
+            after = self._sum(code, slots + 1) - price
+        else:
+            after = self._sum(code, slots)
+        return self.total - self._sum(code, self.remaining[code]) + after
+
+
+class _PartialSquad:
+    """Players picked so far, with the quota, club and budget room left."""
+
+    def __init__(self, table: PlayerTable, constraints: SquadConstraints):
+        self.table = table
+        self.max_per_club = constraints.max_per_club
+        self.in_squad = np.zeros(len(table), dtype=bool)
+        self.banned = np.isin(table.player_ids, list(constraints.banned))
+        self.remaining = _position_quota_array(constraints)
+        self.club_counts = np.zeros(len(table.clubs), dtype=np.int32)
+        self.budget = constraints.budget
+
+    def complete(self) -> bool:
+        return self.remaining.sum() == 0
+
+    def can_add(self, row: int) -> bool:
+        """Whether ``row`` fits the squad, ignoring the budget."""
+        if self.in_squad[row] or self.banned[row] or self.remaining[self.table.position_codes[row]] <= 0:
+            return False
+        return bool(self.club_counts[self.table.club_codes[row]] < self.max_per_club)
+
+    def add(self, row: int) -> None:
+        self.in_squad[row] = True
+        self.remaining[self.table.position_codes[row]] -= 1
+        self.club_counts[self.table.club_codes[row]] += 1
+        self.budget -= float(self.table.prices[row])
+
+    def fill_bound(self) -> _FillBound:
+        return _FillBound(self.table, ~self.in_squad & ~self.banned, self.remaining)
+
+
+def _greedy_squad(table: PlayerTable, scores: np.ndarray, constraints: SquadConstraints) -> List[int]:
+    squad = _PartialSquad(table, constraints)
+    for player_id in constraints.locked:
+        squad.add(table.index_of(player_id))
+
+    # Best value first; each pick must leave enough budget to complete the squad cheaply
+    bound = squad.fill_bound()
+    for row in np.argsort(-scores, kind="stable"):
+        if squad.complete():
+            break
+        if not squad.can_add(row):
+            continue
+        price = float(table.prices[row])
+        if price + bound.without(table.position_codes[row], price) > squad.budget + _EPSILON:
+            continue
+        squad.add(row)
+        bound = squad.fill_bound()
+
+    # Budget too tight for the greedy pass: fill what is left with the cheapest legal players
+    if not squad.complete():
+        for row in np.argsort(table.prices, kind="stable"):
+            if squad.can_add(row):
+                squad.add(row)
+        if not squad.complete():
+            raise ValueError("Player pool cannot fill the squad quotas under the club limit")
+
+    return _repair_budget(table, scores, np.nonzero(squad.in_squad)[0].tolist(), constraints)
+
+
+def _repair_budget(
+    table: PlayerTable,
+    scores: np.ndarray,
+    squad: Sequence[int],
+    constraints: SquadConstraints,
+) -> List[int]:
+    """
+    Bring an over-budget squad back under the budget. The greedy bound does
+    not see the club limit, so a tight limit can leave the cheap fill short;
+    repeatedly make the like-for-like swap that loses the least score per
+    million saved until the squad fits.
+    """
+    squad = list(squad)
+    banned = np.isin(table.player_ids, list(constraints.banned))
+    while True:
+        over_budget = float(table.prices[squad].sum()) - constraints.budget
+        if over_budget <= _EPSILON:
+            return squad
+        in_squad = np.zeros(len(table), dtype=bool)
+        in_squad[squad] = True
+        club_counts = np.bincount(table.club_codes[squad], minlength=len(table.clubs))
+        best = (np.inf, -1, -1)
+        for out_row in squad:
+            if int(table.player_ids[out_row]) in constraints.locked:
+                continue
+            candidates = table.by_position(POSITIONS[table.position_codes[out_row]]).row_indices()
+            candidates = candidates[~in_squad[candidates] & ~banned[candidates]]
+            saving = table.prices[out_row] - table.prices[candidates]
+            cand_clubs = table.club_codes[candidates]
+            ok = saving > _EPSILON
+            ok &= (cand_clubs == table.club_codes[out_row]) | (club_counts[cand_clubs] < constraints.max_per_club)
+            if not ok.any():
+                continue
+            # Savings beyond what is still needed are worth nothing
+            loss = np.divide(
+                scores[out_row] - scores[candidates], np.minimum(saving, over_budget),
+                out=np.full(len(candidates), np.inf), where=ok,
+            )
+            i = int(np.argmin(loss))
+            if loss[i] < best[0]:
+                best = (float(loss[i]), int(out_row), int(candidates[i]))
+        if best[1] < 0:
+            raise ValueError("Player pool cannot fill the squad quotas within the budget")
+        squad[squad.index(best[1])] = best[2]
+
+
+def _best_swap(
+    table: PlayerTable,
+    scores: np.ndarray,
+    squad: Sequence[int],
+    constraints: SquadConstraints,
+) -> Tuple[float, int, int]:
+    """Best single like-for-like swap (gain, row out, row in); gain <= 0 if none improves."""
+    in_squad = np.zeros(len(table), dtype=bool)
+    in_squad[list(squad)] = True
+    available = ~in_squad & ~np.isin(table.player_ids, list(constraints.banned))
+    club_counts = np.bincount(table.club_codes[list(squad)], minlength=len(table.clubs))
+    budget_left = constraints.budget - float(table.prices[list(squad)].sum())
+
+    best = (0.0, -1, -1)
+    for out_row in squad:
+        if int(table.player_ids[out_row]) in constraints.locked:
+            continue
+        code = table.position_codes[out_row]
+        view = table.by_position(POSITIONS[code])
+        candidates = view.row_indices()
+        candidates = candidates[available[candidates]]
+        if not len(candidates):
+            continue
+        out_club = table.club_codes[out_row]
+        cand_clubs = table.club_codes[candidates]
+        ok = table.prices[candidates] <= budget_left + table.prices[out_row] + _EPSILON
+        ok &= (cand_clubs == out_club) | (club_counts[cand_clubs] < constraints.max_per_club)
+        if not ok.any():
+            continue
+        gains = np.where(ok, scores[candidates] - scores[out_row], -np.inf)
+        best_index = int(np.argmax(gains))
+        if gains[best_index] > best[0] + _EPSILON:
+            best = (float(gains[best_index]), int(out_row), int(candidates[best_index]))
+    return best
+
+
+def _best_insertion(
+    table: PlayerTable,
+    scores: np.ndarray,
+    squad: Sequence[int],
+    constraints: SquadConstraints,
+    in_row: int,
+) -> Tuple[float, List[int]]:
+    """
+    Best way to bring ``in_row`` into the squad: swap it for a squad player of
+    its position and, if that breaks the budget or the club limit, make the
+    one extra swap elsewhere that repairs it for the smallest loss. Reaches
+    squads a single swap cannot, e.g. an expensive player whose projection
+    just jumped.
+
+    Returns:
+        (gain, new squad rows); gain <= 0 and the squad unchanged if no insertion improves it
+    """
+    code = table.position_codes[in_row]
+    in_club = table.club_codes[in_row]
+    banned = np.isin(table.player_ids, list(constraints.banned))
+    best: Tuple[float, List[int]] = (0.0, list(squad))
+    for out_row in squad:
+        if table.position_codes[out_row] != code or int(table.player_ids[out_row]) in constraints.locked:
+            continue
+        rows = [in_row if r == out_row else r for r in squad]
+        gain = float(scores[in_row] - scores[out_row])
+        club_counts = np.bincount(table.club_codes[rows], minlength=len(table.clubs))
+        over_budget = float(table.prices[rows].sum()) - constraints.budget
+        over_club = club_counts[in_club] > constraints.max_per_club
+        if over_budget <= _EPSILON and not over_club:
+            if gain > best[0] + _EPSILON:
+                best = (gain, rows)
+            continue
+
+        in_squad = np.zeros(len(table), dtype=bool)
+        in_squad[rows] = True
+        # Repair swap: every (squad player out, available player in) pair of a position at once
+        for position_code, position in enumerate(POSITIONS):
+            outs = np.array([
+                r for r in rows
+                if r != in_row and table.position_codes[r] == position_code
+                and int(table.player_ids[r]) not in constraints.locked
+                and (not over_club or table.club_codes[r] == in_club)
+            ], dtype=np.int64)
+            view = table.by_position(position)
+            candidates = view.row_indices()
+            candidates = candidates[~in_squad[candidates] & ~banned[candidates]]
+            if not len(outs) or not len(candidates):
+                continue
+            cand_clubs = table.club_codes[candidates][None, :]
+            out_clubs = table.club_codes[outs][:, None]
+            ok = table.prices[candidates][None, :] <= table.prices[outs][:, None] - max(over_budget, 0.0) + _EPSILON
+            if over_club:
+                ok &= (cand_clubs != in_club) & (club_counts[cand_clubs] < constraints.max_per_club)
+            else:
+                ok &= (cand_clubs == out_clubs) | (club_counts[cand_clubs] < constraints.max_per_club)
+            if not ok.any():
+                continue
+            gains = np.where(ok, scores[candidates][None, :] - scores[outs][:, None], -np.inf)
+            i, j = np.unravel_index(int(np.argmax(gains)), gains.shape)
+            total = gain + float(gains[i, j])
+            if total > best[0] + _EPSILON:
+                best = (total, [int(candidates[j]) if r == outs[i] else r for r in rows])
+    return best
+
+
+def improve_squad(
+    table: PlayerTable,
+    scores: np.ndarray,
+    squad: Sequence[int],
+    constraints: SquadConstraints,
+    max_swaps: Optional[int] = None,
+    min_gain: float = 0.0,
+) -> Tuple[List[int], int]:
+    """
+    Local search: repeatedly apply the best improving like-for-like swap.
+
+    Returns:
+        (new squad rows, number of swaps made)
+    """
+    squad = list(squad)
+    swaps = 0
+    while max_swaps is None or swaps < max_swaps:
+        gain, out_row, in_row = _best_swap(table, scores, squad, constraints)
+        if out_row < 0 or gain <= min_gain + _EPSILON:
+            break
+        squad[squad.index(out_row)] = in_row
+        swaps += 1
+    return squad, swaps
+
+
+def pick_starting_xi(table: PlayerTable, rows: Sequence[int], scores: np.ndarray) -> Tuple[List[int], List[int]]:
+    """
+    Choose the highest-scoring valid starting XI from a 15-player squad.
+
+    Returns:
+        (starting rows, bench rows with the backup goalkeeper first)
+    """
+    by_position: Dict[int, List[int]] = {code: [] for code in range(len(POSITIONS))}
+    for row in sorted(rows, key=lambda r: -scores[r]):
+        by_position[int(table.position_codes[row])].append(row)
+
+    starting: List[int] = []
+    for code, position in enumerate(POSITIONS):
+        starting.extend(by_position[code][:XI_MIN[position]])
+    counts = {code: XI_MIN[position] for code, position in enumerate(POSITIONS)}
+    rest = sorted(
+        (row for code in by_position for row in by_position[code][XI_MIN[POSITIONS[code]]:]),
+        key=lambda r: -scores[r],
+    )
+    for row in rest:
+        if len(starting) == XI_SIZE:
+            break
+        code = int(table.position_codes[row])
+        if counts[code] < XI_MAX[POSITIONS[code]]:
+            starting.append(row)
+            counts[code] += 1
+
+    starting_set = set(starting)
+    bench = [row for row in rows if row not in starting_set]
+    bench.sort(key=lambda r: (table.position_codes[r] != 0, -scores[r]))
+    return starting, bench
+
+
+def build_squad(table: PlayerTable, rows: Sequence[int], scores: np.ndarray) -> Squad:
+    """Wrap squad rows with cost, XI, bench and captaincy picks."""
+    rows = sorted(rows, key=lambda r: (table.position_codes[r], -scores[r]))
+    starting, bench = pick_starting_xi(table, rows, scores)
+    by_score = sorted(starting, key=lambda r: -scores[r])
+    return Squad(
+        rows=list(rows),
+        player_ids=[int(table.player_ids[r]) for r in rows],
+        cost=round(float(table.prices[rows].sum()), 1),
+        score=float(scores[starting].sum() + scores[by_score[0]]),
+        starting=starting,
+        bench=bench,
+        captain=by_score[0],
+        vice_captain=by_score[1],
+    )
+
+
+def select_squad(
+    table: PlayerTable,
+    scores: Optional[np.ndarray] = None,
+    constraints: Optional[SquadConstraints] = None,
+) -> Squad:
+    """
+    Select a 15-player squad maximising total projected score.
+
+    A budget-aware greedy pass builds a legal squad and a swap-based local
+    search then improves it until no single transfer increases the score.
+
+    Args:
+        table: Player pool
+        scores: Projected points per table row (defaults to the table's total projection)
+        constraints: Budget, club limit, quotas and locked/banned players
+    """
+    constraints = constraints or SquadConstraints()
+    if scores is None:
+        scores = table.total_projection()
+    scores = np.asarray(scores, dtype=np.float64)
+
+    rows = _greedy_squad(table, scores, constraints)
+    rows, _ = improve_squad(table, scores, rows, constraints)
+    return build_squad(table, rows, scores)
+
+
+def best_transfers(
+    table: PlayerTable,
+    scores: np.ndarray,
+    current_ids: Sequence[int],
+    constraints: Optional[SquadConstraints] = None,
+    free_transfers: int = 1,
+    hit_cost: float = 4.0,
+    max_transfers: int = 3,
+) -> Tuple[Squad, int]:
+    """
+    Improve an existing squad with at most ``max_transfers`` swaps. Transfers
+    beyond ``free_transfers`` are only made when they gain more than ``hit_cost``.
+
+    Players who have left the pool are replaced first; those replacements are
+    forced, so they are not counted and do not use up ``free_transfers``.
+    Price rises never force a sale: the squad may stay above the budget, but
+    a transfer can only spend what selling frees up.
+
+    Returns:
+        (new squad, number of transfers chosen on top of forced replacements)
+    """
+    constraints = constraints or SquadConstraints()
+    scores = np.asarray(scores, dtype=np.float64)
+    rows = [table.index_of(pid) for pid in current_ids if table.has_player(pid)]
+    forced = len(current_ids) - len(rows)
+    constraints = SquadConstraints(
+        budget=max(constraints.budget, float(table.prices[rows].sum())),
+        max_per_club=constraints.max_per_club,
+        quotas=constraints.quotas,
+        locked=constraints.locked,
+        banned=constraints.banned,
+    )
+
+    if forced:
+        refill = SquadConstraints(
+            budget=constraints.budget,
+            max_per_club=constraints.max_per_club,
+            quotas=constraints.quotas,
+            locked=frozenset(int(table.player_ids[r]) for r in rows) | constraints.locked,
+            banned=constraints.banned,
+        )
+        try:
+            rows = _greedy_squad(table, scores, refill)
+        except ValueError:
+            return select_squad(table, scores, constraints), 0
+
+    rows, made = improve_squad(table, scores, rows, constraints, max_swaps=free_transfers)
+    if made == free_transfers and max_transfers > free_transfers:
+        rows, extra = improve_squad(
+            table, scores, rows, constraints, max_swaps=max_transfers - free_transfers, min_gain=hit_cost
+        )
+        made += extra
+    return build_squad(table, rows, scores), made
+
+
+def is_legal(table: PlayerTable, rows: Sequence[int], constraints: SquadConstraints) -> bool:
+    """Whether squad ``rows`` satisfy the quotas, club limit, budget and locked/banned players."""
+    rows = list(rows)
+    counts = np.bincount(table.position_codes[rows], minlength=len(POSITIONS))
+    if counts.tolist() != _position_quota_array(constraints).tolist():
+        return False
+    if np.bincount(table.club_codes[rows], minlength=len(table.clubs)).max() > constraints.max_per_club:
+        return False
+    if float(table.prices[rows].sum()) > constraints.budget + _EPSILON:
+        return False
+    ids = set(table.player_ids[rows].tolist())
+    return constraints.locked <= ids and not constraints.banned & ids
+
+
+class IncrementalOptimizer:
+    """
+    Squad selection for live updates: keeps the last squad and re-optimizes from it.
+
+    ``solve()`` selects from scratch like select_squad(). ``update()`` changes
+    some players' projected scores and warm-starts the swap search from the
+    previous squad, which is still legal because only scores changed; a few
+    changed projections cost a few swaps instead of a new greedy pass.
+    ``set_constraints()`` warm-starts too while the previous squad is still
+    legal (e.g. a rising budget sweep) and solves from scratch otherwise.
+    Like select_squad(), the result is a squad no single swap improves.
+    """
+
+    def __init__(
+        self,
+        table: PlayerTable,
+        scores: Optional[np.ndarray] = None,
+        constraints: Optional[SquadConstraints] = None,
+    ):
+        self.table = table
+        self.constraints = constraints or SquadConstraints()
+        self.scores = np.array(table.total_projection() if scores is None else scores, dtype=np.float64)
+        self.squad: Optional[Squad] = None
+        self.swaps = 0   # swaps made by the last re-solve
+
+    def solve(self) -> Squad:
+        self.squad = select_squad(self.table, self.scores, self.constraints)
+        self.swaps = 0
+        return self.squad
+
+    def _resolve(self) -> Squad:
+        if self.squad is None or not is_legal(self.table, self.squad.rows, self.constraints):
+            return self.solve()
+        rows, self.swaps = improve_squad(self.table, self.scores, self.squad.rows, self.constraints)
+        self.squad = build_squad(self.table, rows, self.scores)
+        return self.squad
+
+    def update(self, changes: Mapping[int, float]) -> Squad:
+        """
+        Set the projected score of some players (player id -> score) and
+        re-optimize. Players outside the squad whose score rose are tried
+        with an insertion move first, which can make room for them.
+        """
+        raised = []
+        for player_id, score in changes.items():
+            row = self.table.index_of(player_id)
+            if score > self.scores[row]:
+                raised.append(row)
+            self.scores[row] = score
+        if self.squad is None or not is_legal(self.table, self.squad.rows, self.constraints):
+            return self.solve()
+
+        rows = list(self.squad.rows)
+        inserted = 0
+        for row in sorted(raised, key=lambda r: -self.scores[r]):
+            if row in rows or int(self.table.player_ids[row]) in self.constraints.banned:
+                continue
+            gain, candidate = _best_insertion(self.table, self.scores, rows, self.constraints, row)
+            if gain > _EPSILON:
+                rows = candidate
+                inserted += 1
+        rows, swaps = improve_squad(self.table, self.scores, rows, self.constraints)
+        self.swaps = inserted + swaps
+        self.squad = build_squad(self.table, rows, self.scores)
+        return self.squad
+
+    def set_scores(self, scores: np.ndarray) -> Squad:
+        """Replace all projected scores (table row order) and re-optimize."""
+        self.scores = np.array(scores, dtype=np.float64)
+        return self._resolve()
+
+    def set_constraints(self, constraints: SquadConstraints) -> Squad:
+        self.constraints = constraints
+        return self._resolve()
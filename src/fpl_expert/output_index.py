@@ -0,0 +1,410 @@
+import glob
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import yaml
+
+
+DEFAULT_INDEX_DIR = os.path.join("output", "index")
+
+# Crew outputs worth reusing: the analysis reports the agents save and the team files
+DEFAULT_PATTERNS = (os.path.join("output", "*.md"), "champions_league_team*.md")
+
+TASKS_FILE = os.path.join(os.path.dirname(__file__), "config", "tasks.yaml")
+
+DIMENSIONS = 1024
+LSH_TABLES = 8
+LSH_BITS = 10
+
+CHUNK_SIZE = 1200
+CHUNK_OVERLAP = 200
+
+DEFAULT_MAX_CHUNKS = 5000
+# Three two-week gameweeks: older research is more misleading than useful
+DEFAULT_MAX_AGE_DAYS = 42
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+
+@lru_cache(maxsize=1)
+def crew_report_prefixes(tasks_file: str = TASKS_FILE) -> Tuple[str, ...]:
+    """
+    File name prefixes of the crew's own reports: every task's ``output_file``
+    up to its first placeholder, and the team reports. Other files in
+    ``output/`` (backtests, load tests, benchmarks, bracket simulations) are
+    not research and are never indexed.
+    """
+    from .reports import LATEST_TEAM_FILE, TEAM_REPORT_FILE
+
+    with open(tasks_file, "r", encoding="utf-8") as f:
+        tasks = yaml.safe_load(f) or {}
+    files = [task.get("output_file") for task in tasks.values() if isinstance(task, dict)]
+    prefixes = {os.path.basename(name).split("{")[0] for name in files + [TEAM_REPORT_FILE] if name}
+    # The latest team file, also written per profile (champions_league_team_<profile>.md)
+    prefixes.add(os.path.splitext(LATEST_TEAM_FILE)[0])
+    return tuple(sorted(prefix for prefix in prefixes if prefix))
+
+
+def _tokens(text: str) -> List[str]:
+    from .entities import normalize_name
+
+    return _TOKEN.findall(normalize_name(text))
+
+
+def embed(texts: Sequence[str], dimensions: int = DIMENSIONS) -> np.ndarray:
+    """
+    Hashed bag-of-words embeddings (unigrams and bigrams, signed feature
+    hashing), L2-normalised. Deterministic across processes and needs no model.
+    """
+    vectors = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = _tokens(text)
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        if not features:
+            continue
+        hashes = np.array([zlib.crc32(feature.encode("utf-8")) for feature in features], dtype=np.uint64)
+        signs = np.where(hashes & (1 << 31), -1.0, 1.0).astype(np.float32)
+        np.add.at(vectors[row], (hashes % dimensions).astype(np.int64), signs)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def chunk_markdown(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    Split markdown into chunks of at most about ``size`` characters along
+    paragraph boundaries. Each chunk starts with the heading it falls under.
+    """
+    chunks: List[str] = []
+    heading = ""
+    current = ""
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        if block.startswith("#"):
+            heading = block.splitlines()[0]
+        if current and len(current) + len(block) > size:
+            chunks.append(current)
+            tail = current[-overlap:] if overlap else ""
+            current = f"{heading}\n{tail}" if heading and not block.startswith("#") else tail
+        current = f"{current}\n\n{block}".strip() if current else block
+        while len(current) > size * 2:
+            chunks.append(current[:size])
+            current = current[size - overlap:]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@dataclass
+class Hit:
+    score: float
+    source: str
+    written: datetime
+    text: str
+
+
+class OutputIndex:
+    """
+    On-disk vector index of earlier crew outputs.
+
+    Reports are chunked, embedded and appended incrementally: ``refresh()``
+    only reads files that are new or changed since the last refresh. Lookups
+    use random-hyperplane LSH to pick candidates and rank them by exact cosine
+    similarity. The index is bounded: chunks older than ``max_age_days`` are
+    evicted, and beyond ``max_chunks`` the oldest go first.
+
+    The files are append-only: new chunks are appended to the current
+    segment, and a changed file's old chunks are dropped with a log line
+    rather than rewritten. The index is compacted only when chunks are
+    evicted, or once dropped rows outnumber the live ones: the live chunks
+    are written to a new segment and the manifest switched to it, so a
+    crash at any point leaves a readable index.
+
+    Layout::
+
+        output/index/
+            vectors.<n>.f16   # segment n: raw float16 embeddings, one row per chunk line
+            chunks.<n>.jsonl  # segment n: per row source file, write time, text; or {"drop": file}
+            manifest.json     # current segment, and per indexed file: mtime and size when it was read
+    """
+
+    def __init__(
+        self,
+        root: str = DEFAULT_INDEX_DIR,
+        patterns: Sequence[str] = DEFAULT_PATTERNS,
+        max_chunks: int = DEFAULT_MAX_CHUNKS,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+    ):
+        self.root = root
+        self.patterns = tuple(patterns)
+        self.max_chunks = max_chunks
+        self.max_age = timedelta(days=max_age_days)
+        self._lock = threading.Lock()
+        rng = np.random.default_rng(0)
+        self._planes = rng.standard_normal((LSH_TABLES * LSH_BITS, DIMENSIONS)).astype(np.float32)
+        self._weights = (1 << np.arange(LSH_BITS)).astype(np.int64)
+        self._load()
+
+    # Storage
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _segment(self, kind: str, segment: Optional[int] = None) -> str:
+        extension = "f16" if kind == "vectors" else "jsonl"
+        return self._path(f"{kind}.{self.segment if segment is None else segment}.{extension}")
+
+    def _load(self) -> None:
+        self.vectors = np.zeros((0, DIMENSIONS), dtype=np.float16)
+        self.chunks: List[Dict[str, str]] = []
+        self.manifest: Dict[str, Dict[str, float]] = {}
+        self.segment = 0
+        self._stored = 0        # rows in the current segment, dropped ones included
+        self._buckets: Optional[List[Dict[int, List[int]]]] = None
+        if not os.path.exists(self._path("manifest.json")):
+            # Leftovers of an index that never saved a manifest must not be appended to
+            self._remove_segments()
+            return
+        with open(self._path("manifest.json"), "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if "segment" not in saved:
+            self._load_single_file(saved)
+            return
+        self.segment = saved["segment"]
+        self.manifest = saved["files"]
+
+        chunks: List[Dict[str, str]] = []
+        rows: Dict[str, List[int]] = {}
+        complete = True
+        if os.path.exists(self._segment("chunks")):
+            with open(self._segment("chunks"), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn last line of an interrupted append
+                        complete = False
+                        break
+                    if "drop" in entry:
+                        rows.pop(entry["drop"], None)
+                    else:
+                        rows.setdefault(entry["source"], []).append(len(chunks))
+                        chunks.append(entry)
+        vectors_path = self._segment("vectors")
+        flat = np.fromfile(vectors_path, dtype=np.float16) if os.path.exists(vectors_path) else np.zeros(0, np.float16)
+        self._stored = min(len(chunks), len(flat) // DIMENSIONS)
+        stored = flat[:self._stored * DIMENSIONS].reshape(self._stored, DIMENSIONS)
+        live = sorted(row for source_rows in rows.values() for row in source_rows if row < self._stored)
+        self.vectors = stored[live]
+        self.chunks = [chunks[row] for row in live]
+        if not complete or len(flat) != len(chunks) * DIMENSIONS:
+            # Interrupted append: rewrite so the next one starts on a row boundary
+            self._compact()
+
+    def _load_single_file(self, manifest: Dict[str, Dict[str, float]]) -> None:
+        """Index saved as one vectors.npy/chunks.json pair, rewritten every refresh: convert it."""
+        self.manifest = manifest
+        if os.path.exists(self._path("chunks.json")):
+            self.vectors = np.load(self._path("vectors.npy"))
+            with open(self._path("chunks.json"), "r", encoding="utf-8") as f:
+                self.chunks = json.load(f)
+        self._compact()
+        for name in ("vectors.npy", "chunks.json"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+
+    def _remove_segments(self, keep: Optional[int] = None) -> None:
+        for path in glob.glob(self._path("vectors.*.f16")) + glob.glob(self._path("chunks.*.jsonl")):
+            if keep is None or path not in (self._segment("vectors", keep), self._segment("chunks", keep)):
+                os.remove(path)
+
+    def _save_manifest(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        # Write to a temporary file and swap it in so a crash never leaves a half-written manifest
+        with open(self._path("manifest.tmp.json"), "w", encoding="utf-8") as f:
+            json.dump({"segment": self.segment, "files": self.manifest}, f, ensure_ascii=False)
+        os.replace(self._path("manifest.tmp.json"), self._path("manifest.json"))
+
+    def _append(self, dropped: Iterable[str], chunks: List[Dict[str, str]], vectors: np.ndarray) -> None:
+        """Append to the current segment: a drop line per replaced file, then the new chunks."""
+        os.makedirs(self.root, exist_ok=True)
+        # Vectors first: rows without a chunk line are cut off on load
+        with open(self._segment("vectors"), "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float16).tobytes())
+        with open(self._segment("chunks"), "a", encoding="utf-8") as f:
+            for path in dropped:
+                f.write(json.dumps({"drop": path}, ensure_ascii=False) + "\n")
+            for chunk in chunks:
+                f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+        self._stored += len(chunks)
+
+    def _compact(self) -> None:
+        """Write the live chunks to a new segment, switch the manifest to it and delete the old ones."""
+        os.makedirs(self.root, exist_ok=True)
+        segment = self.segment + 1
+        np.ascontiguousarray(self.vectors, dtype=np.float16).tofile(self._segment("vectors", segment))
+        with open(self._segment("chunks", segment), "w", encoding="utf-8") as f:
+            for chunk in self.chunks:
+                f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+        self.segment = segment
+        self._stored = len(self.chunks)
+        self._save_manifest()
+        self._remove_segments(keep=segment)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    # Indexing
+
+    def _files(self) -> List[str]:
+        files: Set[str] = set()
+        for pattern in self.patterns:
+            files.update(
+                path for path in glob.glob(pattern)
+                if os.path.basename(path).startswith(crew_report_prefixes())
+            )
+        return sorted(files)
+
+    def _keep(self, rows: Iterable[int]) -> None:
+        rows = list(rows)
+        self.vectors = self.vectors[rows] if rows else self.vectors[:0]
+        self.chunks = [self.chunks[row] for row in rows]
+        self._buckets = None
+
+    def refresh(self, now: Optional[datetime] = None) -> int:
+        """
+        Index new and changed output files, then evict old chunks.
+
+        Returns:
+            Number of chunks added
+        """
+        now = now or datetime.now()
+        with self._lock:
+            changed = []
+            for path in self._files():
+                stat = os.stat(path)
+                seen = self.manifest.get(path)
+                if seen is None or seen["mtime"] != stat.st_mtime or seen["size"] != stat.st_size:
+                    changed.append((path, stat))
+
+            added = 0
+            if changed:
+                paths = {path for path, _ in changed}
+                dropped = sorted(paths & {chunk["source"] for chunk in self.chunks})
+                self._keep(row for row, chunk in enumerate(self.chunks) if chunk["source"] not in paths)
+                new_chunks: List[Dict[str, str]] = []
+                texts: List[str] = []
+                for path, stat in changed:
+                    with open(path, "r", encoding="utf-8", errors="replace") as f:
+                        pieces = chunk_markdown(f.read())
+                    written = datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds")
+                    new_chunks.extend({"source": path, "written": written, "text": text} for text in pieces)
+                    texts.extend(pieces)
+                    self.manifest[path] = {"mtime": stat.st_mtime, "size": stat.st_size}
+                vectors = embed(texts).astype(np.float16)
+                self._append(dropped, new_chunks, vectors)
+                if texts:
+                    self.vectors = np.concatenate([self.vectors, vectors])
+                    self.chunks.extend(new_chunks)
+                    self._buckets = None
+                added = len(texts)
+
+            if self._evict(now) or self._stored > 2 * len(self.chunks):
+                self._compact()
+            elif changed:
+                self._save_manifest()
+            return added
+
+    def _evict(self, now: datetime) -> int:
+        cutoff = (now - self.max_age).isoformat(timespec="seconds")
+        # Files indexed before they stopped counting as crew reports go too
+        rows = [
+            row for row, chunk in enumerate(self.chunks)
+            if chunk["written"] >= cutoff and os.path.basename(chunk["source"]).startswith(crew_report_prefixes())
+        ]
+        if len(rows) > self.max_chunks:
+            rows = sorted(rows, key=lambda row: self.chunks[row]["written"])[-self.max_chunks:]
+            rows.sort()
+        evicted = len(self.chunks) - len(rows)
+        if evicted:
+            self._keep(rows)
+            sources = {chunk["source"] for chunk in self.chunks}
+            # Evicted files stay in the manifest so they are not re-indexed while unchanged
+            self.manifest = {
+                path: seen for path, seen in self.manifest.items() if path in sources or os.path.exists(path)
+            }
+        return evicted
+
+    # Search
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        bits = (vectors.astype(np.float32) @ self._planes.T > 0).reshape(len(vectors), LSH_TABLES, LSH_BITS)
+        return bits.astype(np.int64) @ self._weights
+
+    def _index_buckets(self) -> List[Dict[int, List[int]]]:
+        if self._buckets is None:
+            buckets: List[Dict[int, List[int]]] = [{} for _ in range(LSH_TABLES)]
+            if len(self.vectors):
+                for row, codes in enumerate(self._codes(self.vectors)):
+                    for table, code in enumerate(codes):
+                        buckets[table].setdefault(int(code), []).append(row)
+            self._buckets = buckets
+        return self._buckets
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.1) -> List[Hit]:
+        """The ``k`` chunks most similar to ``query``."""
+        with self._lock:
+            if not self.chunks:
+                return []
+            vector = embed([query])[0]
+            buckets = self._index_buckets()
+            candidates: Set[int] = set()
+            for table, code in enumerate(self._codes(vector[None, :])[0]):
+                candidates.update(buckets[table].get(int(code), ()))
+            # Too few LSH candidates (small index or unusual query): rank everything
+            rows = np.array(sorted(candidates)) if len(candidates) >= 4 * k else np.arange(len(self.chunks))
+            scores = self.vectors[rows].astype(np.float32) @ vector
+            best = np.argsort(-scores)[:k]
+            return [
+                Hit(
+                    score=float(scores[i]),
+                    source=self.chunks[rows[i]]["source"],
+                    written=datetime.fromisoformat(self.chunks[rows[i]]["written"]),
+                    text=self.chunks[rows[i]]["text"],
+                )
+                for i in best if scores[i] >= min_score
+            ]
+
+
+_index: Optional[OutputIndex] = None
+_index_lock = threading.Lock()
+_last_refresh: Optional[float] = None
+
+# Refresh the shared index at most this often (seconds)
+REFRESH_INTERVAL = 60
+
+
+def output_index(refresh: bool = True) -> OutputIndex:
+    """Process-wide output index, refreshed from disk at most every REFRESH_INTERVAL seconds."""
+    global _index, _last_refresh
+    with _index_lock:
+        if _index is None:
+            _index = OutputIndex(
+                root=os.getenv("FPL_OUTPUT_INDEX_DIR", DEFAULT_INDEX_DIR),
+                max_chunks=int(os.getenv("FPL_OUTPUT_INDEX_MAX_CHUNKS", DEFAULT_MAX_CHUNKS)),
+                max_age_days=float(os.getenv("FPL_OUTPUT_INDEX_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS)),
+            )
+        if refresh and (_last_refresh is None or time.monotonic() - _last_refresh >= REFRESH_INTERVAL):
+            _index.refresh()
+            _last_refresh = time.monotonic()
+        return _index
@@ -0,0 +1,402 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .optimizer import SQUAD_QUOTAS, XI_SIZE
+from .player_table import POSITIONS, PlayerTable, normalize_position
+from .scoring import CAPTAIN_MULTIPLIER, GOAL_POINTS
+
+
+DEFAULT_RIVALS = 100_000
+DEFAULT_SCENARIOS = 200
+# Rank the user is assumed to hold when no squad is given (top 1%)
+DEFAULT_TARGET_PERCENTILE = 0.99
+
+# Rivals sampled per batch, which bounds the size of the random key matrices
+BATCH_SIZE = 10_000
+# Rivals used to calibrate the sampling weights against the ownership figures
+CALIBRATION_RIVALS = 20_000
+CALIBRATION_ROUNDS = 4
+# Ownership share never reached by sampling without replacement (a player owned by everyone)
+MAX_INCLUSION = 0.995
+
+# Expected points per gameweek for players nothing better is known about, by position code
+DEFAULT_PROJECTION = np.array([3.5, 3.5, 4.0, 4.5], dtype=np.float32)
+
+
+def _gumbel(rng: np.random.Generator, shape: Tuple[int, ...]) -> np.ndarray:
+    uniform = np.maximum(rng.random(shape, dtype=np.float32), np.float32(1e-30))
+    return -np.log(-np.log(uniform))
+
+
+def _target_inclusion(table: PlayerTable, ownership: np.ndarray) -> np.ndarray:
+    """
+    Probability of each player being in a rival squad. Ownership figures are
+    rescaled per position so they add up to the squad quota (published figures
+    are rounded and cover only the players that were looked up).
+    """
+    target = np.clip(np.asarray(ownership, dtype=np.float64) / 100.0, 1e-4, None)
+    for code, position in enumerate(POSITIONS):
+        mask = table.position_codes == code
+        total = target[mask].sum()
+        if total > 0:
+            target[mask] *= SQUAD_QUOTAS[position] / total
+    return np.clip(target, 1e-4, MAX_INCLUSION)
+
+
+@dataclass
+class PickImpact:
+    """Effect on the user's rank of owning (or captaining) one player."""
+    name: str
+    position: str
+    ownership: float            # % of rival squads with the player (as modelled)
+    effective_ownership: float  # % of rival starters, captains counted twice
+    expected_points: float
+    multiplier: float           # 1 to own, CAPTAIN_MULTIPLIER to captain
+    rank_gain_mean: float       # places gained over a pick scoring the candidates' average
+    rank_gain_p10: float
+    rank_gain_p90: float
+    gain_probability: float     # share of scenarios in which the pick gains places
+    field_size: int
+
+    @property
+    def relative_points(self) -> float:
+        """Expected points gained on the average rival: (multiplier - EO) x expected points."""
+        return (self.multiplier - self.effective_ownership / 100.0) * self.expected_points
+
+
+class RivalField:
+    """
+    Synthetic population of rival squads drawn from ownership percentages.
+
+    Every rival drafts 2-5-5-3 by weighted sampling without replacement
+    (Gumbel top-k, all rivals at once per batch). The weights are calibrated
+    so each player's share of squads matches their ownership. Within a squad
+    the lower-ranked goalkeeper and three outfield players are benched, and
+    the captain is drawn among the starters in proportion to captaincy
+    weights. Only the starters and the captain are kept (12 small integers per
+    rival), which is all that effective ownership and rival scores need.
+    """
+
+    def __init__(
+        self,
+        table: PlayerTable,
+        ownership: Union[Sequence[float], np.ndarray],
+        projections: Union[Sequence[float], np.ndarray, None] = None,
+        captaincy: Optional[Sequence[float]] = None,
+        n_rivals: int = DEFAULT_RIVALS,
+        seed: int = 0,
+    ):
+        self.table = table
+        self.ownership = np.asarray(ownership, dtype=np.float64)
+        self.projections = (
+            np.asarray(projections, dtype=np.float32) if projections is not None
+            else DEFAULT_PROJECTION[table.position_codes]
+        )
+        # By default rivals captain the popular, high-scoring picks
+        weights = (
+            np.asarray(captaincy, dtype=np.float64) if captaincy is not None
+            else self.ownership * np.maximum(self.projections, 0.1) ** 2
+        )
+        self.captain_logits = np.log(np.maximum(weights, 1e-9)).astype(np.float32)
+        self.n_rivals = n_rivals
+        self.rng = np.random.default_rng(seed)
+        self._pools = [np.nonzero(table.position_codes == code)[0] for code in range(len(POSITIONS))]
+        for code, position in enumerate(POSITIONS):
+            if len(self._pools[code]) < SQUAD_QUOTAS[position]:
+                raise ValueError(f"Need at least {SQUAD_QUOTAS[position]} {position} players to sample squads")
+
+        target = _target_inclusion(table, self.ownership)
+        self.squad_share = 100.0 * target
+        self.logits = np.log(target).astype(np.float32)
+        self._calibrate(target)
+        self.starters, self.captains = self._sample(n_rivals)
+
+    # Sampling
+
+    def _draft(self, n: int) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """Squads for ``n`` rivals as (rows, keys) per position, best key first."""
+        rows, keys = [], []
+        for code, position in enumerate(POSITIONS):
+            pool = self._pools[code]
+            count = SQUAD_QUOTAS[position]
+            key = self.logits[pool] + _gumbel(self.rng, (n, len(pool)))
+            top = np.argpartition(-key, count - 1, axis=1)[:, :count]
+            top_keys = np.take_along_axis(key, top, axis=1)
+            order = np.argsort(-top_keys, axis=1)
+            rows.append(pool[np.take_along_axis(top, order, axis=1)])
+            keys.append(np.take_along_axis(top_keys, order, axis=1))
+        return rows, keys
+
+    def _calibrate(self, target: np.ndarray) -> None:
+        for _ in range(CALIBRATION_ROUNDS):
+            rows, _keys = self._draft(CALIBRATION_RIVALS)
+            counts = np.bincount(np.concatenate([r.ravel() for r in rows]), minlength=len(self.table))
+            observed = np.maximum(counts / CALIBRATION_RIVALS, 0.5 / CALIBRATION_RIVALS)
+            self.logits += np.log(target / observed).astype(np.float32)
+
+    def _sample(self, n_rivals: int) -> Tuple[np.ndarray, np.ndarray]:
+        starters = np.empty((n_rivals, XI_SIZE), dtype=np.int32)
+        captains = np.empty(n_rivals, dtype=np.int32)
+        for start in range(0, n_rivals, BATCH_SIZE):
+            n = min(BATCH_SIZE, n_rivals - start)
+            (gk, df, md, fw), (_gk_keys, df_keys, md_keys, fw_keys) = self._draft(n)
+            # Bench the weakest defender, the weakest midfielder and the weakest of the
+            # remaining outfielders; any such choice leaves a legal formation
+            outfield = np.concatenate([df[:, :-1], md[:, :-1], fw], axis=1)
+            outfield_keys = np.concatenate([df_keys[:, :-1], md_keys[:, :-1], fw_keys], axis=1)
+            keep = np.argsort(-outfield_keys, axis=1)[:, :XI_SIZE - 1]
+            xi = np.concatenate([gk[:, :1], np.take_along_axis(outfield, keep, axis=1)], axis=1)
+            starters[start:start + n] = xi
+            cap_keys = self.captain_logits[xi] + _gumbel(self.rng, xi.shape)
+            captains[start:start + n] = xi[np.arange(n), np.argmax(cap_keys, axis=1)]
+        return starters, captains
+
+    # Effective ownership
+
+    def starting_share(self) -> np.ndarray:
+        return np.bincount(self.starters.ravel(), minlength=len(self.table)) / self.n_rivals
+
+    def captain_share(self) -> np.ndarray:
+        return np.bincount(self.captains, minlength=len(self.table)) / self.n_rivals
+
+    def effective_ownership(self) -> np.ndarray:
+        """
+        Effective ownership in % per table row: the share of rivals starting
+        the player plus the extra share of points rivals get by captaining them.
+        """
+        return 100.0 * (self.starting_share() + (CAPTAIN_MULTIPLIER - 1.0) * self.captain_share())
+
+    # Rank impact
+
+    def scenarios(self, n_scenarios: int = DEFAULT_SCENARIOS) -> np.ndarray:
+        """
+        Sampled gameweek points, shape (n_scenarios, players). A player scores
+        up to two appearance points for sure, and the rest of their expected
+        points as Poisson-distributed returns the size of a goal for their position.
+        """
+        expected = np.maximum(self.projections, 0.0)
+        base = np.minimum(expected, 2.0)
+        size = GOAL_POINTS[self.table.position_codes].astype(np.float32)
+        returns = self.rng.poisson((expected - base) / size, (n_scenarios, len(self.table)))
+        return (base + size * returns).astype(np.float32)
+
+    def rival_scores(self, points: np.ndarray) -> np.ndarray:
+        """Rival gameweek totals per scenario, shape (n_scenarios, n_rivals)."""
+        scores = np.empty((len(points), self.n_rivals), dtype=np.float32)
+        for s, row in enumerate(points):
+            scores[s] = row[self.starters].sum(axis=1) + (CAPTAIN_MULTIPLIER - 1.0) * row[self.captains]
+        return scores
+
+    def rank_impact(
+        self,
+        candidates: Union[Sequence[int], np.ndarray],
+        captain: bool = False,
+        user_rows: Optional[Sequence[int]] = None,
+        user_captain: Optional[int] = None,
+        target_percentile: float = DEFAULT_TARGET_PERCENTILE,
+        n_scenarios: int = DEFAULT_SCENARIOS,
+    ) -> List[PickImpact]:
+        """
+        Rank gained or lost by picking each candidate (table rows) for one
+        slot, compared with a pick scoring the candidates' average expected
+        points. Rival scores include the candidates wherever rivals own them,
+        so a popular pick's haul lifts much of the field with the user and a
+        differential's haul does not.
+
+        The user's team is ``user_rows`` (starting XI) with ``user_captain`` if
+        given; otherwise the user is placed at ``target_percentile`` of the
+        field before the slot is filled, where differentials matter most for a
+        top finish.
+        """
+        candidates = np.asarray(candidates, dtype=np.intp)
+        multiplier = CAPTAIN_MULTIPLIER if captain else 1.0
+        points = self.scenarios(n_scenarios)
+        scores = self.rival_scores(points)
+        scores.sort(axis=1)
+        average = multiplier * float(self.projections[candidates].mean())
+
+        if user_rows is not None:
+            user = points[:, list(user_rows)].sum(axis=1)
+            if user_captain is not None:
+                user += (CAPTAIN_MULTIPLIER - 1.0) * points[:, user_captain]
+            # Candidates already in the team are taken out so every candidate fills the same empty slot
+            share = np.isin(candidates, list(user_rows)).astype(np.float32)
+            if user_captain is not None:
+                share[candidates == user_captain] = CAPTAIN_MULTIPLIER
+            base = user[:, None] - points[:, candidates] * share
+        else:
+            target = np.quantile(scores, target_percentile, axis=1)
+            base = np.repeat((target - average)[:, None], len(candidates), axis=1)
+
+        with_pick = base + multiplier * points[:, candidates]
+        reference = base + average
+        gains = np.empty_like(with_pick)
+        for s in range(len(points)):
+            # Rank is the number of rivals strictly ahead
+            ahead_with = self.n_rivals - np.searchsorted(scores[s], with_pick[s], side="right")
+            ahead_reference = self.n_rivals - np.searchsorted(scores[s], reference[s], side="right")
+            gains[s] = ahead_reference - ahead_with
+
+        eo = self.effective_ownership()
+        return [
+            PickImpact(
+                name=self.table.names[row],
+                position=POSITIONS[self.table.position_codes[row]],
+                ownership=float(self.squad_share[row]),
+                effective_ownership=float(eo[row]),
+                expected_points=float(self.projections[row]),
+                multiplier=multiplier,
+                rank_gain_mean=float(gains[:, i].mean()),
+                rank_gain_p10=float(np.percentile(gains[:, i], 10)),
+                rank_gain_p90=float(np.percentile(gains[:, i], 90)),
+                gain_probability=float((gains[:, i] > 0).mean()),
+                field_size=self.n_rivals,
+            )
+            for i, row in enumerate(candidates)
+        ]
+
+
+def format_impacts(impacts: Sequence[PickImpact]) -> str:
+    """Markdown table of pick impacts, best mean rank gain first."""
+    if not impacts:
+        return "No players to evaluate."
+    field_size = impacts[0].field_size
+    lines = [
+        f"Rank impact against {field_size:,} sampled rival squads "
+        "(places gained versus a pick scoring the candidates' average expected points):",
+        "",
+        "| Player | Pos | Own % | EO % | xPts | Rel. pts | Mean gain | P(gain) | 10th pct | 90th pct |",
+        "|---|---|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for impact in sorted(impacts, key=lambda i: -i.rank_gain_mean):
+        lines.append(
+            f"| {impact.name} | {impact.position} | {impact.ownership:.1f} | {impact.effective_ownership:.1f} | "
+            f"{impact.expected_points:.1f} | {impact.relative_points:+.2f} | {impact.rank_gain_mean:+,.0f} | "
+            f"{impact.gain_probability:.0%} | {impact.rank_gain_p10:+,.0f} | {impact.rank_gain_p90:+,.0f} |"
+        )
+    return "\n".join(lines)
+
+
+# Building a field from what is known
+
+def _archive_pool() -> Optional[Tuple[PlayerTable, np.ndarray, np.ndarray]]:
+    """
+    Latest archived gameweek of the current season: player table, ownership %
+    and recent mean points. None if the current season is not archived.
+    """
+    from .backtest import SeasonReplay
+    from .history import HistoryArchive
+    from .lineup import lineup_model
+    from .season_calendar import season_of
+
+    archive = HistoryArchive()
+    if season_of() not in archive.seasons():
+        return None
+    partition = archive.season(season_of())
+    if not partition.gameweeks:
+        return None
+    names = {pid: info["name"] for pid, info in archive.players.items()}
+    replay = SeasonReplay(partition, names)
+    context = replay.deadline(partition.gameweeks[-1], include_gameweek=True)
+    # Recent points, scaled by each player's chance of starting the next gameweek (team news included)
+    availability = lineup_model().outlook(season_of()).factors(context.table.player_ids)
+    return context.table, context.ownership, (context.mean_points(window=4) * availability).astype(np.float32)
+
+
+# Season -> (lineup signature, pool); rebuilt when the archive grows or team news arrives
+_archive_cache: Dict[str, Tuple[Optional[Tuple], Optional[Tuple[PlayerTable, np.ndarray, np.ndarray]]]] = {}
+_archive_lock = threading.Lock()
+
+# Synthetic "other" players per position when the pool is too small to sample squads from
+FILLER_PER_POSITION = 20
+
+
+def _cached_pool() -> Optional[Tuple[PlayerTable, np.ndarray, np.ndarray]]:
+    """The archive pool of the current season, rebuilt when its lineup signature changes."""
+    from .lineup import lineup_model
+    from .season_calendar import season_of
+
+    season = season_of()
+    try:
+        signature: Optional[Tuple] = lineup_model().signature(season)
+    except KeyError:
+        signature = None
+    with _archive_lock:
+        cached = _archive_cache.get(season)
+        if cached is None or cached[0] != signature:
+            cached = _archive_cache[season] = (signature, _archive_pool())
+        return cached[1]
+
+
+def _add_fillers(records: List[Dict], ownership: List[float], projections: List[float]) -> None:
+    """Top up thin positions with anonymous players carrying the remaining ownership."""
+    positions = [normalize_position(record["position"]) for record in records]
+    for code, position in enumerate(POSITIONS):
+        if positions.count(position) >= SQUAD_QUOTAS[position] * 4:
+            continue
+        named = sum(o for p, o in zip(positions, ownership) if p == position)
+        remaining = max(SQUAD_QUOTAS[position] * 100.0 - named, 1.0 * FILLER_PER_POSITION)
+        for i in range(FILLER_PER_POSITION):
+            records.append({"player_id": -len(records) - 1, "name": f"Other {position} {i + 1}", "club": "",
+                            "position": position, "price": 0.0})
+            ownership.append(remaining / FILLER_PER_POSITION)
+            projections.append(float(DEFAULT_PROJECTION[code]))
+
+
+def build_field(
+    players: Sequence[Dict],
+    n_rivals: int = DEFAULT_RIVALS,
+    seed: int = 0,
+) -> Tuple[RivalField, List[int]]:
+    """
+    A rival field over the latest archived gameweek, with ``players`` (dicts
+    with ``name`` and optionally ``position``, ``ownership``, ``expected_points``)
+    updated or added. Positions without enough players are topped up with
+    anonymous players sharing the ownership the named ones leave over.
+
+    Returns:
+        The field and the table row of each of ``players``
+    """
+    from .entities import normalize_name
+
+    pool = _cached_pool()
+    records: List[Dict] = []
+    ownership: List[float] = []
+    projections: List[float] = []
+    if pool is not None:
+        table, own, points = pool
+        records = table.to_records()
+        ownership = own.tolist()
+        projections = points.tolist()
+    by_name = {normalize_name(record["name"]): i for i, record in enumerate(records)}
+
+    rows: List[int] = []
+    for player in players:
+        key = normalize_name(player["name"])
+        row = by_name.get(key)
+        if row is None:
+            position = normalize_position(player.get("position") or "MID")
+            records.append({"player_id": -len(records) - 1, "name": player["name"], "club": player.get("club") or "",
+                            "position": position, "price": player.get("price") or 0.0})
+            ownership.append(0.0)
+            projections.append(float(DEFAULT_PROJECTION[POSITIONS.index(position)]))
+            row = by_name[key] = len(records) - 1
+        if player.get("ownership") is not None:
+            ownership[row] = float(player["ownership"])
+        if player.get("expected_points") is not None:
+            projections[row] = float(player["expected_points"])
+        rows.append(row)
+    _add_fillers(records, ownership, projections)
+
+    table = PlayerTable.from_records(records, n_gameweeks=1)
+    # PlayerTable sorts its rows; map the input order onto table rows
+    order = np.array([table.index_of(record["player_id"]) for record in records])
+    own_by_row = np.zeros(len(records))
+    proj_by_row = np.zeros(len(records), dtype=np.float32)
+    own_by_row[order] = ownership
+    proj_by_row[order] = projections
+    field = RivalField(table, own_by_row, proj_by_row, n_rivals=n_rivals, seed=seed)
+    return field, [int(order[row]) for row in rows]
@@ -0,0 +1,317 @@
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+# Squad positions in the order rows are stored (and the order the 2-5-5-3 squad is listed)
+POSITIONS: Tuple[str, ...] = ("GK", "DEF", "MID", "FWD")
+
+# League phase of the new Champions League format
+LEAGUE_PHASE_GAMEWEEKS = 8
+
+_POSITION_ALIASES: Dict[str, str] = {
+    "g": "GK", "gk": "GK", "gkp": "GK", "goalkeeper": "GK", "keeper": "GK",
+    "d": "DEF", "def": "DEF", "defender": "DEF",
+    "m": "MID", "mid": "MID", "midfielder": "MID",
+    "f": "FWD", "fwd": "FWD", "forward": "FWD", "st": "FWD", "striker": "FWD", "att": "FWD",
+}
+
+
+def normalize_position(position: str) -> str:
+    """
+    Map the many ways a position is written ("Goalkeeper", "gk", "ST", ...)
+    onto one of POSITIONS.
+
+    Raises:
+        ValueError: If the position is not recognised
+    """
+    key = position.strip().lower()
+    if key.upper() in POSITIONS:
+        return key.upper()
+    try:
+        return _POSITION_ALIASES[key]
+    except KeyError:
+        raise ValueError(f"Unknown position: {position!r}") from None
+
+
+class PlayerRow:
+    """Lightweight read-only view of a single row in a PlayerTable."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "PlayerTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def player_id(self) -> int:
+        return int(self._table.player_ids[self._index])
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._index]
+
+    @property
+    def club(self) -> str:
+        return self._table.clubs[self._table.club_codes[self._index]]
+
+    @property
+    def position(self) -> str:
+        return POSITIONS[self._table.position_codes[self._index]]
+
+    @property
+    def price(self) -> float:
+        return float(self._table.prices[self._index])
+
+    @property
+    def projections(self) -> np.ndarray:
+        # Basic indexing, so this is a view into the projection matrix
+        return self._table.projections[self._index]
+
+    def __repr__(self) -> str:
+        return f"PlayerRow({self.name!r}, {self.club!r}, {self.position}, {self.price:.1f}m)"
+
+
+class PlayerView:
+    """
+    Subset of a PlayerTable selected by position, club or price band.
+
+    The view only holds an index into the parent table: either a slice (for
+    positions, which are stored contiguously) or a view of one of the table's
+    precomputed ordering arrays. Reading a column of a position view returns
+    a view of the table's column; club and price-band views gather the rows
+    they select, so their column accessors return copies.
+    """
+
+    __slots__ = ("table", "indices")
+
+    def __init__(self, table: "PlayerTable", indices: Union[slice, np.ndarray]):
+        self.table = table
+        self.indices = indices
+
+    def __len__(self) -> int:
+        if isinstance(self.indices, slice):
+            return len(range(*self.indices.indices(len(self.table))))
+        return len(self.indices)
+
+    def __iter__(self) -> Iterator[PlayerRow]:
+        if isinstance(self.indices, slice):
+            positions = range(*self.indices.indices(len(self.table)))
+        else:
+            positions = self.indices.tolist()
+        for index in positions:
+            yield PlayerRow(self.table, index)
+
+    def row_indices(self) -> np.ndarray:
+        """Return the selected row numbers as an integer array."""
+        if isinstance(self.indices, slice):
+            return np.arange(*self.indices.indices(len(self.table)), dtype=np.int32)
+        return self.indices
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self.table.prices[self.indices]
+
+    @property
+    def projections(self) -> np.ndarray:
+        return self.table.projections[self.indices]
+
+    @property
+    def player_ids(self) -> np.ndarray:
+        return self.table.player_ids[self.indices]
+
+    @property
+    def club_codes(self) -> np.ndarray:
+        return self.table.club_codes[self.indices]
+
+
+class PlayerTable:
+    """
+    Columnar (struct-of-arrays) table of all league-phase players.
+
+    Clubs and positions are categorical: each row stores a small integer code
+    into ``clubs`` / ``POSITIONS``. Rows are sorted by position, then by price
+    descending, so that every position is a contiguous block and selecting one
+    is a plain slice. Orderings by club and by price are precomputed once so
+    club and price-band selections are found by binary search instead of a
+    scan; the selected row numbers are a slice of those orderings.
+
+    Prices are in millions of euros; ``projections`` has one column per
+    gameweek of expected fantasy points.
+    """
+
+    __slots__ = (
+        "player_ids", "names", "club_codes", "position_codes", "prices", "projections",
+        "clubs", "_club_lookup", "_position_bounds", "_club_order", "_club_bounds",
+        "_price_order", "_sorted_prices", "_id_lookup",
+    )
+
+    def __init__(
+        self,
+        player_ids: Sequence[int],
+        names: Sequence[str],
+        clubs: Sequence[str],
+        positions: Sequence[str],
+        prices: Union[Sequence[float], np.ndarray],
+        projections: Optional[np.ndarray] = None,
+        n_gameweeks: int = LEAGUE_PHASE_GAMEWEEKS,
+    ):
+        n_players = len(names)
+        if not (len(player_ids) == len(clubs) == len(positions) == len(prices) == n_players):
+            raise ValueError("All player columns must have the same length")
+        if len(set(player_ids)) != n_players:
+            raise ValueError("player_ids must be unique")
+
+        position_codes = np.fromiter(
+            (POSITIONS.index(normalize_position(p)) for p in positions), dtype=np.uint8, count=n_players
+        )
+        raw_prices = np.asarray(prices, dtype=np.float32)
+        if projections is None:
+            projections = np.zeros((n_players, n_gameweeks), dtype=np.float32)
+        projections = np.asarray(projections, dtype=np.float32)
+        if projections.ndim != 2 or projections.shape[0] != n_players:
+            raise ValueError("projections must have shape (n_players, n_gameweeks)")
+
+        # Store rows grouped by position, most expensive first within each position
+        order = np.lexsort((-raw_prices, position_codes))
+
+        self.clubs: Tuple[str, ...] = tuple(sorted(set(clubs)))
+        self._club_lookup: Dict[str, int] = {club: code for code, club in enumerate(self.clubs)}
+        club_dtype = np.uint8 if len(self.clubs) <= np.iinfo(np.uint8).max else np.uint16
+
+        self.player_ids = np.asarray(player_ids, dtype=np.int32)[order]
+        self.names: Tuple[str, ...] = tuple(names[i] for i in order)
+        self.club_codes = np.fromiter(
+            (self._club_lookup[clubs[i]] for i in order), dtype=club_dtype, count=n_players
+        )
+        self.position_codes = position_codes[order]
+        self.prices = raw_prices[order]
+        self.projections = np.ascontiguousarray(projections[order])
+
+        bounds = np.searchsorted(self.position_codes, np.arange(len(POSITIONS) + 1))
+        self._position_bounds = bounds.tolist()
+
+        self._club_order = np.argsort(self.club_codes, kind="stable").astype(np.int32)
+        self._club_bounds = np.searchsorted(
+            self.club_codes[self._club_order], np.arange(len(self.clubs) + 1)
+        ).tolist()
+
+        self._price_order = np.argsort(self.prices, kind="stable").astype(np.int32)
+        self._sorted_prices = self.prices[self._price_order]
+
+        self._id_lookup: Dict[int, int] = {pid: i for i, pid in enumerate(self.player_ids.tolist())}
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[Mapping], n_gameweeks: int = LEAGUE_PHASE_GAMEWEEKS
+    ) -> "PlayerTable":
+        """
+        Build a table from dict-like player records.
+
+        Each record needs ``name``, ``club``, ``position`` and ``price``; ``player_id``
+        defaults to the record's position in the input and ``projections`` (a
+        per-gameweek list of expected points) defaults to zeros.
+        """
+        ids: List[int] = []
+        names: List[str] = []
+        clubs: List[str] = []
+        positions: List[str] = []
+        prices: List[float] = []
+        rows: List[Sequence[float]] = []
+        for i, record in enumerate(records):
+            ids.append(int(record.get("player_id", i)))
+            names.append(str(record["name"]))
+            clubs.append(str(record["club"]))
+            positions.append(str(record["position"]))
+            prices.append(float(record["price"]))
+            projection = list(record.get("projections") or [])[:n_gameweeks]
+            rows.append(projection + [0.0] * (n_gameweeks - len(projection)))
+
+        projections = np.asarray(rows, dtype=np.float32).reshape(len(names), n_gameweeks)
+        return cls(ids, names, clubs, positions, prices, projections, n_gameweeks)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[PlayerRow]:
+        for index in range(len(self)):
+            yield PlayerRow(self, index)
+
+    def __getitem__(self, index: int) -> PlayerRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return PlayerRow(self, index)
+
+    @property
+    def n_gameweeks(self) -> int:
+        return self.projections.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the numeric columns and ordering arrays."""
+        arrays = (
+            self.player_ids, self.club_codes, self.position_codes, self.prices, self.projections,
+            self._club_order, self._price_order, self._sorted_prices,
+        )
+        return sum(a.nbytes for a in arrays)
+
+    def club_code(self, club: str) -> int:
+        try:
+            return self._club_lookup[club]
+        except KeyError:
+            raise KeyError(f"Unknown club: {club!r}") from None
+
+    def has_player(self, player_id: int) -> bool:
+        return player_id in self._id_lookup
+
+    def row_for_id(self, player_id: int) -> PlayerRow:
+        return PlayerRow(self, self._id_lookup[player_id])
+
+    def index_of(self, player_id: int) -> int:
+        return self._id_lookup[player_id]
+
+    def all(self) -> PlayerView:
+        return PlayerView(self, slice(0, len(self)))
+
+    def by_position(self, position: str) -> PlayerView:
+        code = POSITIONS.index(normalize_position(position))
+        return PlayerView(self, slice(self._position_bounds[code], self._position_bounds[code + 1]))
+
+    def by_club(self, club: str) -> PlayerView:
+        code = self.club_code(club)
+        start, stop = self._club_bounds[code], self._club_bounds[code + 1]
+        return PlayerView(self, self._club_order[start:stop])
+
+    def by_price(self, min_price: float = 0.0, max_price: float = float("inf")) -> PlayerView:
+        """Select players priced within [min_price, max_price] million."""
+        start = int(np.searchsorted(self._sorted_prices, np.float32(min_price), side="left"))
+        stop = int(np.searchsorted(self._sorted_prices, np.float32(max_price), side="right"))
+        return PlayerView(self, self._price_order[start:stop])
+
+    def set_projections(self, gameweek: int, points: Union[Sequence[float], np.ndarray]) -> None:
+        """Overwrite the projected points for a 1-based gameweek, in table row order."""
+        self.projections[:, gameweek - 1] = np.asarray(points, dtype=np.float32)
+
+    def total_projection(self, start_gameweek: int = 1, horizon: Optional[int] = None) -> np.ndarray:
+        """Sum projected points over ``horizon`` gameweeks starting at ``start_gameweek``."""
+        stop = self.n_gameweeks if horizon is None else min(start_gameweek - 1 + horizon, self.n_gameweeks)
+        return self.projections[:, start_gameweek - 1:stop].sum(axis=1)
+
+    def to_records(self) -> List[Dict]:
+        return [
+            {
+                "player_id": row.player_id,
+                "name": row.name,
+                "club": row.club,
+                "position": row.position,
+                "price": round(row.price, 1),
+                "projections": row.projections.tolist(),
+            }
+            for row in self
+        ]
@@ -0,0 +1,229 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+from .entities import CLUB, PLAYER, entity_index
+from .tools.custom_tool import InjuryReportTool, PlayerTeamVerificationTool
+from .tools.search_cache import SearchCache, search_cache, search_key
+
+
+# Entities per tool warmed from one task output (the aggressiveness knob)
+DEFAULT_MAX_PER_OUTPUT = 12
+DEFAULT_WORKERS = 4
+
+
+@dataclass
+class PrefetchTarget:
+    """A tool whose search is warmed for every player or club (``kind``) a task output names."""
+    tool: Any       # a tool with search_query(name) and a CachedSerperDevTool as serper_tool
+    kind: str
+
+
+@dataclass
+class ToolPrefetchStats:
+    issued: int = 0        # searches started in the background
+    failed: int = 0
+    skipped: int = 0       # already cached or already prefetched
+    used: int = 0          # prefetched searches an agent later asked for
+    hits: int = 0          # agent lookups answered by a prefetched search (a search can be used more than once)
+
+
+@dataclass
+class PrefetchMetrics:
+    """Prefetch outcomes per tool, and how many of all agent searches they answered."""
+    tools: Dict[str, ToolPrefetchStats] = field(default_factory=dict)
+    lookups: int = 0           # searches made by agents (not by the prefetcher)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def count(self, tool: str, field_name: str) -> None:
+        with self._lock:
+            stats = self.tools.setdefault(tool, ToolPrefetchStats())
+            setattr(stats, field_name, getattr(stats, field_name) + 1)
+
+    def lookup(self) -> None:
+        with self._lock:
+            self.lookups += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.tools.clear()
+            self.lookups = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Counts per tool plus ``hit_rate`` (share of prefetched searches that were
+        used; low means prefetching too much) and ``coverage`` (share of agent
+        searches answered by a prefetch; low means prefetching too little).
+        """
+        with self._lock:
+            issued = sum(s.issued for s in self.tools.values())
+            used = sum(s.used for s in self.tools.values())
+            hits = sum(s.hits for s in self.tools.values())
+            return {
+                "tools": {name: dict(vars(s)) for name, s in self.tools.items()},
+                "issued": issued,
+                "used": used,
+                "lookups": self.lookups,
+                "hit_rate": used / issued if issued else 0.0,
+                "coverage": hits / self.lookups if self.lookups else 0.0,
+            }
+
+    def report(self) -> str:
+        """Markdown table of the metrics."""
+        summary = self.summary()
+        lines = ["| Tool | Issued | Used | Hit rate | Failed | Skipped |", "|---|---:|---:|---:|---:|---:|"]
+        for name, s in sorted(summary["tools"].items()):
+            rate = s["used"] / s["issued"] if s["issued"] else 0.0
+            lines.append(f"| {name} | {s['issued']} | {s['used']} | {rate:.0%} | {s['failed']} | {s['skipped']} |")
+        lines.append(
+            f"\nPrefetches answered {summary['coverage']:.0%} of {summary['lookups']} agent searches."
+        )
+        return "\n".join(lines)
+
+
+prefetch_metrics = PrefetchMetrics()
+
+
+class Prefetcher:
+    """
+    Warms the search cache with the searches agents are about to make.
+
+    When a task finishes, the players and clubs its output names are looked
+    up in the entity index, and for each target tool the exact search the
+    tool would run (its ``search_query()``) is started in the background.
+    When a later agent verifies one of those players or asks for a club's
+    injury news, the answer is already cached, or in flight and shared.
+    """
+
+    def __init__(
+        self,
+        targets: Sequence[PrefetchTarget],
+        cache: SearchCache = search_cache,
+        max_per_output: int = DEFAULT_MAX_PER_OUTPUT,
+        workers: int = DEFAULT_WORKERS,
+        metrics: PrefetchMetrics = prefetch_metrics,
+    ):
+        self.targets = list(targets)
+        self.cache = cache
+        self.max_per_output = max_per_output
+        self.metrics = metrics
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch")
+        self._prefetched: Dict[Hashable, str] = {}   # search key -> tool name
+        self._used: set = set()
+        self._queued: set = set()                     # keys submitted but not yet fetched
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        cache.add_listener(self._on_lookup)
+
+    def _key(self, target: PrefetchTarget, name: str) -> Hashable:
+        serper = target.tool.serper_tool
+        return search_key(target.tool.search_query(name), serper.search_type, serper.n_results)
+
+    def _on_lookup(self, key: Hashable, hit: bool) -> None:
+        if getattr(self._local, "active", False):
+            return
+        self.metrics.lookup()
+        with self._lock:
+            tool = self._prefetched.get(key)
+            first_use = tool is not None and hit and key not in self._used
+            if first_use:
+                self._used.add(key)
+        if tool is not None and hit:
+            self.metrics.count(tool, "hits")
+            if first_use:
+                self.metrics.count(tool, "used")
+
+    @staticmethod
+    def mentions(text: str, kind: str) -> List[str]:
+        """Canonical names of the players, or clubs, ``text`` mentions (clubs include named players' clubs)."""
+        index = entity_index()
+        players = index.find_players(text)
+        if kind == PLAYER:
+            return [player.name for player in players]
+        clubs = [club.name for club in index.find_clubs(text)]
+        for player in players:
+            club = index.entities.get(player.club) if player.club else None
+            if club is not None and club.name not in clubs:
+                clubs.append(club.name)
+        return clubs
+
+    def prefetch_text(self, text: str) -> int:
+        """
+        Start background searches for what ``text`` mentions.
+
+        Returns:
+            Number of searches started
+        """
+        started = 0
+        for target in self.targets:
+            for name in self.mentions(text, target.kind)[:self.max_per_output]:
+                key = self._key(target, name)
+                with self._lock:
+                    # Cached results expire, so a key prefetched in an earlier cycle is fetched again
+                    fresh = key not in self._queued and not self.cache.in_flight(key) and self.cache.get(key) is None
+                    if fresh:
+                        if len(self._prefetched) >= self.cache.max_entries:
+                            self._forget_stale()
+                        self._prefetched[key] = target.tool.name
+                        self._used.discard(key)
+                        self._queued.add(key)
+                if not fresh:
+                    self.metrics.count(target.tool.name, "skipped")
+                    continue
+                self.metrics.count(target.tool.name, "issued")
+                self._pool.submit(self._fetch, target, name, key)
+                started += 1
+        return started
+
+    def _forget_stale(self) -> None:
+        """Drop prefetched keys whose results have left the cache (called with the lock held)."""
+        live = {key for key, _ in self.cache.entries()} | self._queued
+        for key in [key for key in self._prefetched if key not in live]:
+            del self._prefetched[key]
+            self._used.discard(key)
+
+    def _fetch(self, target: PrefetchTarget, name: str, key: Hashable) -> None:
+        self._local.active = True
+        try:
+            target.tool.serper_tool._run(search_query=target.tool.search_query(name))
+        except Exception:
+            self.metrics.count(target.tool.name, "failed")
+        finally:
+            self._local.active = False
+            with self._lock:
+                self._queued.discard(key)
+
+    def on_task_output(self, output: Any) -> None:
+        """Crew task callback: prefetch for the players and clubs a finished task names."""
+        text = getattr(output, "raw", None) or ""
+        if text:
+            self.prefetch_text(text)
+
+
+def prefetch_enabled() -> bool:
+    return os.getenv("FPL_PREFETCH", "1").lower() not in ("0", "false", "no")
+
+
+_prefetcher: Optional[Prefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def prefetcher() -> Prefetcher:
+    """
+    Process-wide prefetcher for the Player Team Verification Tool (named
+    players) and the Injury Report Tool (named clubs and the clubs of named players).
+    """
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher(
+                targets=[
+                    PrefetchTarget(PlayerTeamVerificationTool(), PLAYER),
+                    PrefetchTarget(InjuryReportTool(), CLUB),
+                ],
+                max_per_output=int(os.getenv("FPL_PREFETCH_MAX", DEFAULT_MAX_PER_OUTPUT)),
+                workers=int(os.getenv("FPL_PREFETCH_WORKERS", DEFAULT_WORKERS)),
+            )
+        return _prefetcher
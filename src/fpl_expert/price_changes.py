@@ -0,0 +1,406 @@
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .entities import normalize_name
+from .history import HistoryArchive, SeasonPartition
+from .store import RecommendationStore, default_store
+
+
+# Per-player features, in model order
+FEATURES: Tuple[str, ...] = (
+    "net_transfers",     # net transfers in this gameweek, in standard deviations of the gameweek
+    "net_trend",         # exponentially weighted net_transfers
+    "ownership_delta",   # ownership change since the previous gameweek (percentage points)
+    "form",              # exponentially weighted points above the gameweek average of players who played
+    "minutes_share",     # exponentially weighted share of 90 minutes played
+    "last_change",       # price change into this gameweek, in 0.1m steps
+    "price",
+)
+# Kept with the features so the next gameweek can be folded in without the archive
+STATE: Tuple[str, ...] = FEATURES + ("ownership",)
+
+TREND_WEIGHT = 0.5   # weight of the newest gameweek in net_trend
+FORM_WEIGHT = 0.4    # weight of the newest gameweek in form and minutes_share
+
+# Outcomes, in model order; "hold" is the reference class
+RISE, FALL = "rise", "fall"
+
+# Fewer archived rises or falls than this and the prior coefficients are used instead of a fit
+MIN_CHANGES = 20
+FIT_ITERATIONS = 400
+FIT_LEARNING_RATE = 0.5
+FIT_L2 = 1e-3
+
+# Coefficients on standardized features (bias first) when there is nothing to fit: demand and
+# form push prices up, selling and benching push them down
+PRIOR_WEIGHTS = {
+    RISE: [-3.0, 1.2, 0.6, 0.6, 0.4, 0.2, 0.3, 0.0],
+    FALL: [-3.0, -1.2, -0.6, -0.6, -0.4, -0.3, -0.3, 0.0],
+}
+
+
+def _checksum(rows: np.ndarray) -> int:
+    """Changes whenever any of ``rows`` does, not just their number."""
+    return zlib.crc32(np.ascontiguousarray(rows).tobytes())
+
+
+class PriceFeatures:
+    """Columnar price-change features of one season, as of the last folded gameweek."""
+
+    def __init__(self, player_ids: np.ndarray, columns: Dict[str, np.ndarray], gameweek: int = 0):
+        self.player_ids = np.asarray(player_ids, dtype=np.int64)
+        self.columns = columns
+        self.gameweek = gameweek
+
+    @classmethod
+    def empty(cls) -> "PriceFeatures":
+        return cls(np.zeros(0, dtype=np.int64), {name: np.zeros(0) for name in STATE})
+
+    @classmethod
+    def from_store(cls, rows: Dict[int, Dict[str, float]], gameweek: int) -> "PriceFeatures":
+        ids = np.array(sorted(rows), dtype=np.int64)
+        columns = {name: np.array([rows[int(pid)][name] for pid in ids], dtype=np.float64) for name in STATE}
+        return cls(ids, columns, gameweek)
+
+    def to_store(self) -> Dict[int, Dict[str, float]]:
+        return {
+            int(pid): {name: round(float(self.columns[name][i]), 4) for name in STATE}
+            for i, pid in enumerate(self.player_ids)
+        }
+
+    def __len__(self) -> int:
+        return len(self.player_ids)
+
+    def matrix(self) -> np.ndarray:
+        """Features as an (n_players, len(FEATURES)) array."""
+        return np.column_stack([self.columns[name] for name in FEATURES]) if len(self) else np.zeros((0, len(FEATURES)))
+
+    def fold(self, rows: np.ndarray, gameweek: int) -> "PriceFeatures":
+        """
+        Features after one more gameweek of archive rows (STATS_DTYPE, sorted
+        by player id). Players missing from the gameweek keep their price and
+        ownership and count as not having played.
+        """
+        ids = np.union1d(self.player_ids, rows["player_id"]).astype(np.int64)
+        present = np.isin(ids, rows["player_id"])
+        row_of = np.searchsorted(rows["player_id"], ids[present])
+        known = np.isin(ids, self.player_ids)
+        prev_of = np.searchsorted(self.player_ids, ids[known])
+
+        def previous(name: str, default: np.ndarray) -> np.ndarray:
+            values = default.copy()
+            values[known] = self.columns[name][prev_of]
+            return values
+
+        def current(field: str, default: np.ndarray) -> np.ndarray:
+            values = default.copy()
+            values[present] = rows[field][row_of]
+            return values
+
+        zeros = np.zeros(len(ids))
+        prev_price = previous("price", zeros)
+        price = current("price", prev_price)
+        prev_price = np.where(known, prev_price, price)
+        prev_ownership = previous("ownership", zeros)
+        ownership = current("ownership", prev_ownership)
+        prev_ownership = np.where(known, prev_ownership, ownership)
+
+        net = current("transfers_in", zeros) - current("transfers_out", zeros)
+        net_z = net / (net[present].std() + 1.0 if present.any() else 1.0)
+        minutes = current("minutes", zeros)
+        points = current("points", zeros)
+        played = minutes > 0
+        average = points[played].mean() if played.any() else 0.0
+
+        columns = {
+            "net_transfers": net_z,
+            "net_trend": TREND_WEIGHT * net_z + (1 - TREND_WEIGHT) * previous("net_trend", zeros),
+            "ownership_delta": ownership - prev_ownership,
+            "form": (
+                FORM_WEIGHT * np.where(played, points - average, 0.0)
+                + (1 - FORM_WEIGHT) * previous("form", zeros)
+            ),
+            "minutes_share": (
+                FORM_WEIGHT * np.minimum(minutes / 90.0, 1.0)
+                + (1 - FORM_WEIGHT) * previous("minutes_share", zeros)
+            ),
+            "last_change": np.round((price - prev_price) * 10.0),
+            "price": price,
+            "ownership": ownership,
+        }
+        return PriceFeatures(ids, columns, gameweek)
+
+
+def training_pairs(partition: SeasonPartition) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Features after each gameweek and the price move into the next one.
+
+    Returns:
+        (X, y): X has one row per player and gameweek pair, y is 0 (rise), 1 (fall) or 2 (hold)
+    """
+    features = PriceFeatures.empty()
+    xs: List[np.ndarray] = []
+    ys: List[np.ndarray] = []
+    gameweeks = partition.gameweeks
+    for gameweek, following in zip(gameweeks, gameweeks[1:] + [None]):
+        features = features.fold(partition.gameweek(gameweek), gameweek)
+        if following is None:
+            break
+        nxt = partition.gameweek(following)
+        common, mine, theirs = np.intersect1d(features.player_ids, nxt["player_id"], return_indices=True)
+        if not len(common):
+            continue
+        change = nxt["price"][theirs] - features.columns["price"][mine]
+        xs.append(features.matrix()[mine])
+        ys.append(np.where(change > 1e-6, 0, np.where(change < -1e-6, 1, 2)))
+    if not xs:
+        return np.zeros((0, len(FEATURES))), np.zeros(0, dtype=int)
+    return np.vstack(xs), np.concatenate(ys)
+
+
+class PriceChangeModel:
+    """
+    Multinomial logistic model of a price rise, fall or hold at the next
+    gameweek. Scores every player in one matrix product.
+    """
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray, weights: np.ndarray, fitted: bool = False,
+                 samples: int = 0):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)   # (1 + len(FEATURES), 2): rise, fall logits
+        self.fitted = fitted
+        self.samples = samples
+
+    @classmethod
+    def prior(cls, x: Optional[np.ndarray] = None) -> "PriceChangeModel":
+        """Hand-set coefficients, standardized on ``x`` when given."""
+        mean, scale = _standardization(x)
+        return cls(mean, scale, np.column_stack([PRIOR_WEIGHTS[RISE], PRIOR_WEIGHTS[FALL]]))
+
+    @classmethod
+    def fit(cls, x: np.ndarray, y: np.ndarray) -> "PriceChangeModel":
+        """Fit on archived moves, or fall back to the prior with too few rises or falls to learn from."""
+        counts = np.bincount(y, minlength=3)
+        if min(counts[0], counts[1]) < MIN_CHANGES:
+            return cls.prior(x if len(x) else None)
+        mean, scale = _standardization(x)
+        design = np.column_stack([np.ones(len(x)), (x - mean) / scale])
+        targets = np.eye(3)[y]
+        weights = np.zeros((design.shape[1], 2))
+        for _ in range(FIT_ITERATIONS):
+            probabilities = _softmax(design @ weights)
+            gradient = design.T @ (probabilities[:, :2] - targets[:, :2]) / len(x) + FIT_L2 * weights
+            weights -= FIT_LEARNING_RATE * gradient
+        return cls(mean, scale, weights, fitted=True, samples=len(x))
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """(n_players, 3) probabilities of a rise, a fall and no change."""
+        design = np.column_stack([np.ones(len(x)), (x - self.mean) / self.scale])
+        return _softmax(design @ self.weights)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "weights": self.weights.tolist(),
+            "fitted": self.fitted,
+            "samples": self.samples,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PriceChangeModel":
+        return cls(data["mean"], data["scale"], data["weights"], data.get("fitted", False), data.get("samples", 0))
+
+
+def _standardization(x: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    if x is None or not len(x):
+        return np.zeros(len(FEATURES)), np.ones(len(FEATURES))
+    scale = x.std(axis=0)
+    return x.mean(axis=0), np.where(scale > 1e-9, scale, 1.0)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    """Softmax over the rise and fall logits plus a zero logit for no change."""
+    full = np.column_stack([logits, np.zeros(len(logits))])
+    full -= full.max(axis=1, keepdims=True)
+    exp = np.exp(full)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+@dataclass
+class PricePrediction:
+    player_id: int
+    name: str
+    club: str
+    position: str
+    price: float
+    rise: float
+    fall: float
+    net_transfers: float
+    ownership: float
+
+
+@dataclass
+class PriceOutlook:
+    season: str
+    gameweek: int                         # last archived gameweek the features include
+    fitted: bool                          # False when the prior coefficients were used
+    predictions: List[PricePrediction]    # most likely riser first
+
+
+class PricePredictor:
+    """
+    Price-change predictions kept up to date from the history archive.
+
+    Per-player features live in the recommendation store and are updated
+    incrementally: ``refresh()`` folds in only the gameweeks archived since
+    the last refresh (re-ingesting an earlier gameweek rebuilds the season,
+    even when it only corrects values). The model is refitted on every
+    archived season's price moves whenever the archive has changed.
+    """
+
+    def __init__(self, archive: Optional[HistoryArchive] = None, store: Optional[RecommendationStore] = None):
+        self.archive = archive or HistoryArchive()
+        self.store = store or default_store()
+        self._lock = threading.Lock()
+
+    def _archive_signature(self) -> List[List[Any]]:
+        signature: List[List[Any]] = []
+        for season in self.archive.seasons():
+            partition = self.archive.season(season)
+            signature.append([season, len(partition), _checksum(partition.stats)])
+        return signature
+
+    def _fit(self) -> PriceChangeModel:
+        pairs = [training_pairs(self.archive.season(season)) for season in self.archive.seasons()]
+        x = np.vstack([p[0] for p in pairs]) if pairs else np.zeros((0, len(FEATURES)))
+        y = np.concatenate([p[1] for p in pairs]) if pairs else np.zeros(0, dtype=int)
+        return PriceChangeModel.fit(x, y)
+
+    def refresh(self, season: str) -> Tuple[PriceFeatures, PriceChangeModel]:
+        """
+        Bring the stored features of ``season`` up to the archive.
+
+        Raises:
+            KeyError: If the season is not archived
+        """
+        with self._lock:
+            partition = self.archive.season(season)
+            state = self.store.price_state(season)
+            last = state["gameweek"] if state else 0
+            stored_model = state["model"] if state else None
+            # Rows of already-folded gameweeks changed (re-ingested): fold the season again
+            folded = partition.before(last + 1)
+            rebuild = (
+                state is None or state["rows"] != len(folded)
+                or (stored_model or {}).get("checksum") != _checksum(folded)
+            )
+            if rebuild:
+                features, last = PriceFeatures.empty(), 0
+            else:
+                features = PriceFeatures.from_store(self.store.price_features(season), last)
+            new = [gameweek for gameweek in partition.gameweeks if gameweek > last]
+            for gameweek in new:
+                features = features.fold(partition.gameweek(gameweek), gameweek)
+
+            signature = self._archive_signature()
+            model_data = stored_model
+            refit = model_data is None or model_data.get("signature") != signature
+            if refit or model_data is None:
+                model = self._fit()
+                model_data = {**model.to_dict(), "signature": signature}
+            else:
+                model = PriceChangeModel.from_dict(model_data)
+
+            if rebuild or new or refit:
+                folded = partition.before(features.gameweek + 1)
+                self.store.save_price_features(
+                    season, features.gameweek, len(folded), features.to_store(),
+                    {**model_data, "checksum": _checksum(folded)}, replace=rebuild,
+                )
+            return features, model
+
+    def predict(self, season: str) -> PriceOutlook:
+        """Rise and fall probabilities for every player of ``season``."""
+        features, model = self.refresh(season)
+        probabilities = model.predict(features.matrix())
+        players = self.archive.players
+        predictions = []
+        for i, pid in enumerate(features.player_ids):
+            info = players.get(int(pid), {})
+            predictions.append(PricePrediction(
+                player_id=int(pid),
+                name=info.get("name", str(pid)),
+                club=info.get("club", ""),
+                position=info.get("position", ""),
+                price=float(features.columns["price"][i]),
+                rise=float(probabilities[i, 0]),
+                fall=float(probabilities[i, 1]),
+                net_transfers=float(features.columns["net_transfers"][i]),
+                ownership=float(features.columns["ownership"][i]),
+            ))
+        predictions.sort(key=lambda p: (-p.rise, p.fall))
+        return PriceOutlook(season, features.gameweek, model.fitted, predictions)
+
+
+def filter_predictions(predictions: Sequence[PricePrediction], players: Optional[Sequence[str]] = None,
+                       position: Optional[str] = None, max_price: Optional[float] = None) -> List[PricePrediction]:
+    wanted = {normalize_name(name) for name in players or []}
+    selected = []
+    for prediction in predictions:
+        if wanted and normalize_name(prediction.name) not in wanted:
+            continue
+        if position and prediction.position != position:
+            continue
+        if max_price is not None and prediction.price > max_price:
+            continue
+        selected.append(prediction)
+    return selected
+
+
+def format_predictions(outlook: PriceOutlook, predictions: Sequence[PricePrediction], top: int = 10) -> str:
+    """Markdown tables of the likeliest risers and fallers among ``predictions`` (a subset of the outlook's)."""
+    def table(title: str, rows: Sequence[PricePrediction]) -> List[str]:
+        lines = [
+            f"**{title}**",
+            "| Player | Club | Pos | Price | Rise | Fall | Net transfers (sd) | Ownership |",
+            "|---|---|---|---:|---:|---:|---:|---:|",
+        ]
+        for p in rows:
+            lines.append(
+                f"| {p.name} | {p.club} | {p.position} | €{p.price:.1f}m | {p.rise:.0%} | {p.fall:.0%} | "
+                f"{p.net_transfers:+.1f} | {p.ownership:.1f}% |"
+            )
+        return lines
+
+    risers = list(predictions[:top])
+    fallers = sorted(predictions, key=lambda p: (-p.fall, p.rise))[:top]
+    basis = (
+        "fitted on archived price moves" if outlook.fitted
+        else "prior coefficients (too few archived price moves to fit)"
+    )
+    lines = [
+        f"Price change outlook for {outlook.season} after gameweek {outlook.gameweek} "
+        f"({len(predictions)} players, {basis}):",
+        "",
+    ]
+    lines += table("Most likely to rise", risers) + [""] + table("Most likely to fall", fallers)
+    return "\n".join(lines)
+
+
+_predictor: Optional[PricePredictor] = None
+_predictor_lock = threading.Lock()
+
+
+def price_predictor() -> PricePredictor:
+    """Process-wide predictor over the default archive and store."""
+    global _predictor
+    with _predictor_lock:
+        if _predictor is None:
+            _predictor = PricePredictor()
+        return _predictor
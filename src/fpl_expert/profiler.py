@@ -0,0 +1,258 @@
+import html
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Sampling interval in seconds (wall clock, so time spent waiting on the network counts)
+DEFAULT_INTERVAL = 0.005
+
+# Where a sample's time goes, decided by the innermost frame whose file path contains a marker
+CATEGORY_MARKERS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("llm", ("litellm", "openai", os.path.join("crewai", "llm"))),
+    ("search", ("serper",)),
+    ("embedding", ("chromadb", "onnxruntime", "embedding")),
+)
+PYTHON_CATEGORY = "python"
+
+# Frames of stacks that are only waiting for work: samples ending in them are idle threads
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py", os.path.join("concurrent", "futures"))
+
+# Frame functions whose ``self`` identifies the task, agent, tool or model being run
+_CONTEXT_FUNCTIONS = {"_execute_core": "task", "execute_task": "agent", "_run": "tool", "run": "tool", "call": "llm"}
+
+CATEGORY_COLOURS = {
+    "llm": "#e8a33d",
+    "search": "#4d9de0",
+    "embedding": "#7fb069",
+    PYTHON_CATEGORY: "#d1495b",
+    "context": "#b8b8b8",
+}
+
+Stack = Tuple[str, ...]
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _context_label(kind: str, owner) -> Optional[str]:
+    from crewai import Agent, Task
+    from crewai.llms.base_llm import BaseLLM
+    from crewai.tools import BaseTool
+
+    if kind == "task" and isinstance(owner, Task):
+        return owner.name or owner.description[:40]
+    if kind == "agent" and isinstance(owner, Agent):
+        return " ".join(owner.role.split())
+    if kind == "tool" and isinstance(owner, BaseTool):
+        return owner.name
+    if kind == "llm" and isinstance(owner, BaseLLM):
+        return owner.model
+    return None
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for every thread in the process.
+
+    A background thread snapshots all stacks every ``interval`` seconds. Each
+    sample is attributed to the crew task, agent, tool and model whose frames
+    are on the stack, and to a category (LLM call, web search, embedding or
+    plain Python) by the innermost frame that belongs to one of them.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.contexts: Dict[str, Counter] = {kind: Counter() for kind in ("task", "agent", "tool", "llm")}
+        self.started: Optional[float] = None
+        self.wall_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._stop.clear()
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._loop, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.started is not None:
+            self.wall_seconds = time.perf_counter() - self.started
+
+    def _loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own:
+                    self._sample(frame)
+
+    def _sample(self, frame) -> None:
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()   # outermost first
+        if not frames or frames[-1].f_code.co_filename.endswith(IDLE_FILES) and not self._category(frames):
+            return
+
+        context: Dict[str, str] = {}
+        for frame in frames:
+            kind = _CONTEXT_FUNCTIONS.get(frame.f_code.co_name)
+            # The outermost tool is the one the agent called; the innermost model is the one answering
+            if kind and (kind not in context or kind == "llm"):
+                label = _context_label(kind, frame.f_locals.get("self"))
+                if label:
+                    # ";" separates frames in the folded format
+                    context[kind] = label.replace(";", ",")
+
+        category = self._category(frames) or PYTHON_CATEGORY
+        self.categories[category] += 1
+        for kind, label in context.items():
+            self.contexts[kind][label] += 1
+        prefix = tuple(f"{kind}:{context[kind]}" for kind in ("task", "agent", "tool") if kind in context)
+        self.stacks[prefix + tuple(_frame_label(f) for f in frames) + (f"[{category}]",)] += 1
+
+    @staticmethod
+    def _category(frames: Sequence) -> Optional[str]:
+        for frame in reversed(frames):
+            path = frame.f_code.co_filename
+            for category, markers in CATEGORY_MARKERS:
+                if any(marker in path for marker in markers):
+                    return category
+        return None
+
+    # Reports
+
+    @property
+    def total_samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def folded(self) -> str:
+        """Stacks in the folded format used by flamegraph.pl and speedscope."""
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common())
+
+    def _seconds(self, samples: int) -> float:
+        total = self.total_samples
+        return self.wall_seconds * samples / total if total else 0.0
+
+    def hotspot_report(self, top: int = 25) -> str:
+        """Markdown report: time per category, task, agent, tool and model, then the hottest functions."""
+        total = self.total_samples or 1
+        lines = [
+            "# Run Profile",
+            "",
+            f"Wall time {self.wall_seconds:.1f}s, {self.total_samples} samples every {self.interval * 1000:.0f}ms "
+            "(across all busy threads, so parallel work can add up to more than the wall time).",
+        ]
+
+        def table(title: str, counts: Counter) -> None:
+            lines.extend(["", f"## {title}", "", "| Name | Samples | Share | Est. seconds |", "|---|---:|---:|---:|"])
+            for name, count in counts.most_common():
+                lines.append(f"| {name} | {count} | {count / total:.1%} | {self._seconds(count):.1f} |")
+
+        table("Time by category", self.categories)
+        table("Time by task", self.contexts["task"])
+        table("Time by agent", self.contexts["agent"])
+        table("Time by tool", self.contexts["tool"])
+        table("Time by model", self.contexts["llm"])
+
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = [label for label in stack if ".py:" in label]
+            if frames:
+                own[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+        table(f"Top {top} functions by own time", Counter(dict(own.most_common(top))))
+        table(f"Top {top} functions by inclusive time", Counter(dict(inclusive.most_common(top))))
+        return "\n".join(lines) + "\n"
+
+    def flame_graph(self, width: int = 1400, row_height: int = 16) -> str:
+        """Flame graph of the folded stacks as a standalone SVG."""
+        tree: Dict = {"count": 0, "children": {}}
+        for stack, count in self.stacks.items():
+            node = tree
+            node["count"] += count
+            for label in stack:
+                node = node["children"].setdefault(label, {"count": 0, "children": {}})
+                node["count"] += count
+
+        depth = max((len(stack) for stack in self.stacks), default=0)
+        height = (depth + 2) * row_height
+        total = tree["count"] or 1
+        rects: List[str] = []
+
+        def colour(label: str) -> str:
+            if label.startswith(("task:", "agent:", "tool:")):
+                return CATEGORY_COLOURS["context"]
+            if label.startswith("["):
+                return CATEGORY_COLOURS.get(label.strip("[]"), CATEGORY_COLOURS[PYTHON_CATEGORY])
+            return "#f2c57c" if zlib.crc32(label.encode("utf-8")) % 2 else "#f4d8a5"
+
+        def draw(node: Dict, x: float, level: int) -> None:
+            for label, child in sorted(node["children"].items()):
+                w = width * child["count"] / total
+                if w >= 0.5:
+                    y = height - (level + 1) * row_height
+                    text = html.escape(label)
+                    share = child["count"] / total
+                    visible = html.escape(label[: int(w / 7)]) if w > 21 else ""
+                    rects.append(
+                        f'<g><title>{text} ({child["count"]} samples, {share:.1%})</title>'
+                        f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" '
+                        f'fill="{colour(label)}"/>'
+                        f'<text x="{x + 3:.1f}" y="{y + row_height - 4}">{visible}</text></g>'
+                    )
+                    draw(child, x, level + 1)
+                x += w
+
+        draw(tree, 0.0, 0)
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'font-family="monospace" font-size="11">'
+            f'<rect width="100%" height="100%" fill="#ffffff"/>'
+            f'<text x="4" y="{row_height - 4}">Crew run flame graph: {self.total_samples} samples, '
+            f'{self.wall_seconds:.1f}s wall time</text>'
+            + "".join(rects)
+            + "</svg>"
+        )
+
+    def write(self, directory: Optional[str] = None) -> Dict[str, str]:
+        """
+        Write the flame graph, hotspot report and folded stacks.
+
+        Returns:
+            Kind of output -> file path
+        """
+        directory = directory or os.path.join("output", f"profile_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}")
+        os.makedirs(directory, exist_ok=True)
+        paths = {
+            "flame_graph": os.path.join(directory, "flamegraph.svg"),
+            "hotspots": os.path.join(directory, "hotspots.md"),
+            "folded": os.path.join(directory, "stacks.folded"),
+        }
+        for kind, content in (
+            ("flame_graph", self.flame_graph()), ("hotspots", self.hotspot_report()), ("folded", self.folded()),
+        ):
+            with open(paths[kind], "w", encoding="utf-8") as f:
+                f.write(content)
+        return paths
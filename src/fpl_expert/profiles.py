@@ -0,0 +1,146 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import yaml
+from crewai import Crew
+from crewai.crews.crew_output import CrewOutput
+
+from .crew import FplExpert
+
+
+PROFILES_FILE = os.path.join(os.path.dirname(__file__), "config", "profiles.yaml")
+DEFAULT_PROFILE = "aaron"
+
+# Tasks whose agents know nothing about the manager: run once and shared by every profile
+RESEARCH_TASKS = (
+    "scout_players_task",
+    "analyze_tactics_task",
+    "analyze_fixtures_task",
+    "gather_community_insights_task",
+)
+# Tasks whose agents work for a specific manager ({manager_profile} in their backstory)
+PROFILE_TASKS = (
+    "select_captain_task",
+    "optimize_budget_task",
+    "build_optimal_team_task",
+)
+
+
+@dataclass
+class ManagerProfile:
+    """A fantasy manager the crew can work for."""
+    name: str
+    manager_profile: str
+    budget: Optional[str] = None
+
+    def inputs(self, base: Mapping[str, str]) -> Dict[str, str]:
+        """Crew inputs for this manager on top of the shared ``base`` inputs."""
+        inputs = dict(base)
+        inputs["profile"] = self.name
+        inputs["manager_profile"] = self.manager_profile
+        if self.budget is not None:
+            inputs["budget"] = self.budget
+        return inputs
+
+
+def load_profiles(path: str = PROFILES_FILE) -> Dict[str, ManagerProfile]:
+    """
+    Read manager profiles. A profile's ``preferences_file`` (relative to the
+    working directory, like the knowledge files) is appended to its text.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+
+    profiles = {}
+    for name, entry in config.items():
+        text = " ".join(entry["manager_profile"].split())
+        preferences_file = entry.get("preferences_file")
+        if preferences_file and os.path.exists(preferences_file):
+            with open(preferences_file, "r", encoding="utf-8") as f:
+                preferences = " ".join(line.strip() for line in f if line.strip())
+            text = f"{text} Their stated preferences: {preferences}"
+        budget = entry.get("budget")
+        profiles[name] = ManagerProfile(name, text, str(budget) if budget is not None else None)
+    return profiles
+
+
+def default_profile_name() -> str:
+    return os.getenv("FPL_PROFILE", DEFAULT_PROFILE)
+
+
+def get_profile(name: Optional[str] = None, path: str = PROFILES_FILE) -> ManagerProfile:
+    name = name or default_profile_name()
+    profiles = load_profiles(path)
+    if name not in profiles:
+        raise KeyError(f"Unknown profile {name!r}; available: {', '.join(profiles)}")
+    return profiles[name]
+
+
+def _narrow(crew: Crew, task_names: Sequence[str]) -> None:
+    """Restrict ``crew`` to the named tasks and the agents that run them."""
+    crew.tasks = [task for task in crew.tasks if task.name in task_names]
+    agents: List = []
+    for task in crew.tasks:
+        if task.agent is not None and task.agent not in agents:
+            agents.append(task.agent)
+    crew.agents = agents
+
+
+def run_profiles(
+    inputs: Mapping[str, str],
+    profile_names: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, CrewOutput]:
+    """
+    Run the crew for several managers, sharing the research.
+
+    The research tasks run once; the captain, budget and team-building tasks
+    then run in parallel for every profile, each with the shared research
+    outputs injected as context. Each profile's final team is written to
+    ``champions_league_team_<profile>.md``.
+
+    Args:
+        inputs: Shared crew inputs (date, season, matchweek, budget, ...)
+        profile_names: Profiles to run (defaults to every configured profile)
+        workers: Maximum number of profiles running at once
+
+    Returns:
+        Profile name -> crew output covering the shared and the profile tasks
+    """
+    profiles = load_profiles()
+    names = list(profile_names or profiles)
+    unknown = [name for name in names if name not in profiles]
+    if unknown:
+        raise KeyError(f"Unknown profiles: {', '.join(unknown)}")
+
+    research = FplExpert().crew()
+    _narrow(research, RESEARCH_TASKS)
+    research.kickoff(inputs=dict(inputs))
+    shared = {task.name: task.output for task in research.tasks}
+
+    def run_profile(profile: ManagerProfile) -> CrewOutput:
+        expert = FplExpert()
+        expert.team_report_file = f"champions_league_team_{profile.name}.md"
+        crew = expert.crew()
+        all_tasks = list(crew.tasks)
+        for task in all_tasks:
+            if task.name in shared:
+                task.output = shared[task.name]
+            elif task.output_file and "{profile}" not in task.output_file:
+                root, ext = os.path.splitext(task.output_file)
+                task.output_file = f"{root}_{profile.name}{ext}"
+        _narrow(crew, PROFILE_TASKS)
+        result = crew.kickoff(inputs=profile.inputs(inputs))
+        return CrewOutput(
+            raw=result.raw,
+            pydantic=result.pydantic,
+            json_dict=result.json_dict,
+            tasks_output=[task.output for task in all_tasks],
+            token_usage=result.token_usage,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers or len(names), len(names)))) as pool:
+        futures = {name: pool.submit(run_profile, profiles[name]) for name in names}
+        return {name: future.result() for name, future in futures.items()}
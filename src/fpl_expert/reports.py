@@ -0,0 +1,245 @@
+import os
+from collections import Counter
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .entities import MAX_PER_CLUB, canonical_club, normalize_name
+from .optimizer import SQUAD_QUOTAS, XI_MAX, XI_MIN, XI_SIZE
+from .player_table import POSITIONS, normalize_position
+
+
+DEFAULT_REPORT_DIR = "output"
+TEAM_REPORT_FILE = "champions_league_team_{profile}_{current_date}.md"
+TEAM_SUMMARY_FILE = "team_summary_{profile}_{current_date}.txt"
+# Latest team selection, outside the dated reports
+LATEST_TEAM_FILE = "champions_league_team.md"
+
+
+class SquadPick(BaseModel):
+    """One player of the selected squad."""
+    name: str
+    club: str
+    position: str = Field(description="GK, DEF, MID or FWD")
+    price: float = Field(description="Price in millions of euros")
+    starting: bool = Field(description="True for the starting XI, False for the bench")
+    justification: str = Field(description="One sentence on why this player is in the squad")
+
+
+class TeamSelection(BaseModel):
+    """Structured output of the team builder; the report tables are rendered from it."""
+    summary: str = Field(description="Two or three sentences on the squad's overall approach")
+    players: List[SquadPick] = Field(description="All 15 players of the squad")
+    captain: str = Field(description="Name of the captain (one of the starting XI)")
+    vice_captain: str = Field(description="Name of the vice-captain (one of the starting XI)")
+    transfer_strategy: str = Field(description="A short paragraph on transfers for the coming gameweeks")
+    risk_assessment: str = Field(description="A short paragraph on the main risks and differential picks")
+
+
+def _position(pick: SquadPick) -> str:
+    try:
+        return normalize_position(pick.position)
+    except ValueError:
+        return pick.position.upper()
+
+
+def _order(picks: List[SquadPick]) -> List[SquadPick]:
+    """Goalkeepers first, then defenders, midfielders and forwards; most expensive first within each."""
+    rank = {position: i for i, position in enumerate(POSITIONS)}
+    return sorted(picks, key=lambda p: (rank.get(_position(p), len(POSITIONS)), -p.price))
+
+
+def _cell(text: str) -> str:
+    """Text for a markdown table cell: one line, no column separators."""
+    return " ".join(str(text).split()).replace("|", "/")
+
+
+def _money(amount: float) -> str:
+    return f"-€{-amount:.1f}m" if amount < 0 else f"€{amount:.1f}m"
+
+
+def _role(selection: TeamSelection, pick: SquadPick) -> str:
+    name = normalize_name(pick.name)
+    if name == normalize_name(selection.captain):
+        return "C"
+    return "VC" if name == normalize_name(selection.vice_captain) else ""
+
+
+def formation(selection: TeamSelection) -> str:
+    counts = Counter(_position(p) for p in selection.players if p.starting)
+    return "-".join(str(counts[position]) for position in POSITIONS[1:])
+
+
+def _shape_checks(selection: TeamSelection) -> List[str]:
+    """Squad size and position quotas, and the starting XI's size and formation."""
+    problems = []
+    if len(selection.players) != sum(SQUAD_QUOTAS.values()):
+        problems.append(f"{len(selection.players)} players instead of {sum(SQUAD_QUOTAS.values())}")
+    squad = Counter(_position(p) for p in selection.players)
+    for position, quota in SQUAD_QUOTAS.items():
+        if squad[position] != quota:
+            problems.append(f"{squad[position]} {position} instead of {quota}")
+
+    starting = [p for p in selection.players if p.starting]
+    xi = Counter(_position(p) for p in starting)
+    if len(starting) != XI_SIZE:
+        problems.append(f"{len(starting)} starters instead of {XI_SIZE}")
+    for position in POSITIONS:
+        if not XI_MIN[position] <= xi[position] <= XI_MAX[position]:
+            problems.append(
+                f"{xi[position]} {position} in the starting XI (allowed {XI_MIN[position]}-{XI_MAX[position]})"
+            )
+    return problems
+
+
+def squad_checks(selection: TeamSelection, budget: float) -> List[str]:
+    """Rule violations of a selection (empty if it is valid)."""
+    problems = _shape_checks(selection)
+
+    clubs = Counter(canonical_club(p.club) for p in selection.players)
+    for club, count in clubs.items():
+        if count > MAX_PER_CLUB:
+            problems.append(f"{count} players from {club} (at most {MAX_PER_CLUB})")
+
+    cost = sum(p.price for p in selection.players)
+    if cost > budget + 1e-6:
+        problems.append(f"squad costs {_money(cost)}, over the {_money(budget)} budget")
+    starters = {normalize_name(p.name) for p in selection.players if p.starting}
+    for role, name in (("Captain", selection.captain), ("Vice-captain", selection.vice_captain)):
+        if normalize_name(name) not in starters:
+            problems.append(f"{role} {name} is not in the starting XI")
+    return problems
+
+
+def _budget(inputs: Mapping[str, str]) -> float:
+    try:
+        return float(inputs.get("budget") or 100)
+    except ValueError:
+        return 100.0
+
+
+def render_team_report(selection: TeamSelection, inputs: Mapping[str, str]) -> str:
+    """Markdown team report: the tables come from the selection, the narrative from the agent's fields."""
+    budget = _budget(inputs)
+    picks = _order(selection.players)
+    cost = sum(p.price for p in picks)
+
+    def table(rows: List[SquadPick]) -> List[str]:
+        lines = ["| Pos | Player | Club | Price | Role |", "|---|---|---|---:|---|"]
+        lines += [
+            f"| {_position(p)} | {_cell(p.name)} | {_cell(p.club)} | {_money(p.price)} | {_role(selection, p)} |"
+            for p in rows
+        ]
+        return lines
+
+    header = f"# Champions League Fantasy Team - Gameweek {inputs.get('matchweek', '?')}"
+    lines = [
+        header,
+        "",
+        f"Season {inputs.get('current_season', '')}, {inputs.get('current_date', '')}"
+        + (f", profile {inputs['profile']}" if inputs.get("profile") else ""),
+        "",
+        "## Overview",
+        "",
+        selection.summary.strip(),
+        "",
+        f"## Starting XI ({formation(selection)})",
+        "",
+        *table([p for p in picks if p.starting]),
+        "",
+        "## Bench",
+        "",
+        *table([p for p in picks if not p.starting]),
+        "",
+        "## Captaincy",
+        "",
+        f"- Captain: {selection.captain}",
+        f"- Vice-captain: {selection.vice_captain}",
+        "",
+        "## Budget",
+        "",
+        "| Position | Players | Spend |",
+        "|---|---:|---:|",
+    ]
+    for position in POSITIONS:
+        group = [p for p in picks if _position(p) == position]
+        lines.append(f"| {position} | {len(group)} | {_money(sum(p.price for p in group))} |")
+    lines += [
+        f"| **Total** | **{len(picks)}** | **{_money(cost)}** |",
+        "",
+        f"Remaining budget: {_money(budget - cost)} of {_money(budget)}.",
+        "",
+        "## Squad Checks",
+        "",
+    ]
+    problems = squad_checks(selection, budget)
+    if problems:
+        lines += [f"- ⚠️ {problem}" for problem in problems]
+    else:
+        lines.append(
+            f"- ✅ {sum(SQUAD_QUOTAS.values())} players (2 GK, 5 DEF, 5 MID, 3 FWD), valid {formation(selection)} "
+            f"XI, at most {MAX_PER_CLUB} per club, within budget"
+        )
+    lines += [
+        "",
+        "## Player Justification",
+        "",
+        "| Player | Pos | Club | Price | Why |",
+        "|---|---|---|---:|---|",
+        *[
+            f"| {_cell(p.name)} | {_position(p)} | {_cell(p.club)} | {_money(p.price)} | {_cell(p.justification)} |"
+            for p in picks
+        ],
+        "",
+        "## Transfer Strategy",
+        "",
+        selection.transfer_strategy.strip(),
+        "",
+        "## Risk Assessment",
+        "",
+        selection.risk_assessment.strip(),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def render_team_summary(selection: TeamSelection) -> str:
+    """Plain-text summary: formation and the 15 players."""
+    lines = [f"Formation: {formation(selection)}", "", "Starting XI:"]
+    picks = _order(selection.players)
+    for starting in (True, False):
+        if not starting:
+            lines += ["", "Bench:"]
+        for p in picks:
+            if p.starting == starting:
+                role = _role(selection, p)
+                lines.append(f"{_position(p)}  {p.name}{f' ({role})' if role else ''} - {p.club} - {_money(p.price)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_team_reports(
+    selection: TeamSelection,
+    inputs: Mapping[str, str],
+    directory: str = DEFAULT_REPORT_DIR,
+    latest_file: Optional[str] = LATEST_TEAM_FILE,
+) -> Dict[str, str]:
+    """
+    Write the dated team report and summary, and the latest-team file.
+
+    Returns:
+        Kind of output -> file path
+    """
+    names = {"profile": inputs.get("profile") or "default", "current_date": inputs.get("current_date") or ""}
+    report = render_team_report(selection, inputs)
+    files: List[Tuple[str, str, str]] = [
+        ("report", os.path.join(directory, TEAM_REPORT_FILE.format(**names)), report),
+        ("summary", os.path.join(directory, TEAM_SUMMARY_FILE.format(**names)), render_team_summary(selection)),
+    ]
+    if latest_file:
+        files.append(("latest", latest_file, report))
+    paths = {}
+    for kind, path, content in files:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        paths[kind] = path
+    return paths
@@ -0,0 +1,307 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import yaml
+from crewai.llms.base_llm import BaseLLM
+from crewai.utilities.llm_utils import create_llm
+
+from .context_window import WindowedLLM, call_with_stop
+
+
+ROUTING_FILE = os.path.join(os.path.dirname(__file__), "config", "model_routing.yaml")
+
+# Kinds of agent step
+TOOL_RESULT = "tool_result"
+EXTRACTION = "extraction"
+SYNTHESIS = "synthesis"
+
+# Route target meaning "the model the agent was configured with"
+AGENT_TIER = "agent"
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+ACTION_MARKER = "Action:"
+OBSERVATION_MARKER = "\nObservation:"
+# What crewai's executor appends once an agent runs out of iterations
+FORCED_FINAL_ANSWER = "MUST give your absolute best final answer"
+
+# System prompts crewai uses for structured-output conversion and transcript summaries,
+# and the one tools/records.py uses when its rule-based extractors find nothing
+EXTRACTION_PROMPT_PREFIXES = (
+    "Please convert the following text into valid JSON",
+    "You are a helpful assistant that summarizes text",
+    "Extract the following fields",
+)
+
+# Model for record extraction when no tier is routed for it
+DEFAULT_EXTRACTION_MODEL = "deepseek/deepseek-chat"
+
+# Rough characters-per-token ratio used for cost estimates
+CHARS_PER_TOKEN = 4
+
+
+def classify_step(messages: Union[str, Sequence[Dict[str, str]]]) -> str:
+    """Decide what kind of step an LLM call is from its messages."""
+    if isinstance(messages, str):
+        return SYNTHESIS
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    if system.lstrip().startswith(EXTRACTION_PROMPT_PREFIXES):
+        return EXTRACTION
+    # The executor appends each tool result to the transcript as "...\nObservation: <result>"
+    for message in messages:
+        if message.get("role") == "assistant" and OBSERVATION_MARKER in (message.get("content") or ""):
+            return TOOL_RESULT
+    return SYNTHESIS
+
+
+def forces_final_answer(messages: Union[str, Sequence[Dict[str, str]]]) -> bool:
+    """Whether the executor has told the agent to stop using tools and answer now."""
+    if isinstance(messages, str) or not messages:
+        return False
+    return FORCED_FINAL_ANSWER in (messages[-1].get("content") or "")
+
+
+@dataclass
+class TierStats:
+    calls: int = 0
+    errors: int = 0
+    fallbacks: int = 0
+    escalations: int = 0
+    seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+
+class RoutingMetrics:
+    """Per-tier call counts, latency and estimated cost, shared by every routed LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tiers: Dict[str, TierStats] = {}
+
+    def _stats(self, tier: str) -> TierStats:
+        return self.tiers.setdefault(tier, TierStats())
+
+    def record(self, tier: str, seconds: float, input_tokens: int, output_tokens: int, cost: float,
+               error: bool = False) -> None:
+        with self._lock:
+            stats = self._stats(tier)
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.seconds += seconds
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.cost += cost
+
+    def count(self, tier: str, field_name: str) -> None:
+        with self._lock:
+            stats = self._stats(tier)
+            setattr(stats, field_name, getattr(stats, field_name) + 1)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.tiers.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                tier: {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "fallbacks": s.fallbacks,
+                    "escalations": s.escalations,
+                    "mean_latency": s.seconds / s.calls if s.calls else 0.0,
+                    "total_latency": s.seconds,
+                    "input_tokens": s.input_tokens,
+                    "output_tokens": s.output_tokens,
+                    "cost": s.cost,
+                }
+                for tier, s in self.tiers.items()
+            }
+
+    def report(self) -> str:
+        """Markdown table of the metrics."""
+        lines = [
+            "| Tier | Calls | Errors | Fallbacks | Escalations | Mean latency (s) | Est. cost ($) |",
+            "|---|---:|---:|---:|---:|---:|---:|",
+        ]
+        for tier, s in sorted(self.summary().items()):
+            lines.append(
+                f"| {tier} | {s['calls']} | {s['errors']} | {s['fallbacks']} | {s['escalations']} | "
+                f"{s['mean_latency']:.2f} | {s['cost']:.4f} |"
+            )
+        return "\n".join(lines)
+
+
+routing_metrics = RoutingMetrics()
+
+
+def load_routing(path: str = ROUTING_FILE) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def routing_enabled(config: Optional[Dict[str, Any]] = None) -> bool:
+    if os.getenv("FPL_MODEL_ROUTING", "1").lower() in ("0", "false", "no"):
+        return False
+    return bool((config if config is not None else load_routing()).get("enabled", True))
+
+
+def _message_chars(messages: Union[str, Sequence[Dict[str, str]]]) -> int:
+    if isinstance(messages, str):
+        return len(messages)
+    return sum(len(m.get("content") or "") for m in messages)
+
+
+class RoutedLLM(BaseLLM):
+    """
+    LLM that sends each agent step to the model tier configured for its kind.
+
+    Steps that follow a tool result and structured extraction go to a faster
+    tier; everything else stays on the agent's own model. Final answers are
+    always written by the agent's model: a step the executor forces to be
+    final goes there directly, and a fast-tier step is stopped at
+    "Final Answer:" so one that turns out to be final is handed over after
+    a single thought line rather than a whole discarded answer. Any tier
+    failure falls back to the agent's model.
+    """
+
+    def __init__(
+        self,
+        primary: BaseLLM,
+        routes: Dict[str, str],
+        tiers: Dict[str, Dict[str, Any]],
+        metrics: RoutingMetrics = routing_metrics,
+    ):
+        super().__init__(model=primary.model, temperature=primary.temperature, stop=primary.stop)
+        self.primary = primary
+        self.routes = routes
+        self.tier_config = tiers
+        self.metrics = metrics
+        self._tier_llms: Dict[str, BaseLLM] = {}
+        self._lock = threading.Lock()
+        # Metrics for the agent's own model are reported under the tier using the same model
+        self.primary_tier = next(
+            (name for name, tier in tiers.items() if tier.get("model") == primary.model), AGENT_TIER
+        )
+
+    @property
+    def seed(self) -> Optional[int]:
+        return getattr(self.primary, "seed", None)
+
+    @seed.setter
+    def seed(self, value: Optional[int]) -> None:
+        for llm in [self.primary, *self._tier_llms.values()]:
+            if hasattr(llm, "seed"):
+                llm.seed = value
+
+    def _resolve(self, step: str) -> str:
+        tier = self.routes.get(step, AGENT_TIER)
+        if tier not in self.tier_config or self.tier_config[tier].get("model") == self.primary.model:
+            return self.primary_tier
+        return tier
+
+    def _llm(self, tier: str) -> BaseLLM:
+        if tier == self.primary_tier:
+            return self.primary
+        with self._lock:
+            llm = self._tier_llms.get(tier)
+            if llm is None:
+                llm = create_llm(self.tier_config[tier]["model"])
+                if hasattr(self.primary, "seed") and hasattr(llm, "seed"):
+                    llm.seed = self.primary.seed
+                self._tier_llms[tier] = llm
+        return llm
+
+    def _timed_call(self, tier: str, messages, stop: Sequence[str], **kwargs) -> str:
+        llm = self._llm(tier)
+        config = self.tier_config.get(tier, {})
+        input_tokens = _message_chars(messages) // CHARS_PER_TOKEN
+        start = time.perf_counter()
+        try:
+            answer = call_with_stop(llm, stop, messages, **kwargs)
+        except Exception:
+            self.metrics.record(tier, time.perf_counter() - start, input_tokens, 0, 0.0, error=True)
+            raise
+        output_tokens = len(answer or "") // CHARS_PER_TOKEN
+        cost = (
+            input_tokens * config.get("input_cost_per_million", 0.0)
+            + output_tokens * config.get("output_cost_per_million", 0.0)
+        ) / 1_000_000
+        self.metrics.record(tier, time.perf_counter() - start, input_tokens, output_tokens, cost)
+        return answer
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None,
+    ) -> Union[str, Any]:
+        kwargs = dict(
+            tools=tools, callbacks=callbacks, available_functions=available_functions,
+            from_task=from_task, from_agent=from_agent,
+        )
+        step = classify_step(messages)
+        tier = self.primary_tier if forces_final_answer(messages) else self._resolve(step)
+
+        if tier != self.primary_tier:
+            # A tool-result step may end in the final answer; stop the fast tier before it writes one
+            stop = [*self.stop, FINAL_ANSWER_MARKER] if step == TOOL_RESULT else list(self.stop)
+            try:
+                answer = self._timed_call(tier, messages, stop, **kwargs)
+            except Exception:
+                self.metrics.count(tier, "fallbacks")
+            else:
+                if not (step == TOOL_RESULT and isinstance(answer, str) and ACTION_MARKER not in answer):
+                    return answer
+                self.metrics.count(tier, "escalations")
+
+        return self._timed_call(self.primary_tier, messages, self.stop, **kwargs)
+
+    def supports_function_calling(self) -> bool:
+        return self.primary.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.primary.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.primary.get_context_window_size()
+
+
+def route_agent_llms(agents: Sequence[Any], config: Optional[Dict[str, Any]] = None) -> None:
+    """Wrap every agent's LLM in a RoutedLLM, unless routing is disabled."""
+    config = config if config is not None else load_routing()
+    if not routing_enabled(config):
+        return
+    routes = config.get("routes") or {}
+    tiers = config.get("tiers") or {}
+    for agent in agents:
+        if isinstance(agent.llm, BaseLLM) and not isinstance(agent.llm, (RoutedLLM, WindowedLLM)):
+            agent.llm = RoutedLLM(agent.llm, routes, tiers)
+
+
+_extraction_llm: Optional[BaseLLM] = None
+_extraction_lock = threading.Lock()
+
+
+def extraction_llm(config: Optional[Dict[str, Any]] = None) -> BaseLLM:
+    """
+    LLM for tool-record extraction: the model of the tier routed for
+    extraction steps, with its calls reported under that tier.
+    """
+    global _extraction_llm
+    with _extraction_lock:
+        if _extraction_llm is None:
+            config = config if config is not None else load_routing()
+            routes = config.get("routes") or {}
+            tiers = config.get("tiers") or {}
+            model = tiers.get(routes.get(EXTRACTION), {}).get("model", DEFAULT_EXTRACTION_MODEL)
+            llm = create_llm(model)
+            _extraction_llm = RoutedLLM(llm, routes, tiers) if routing_enabled(config) else llm
+        return _extraction_llm
@@ -0,0 +1,234 @@
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .crew import FplExpert
+from .entities import canonical_club
+from .invalidation import InvalidationEngine, fingerprint_items
+from .store import RecommendationStore
+from .season_calendar import next_deadline
+from .tools.custom_tool import FantasyNewsTool, InjuryReportTool
+from .tools.search_cache import search_cache, search_key
+
+
+# (hours before deadline, polling interval in minutes): the first matching row applies
+DEFAULT_POLL_SCHEDULE: Tuple[Tuple[float, float], ...] = (
+    (3, 10),
+    (12, 30),
+    (24, 60),
+    (72, 180),
+    (float("inf"), 720),
+)
+
+# Share of a club's news items that must be new before a re-run is triggered
+DEFAULT_CHANGE_THRESHOLD = 0.3
+
+# Changes further out than this are polled and cached but do not trigger a re-run
+DEFAULT_OPTIMIZE_WINDOW_HOURS = 72
+
+TEAMS_KNOWLEDGE_FILE = os.path.join("knowledge", "top_champions_league_teams.md")
+
+
+def watched_clubs(path: str = TEAMS_KNOWLEDGE_FILE) -> List[str]:
+    """
+    Clubs whose team news is polled: FPL_WATCH_CLUBS (comma separated) if set,
+    otherwise the clubs listed in the "Teams" sections of the teams knowledge file.
+    """
+    configured = os.getenv("FPL_WATCH_CLUBS")
+    if configured:
+        return _unique_clubs(club for club in configured.split(",") if club.strip())
+
+    clubs: List[str] = []
+    in_teams_section = False
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("## "):
+                    in_teams_section = "Teams" in line or "Contenders" in line
+                    continue
+                match = re.match(r"-\s+\*\*(.+?)\*\*", line.strip())
+                if in_teams_section and match:
+                    clubs.append(match.group(1))
+    except FileNotFoundError:
+        pass
+    return _unique_clubs(clubs)
+
+
+def _unique_clubs(names: Iterable[str]) -> List[str]:
+    """Canonical club names, so "PSG" and "Paris Saint-Germain" are polled once."""
+    clubs: List[str] = []
+    for name in names:
+        club = canonical_club(name)
+        if club not in clubs:
+            clubs.append(club)
+    return clubs
+
+
+def poll_interval(
+    time_to_deadline: timedelta, schedule: Sequence[Tuple[float, float]] = DEFAULT_POLL_SCHEDULE
+) -> timedelta:
+    """Polling interval for the given time left until the deadline."""
+    hours = time_to_deadline.total_seconds() / 3600
+    for max_hours, minutes in schedule:
+        if hours <= max_hours:
+            return timedelta(minutes=minutes)
+    return timedelta(minutes=schedule[-1][1])
+
+
+def _news_items(result: Any) -> Set[str]:
+    """Fingerprints of the individual news items in a Serper result."""
+    items: Set[str] = set()
+    if isinstance(result, dict):
+        for section in ("organic", "news", "topStories"):
+            for entry in result.get(section) or []:
+                text = f"{entry.get('title', '')} {entry.get('snippet', '')}".strip().lower()
+                if text:
+                    items.add(hashlib.sha1(text.encode("utf-8")).hexdigest())
+    return items
+
+
+@dataclass
+class SchedulerState:
+    """What the scheduler knew at the last crew run."""
+    matchweek: Optional[str] = None
+    last_run: Optional[datetime] = None
+    news: Dict[str, Set[str]] = field(default_factory=dict)
+    runs: int = 0
+
+
+class PreDeadlineScheduler:
+    """
+    Long-running pre-deadline mode.
+
+    Keeps one crew (and with it the shared search cache and embedded knowledge)
+    alive between runs, polls injury and lineup news for the watched clubs on a
+    schedule that tightens as the deadline approaches, and re-runs the crew
+    only when a new matchweek starts or the news has materially changed.
+    """
+
+    def __init__(
+        self,
+        build_inputs: Callable[[datetime], Dict[str, str]],
+        clubs: Optional[Sequence[str]] = None,
+        deadline_for: Callable[[datetime], datetime] = next_deadline,
+        schedule: Sequence[Tuple[float, float]] = DEFAULT_POLL_SCHEDULE,
+        change_threshold: float = DEFAULT_CHANGE_THRESHOLD,
+        optimize_window: timedelta = timedelta(hours=DEFAULT_OPTIMIZE_WINDOW_HOURS),
+        clock: Callable[[], datetime] = datetime.now,
+        engine: Optional[InvalidationEngine] = None,
+        store: Optional[RecommendationStore] = None,
+    ):
+        self.build_inputs = build_inputs
+        self.clubs = list(clubs) if clubs is not None else watched_clubs()
+        self.deadline_for = deadline_for
+        self.schedule = schedule
+        self.change_threshold = change_threshold
+        self.optimize_window = optimize_window
+        self.clock = clock
+        self.state = SchedulerState()
+        self.engine = engine or InvalidationEngine()
+        self.store = store or RecommendationStore()
+        self.signals: Dict[str, str] = {}
+        self.injury_tool = InjuryReportTool()
+        self.news_tool = FantasyNewsTool()
+        self._stop = threading.Event()
+        self._crew = None
+
+    @property
+    def crew(self):
+        # Built once and copied per run, so agents, tools and knowledge stay warm
+        if self._crew is None:
+            self._crew = FplExpert().crew()
+        return self._crew
+
+    def warm_up(self) -> None:
+        """Build the crew (and embed knowledge) ahead of the first deadline window."""
+        _ = self.crew
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def prefetch(self) -> Dict[str, Set[str]]:
+        """
+        Fetch fresh injury and predicted-lineup news for every watched club.
+        Results land in the shared search cache, so the next crew run reads
+        them without searching again. Also updates ``signals``, the per-tool
+        fingerprints that decide which tasks the next run has to redo.
+        """
+        news: Dict[str, Set[str]] = {}
+        injuries: Set[str] = set()
+        lineups: Set[str] = set()
+        with search_cache.refreshing():
+            for club in self.clubs:
+                lineup_topic = f"{club} predicted lineup"
+                self.injury_tool._run(club)
+                self.news_tool._run(lineup_topic)
+                club_injuries = _news_items(search_cache.get(search_key(self.injury_tool.search_query(club))))
+                club_lineups = _news_items(search_cache.get(search_key(self.news_tool.search_query(lineup_topic))))
+                news[club] = club_injuries | club_lineups
+                injuries |= club_injuries
+                lineups |= club_lineups
+        self.signals = {
+            self.injury_tool.name: fingerprint_items(injuries),
+            self.news_tool.name: fingerprint_items(lineups),
+        }
+        return news
+
+    def changed_clubs(self, news: Dict[str, Set[str]]) -> List[str]:
+        """Clubs whose share of new news items reaches the change threshold."""
+        changed = []
+        for club, items in news.items():
+            previous = self.state.news.get(club, set())
+            if not items:
+                continue
+            if len(items - previous) / len(items) >= self.change_threshold:
+                changed.append(club)
+        return changed
+
+    def should_run(self, inputs: Dict[str, str], changed: Sequence[str], deadline: datetime, now: datetime) -> bool:
+        if self.state.last_run is None or inputs.get("matchweek") != self.state.matchweek:
+            return True
+        return bool(changed) and deadline - now <= self.optimize_window
+
+    def run_crew(self, inputs: Dict[str, str]) -> Any:
+        # Only tasks fed by changed inputs or news (and their dependants) are re-run
+        output = self.engine.kickoff(self.crew.copy(), inputs=inputs, signals=self.signals)
+        # Recorded so the HTTP API can serve this run's recommendations
+        self.store.save_run(inputs, output)
+        return output
+
+    def tick(self) -> timedelta:
+        """One poll cycle. Returns how long to wait before the next one."""
+        now = self.clock()
+        deadline = self.deadline_for(now)
+        inputs = self.build_inputs(now)
+
+        news = self.prefetch()
+        changed = self.changed_clubs(news)
+        if self.should_run(inputs, changed, deadline, now):
+            if inputs.get("matchweek") != self.state.matchweek:
+                reason = "new matchweek"
+            else:
+                reason = f"news changed for {', '.join(changed)}"
+            print(f"[{now:%Y-%m-%d %H:%M}] Re-optimizing ({reason}); deadline {deadline:%Y-%m-%d %H:%M}")
+            self.run_crew(inputs)
+            self.state.matchweek = inputs.get("matchweek")
+            self.state.last_run = now
+            self.state.news = news
+            self.state.runs += 1
+        else:
+            print(f"[{now:%Y-%m-%d %H:%M}] No material change; deadline {deadline:%Y-%m-%d %H:%M}")
+
+        return poll_interval(deadline - now, self.schedule)
+
+    def run_forever(self) -> None:
+        print(f"Pre-deadline scheduler watching {len(self.clubs)} clubs")
+        self.warm_up()
+        while not self._stop.is_set():
+            wait = self.tick()
+            print(f"Next check in {int(wait.total_seconds() // 60)} minutes")
+            self._stop.wait(wait.total_seconds())
@@ -0,0 +1,74 @@
+from typing import Tuple
+
+import numpy as np
+
+from .player_table import POSITIONS
+
+
+# Champions League Fantasy scoring (see knowledge/champions_league_fantasy_rules.md).
+# Arrays are indexed by position code: GK, DEF, MID, FWD.
+APPEARANCE_POINTS = 1
+SIXTY_MINUTES_POINTS = 2
+GOAL_POINTS = np.array([6, 6, 5, 4], dtype=np.int16)
+ASSIST_POINTS = 3
+CLEAN_SHEET_POINTS = np.array([1, 1, 1, 0], dtype=np.int16)
+CONCEDED_PENALTY_PER_TWO = np.array([1, 1, 0, 0], dtype=np.int16)
+BALL_RECOVERIES_PER_POINT = 3
+SAVES_PER_POINT = 3
+YELLOW_CARD_POINTS = -1
+RED_CARD_POINTS = -3
+PLAYER_OF_MATCH_POINTS = 3
+
+CAPTAIN_MULTIPLIER = 2.0
+VICE_CAPTAIN_MULTIPLIER = 1.5
+
+FREE_TRANSFERS_PER_GAMEWEEK = 1
+TRANSFER_HIT = 4
+
+
+def captain_multipliers(captain_played: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Multipliers on the captain's and the vice-captain's points. The captain
+    scores double and the vice-captain 1.5x; when the captain does not play,
+    the vice-captain takes over the double.
+
+    Args:
+        captain_played: Whether each team's captain played (bool array or scalar)
+
+    Returns:
+        (captain multipliers, vice-captain multipliers)
+    """
+    captain_played = np.asarray(captain_played, dtype=bool)
+    return (
+        np.where(captain_played, CAPTAIN_MULTIPLIER, 1.0),
+        np.where(captain_played, VICE_CAPTAIN_MULTIPLIER, CAPTAIN_MULTIPLIER),
+    )
+
+
+def score_stats(stats: np.ndarray) -> np.ndarray:
+    """
+    Fantasy points for each row of a history.STATS_DTYPE array, computed from
+    the raw match stats with the Champions League Fantasy scoring rules.
+
+    Args:
+        stats: Structured array (or memory-mapped slice) of per-gameweek stats
+
+    Returns:
+        int16 array of points, one per row
+    """
+    position = stats["position"].astype(np.intp)
+    minutes = stats["minutes"].astype(np.int16)
+    played = minutes > 0
+
+    points = np.where(played, APPEARANCE_POINTS, 0).astype(np.int16)
+    points += np.where(minutes >= 60, SIXTY_MINUTES_POINTS - APPEARANCE_POINTS, 0).astype(np.int16)
+    points += GOAL_POINTS[position] * stats["goals"].astype(np.int16)
+    points += ASSIST_POINTS * stats["assists"].astype(np.int16)
+    points += CLEAN_SHEET_POINTS[position] * (stats["clean_sheet"].astype(np.int16) * (minutes >= 60))
+    points -= CONCEDED_PENALTY_PER_TWO[position] * (stats["goals_conceded"].astype(np.int16) // 2)
+    points += stats["ball_recoveries"].astype(np.int16) // BALL_RECOVERIES_PER_POINT
+    points += np.where(position == POSITIONS.index("GK"), stats["saves"].astype(np.int16) // SAVES_PER_POINT, 0)
+    points += YELLOW_CARD_POINTS * stats["yellow_cards"].astype(np.int16)
+    points += RED_CARD_POINTS * stats["red_cards"].astype(np.int16)
+    points += PLAYER_OF_MATCH_POINTS * stats["player_of_match"].astype(np.int16)
+    return points.astype(np.int16)
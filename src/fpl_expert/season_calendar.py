@@ -0,0 +1,228 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import yaml
+
+
+CALENDAR_FILE = os.path.join(os.path.dirname(__file__), "config", "calendar.yaml")
+
+LEAGUE_STAGE = "league"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Gameweek:
+    """One Champions League Fantasy gameweek."""
+    season: str
+    number: int
+    stage: str
+    start: date
+    end: date
+    deadline: datetime   # local time, naive like the rest of the code base
+    estimated: bool = False   # projected from another season rather than configured
+
+
+def football_season(when: Union[date, datetime]) -> str:
+    """
+    Season label ("2025/26") for a date. A season runs from August 1st until
+    the following July 31st.
+    """
+    start_year = when.year if when.month >= 8 else when.year - 1
+    return f"{start_year}/{str(start_year + 1)[-2:]}"
+
+
+@lru_cache(maxsize=32)
+def _season_for_day(day: date) -> str:
+    return football_season(day)
+
+
+def season_of(when: Optional[datetime] = None) -> str:
+    """Season label for ``when`` (defaults to now), cached per day."""
+    return _season_for_day((when or datetime.now()).date())
+
+
+def _season_start_year(season: str) -> int:
+    return int(season[:4])
+
+
+def _local(deadline: str) -> datetime:
+    parsed = datetime.fromisoformat(deadline)
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+class SeasonCalendar:
+    """
+    Gameweek dates and deadlines per season.
+
+    Configured seasons come from config/calendar.yaml; any other season is
+    projected from the nearest configured one by shifting it a whole number of
+    weeks, so matches stay on the same weekdays. Per-season gameweek lists and
+    the sorted arrays used for bulk date lookups are built once and cached.
+    """
+
+    def __init__(self, path: str = CALENDAR_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        self._configured: Dict[str, List[Gameweek]] = {
+            str(season): [
+                Gameweek(
+                    season=str(season),
+                    number=int(entry["gameweek"]),
+                    stage=entry["stage"],
+                    start=entry["start"],
+                    end=entry["end"],
+                    deadline=_local(str(entry["deadline"])),
+                )
+                for entry in entries
+            ]
+            for season, entries in config.items()
+        }
+        self._projected: Dict[str, List[Gameweek]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def configured_seasons(self) -> List[str]:
+        return sorted(self._configured)
+
+    def gameweeks(self, season: str) -> List[Gameweek]:
+        """Gameweeks of ``season`` in order."""
+        if season in self._configured:
+            return self._configured[season]
+        with self._lock:
+            if season not in self._projected:
+                self._projected[season] = self._project(season)
+            return self._projected[season]
+
+    def _project(self, season: str) -> List[Gameweek]:
+        if not self._configured:
+            raise KeyError("No seasons configured in the calendar")
+        year = _season_start_year(season)
+        source = min(self._configured, key=lambda s: abs(_season_start_year(s) - year))
+        years = year - _season_start_year(source)
+        # Whole weeks closest to the number of years between the seasons
+        shift = timedelta(weeks=round(years * 365.2425 / 7))
+        logger.warning(
+            "Season %s is not in %s; using %s's gameweek dates shifted by %d weeks",
+            season, os.path.basename(CALENDAR_FILE), source, shift.days // 7,
+        )
+        return [
+            replace(
+                gw, season=season, start=gw.start + shift, end=gw.end + shift,
+                deadline=gw.deadline + shift, estimated=True,
+            )
+            for gw in self._configured[source]
+        ]
+
+    def gameweek(self, season: str, number: int) -> Gameweek:
+        for gw in self.gameweeks(season):
+            if gw.number == number:
+                return gw
+        raise KeyError(f"No gameweek {number} in season {season}")
+
+    def league_phase(self, season: str) -> List[Gameweek]:
+        return [gw for gw in self.gameweeks(season) if gw.stage == LEAGUE_STAGE]
+
+    def upcoming_gameweek(self, when: Optional[datetime] = None) -> Gameweek:
+        """The first gameweek whose deadline is after ``when`` (defaults to now)."""
+        when = when or datetime.now()
+        season = season_of(when)
+        for gw in self.gameweeks(season):
+            if gw.deadline > when:
+                return gw
+        # Only between the final and August 1st: the next season's first gameweek
+        next_season = football_season(date(_season_start_year(season) + 1, 8, 1))
+        for gw in self.gameweeks(next_season):
+            if gw.deadline > when:
+                return gw
+        return self.gameweeks(next_season)[-1]
+
+    def matchweek(self, when: Optional[datetime] = None) -> int:
+        """
+        Gameweek of the current season to pick a team for at ``when``: the next
+        one with an open deadline, or the last one once the season is over.
+        """
+        when = when or datetime.now()
+        season = season_of(when)
+        upcoming = self.upcoming_gameweek(when)
+        if upcoming.season == season:
+            return upcoming.number
+        return self.gameweeks(season)[-1].number
+
+    def next_deadline(self, when: Optional[datetime] = None) -> datetime:
+        return self.upcoming_gameweek(when).deadline
+
+    def _starts(self, season: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Gameweek start dates (sorted) and numbers of a season, built once."""
+        cached = self._arrays.get(season)
+        if cached is None:
+            gameweeks = sorted(self.gameweeks(season), key=lambda gw: gw.start)
+            cached = (
+                np.array([gw.start for gw in gameweeks], dtype="datetime64[D]"),
+                np.array([gw.number for gw in gameweeks], dtype=np.int16),
+            )
+            self._arrays[season] = cached
+        return cached
+
+    def locate(
+        self, dates: Union[Sequence, np.ndarray], season: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map match dates to gameweeks in one vectorised pass per season.
+
+        Each date belongs to the latest gameweek of its season that started on
+        or before it; dates before the season's first gameweek map to 0.
+
+        Args:
+            dates: Dates (anything numpy can turn into datetime64[D])
+            season: Season all the dates belong to (defaults to each date's own season)
+
+        Returns:
+            (season labels, gameweek numbers), one entry per date
+        """
+        days = np.atleast_1d(np.asarray(dates, dtype="datetime64[D]"))
+        if season is not None:
+            start_years = np.full(len(days), _season_start_year(season))
+        else:
+            years = days.astype("datetime64[Y]").astype(int) + 1970
+            months = days.astype("datetime64[M]").astype(int) % 12 + 1
+            start_years = np.where(months >= 8, years, years - 1)
+
+        labels = np.empty(len(days), dtype=object)
+        numbers = np.zeros(len(days), dtype=np.int16)
+        for year in np.unique(start_years):
+            label = season if season is not None else football_season(date(int(year), 8, 1))
+            mask = start_years == year
+            starts, season_numbers = self._starts(label)
+            positions = np.searchsorted(starts, days[mask], side="right") - 1
+            labels[mask] = label
+            numbers[mask] = np.where(positions >= 0, season_numbers[np.clip(positions, 0, None)], 0)
+        return labels, numbers
+
+
+_calendar: Optional[SeasonCalendar] = None
+_calendar_lock = threading.Lock()
+
+
+def season_calendar() -> SeasonCalendar:
+    """Process-wide calendar loaded from config/calendar.yaml."""
+    global _calendar
+    with _calendar_lock:
+        if _calendar is None:
+            _calendar = SeasonCalendar()
+        return _calendar
+
+
+def current_matchweek(when: Optional[datetime] = None) -> int:
+    return season_calendar().matchweek(when)
+
+
+def next_deadline(when: Optional[datetime] = None) -> datetime:
+    return season_calendar().next_deadline(when)
@@ -0,0 +1,314 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional
+
+
+DEFAULT_STORE_PATH = os.path.join("output", "state", "fpl_expert.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created TEXT NOT NULL,
+    season TEXT,
+    matchweek TEXT,
+    budget TEXT,
+    profile TEXT,
+    inputs TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_outputs (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    task TEXT NOT NULL,
+    agent TEXT,
+    raw TEXT NOT NULL,
+    json TEXT,
+    PRIMARY KEY (run_id, task)
+);
+CREATE INDEX IF NOT EXISTS runs_lookup ON runs (season, matchweek, budget, profile);
+CREATE TABLE IF NOT EXISTS tool_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created TEXT NOT NULL,
+    tool TEXT,
+    kind TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    season TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tool_records_lookup ON tool_records (kind, subject, season);
+CREATE TABLE IF NOT EXISTS price_features (
+    season TEXT NOT NULL,
+    player_id INTEGER NOT NULL,
+    features TEXT NOT NULL,
+    PRIMARY KEY (season, player_id)
+);
+CREATE TABLE IF NOT EXISTS price_state (
+    season TEXT PRIMARY KEY,
+    updated TEXT NOT NULL,
+    gameweek INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    model TEXT
+);
+"""
+
+
+def default_store_path() -> str:
+    return os.getenv("FPL_STORE_PATH", DEFAULT_STORE_PATH)
+
+
+class RecommendationStore:
+    """
+    SQLite store of crew runs, their per-task outputs and the typed records
+    the search tools extract.
+
+    Anything that runs the crew (the scheduler, the HTTP API) records the
+    outputs here, so recommendations can be served later by season, matchweek,
+    budget and profile without running the crew again. Safe to share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_store_path()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+            # Stores written before save_record replaced rows kept every extraction
+            self._conn.execute(
+                "DELETE FROM tool_records WHERE id NOT IN "
+                "(SELECT MAX(id) FROM tool_records GROUP BY kind, subject, tool, season)"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def save_run(self, inputs: Mapping[str, Any], output: Any) -> int:
+        """
+        Record a crew run.
+
+        Args:
+            inputs: Inputs the crew ran with
+            output: The CrewOutput of the run
+
+        Returns:
+            The run id
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (created, season, matchweek, budget, profile, inputs) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.now().isoformat(timespec="seconds"),
+                    inputs.get("current_season"),
+                    str(inputs.get("matchweek")) if inputs.get("matchweek") is not None else None,
+                    str(inputs.get("budget")) if inputs.get("budget") is not None else None,
+                    inputs.get("profile"),
+                    json.dumps(dict(inputs), default=str),
+                ),
+            )
+            run_id = int(cursor.lastrowid or 0)
+            for task_output in output.tasks_output:
+                if task_output is None:
+                    continue
+                structured = task_output.json_dict
+                if structured is None and task_output.pydantic is not None:
+                    structured = task_output.pydantic.model_dump()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO task_outputs (run_id, task, agent, raw, json) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        run_id,
+                        task_output.name,
+                        task_output.agent,
+                        task_output.raw,
+                        json.dumps(structured) if structured is not None else None,
+                    ),
+                )
+        return run_id
+
+    def latest_task_output(
+        self,
+        task: str,
+        season: Optional[str] = None,
+        matchweek: Optional[str] = None,
+        budget: Optional[str] = None,
+        profile: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Most recent stored output of ``task``, optionally restricted to a
+        season, matchweek, budget and manager profile. Returns None if nothing matches.
+        """
+        query = (
+            "SELECT r.id, r.created, r.season, r.matchweek, r.budget, r.profile, t.agent, t.raw, t.json "
+            "FROM task_outputs t JOIN runs r ON r.id = t.run_id WHERE t.task = ?"
+        )
+        params: List[Any] = [task]
+        filters = (("season", season), ("matchweek", matchweek), ("budget", budget), ("profile", profile))
+        for column, value in filters:
+            if value is not None:
+                query += f" AND r.{column} = ?"
+                params.append(str(value))
+        query += " ORDER BY r.id DESC LIMIT 1"
+
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+        return {
+            "run_id": row["id"],
+            "created": row["created"],
+            "season": row["season"],
+            "matchweek": row["matchweek"],
+            "budget": row["budget"],
+            "profile": row["profile"],
+            "agent": row["agent"],
+            "raw": row["raw"],
+            "json": json.loads(row["json"]) if row["json"] else None,
+        }
+
+    def save_record(self, kind: str, subject: str, season: Optional[str], record: Mapping[str, Any],
+                    tool: Optional[str] = None) -> None:
+        """
+        Record a typed tool record (see tools/records.py), replacing the one
+        ``tool`` last saved for the same subject and season, so the table holds
+        one row per (kind, subject, tool, season). Subjects are matched case-insensitively.
+        """
+        with self._lock, self._conn:
+            # Delete and insert rather than update: a new id tells readers (records_version) it changed
+            self._conn.execute(
+                "DELETE FROM tool_records WHERE kind = ? AND subject = ? AND tool IS ? AND season IS ?",
+                (kind, subject.lower(), tool, season),
+            )
+            self._conn.execute(
+                "INSERT INTO tool_records (created, tool, kind, subject, season, record) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.now().isoformat(timespec="seconds"),
+                    tool,
+                    kind,
+                    subject.lower(),
+                    season,
+                    json.dumps(dict(record), default=str),
+                ),
+            )
+
+    def latest_records(self, kind: str, subject: str, season: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent record of ``subject`` from each tool, newest first."""
+        query = (
+            "SELECT tool, record FROM tool_records WHERE id IN ("
+            "SELECT MAX(id) FROM tool_records WHERE kind = ? AND subject = ?"
+        )
+        params: List[Any] = [kind, subject.lower()]
+        if season is not None:
+            query += " AND season = ?"
+            params.append(season)
+        query += " GROUP BY tool) ORDER BY id DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [{"tool": row["tool"], **json.loads(row["record"])} for row in rows]
+
+    def merged_record(self, kind: str, subject: str, season: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        One record for ``subject`` combining every tool's latest record: each
+        field takes the newest value that is set. Returns None if nothing is stored.
+        """
+        records = self.latest_records(kind, subject, season)
+        if not records:
+            return None
+        merged: Dict[str, Any] = {}
+        for record in reversed(records):
+            merged.update({key: value for key, value in record.items() if value not in (None, [])})
+        merged.pop("tool", None)
+        merged["sources"] = [source for record in records for source in record.get("sources") or []]
+        return merged
+
+    def subject_records(self, kind: str, season: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest record of every subject of ``kind`` (from any tool), with ``subject`` and ``created``, oldest first."""
+        query = (
+            "SELECT subject, created, record FROM tool_records "
+            "WHERE id IN (SELECT MAX(id) FROM tool_records WHERE kind = ?"
+        )
+        params: List[Any] = [kind]
+        if season is not None:
+            query += " AND season = ?"
+            params.append(season)
+        query += " GROUP BY subject) ORDER BY id"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [{"subject": row["subject"], **json.loads(row["record"]), "created": row["created"]} for row in rows]
+
+    def records_version(self, kinds: List[str], season: Optional[str] = None) -> int:
+        """Id of the newest record of any of ``kinds``: changes whenever one of them is saved."""
+        query = f"SELECT MAX(id) FROM tool_records WHERE kind IN ({', '.join('?' * len(kinds))})"
+        params: List[Any] = list(kinds)
+        if season is not None:
+            query += " AND season = ?"
+            params.append(season)
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return row[0] or 0
+
+    def price_state(self, season: str) -> Optional[Dict[str, Any]]:
+        """Last gameweek and archive row count folded into the price features of ``season``, and the model."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT updated, gameweek, rows, model FROM price_state WHERE season = ?", (season,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "updated": row["updated"],
+            "gameweek": row["gameweek"],
+            "rows": row["rows"],
+            "model": json.loads(row["model"]) if row["model"] else None,
+        }
+
+    def price_features(self, season: str) -> Dict[int, Dict[str, float]]:
+        """Per-player price-change features of ``season`` (see price_changes.py)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT player_id, features FROM price_features WHERE season = ?", (season,)
+            ).fetchall()
+        return {row["player_id"]: json.loads(row["features"]) for row in rows}
+
+    def save_price_features(self, season: str, gameweek: int, rows: int,
+                            features: Mapping[int, Mapping[str, float]], model: Optional[Mapping[str, Any]] = None,
+                            replace: bool = False) -> None:
+        """
+        Upsert per-player price-change features and the state they were folded up to.
+
+        Args:
+            replace: Drop the season's existing features first (after a full rebuild)
+        """
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM price_features WHERE season = ?", (season,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO price_features (season, player_id, features) VALUES (?, ?, ?)",
+                [(season, int(pid), json.dumps(dict(values))) for pid, values in features.items()],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO price_state (season, updated, gameweek, rows, model) VALUES (?, ?, ?, ?, ?)",
+                (
+                    season,
+                    datetime.now().isoformat(timespec="seconds"),
+                    gameweek,
+                    rows,
+                    json.dumps(dict(model)) if model is not None else None,
+                ),
+            )
+
+
+_default_store: Optional[RecommendationStore] = None
+_default_store_lock = threading.Lock()
+
+
+def default_store() -> RecommendationStore:
+    """Process-wide store at ``default_store_path()``, opened on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = RecommendationStore()
+        return _default_store
@@ -1,39 +1,20 @@
 from crewai.tools import BaseTool
 from crewai_tools import SerperDevTool
-from typing import Type, Dict, List
-from pydantic import BaseModel, Field
+from typing import Type, Dict, List, Optional
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime, timedelta
 import json
 import os
 
-
-def get_football_season(current_date: datetime = None) -> str:
-    """
-    Calculate the current football season based on the football calendar.
-    Season runs from August 1st to June 10th of the following year.
-    
-    Args:
-        current_date: Date to calculate season for (defaults to now)
-    
-    Returns:
-        String in format "YYYY/YY" (e.g., "2025/26")
-    """
-    if current_date is None:
-        current_date = datetime.now()
-    
-    # If we're between August 1st and June 10th, we're in the season that started in August
-    if current_date.month >= 8:  # August to December
-        season_start_year = current_date.year
-        season_end_year = current_date.year + 1
-    elif current_date.month <= 6 and current_date.day <= 10:  # January to June 10th
-        season_start_year = current_date.year - 1
-        season_end_year = current_date.year
-    else:  # June 11th to July 31st (off-season)
-        # During off-season, we're still in the previous season until August 1st
-        season_start_year = current_date.year - 1
-        season_end_year = current_date.year
-    
-    return f"{season_start_year}/{str(season_end_year)[-2:]}"
+from ..entities import canonical_club, canonical_player, entity_index
+from ..lineup import lineup_model
+from ..output_index import output_index
+from ..ownership import DEFAULT_RIVALS, build_field, format_impacts
+from ..price_changes import filter_predictions, format_predictions, price_predictor
+from ..season_calendar import season_of
+from ..store import default_store
+from .records import NewsRecord, PlayerRecord, TeamNewsRecord, extract_record
+from .search_cache import CachedSerperDevTool
 
 
 class PlayerStatsInput(BaseModel):
@@ -52,19 +33,34 @@ class PlayerStatsTool(BaseTool):
 
     def __init__(self):
         super().__init__()
-        self.serper_tool = SerperDevTool()
+        self.serper_tool = CachedSerperDevTool()
 
-    def _run(self, player_name: str, team_name: str) -> str:
+    def search_query(self, player_name: str, team_name: str, now: Optional[datetime] = None) -> str:
+        player_name = canonical_player(player_name, team_name)
+        team_name = canonical_club(team_name)
         # Use current date for relevant search context
-        current_date = datetime.now()
-        current_season = get_football_season(current_date)
+        current_date = now or datetime.now()
+        current_season = season_of(current_date)
         
         # Use Serper to search for player statistics with current season context and team verification
-        search_query = f"{player_name} current team {current_season} season Champions League Fantasy stats goals assists form gameweek points recent matches {current_date.strftime('%B %Y')} transfer news"
+        return f"{player_name} current team {current_season} season Champions League Fantasy stats goals assists form gameweek points recent matches {current_date.strftime('%B %Y')} transfer news"
+
+    def record(self, player_name: str, team_name: str, now: Optional[datetime] = None) -> PlayerRecord:
+        """Typed statistics record for the player, extracted from the search results."""
+        now = now or datetime.now()
+        search_result = self.serper_tool.run(search_query=self.search_query(player_name, team_name, now))
+        return extract_record(
+            PlayerRecord, search_result, canonical_player(player_name, team_name), season_of(now),
+            tool=self.name, team=canonical_club(team_name),
+        )
+
+    def _run(self, player_name: str, team_name: str) -> str:
+        now = datetime.now()
+        current_season = season_of(now)
         
         try:
-            search_result = self.serper_tool.run(search_query=search_query)
-            return f"Player statistics search results for {player_name} ({team_name}) - {current_season} season:\n{search_result}"
+            record = self.record(player_name, team_name, now)
+            return f"Player statistics search results for {player_name} ({team_name}) - {current_season} season:\n{record.to_prompt()}"
         except Exception as e:
             return f"Error searching for {player_name} stats: {str(e)}"
 
@@ -85,20 +81,32 @@ class FixtureAnalysisTool(BaseTool):
 
     def __init__(self):
         super().__init__()
-        self.serper_tool = SerperDevTool()
+        self.serper_tool = CachedSerperDevTool()
 
-    def _run(self, team_name: str, num_fixtures: int = 3) -> str:
+    def search_query(self, team_name: str, num_fixtures: int = 3, now: Optional[datetime] = None) -> str:
+        team_name = canonical_club(team_name)
         # Get current date and season context
-        current_date = datetime.now()
-        current_season = get_football_season(current_date)
-        next_week = current_date + timedelta(days=7)
+        current_date = now or datetime.now()
+        current_season = season_of(current_date)
         
         # Search for upcoming fixtures with current date context and team verification
-        search_query = f"{team_name} current squad {current_season} season Champions League Fantasy upcoming fixtures gameweek next {num_fixtures} matches {current_date.strftime('%B %Y')} difficulty schedule transfer news"
+        return f"{team_name} current squad {current_season} season Champions League Fantasy upcoming fixtures gameweek next {num_fixtures} matches {current_date.strftime('%B %Y')} difficulty schedule transfer news"
+
+    def record(self, team_name: str, num_fixtures: int = 3, now: Optional[datetime] = None) -> TeamNewsRecord:
+        """Typed fixture record (upcoming opponents) for the team."""
+        now = now or datetime.now()
+        search_result = self.serper_tool.run(search_query=self.search_query(team_name, num_fixtures, now))
+        return extract_record(
+            TeamNewsRecord, search_result, canonical_club(team_name), season_of(now), tool=self.name,
+        )
+
+    def _run(self, team_name: str, num_fixtures: int = 3) -> str:
+        now = datetime.now()
+        current_season = season_of(now)
         
         try:
-            search_result = self.serper_tool.run(search_query=search_query)
-            return f"Fixture analysis for {team_name} ({current_season} season):\n{search_result}"
+            record = self.record(team_name, num_fixtures, now)
+            return f"Fixture analysis for {team_name} ({current_season} season):\n{record.to_prompt()}"
         except Exception as e:
             return f"Error searching for {team_name} fixtures: {str(e)}"
 
@@ -118,19 +126,32 @@ class OwnershipAnalysisTool(BaseTool):
 
     def __init__(self):
         super().__init__()
-        self.serper_tool = SerperDevTool()
+        self.serper_tool = CachedSerperDevTool()
 
-    def _run(self, player_name: str) -> str:
+    def search_query(self, player_name: str, now: Optional[datetime] = None) -> str:
+        player_name = canonical_player(player_name)
         # Get current date for timely search context
-        current_date = datetime.now()
-        current_season = get_football_season(current_date)
+        current_date = now or datetime.now()
+        current_season = season_of(current_date)
         
         # Search for ownership data with current context
-        search_query = f"{player_name} Champions League Fantasy ownership percentage popular picks differential gameweek {current_season} {current_date.strftime('%B %Y')}"
+        return f"{player_name} Champions League Fantasy ownership percentage popular picks differential gameweek {current_season} {current_date.strftime('%B %Y')}"
+
+    def record(self, player_name: str, now: Optional[datetime] = None) -> PlayerRecord:
+        """Typed ownership record (ownership %, price) for the player."""
+        now = now or datetime.now()
+        search_result = self.serper_tool.run(search_query=self.search_query(player_name, now))
+        return extract_record(
+            PlayerRecord, search_result, canonical_player(player_name), season_of(now), tool=self.name,
+        )
+
+    def _run(self, player_name: str) -> str:
+        now = datetime.now()
+        current_season = season_of(now)
         
         try:
-            search_result = self.serper_tool.run(search_query=search_query)
-            return f"Ownership analysis for {player_name} ({current_season} season):\n{search_result}"
+            record = self.record(player_name, now)
+            return f"Ownership analysis for {player_name} ({current_season} season):\n{record.to_prompt()}"
         except Exception as e:
             return f"Error searching for {player_name} ownership data: {str(e)}"
 
@@ -151,20 +172,33 @@ class FormAnalysisTool(BaseTool):
 
     def __init__(self):
         super().__init__()
-        self.serper_tool = SerperDevTool()
+        self.serper_tool = CachedSerperDevTool()
 
-    def _run(self, player_name: str, games_back: int = 5) -> str:
+    def search_query(self, player_name: str, games_back: int = 5, now: Optional[datetime] = None) -> str:
+        player_name = canonical_player(player_name)
         # Get current date for recent form context
-        current_date = datetime.now()
-        current_season = get_football_season(current_date)
+        current_date = now or datetime.now()
+        current_season = season_of(current_date)
         last_month = (current_date - timedelta(days=30)).strftime('%B')
         
         # Search for recent form with current date context
-        search_query = f"{player_name} recent form last {games_back} games Champions League Fantasy {current_season} goals assists gameweek points {last_month} {current_date.strftime('%B')}"
+        return f"{player_name} recent form last {games_back} games Champions League Fantasy {current_season} goals assists gameweek points {last_month} {current_date.strftime('%B')}"
+
+    def record(self, player_name: str, games_back: int = 5, now: Optional[datetime] = None) -> PlayerRecord:
+        """Typed recent-form record for the player."""
+        now = now or datetime.now()
+        search_result = self.serper_tool.run(search_query=self.search_query(player_name, games_back, now))
+        return extract_record(
+            PlayerRecord, search_result, canonical_player(player_name), season_of(now), tool=self.name,
+        )
+
+    def _run(self, player_name: str, games_back: int = 5) -> str:
+        now = datetime.now()
+        current_season = season_of(now)
         
         try:
-            search_result = self.serper_tool.run(search_query=search_query)
-            return f"Form analysis for {player_name} (last {games_back} games, {current_season} season):\n{search_result}"
+            record = self.record(player_name, games_back, now)
+            return f"Form analysis for {player_name} (last {games_back} games, {current_season} season):\n{record.to_prompt()}"
         except Exception as e:
             return f"Error searching for {player_name} form data: {str(e)}"
 
@@ -184,20 +218,31 @@ class FantasyNewsTool(BaseTool):
 
     def __init__(self):
         super().__init__()
-        self.serper_tool = SerperDevTool()
+        self.serper_tool = CachedSerperDevTool()
 
-    def _run(self, topic: str) -> str:
+    def search_query(self, topic: str, now: Optional[datetime] = None) -> str:
         # Get current date for latest news context
-        current_date = datetime.now()
-        current_season = get_football_season(current_date)
-        this_week = current_date.strftime('%W')
+        current_date = now or datetime.now()
+        current_season = season_of(current_date)
         
         # Search for latest fantasy football news
-        search_query = f"Champions League Fantasy {topic} {current_season} latest news tips experts reddit twitter gameweek this week {current_date.strftime('%B %Y')}"
+        return f"Champions League Fantasy {topic} {current_season} latest news tips experts reddit twitter gameweek this week {current_date.strftime('%B %Y')}"
+
+    def record(self, topic: str, now: Optional[datetime] = None) -> NewsRecord:
+        """Typed news record (dated headlines) for the topic."""
+        now = now or datetime.now()
+        search_result = self.serper_tool.run(search_query=self.search_query(topic, now))
+        return extract_record(
+            NewsRecord, search_result, topic, season_of(now), tool=self.name,
+        )
+
+    def _run(self, topic: str) -> str:
+        now = datetime.now()
+        current_season = season_of(now)
         
         try:
-            search_result = self.serper_tool.run(search_query=search_query)
-            return f"Latest fantasy football news about {topic} ({current_season} season):\n{search_result}"
+            record = self.record(topic, now)
+            return f"Latest fantasy football news about {topic} ({current_season} season):\n{record.to_prompt()}"
         except Exception as e:
             return f"Error searching for fantasy news about {topic}: {str(e)}"
 
@@ -217,20 +262,33 @@ class InjuryReportTool(BaseTool):
 
     def __init__(self):
         super().__init__()
-        self.serper_tool = SerperDevTool()
+        self.serper_tool = CachedSerperDevTool()
 
-    def _run(self, team_name: str) -> str:
+    def search_query(self, team_name: str, now: Optional[datetime] = None) -> str:
+        team_name = canonical_club(team_name)
         # Get current date for latest injury news
-        current_date = datetime.now()
-        current_season = get_football_season(current_date)
-        today = current_date.strftime('%Y-%m-%d')
+        current_date = now or datetime.now()
+        current_season = season_of(current_date)
         
         # Search for latest injury reports with date context
-        search_query = f"{team_name} injury report team news Champions League Fantasy {current_season} latest today {current_date.strftime('%B %Y')} doubtful suspended available gameweek"
+        return f"{team_name} injury report team news Champions League Fantasy {current_season} latest today {current_date.strftime('%B %Y')} doubtful suspended available gameweek"
+
+    def record(self, team_name: str, now: Optional[datetime] = None) -> TeamNewsRecord:
+        """Typed availability record (unavailable, doubtful, suspended players) for the team."""
+        now = now or datetime.now()
+        search_result = self.serper_tool.run(search_query=self.search_query(team_name, now))
+        return extract_record(
+            TeamNewsRecord, search_result, canonical_club(team_name), season_of(now), tool=self.name,
+        )
+
+    def _run(self, team_name: str) -> str:
+        current_date = datetime.now()
+        current_season = season_of(current_date)
+        today = current_date.strftime('%Y-%m-%d')
         
         try:
-            search_result = self.serper_tool.run(search_query=search_query)
-            return f"Latest injury report for {team_name} ({current_season} season, as of {today}):\n{search_result}"
+            record = self.record(team_name, current_date)
+            return f"Latest injury report for {team_name} ({current_season} season, as of {today}):\n{record.to_prompt()}"
         except Exception as e:
             return f"Error searching for {team_name} injury report: {str(e)}"
 
@@ -250,23 +308,208 @@ class PlayerTeamVerificationTool(BaseTool):
 
     def __init__(self):
         super().__init__()
-        self.serper_tool = SerperDevTool()
+        self.serper_tool = CachedSerperDevTool()
 
-    def _run(self, player_name: str) -> str:
+    def search_query(self, player_name: str, now: Optional[datetime] = None) -> str:
+        player_name = canonical_player(player_name)
         # Get current date and season context
-        current_date = datetime.now()
-        current_season = get_football_season(current_date)
+        current_date = now or datetime.now()
+        current_season = season_of(current_date)
         
         # Search for current team and status with specific date context
-        search_query = f"{player_name} current team {current_season} season Champions League transfer news today {current_date.strftime('%B %Y')} playing status starting XI"
-        
+        return f"{player_name} current team {current_season} season Champions League transfer news today {current_date.strftime('%B %Y')} playing status starting XI"
+
+    def record(self, player_name: str, now: Optional[datetime] = None) -> PlayerRecord:
+        """Typed status record (availability) for the player."""
+        now = now or datetime.now()
+        search_result = self.serper_tool.run(search_query=self.search_query(player_name, now))
+        return extract_record(
+            PlayerRecord, search_result, canonical_player(player_name), season_of(now), tool=self.name,
+        )
+
+    def verify(self, player_name: str) -> str:
+        """Verification summary for the player; raises if the search fails."""
+        current_date = datetime.now()
+        current_season = season_of(current_date)
+        record = self.record(player_name, current_date)
+        return f"Current team verification for {player_name} ({current_season} season, as of {current_date.strftime('%Y-%m-%d')}):\n{record.to_prompt()}"
+
+    def _run(self, player_name: str) -> str:
         try:
-            search_result = self.serper_tool.run(search_query=search_query)
-            return f"Current team verification for {player_name} ({current_season} season, as of {current_date.strftime('%Y-%m-%d')}):\n{search_result}"
+            return self.verify(player_name)
         except Exception as e:
             return f"Error verifying {player_name}'s current team: {str(e)}"
 
 
+class PastResearchInput(BaseModel):
+    """Input schema for PastResearchTool."""
+    query: str = Field(..., description="What to look for in earlier analysis reports")
+    max_results: int = Field(default=5, description="Maximum number of report excerpts to return")
+
+class PastResearchTool(BaseTool):
+    name: str = "Past Research Tool"
+    description: str = (
+        "Search the crew's own earlier analysis reports (player, tactical, fixture, captain, budget and "
+        "community analyses and team selections from previous runs). Check here before searching the web; "
+        "excerpts show when they were written, so re-verify anything time-sensitive such as injuries or prices."
+    )
+    args_schema: Type[BaseModel] = PastResearchInput
+
+    def _run(self, query: str, max_results: int = 5) -> str:
+        try:
+            hits = output_index().search(query, k=max_results)
+        except Exception as e:
+            return f"Error searching past research for {query}: {str(e)}"
+        if not hits:
+            return f"No earlier research found for {query}."
+        today = datetime.now()
+        excerpts = [
+            f"[{os.path.basename(hit.source)}, written {hit.written.strftime('%Y-%m-%d')} "
+            f"({(today - hit.written).days} days ago), relevance {hit.score:.2f}]\n{hit.text}"
+            for hit in hits
+        ]
+        return f"Past research about {query}:\n\n" + "\n\n---\n\n".join(excerpts)
+
+
+class EffectiveOwnershipInput(BaseModel):
+    """Input schema for EffectiveOwnershipTool."""
+    players: List[str] = Field(..., description="Candidate players for one squad slot or the captaincy")
+    ownership: Optional[List[float]] = Field(
+        default=None, description="Ownership % of each player, in the same order (looked up if omitted)"
+    )
+    positions: Optional[List[str]] = Field(
+        default=None, description="Position of each player (GK, DEF, MID, FWD), in the same order"
+    )
+    expected_points: Optional[List[float]] = Field(
+        default=None, description="Expected points of each player this gameweek, in the same order"
+    )
+    captain: bool = Field(default=False, description="Evaluate the players as captain (double points)")
+
+class EffectiveOwnershipTool(BaseTool):
+    name: str = "Effective Ownership Tool"
+    description: str = (
+        "Estimate effective ownership (starters plus captaincy) and the rank gained or lost by picking or "
+        "captaining each candidate, against a simulated field of rival squads built from ownership "
+        "percentages. Use it to weigh template picks against differentials for a top 1% finish."
+    )
+    args_schema: Type[BaseModel] = EffectiveOwnershipInput
+
+    def _run(self, players: List[str], ownership: Optional[List[float]] = None,
+             positions: Optional[List[str]] = None, expected_points: Optional[List[float]] = None,
+             captain: bool = False) -> str:
+        season = season_of()
+        candidates = []
+        for i, player in enumerate(players):
+            name = canonical_player(player)
+            known = default_store().merged_record(PlayerRecord.kind, name, season) or {}
+            candidates.append({
+                "name": name,
+                "club": known.get("team"),
+                "position": positions[i] if positions and i < len(positions) else None,
+                "ownership": ownership[i] if ownership and i < len(ownership) else known.get("ownership"),
+                "expected_points": expected_points[i] if expected_points and i < len(expected_points) else None,
+            })
+        try:
+            field, rows = build_field(
+                candidates, n_rivals=int(os.getenv("FPL_RIVAL_FIELD_SIZE", DEFAULT_RIVALS))
+            )
+            impacts = field.rank_impact(rows, captain=captain)
+        except Exception as e:
+            return f"Error estimating effective ownership for {', '.join(players)}: {str(e)}"
+        missing = [str(c["name"]) for c in candidates if c["ownership"] is None]
+        note = (
+            f"\nNo ownership figure for {', '.join(missing)}; run the Player Ownership Analysis Tool first "
+            "or pass ownership." if missing else ""
+        )
+        return format_impacts(impacts) + note
+
+
+class PriceChangeInput(BaseModel):
+    """Input schema for PriceChangeTool."""
+    players: Optional[List[str]] = Field(default=None, description="Only these players (all players if omitted)")
+    position: Optional[str] = Field(default=None, description="Only this position (GK, DEF, MID, FWD)")
+    max_price: Optional[float] = Field(default=None, description="Only players at or below this price (millions)")
+    top: int = Field(default=10, description="Number of likeliest risers and fallers to list")
+
+class PriceChangeTool(BaseTool):
+    name: str = "Price Change Predictor Tool"
+    description: str = (
+        "Rank players by their probability of rising or falling in price at the next gameweek, from "
+        "transfer trends, ownership changes, form and minutes in the local stats archive. Needs no web "
+        "search. Use it to find value picks likely to rise and assets to sell before they drop."
+    )
+    args_schema: Type[BaseModel] = PriceChangeInput
+
+    def _run(self, players: Optional[List[str]] = None, position: Optional[str] = None,
+             max_price: Optional[float] = None, top: int = 10) -> str:
+        predictor = price_predictor()
+        seasons = predictor.archive.seasons()
+        if not seasons:
+            return "No archived gameweek stats to predict price changes from; ingest them with `main.py ingest`."
+        # The current season until it has been archived, then the latest archived one
+        current_season = season_of()
+        season = current_season if current_season in seasons else seasons[-1]
+        try:
+            outlook = predictor.predict(season)
+        except Exception as e:
+            return f"Error predicting price changes for {season}: {str(e)}"
+        selected = filter_predictions(
+            outlook.predictions, [canonical_player(p) for p in players or []], position, max_price
+        )
+        if not selected:
+            return f"No archived players for {season} match the request."
+        return format_predictions(outlook, selected, top=top)
+
+
+class ExpectedLineupInput(BaseModel):
+    """Input schema for ExpectedLineupTool."""
+    players: Optional[List[str]] = Field(default=None, description="Only these players")
+    team_name: Optional[str] = Field(default=None, description="Only this club's players")
+    top: int = Field(default=15, description="Number of players to list")
+
+class ExpectedLineupTool(BaseTool):
+    name: str = "Expected Lineup Tool"
+    description: str = (
+        "Estimate each player's probability of starting and of playing 60+ minutes in the next gameweeks, "
+        "from recent minutes in the local stats archive, fixture congestion and the latest stored injury "
+        "news. Needs no web search. Give players or a club; with neither, lists the biggest rotation risks."
+    )
+    args_schema: Type[BaseModel] = ExpectedLineupInput
+
+    def _run(self, players: Optional[List[str]] = None, team_name: Optional[str] = None, top: int = 15) -> str:
+        model = lineup_model()
+        seasons = model.archive.seasons()
+        if not seasons:
+            return "No archived gameweek stats to estimate lineups from; ingest them with `main.py ingest`."
+        # The current season until it has been archived, then the latest archived one
+        current_season = season_of()
+        season = current_season if current_season in seasons else seasons[-1]
+        try:
+            outlook = model.outlook(season)
+        except Exception as e:
+            return f"Error estimating lineups for {season}: {str(e)}"
+        rows = outlook.select(players, team_name)
+        if not rows:
+            return f"No archived players for {season} match the request."
+        return outlook.report(rows[:top])
+
+
+def club_limit_warning(content: str) -> str:
+    """
+    Warning text if ``content`` reads like a squad (at least a starting XI of
+    known players) and names more than 3 players from one club, else "".
+    """
+    index = entity_index()
+    players = index.find_players(content)
+    if len(players) < 11:
+        return ""
+    violations = index.club_limit_violations(players)
+    if not violations:
+        return ""
+    details = "; ".join(f"{club}: {', '.join(names)}" for club, names in violations.items())
+    return f"\nWarning: more than 3 players from one club ({details}). Champions League Fantasy allows at most 3."
+
+
 class FileWriterInput(BaseModel):
     """Input schema for FileWriterTool."""
     filename: str = Field(..., description="Name of the file to write (including extension)")
@@ -280,6 +523,12 @@ class FileWriterTool(BaseTool):
         "Useful for saving analysis reports, team selections, and other outputs."
     )
     args_schema: Type[BaseModel] = FileWriterInput
+    # Paths written since the last pop_written() (the crew archives them after each run)
+    _written: List[str] = PrivateAttr(default_factory=list)
+
+    def pop_written(self) -> List[str]:
+        written, self._written = self._written, []
+        return written
 
     def _run(self, filename: str, content: str, directory: str = "output") -> str:
         try:
@@ -309,7 +558,8 @@ class FileWriterTool(BaseTool):
             # Write content to file
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
+            self._written.append(file_path)
             
-            return f"Successfully wrote content to {file_path}"
+            return f"Successfully wrote content to {file_path}" + club_limit_warning(content)
         except Exception as e:
             return f"Error writing to file {filename}: {str(e)}"
\ No newline at end of file
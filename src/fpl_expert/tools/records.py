@@ -0,0 +1,315 @@
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, ClassVar, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, Field, ValidationError
+
+from .search_cache import SearchCache
+
+
+# Sections of a Serper result that hold individual items
+RESULT_SECTIONS = ("organic", "news", "topStories")
+
+# Most sources kept on a record (and shown to the agent)
+MAX_SOURCES = 8
+
+# Prompt prefix of the LLM fallback; routing.py classifies it as an extraction step
+EXTRACTION_PROMPT_PREFIX = "Extract the following fields"
+
+
+class SourceRef(BaseModel):
+    """One search result an extracted value may come from."""
+    title: str = ""
+    link: str = ""
+    snippet: str = ""
+    date: Optional[str] = Field(default=None, description="Publication date as given by the source")
+
+
+class ToolRecord(BaseModel):
+    """Typed result of a search-backed tool call."""
+    kind: ClassVar[str] = "record"
+    # Fields whose absence counts as an extraction miss (triggers the LLM fallback)
+    key_fields: ClassVar[Tuple[str, ...]] = ()
+
+    subject: str
+    season: str
+    fetched_at: datetime = Field(default_factory=datetime.now)
+    method: str = Field(default="regex", description="How the fields were extracted: regex, llm or none")
+    sources: List[SourceRef] = Field(default_factory=list)
+
+    def missed(self) -> bool:
+        if not self.key_fields:
+            return False
+        return all(getattr(self, name) in (None, []) for name in self.key_fields)
+
+    def facts(self) -> Dict[str, Any]:
+        """Extracted fields that have a value."""
+        skip = set(ToolRecord.model_fields)
+        return {
+            name: value for name, value in self.model_dump(exclude=skip).items()
+            if value not in (None, [])
+        }
+
+    def to_prompt(self) -> str:
+        """Compact text for the agent: extracted facts followed by the sources."""
+        lines = []
+        facts = self.facts()
+        if facts:
+            lines.append("Extracted: " + json.dumps(facts, default=str))
+        lines.append("Sources:")
+        for source in self.sources:
+            date = f"[{source.date}] " if source.date else ""
+            lines.append(f"- {date}{source.title}: {source.snippet} ({source.link})")
+        return "\n".join(lines)
+
+
+class PlayerRecord(ToolRecord):
+    kind: ClassVar[str] = "player"
+    key_fields: ClassVar[Tuple[str, ...]] = (
+        "goals", "assists", "minutes", "points", "ownership", "price", "injury_status",
+    )
+
+    team: Optional[str] = None
+    goals: Optional[int] = None
+    assists: Optional[int] = None
+    minutes: Optional[int] = None
+    points: Optional[int] = Field(default=None, description="Fantasy points")
+    ownership: Optional[float] = Field(default=None, description="Ownership percentage")
+    price: Optional[float] = Field(default=None, description="Price in millions")
+    injury_status: Optional[str] = Field(default=None, description="available, doubtful, out or suspended")
+
+
+class TeamNewsRecord(ToolRecord):
+    kind: ClassVar[str] = "team"
+    key_fields: ClassVar[Tuple[str, ...]] = ("unavailable", "doubtful", "suspended", "opponents")
+
+    unavailable: List[str] = Field(default_factory=list, description="Players ruled out")
+    doubtful: List[str] = Field(default_factory=list, description="Players facing fitness tests")
+    suspended: List[str] = Field(default_factory=list, description="Suspended players")
+    opponents: List[str] = Field(default_factory=list, description="Upcoming opponents")
+
+
+class NewsRecord(ToolRecord):
+    kind: ClassVar[str] = "news"
+
+
+# Rule-based extraction
+
+_NAME = r"([A-Z][\w'\-]+(?:\s(?:de|van|da|di|[A-Z][\w'\-]+)){0,2})"
+
+_PLAYER_PATTERNS: Dict[str, List[re.Pattern]] = {
+    "goals": [re.compile(r"\b(\d{1,2})\s+goals?\b", re.I)],
+    "assists": [re.compile(r"\b(\d{1,2})\s+assists?\b", re.I)],
+    "minutes": [re.compile(r"\b(\d{2,4})\s+(?:minutes|mins)\b", re.I)],
+    "points": [re.compile(r"\b(\d{1,3})\s+(?:fantasy\s+)?(?:points|pts)\b", re.I)],
+    "ownership": [
+        re.compile(r"\b(\d{1,2}(?:\.\d+)?)\s*%\s*(?:ownership|owned|of managers|selected|selection)", re.I),
+        re.compile(r"(?:owned by|ownership(?: of)?|selected by)\s*(\d{1,2}(?:\.\d+)?)\s*%", re.I),
+    ],
+    "price": [
+        re.compile(r"€\s?(\d{1,2}(?:\.\d)?)\s?m\b", re.I),
+        # A bare "7.5m" is only a price next to price wording (not a distance, a fee or a stat)
+        re.compile(r"\b(?:price[ds]?|costs?|costing|valued)\b[^.\d]{0,20}?(\d{1,2}\.\d)\s?m\b(?!\w)", re.I),
+        re.compile(r"\b(\d{1,2}\.\d)\s?m\b(?!\w)[^.\d]{0,20}?\b(?:price|cost)", re.I),
+        re.compile(r"price(?:d at| of|:)?\s*€?\s?(\d{1,2}(?:\.\d)?)", re.I),
+    ],
+}
+
+_INJURY_STATUS: Tuple[Tuple[str, re.Pattern], ...] = (
+    ("suspended", re.compile(r"\bsuspen(?:ded|sion)\b", re.I)),
+    ("out", re.compile(r"\b(?:ruled out|out injured|sidelined|will miss|out for|injured)\b", re.I)),
+    ("doubtful", re.compile(r"\b(?:doubt(?:ful)?|fitness test|late fitness|50-50|knock)\b", re.I)),
+    ("available", re.compile(r"\b(?:fit|available|returns?|back in training|passed fit)\b", re.I)),
+)
+
+_TEAM_PATTERNS: Dict[str, re.Pattern] = {
+    "unavailable": re.compile(_NAME + r"\s+(?:is\s+|has been\s+|was\s+)?(?:ruled out|out injured|sidelined|will miss)"),
+    "doubtful": re.compile(_NAME + r"\s+(?:is\s+)?(?:a doubt|doubtful|faces a (?:late )?fitness test|a fitness doubt)"),
+    "suspended": re.compile(_NAME + r"\s+(?:is\s+)?suspended"),
+    "opponents": re.compile(r"\b(?:vs\.?|v\.?|against|face|host|visit)\s+" + _NAME),
+}
+
+_NOT_NAMES = {"The", "He", "She", "They", "Champions", "League", "Fantasy", "UEFA", "Who", "This", "It"}
+
+
+def search_items(result: Any) -> List[Dict[str, Any]]:
+    """The individual items of a Serper result, across sections."""
+    if not isinstance(result, dict):
+        return [{"snippet": str(result)}] if result else []
+    items = []
+    answer = result.get("answerBox")
+    if isinstance(answer, dict):
+        items.append({**answer, "snippet": answer.get("answer") or answer.get("snippet", "")})
+    graph = result.get("knowledgeGraph")
+    if isinstance(graph, dict):
+        items.append({**graph, "snippet": graph.get("description", "")})
+    for section in RESULT_SECTIONS:
+        items.extend(entry for entry in result.get(section) or [] if isinstance(entry, dict))
+    return items
+
+
+def _sources(items: Iterable[Dict[str, Any]]) -> List[SourceRef]:
+    sources = []
+    for item in items:
+        sources.append(SourceRef(
+            title=str(item.get("title", "")),
+            link=str(item.get("link", "")),
+            snippet=str(item.get("snippet", "")),
+            date=item.get("date"),
+        ))
+        if len(sources) >= MAX_SOURCES:
+            break
+    return sources
+
+
+def _surname(subject: str) -> str:
+    return subject.split()[-1].lower() if subject.split() else ""
+
+
+def _texts(items: Iterable[Dict[str, Any]], subject: str) -> List[str]:
+    """Title + snippet of each item, preferring items that mention the subject's surname."""
+    texts = [f"{item.get('title', '')}. {item.get('snippet', '')}" for item in items]
+    surname = _surname(subject)
+    mentioning = [text for text in texts if surname and surname in text.lower()]
+    return mentioning or texts
+
+
+def _sentences_about(texts: List[str], subject: str) -> List[str]:
+    """Sentences that mention the subject's surname."""
+    surname = _surname(subject)
+    return [
+        sentence for text in texts for sentence in re.split(r"(?<=[.!?])\s+", text)
+        if surname and surname in sentence.lower()
+    ]
+
+
+def _most_common(values: List[Any]) -> Any:
+    return Counter(values).most_common(1)[0][0] if values else None
+
+
+def _extract_player(record: PlayerRecord, texts: List[str]) -> None:
+    for field_name, patterns in _PLAYER_PATTERNS.items():
+        values = []
+        for text in texts:
+            for pattern in patterns:
+                values.extend(pattern.findall(text))
+        if values:
+            value = _most_common(values)
+            number = float(value) if field_name in ("ownership", "price") else int(value)
+            if field_name == "price" and not 3.0 <= number <= 15.0:
+                continue
+            if field_name == "ownership" and number > 100:
+                continue
+            setattr(record, field_name, number)
+
+    # Team news snippets cover several players, so only sentences naming this one count
+    sentences = _sentences_about(texts, record.subject)
+    statuses = [status for text in sentences for status, pattern in _INJURY_STATUS if pattern.search(text)]
+    if statuses:
+        # The most severe status mentioned wins: suspended > out > doubtful > available
+        record.injury_status = min(statuses, key=[status for status, _ in _INJURY_STATUS].index)
+
+
+def _extract_team(record: TeamNewsRecord, texts: List[str]) -> None:
+    for field_name, pattern in _TEAM_PATTERNS.items():
+        names: List[str] = []
+        for text in texts:
+            for name in pattern.findall(text):
+                name = name.strip()
+                if name.split()[0] not in _NOT_NAMES and name not in names and name != record.subject:
+                    names.append(name)
+        setattr(record, field_name, names)
+
+
+# LLM fallback
+
+def _llm_extract(record: ToolRecord, texts: List[str]) -> Optional[Dict[str, Any]]:
+    """Ask the extraction-tier model for the record's fields. Returns None on any failure."""
+    if os.getenv("FPL_EXTRACTION_LLM", "1").lower() in ("0", "false", "no"):
+        return None
+    from ..routing import extraction_llm
+
+    fields = {
+        name: info.description or getattr(info.annotation, "__name__", "")
+        for name, info in type(record).model_fields.items()
+        if name in record.key_fields
+    }
+    messages = [
+        {
+            "role": "system",
+            "content": (
+                f"{EXTRACTION_PROMPT_PREFIX} about {record.subject} from the search results and reply "
+                f"with a single JSON object only, using null for anything not stated: {json.dumps(fields)}"
+            ),
+        },
+        {"role": "user", "content": "\n".join(texts)},
+    ]
+    try:
+        answer = extraction_llm().call(messages)
+        match = re.search(r"\{.*\}", answer or "", re.S)
+        return json.loads(match.group(0)) if match else None
+    except Exception:
+        return None
+
+
+# Extracted records are memoised per (kind, subject, result) so an LLM fallback runs once
+_extracted = SearchCache(ttl=24 * 3600, max_entries=4096)
+
+
+def _result_digest(result: Any) -> str:
+    return hashlib.sha256(json.dumps(result, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+R = TypeVar("R", bound=ToolRecord)
+
+
+def extract_record(record_type: Type[R], result: Any, subject: str, season: str,
+                   tool: Optional[str] = None, **fields: Any) -> R:
+    """
+    Build a typed record from a Serper result: rule-based extractors first,
+    the extraction-tier LLM only if they find none of the record's key fields.
+    The record is also saved to the structured store under ``tool``.
+    """
+    key = (record_type.kind, subject.lower(), tool, _result_digest(result))
+
+    def build() -> R:
+        items = search_items(result)
+        record = record_type(subject=subject, season=season, sources=_sources(items), **fields)
+        texts = _texts(items, subject)
+        if isinstance(record, PlayerRecord):
+            _extract_player(record, texts)
+        elif isinstance(record, TeamNewsRecord):
+            _extract_team(record, texts)
+
+        if record.missed():
+            extracted = _llm_extract(record, texts) if texts else None
+            record.method = "none"
+            if extracted:
+                try:
+                    record = record_type.model_validate({
+                        **record.model_dump(),
+                        **{k: v for k, v in extracted.items() if k in record.key_fields and v is not None},
+                        "method": "llm",
+                    })
+                except ValidationError:
+                    pass
+        _save(record, tool)
+        return record
+
+    return _extracted.get_or_fetch(key, build)
+
+
+def _save(record: ToolRecord, tool: Optional[str]) -> None:
+    from ..store import default_store
+
+    try:
+        default_store().save_record(
+            record.kind, record.subject, record.season, record.model_dump(mode="json"), tool=tool,
+        )
+    except Exception:
+        # The store is a convenience for downstream consumers; tool output never depends on it
+        pass
@@ -0,0 +1,191 @@
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Tuple
+
+from crewai_tools import SerperDevTool
+from pydantic import Field
+
+
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAX_ENTRIES = 2048
+
+
+class SearchCache:
+    """
+    Thread-safe LRU cache with expiry for web search results.
+
+    One instance is shared by every tool in the process, so crews running in
+    parallel (evaluation iterations, several profiles, the scheduler) reuse
+    each other's searches. Concurrent requests for the same key are coalesced:
+    only the first caller performs the search and the others wait for it.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._listeners: List[Callable[[Hashable, bool], None]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def add_listener(self, listener: Callable[[Hashable, bool], None]) -> None:
+        """Call ``listener(key, hit)`` after every lookup made through get_or_fetch()."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _notify(self, key: Hashable, hit: bool) -> None:
+        for listener in self._listeners:
+            listener(key, hit)
+
+    @contextmanager
+    def refreshing(self) -> Iterator[None]:
+        """Within this block, searches made by the current thread skip cached entries and overwrite them."""
+        previous = getattr(self._local, "refresh", False)
+        self._local.refresh = True
+        try:
+            yield
+        finally:
+            self._local.refresh = previous
+
+    def get(self, key: Hashable) -> Any:
+        """Return a cached value or None, without fetching."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a search for ``key`` is running now."""
+        with self._lock:
+            return key in self._in_flight
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        refresh = getattr(self._local, "refresh", False)
+        with self._lock:
+            entry = None if refresh else self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                cached, owner = True, False
+            else:
+                cached = False
+                in_flight = self._in_flight.get(key)
+                owner = in_flight is None
+                pending: Future = Future() if in_flight is None else in_flight
+                if owner:
+                    self._in_flight[key] = pending
+                    self.misses += 1
+                else:
+                    self.hits += 1
+
+        self._notify(key, cached or not owner)
+        if entry is not None and cached:
+            return entry[1]
+        if not owner:
+            return pending.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            # Failures are not cached; waiting callers see the same error
+            with self._lock:
+                del self._in_flight[key]
+            pending.set_exception(e)
+            raise
+        self.put(key, value)
+        with self._lock:
+            del self._in_flight[key]
+        pending.set_result(value)
+        return value
+
+    def entries(self) -> List[Tuple[Hashable, Any]]:
+        """Unexpired (key, value) pairs, oldest first."""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (stored, value) in self._entries.items() if now - stored <= self.ttl]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+search_cache = SearchCache(
+    ttl=float(os.getenv("FPL_SEARCH_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+    max_entries=int(os.getenv("FPL_SEARCH_CACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+)
+
+
+def search_key(query: str, search_type: str = "search", n_results: int = 10) -> Tuple[str, str, int]:
+    """Cache key for a search: whitespace and case differences hit the same entry."""
+    return (search_type, " ".join(query.split()).lower(), n_results)
+
+
+def record_searches(path: str) -> int:
+    """Save the cached search responses to ``path`` (JSON) so a later run can replay them."""
+    entries = [{"key": list(key), "result": value} for key, value in search_cache.entries() if isinstance(key, tuple)]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False)
+    return len(entries)
+
+
+def replay_searches(path: str) -> int:
+    """
+    Load search responses saved by record_searches() into the cache, so
+    matching queries are answered without calling Serper. Other queries are
+    still searched live.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    search_cache.ttl = max(search_cache.ttl, 365 * 24 * 3600)
+    for entry in entries:
+        search_cache.put(tuple(entry["key"]), entry["result"])
+    return len(entries)
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that answers repeated queries from the shared search cache."""
+
+    # FPL_SERPER_BASE_URL points searches at another Serper-compatible server (e.g. the load test's fake)
+    base_url: str = Field(default_factory=lambda: os.getenv("FPL_SERPER_BASE_URL", "https://google.serper.dev"))
+
+    def _run(self, **kwargs: Any) -> Any:
+        search_query = kwargs.get("search_query") or kwargs.get("query") or ""
+        search_type = kwargs.get("search_type") or self.search_type or "search"
+
+        def fetch() -> Any:
+            return SerperDevTool._run(self, **kwargs)
+
+        result = search_cache.get_or_fetch(search_key(search_query, search_type, self.n_results), fetch)
+        # Callers may mutate what they get back; keep the cached copy pristine
+        return copy.deepcopy(result)
@@ -0,0 +1,67 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+from fpl_expert.api import RecommendationServer
+from fpl_expert.store import RecommendationStore
+
+
+class FlakyVerifier:
+    """Verification tool stand-in whose first search fails."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def verify(self, player_name):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("Serper unavailable")
+        return f"{player_name} plays for Real Madrid"
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = RecommendationServer(
+        build_inputs=lambda now: {},
+        store=RecommendationStore(str(tmp_path / "store.sqlite3")),
+        archive_root=str(tmp_path / "history"),
+    )
+    server.verification_tool = FlakyVerifier()
+    yield server
+    server.close()
+
+
+def get(server, target, method="GET"):
+    return asyncio.run(server.dispatch(method, target))
+
+
+def test_failed_verification_is_an_error_and_not_cached(server):
+    status, body = get(server, "/verify?player=Kylian%20Mbappe")
+    assert status == HTTPStatus.BAD_GATEWAY and "Serper unavailable" in body["error"]
+
+    status, body = get(server, "/verify?player=kylian%20mbappe")
+    assert status == HTTPStatus.OK and body["result"].endswith("plays for Real Madrid")
+    # The success is cached and shared between spellings
+    assert get(server, "/verify?player=Kylian%20Mbappe") == (status, body)
+    assert server.verification_tool.calls == 2
+
+
+@pytest.mark.parametrize("target", [
+    "/verify",
+    "/squad?budget=abc",
+    "/squad?budget=20",
+    "/squad?budget=nan",
+    "/captain?matchweek=99",
+    "/captain?profile=nobody",
+])
+def test_bad_parameters_are_rejected(server, target):
+    status, body = get(server, target)
+    assert status == HTTPStatus.BAD_REQUEST and body["error"]
+
+
+def test_routing_errors(server):
+    assert get(server, "/nowhere")[0] == HTTPStatus.NOT_FOUND
+    assert get(server, "/health", method="POST")[0] == HTTPStatus.METHOD_NOT_ALLOWED
+    status, body = get(server, "/health")
+    assert status == HTTPStatus.OK and body["status"] == "ok"
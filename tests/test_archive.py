@@ -0,0 +1,74 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from fpl_expert.archive import OutputArchive, report_name
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = OutputArchive(str(tmp_path / "reports.sqlite3"), max_age_days=42, max_entries=100, output_keep_days=14)
+    yield archive
+    archive.close()
+
+
+def add(archive, day, content, matchweek=1, filename="captain_analysis_2026-10-01.md"):
+    return archive.add(
+        f"run-{day}", filename, content, inputs={"matchweek": matchweek}, written=NOW - timedelta(days=day)
+    )
+
+
+def test_report_name():
+    assert report_name("captain_analysis_aaron_2026-10-19.md", "aaron") == "captain_analysis"
+    assert report_name("output/team_report_2026-10-19.md") == "team_report"
+
+
+def test_identical_reports_share_content(archive):
+    add(archive, 3, "same")
+    add(archive, 2, "same")
+    stats = archive.stats()
+    assert stats["entries"] == 2
+    assert stats["objects"] == 1
+
+
+def test_retention_drops_old_entries_but_keeps_the_latest(archive):
+    add(archive, 90, "gw1 old")
+    add(archive, 60, "gw1 newer")
+    add(archive, 80, "gw2 only", matchweek=2)
+    add(archive, 5, "gw3 recent", matchweek=3)
+
+    removed = archive.enforce_retention(now=NOW, output_dir=None)
+
+    assert removed == {"entries": 1, "objects": 1, "files": 0}
+    assert [archive.read(e) for e in archive.find("captain_analysis", matchweek=1)] == ["gw1 newer"]
+    # Older than the cut-off, but the only report of its matchweek
+    assert archive.latest("captain_analysis", matchweek=2) is not None
+    assert not archive.contains("gw1 old")
+
+
+def test_retention_caps_entries(tmp_path):
+    archive = OutputArchive(str(tmp_path / "reports.sqlite3"), max_entries=3)
+    for day in range(6, 0, -1):
+        add(archive, day, f"report {day}")
+    removed = archive.enforce_retention(now=NOW, output_dir=None)
+    assert removed["entries"] == 3
+    assert [archive.read(e) for e in archive.find()] == ["report 1", "report 2", "report 3"]
+    archive.close()
+
+
+def test_retention_prunes_archived_output_files(archive, tmp_path):
+    output = tmp_path / "output"
+    output.mkdir()
+    (output / "captain_analysis_2026-09-01.md").write_text("archived", encoding="utf-8")
+    (output / "fixture_analysis_2026-09-01.md").write_text("not archived", encoding="utf-8")
+    (output / "captain_analysis_2026-10-18.md").write_text("recent", encoding="utf-8")
+    add(archive, 1, "archived")
+    add(archive, 1, "recent")
+
+    removed = archive.enforce_retention(now=NOW, output_dir=str(output))
+
+    assert removed["files"] == 1
+    assert sorted(os.listdir(output)) == ["captain_analysis_2026-10-18.md", "fixture_analysis_2026-09-01.md"]
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from fpl_expert.backtest import SeasonReplay, SetAndForgetPolicy, _draft_field, _Market, run_policy, simulate_field
+from fpl_expert.history import HistoryArchive
+from fpl_expert.optimizer import SquadConstraints, best_transfers, select_squad
+from fpl_expert.player_table import POSITIONS
+from fpl_expert.scoring import CAPTAIN_MULTIPLIER, VICE_CAPTAIN_MULTIPLIER, captain_multipliers
+
+SEASON = "2024/25"
+N_PLAYERS = 120
+LATE_SIGNING = N_PLAYERS + 1
+
+
+def make_replay(tmp_path, n_gameweeks=4):
+    """A season of 120 players at 12 clubs; one extra player first appears in gameweek 2."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for gameweek in range(1, n_gameweeks + 1):
+        for pid in range(1, N_PLAYERS + 2):
+            if pid == LATE_SIGNING and gameweek == 1:
+                continue
+            rows.append({
+                "gameweek": str(gameweek), "player_id": str(pid), "name": f"Player {pid}", "club": f"Club {pid % 12}",
+                "position": POSITIONS[pid % 4], "minutes": str(int(rng.choice([0, 90], p=[0.2, 0.8]))),
+                "goals": str(int(rng.poisson(0.3))), "price": f"{4.0 + pid % 7:.1f}", "ownership": str(pid % 30),
+            })
+    archive = HistoryArchive(str(tmp_path / "history"))
+    archive.ingest(SEASON, rows)
+    return SeasonReplay(archive.season(SEASON), {})
+
+
+def test_deadline_pool_only_holds_players_seen_before(tmp_path):
+    replay = make_replay(tmp_path)
+    assert not replay.deadline(2).table.has_player(LATE_SIGNING)
+    assert replay.deadline(3).table.has_player(LATE_SIGNING)
+    assert replay.deadline(2, include_gameweek=True).table.has_player(LATE_SIGNING)
+    assert replay.deadline(3).past_points.shape[1] == 2
+
+
+def test_forced_replacements_are_free(tmp_path):
+    table = make_replay(tmp_path).deadline(3).table
+    scores = np.ones(len(table))
+    squad = select_squad(table, scores)
+    # One player left the pool: the replacement is not counted as a chosen transfer
+    current = squad.player_ids[:-1] + [10_000]
+    replaced, chosen = best_transfers(table, scores, current, max_transfers=0, free_transfers=0)
+    assert chosen == 0
+    assert len(set(replaced.player_ids) - set(current)) == 1
+
+
+def test_set_and_forget_takes_no_hits(tmp_path):
+    result = run_policy(make_replay(tmp_path), SetAndForgetPolicy())
+    assert result.hits == 0 and result.transfers == 0
+
+
+def test_captain_multipliers():
+    captain, vice = captain_multipliers(np.array([True, False]))
+    assert captain.tolist() == [CAPTAIN_MULTIPLIER, 1.0]
+    assert vice.tolist() == [VICE_CAPTAIN_MULTIPLIER, CAPTAIN_MULTIPLIER]
+
+
+@pytest.mark.parametrize("budget", [100.0, 75.0])
+def test_rival_squads_follow_the_squad_rules(tmp_path, budget):
+    replay = make_replay(tmp_path)
+    market = _Market.at(replay, replay.deadline(1))
+    constraints = SquadConstraints(budget=budget)
+    squads, bank = _draft_field(market, constraints, 500, np.random.default_rng(1))
+
+    assert (market.prices[squads].sum(axis=1) <= budget + 1e-4).all()
+    assert bank == pytest.approx(budget - market.prices[squads].sum(axis=1), abs=1e-4)
+    for squad in squads:
+        assert len(set(squad.tolist())) == 15
+        assert np.bincount(market.positions[squad], minlength=4).tolist() == [2, 5, 5, 3]
+        assert np.bincount(market.clubs[squad]).max() <= constraints.max_per_club
+
+
+def test_simulate_field_is_seeded(tmp_path):
+    replay = make_replay(tmp_path)
+    totals = simulate_field(replay, 200, seed=3)
+    assert totals.shape == (200,) and (totals >= 0).all()
+    assert simulate_field(replay, 200, seed=3).tolist() == totals.tolist()
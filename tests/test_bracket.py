@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from fpl_expert.bracket import DIRECT_QUALIFIERS, LEAGUE_MATCHES, PLAYOFF_LAST, TournamentSimulator
+
+N_CLUBS = 36
+SEASON = "2025/26"
+
+
+def simulate(ratings, n_simulations=4000):
+    """Outlook for a finished league phase where club i finished in position i + 1."""
+    simulator = TournamentSimulator(
+        clubs=[f"Club {i + 1}" for i in range(N_CLUBS)],
+        ratings=ratings,
+        points=[2 * (N_CLUBS - i) for i in range(N_CLUBS)],
+        played=[LEAGUE_MATCHES] * N_CLUBS,
+        season=SEASON,
+    )
+    return simulator.simulate(n_simulations, seed=1)
+
+
+def test_league_positions_decide_the_knockout_route():
+    outlook = simulate(np.full(N_CLUBS, 1800.0))
+    direct, playoff, out = (
+        slice(0, DIRECT_QUALIFIERS), slice(DIRECT_QUALIFIERS, PLAYOFF_LAST), slice(PLAYOFF_LAST, N_CLUBS)
+    )
+    assert outlook.reach["playoff"][direct].tolist() == [0.0] * DIRECT_QUALIFIERS
+    assert outlook.reach["round_of_16"][direct].tolist() == [1.0] * DIRECT_QUALIFIERS
+    assert outlook.reach["playoff"][playoff].tolist() == [1.0] * (PLAYOFF_LAST - DIRECT_QUALIFIERS)
+    assert outlook.reach["round_of_16"][playoff].sum() == pytest.approx(8.0)
+    assert not outlook.reach["playoff"][out].any() and not outlook.reach["round_of_16"][out].any()
+    assert outlook.reach["winner"].sum() == pytest.approx(1.0)
+
+
+def test_top_two_seeds_are_in_different_halves():
+    ratings = np.full(N_CLUBS, 1500.0)
+    ratings[:2] = 4000.0
+    outlook = simulate(ratings)
+    assert outlook.reach["final"][:2].tolist() == [1.0, 1.0]
+
+
+def test_top_seeds_meet_the_winners_of_the_fourth_playoff_block():
+    # Seeds 1-2 face the play-off winners from positions 15-18; every other seed is unbeatable
+    ratings = np.full(N_CLUBS, 1000.0)
+    ratings[2:DIRECT_QUALIFIERS] = 5000.0
+    outlook = simulate(ratings)
+    quarter_final = outlook.reach["quarter_final"]
+    past_seeds = [position for position in range(9, 25) if quarter_final[position - 1] > 0]
+    assert past_seeds == [15, 16, 17, 18]
+
+
+def test_needs_a_full_field():
+    with pytest.raises(ValueError):
+        TournamentSimulator(clubs=["A", "B"], ratings=[1800, 1800])
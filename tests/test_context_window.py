@@ -0,0 +1,56 @@
+import os
+from datetime import datetime
+
+from crewai.llms.base_llm import BaseLLM
+
+from fpl_expert.context_window import SUMMARY_HEADER, ContextWindow, WindowedLLM, prune_transcripts, read_transcript
+
+
+class RecordingLLM(BaseLLM):
+    """LLM that records the prompt and stop words of each call."""
+
+    def __init__(self):
+        super().__init__(model="recording-model")
+        self.calls = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        self.calls.append((list(messages), list(self.stop)))
+        return "Thought: done\nFinal Answer: ok"
+
+
+def transcript(steps):
+    messages = [{"role": "system", "content": "You are a scout."}, {"role": "user", "content": "Find forwards."}]
+    for step in range(steps):
+        messages.append({
+            "role": "assistant",
+            "content": f"Action: search\nAction Input: {{\"page\": {step}}}\nObservation: result {step} " + "x" * 500,
+        })
+    return messages
+
+
+def test_window_keeps_recent_steps_and_spills_the_rest(tmp_path):
+    window = ContextWindow(window_steps=3, directory=str(tmp_path))
+    inner = RecordingLLM()
+    llm = WindowedLLM(inner, window)
+    llm.stop = ["\nObservation:"]
+    messages = transcript(8)
+
+    llm.call(messages)
+    prompt, stop = inner.calls[0]
+    assert len(prompt) == 2 + 1 + 3 and prompt[2]["content"].startswith(SUMMARY_HEADER)
+    assert prompt[-1]["content"].startswith("Action: search\nAction Input: {\"page\": 7}")
+    # Stop words go with the call; the inner LLM is not modified
+    assert stop == ["\nObservation:"] and inner.stop == []
+
+    (path,) = [os.path.join(root, name) for root, _, names in os.walk(tmp_path) for name in names]
+    assert len(read_transcript(path)) == 10
+
+
+def test_old_run_transcripts_are_pruned(tmp_path):
+    for run_id in ("2026-09-01_120000", "2026-10-18_090000"):
+        os.makedirs(tmp_path / run_id)
+        (tmp_path / run_id / "001_agent.jsonl").write_text("{}\n")
+    (tmp_path / "notes").mkdir()
+
+    assert prune_transcripts(str(tmp_path), keep_days=14, now=datetime(2026, 10, 19)) == 1
+    assert sorted(os.listdir(tmp_path)) == ["2026-10-18_090000", "notes"]
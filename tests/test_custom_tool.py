@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+
+from fpl_expert import store
+from fpl_expert.tools import custom_tool
+from fpl_expert.tools.custom_tool import InjuryReportTool, PlayerStatsTool
+
+
+class SeasonTurningClock(datetime):
+    """datetime whose now() moves from the last minute of one season into the next on every read."""
+    reads = 0
+
+    @classmethod
+    def now(cls, tz=None):
+        cls.reads += 1
+        return datetime(2026, 7, 31, 23, 59) if cls.reads == 1 else datetime(2026, 8, 1, 0, 1)
+
+
+class StubSerper:
+    def __init__(self):
+        self.queries = []
+
+    def run(self, search_query):
+        self.queries.append(search_query)
+        return {"organic": [{"title": "Arsenal team news", "snippet": "Saka is doubtful for the weekend."}]}
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch, tmp_path):
+    monkeypatch.setenv("FPL_EXTRACTION_LLM", "0")
+    monkeypatch.setattr(store, "_default_store", store.RecommendationStore(str(tmp_path / "store.sqlite3")))
+    monkeypatch.setattr(custom_tool, "datetime", SeasonTurningClock)
+    SeasonTurningClock.reads = 0
+
+
+@pytest.mark.parametrize("tool_type, args", [
+    (PlayerStatsTool, ("Bukayo Saka", "Arsenal")),
+    (InjuryReportTool, ("Arsenal",)),
+])
+def test_one_season_per_tool_call(tool_type, args):
+    tool = tool_type()
+    tool.serper_tool = StubSerper()
+    answer = tool._run(*args)
+
+    assert SeasonTurningClock.reads == 1
+    assert "2025/26 season" in answer and "2025/26" in tool.serper_tool.queries[0]
+    assert "2026/27" not in answer + tool.serper_tool.queries[0]
+    saved = store.default_store()._conn.execute("SELECT DISTINCT season FROM tool_records").fetchall()
+    assert [row[0] for row in saved] == ["2025/26"]
@@ -0,0 +1,51 @@
+import pytest
+
+from fpl_expert.entities import CLUB, EntityIndex, tokens_agree
+
+
+@pytest.fixture(scope="module")
+def index():
+    return EntityIndex.load()
+
+
+@pytest.mark.parametrize("name", ["Manchester United", "Real Betis", "Inter Miami", "Sporting Braga"])
+def test_other_clubs_are_not_fuzzy_matched(index, name):
+    assert index.resolve(name, CLUB) is None
+    assert index.canonical_name(name, CLUB) == name
+
+
+def test_shared_surname_is_not_enough(index):
+    assert index.resolve("Edson Alvarez") is None
+    assert index.canonical_name("Edson Alvarez") == "Edson Alvarez"
+    assert index.resolve("Julian Alvarez").name == "Julian Alvarez"
+
+
+def test_aliases_resolve(index):
+    assert index.resolve("Man City", CLUB).name == "Manchester City"
+    assert index.resolve("PSG", CLUB).name == "Paris Saint-Germain"
+    assert index.resolve("kylian mbappé").name == "Kylian Mbappe"
+    assert index.canonical_name("Mbappe") == "Kylian Mbappe"
+
+
+def test_typos_and_reordering_resolve_but_are_not_rewritten(index):
+    assert index.resolve("Kylian Mbape").name == "Kylian Mbappe"
+    assert index.resolve("Mbappe Kylian").name == "Kylian Mbappe"
+    assert index.canonical_name("Kylian  Mbape") == "Kylian Mbape"
+
+
+def test_club_breaks_ties_between_namesakes():
+    index = EntityIndex()
+    index.add_player("Joao Silva", club="Benfica", archive_id=1)
+    index.add_player("Joao Silva", club="Porto", archive_id=2)
+    assert index.resolve("Joao Silva") is None
+    assert index.resolve("Joao Silva", club="Porto").archive_id == 2
+
+
+def test_tokens_agree():
+    assert tokens_agree("kylian mbape", "kylian mbappe")
+    assert tokens_agree("mbappe kylian", "kylian mbappe")
+    assert not tokens_agree("manchester united", "manchester city")
+    assert not tokens_agree("edson alvarez", "julian alvarez")
+    assert not tokens_agree("alvarez", "julian alvarez")
+    # Short words must match exactly
+    assert not tokens_agree("psv", "psg")
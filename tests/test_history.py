@@ -0,0 +1,42 @@
+import pytest
+
+from fpl_expert.history import HistoryArchive
+
+SEASON = "2025/26"
+
+
+def row(gameweek, name, club, points, **extra):
+    return {"gameweek": str(gameweek), "name": name, "club": club, "position": "MID", "points": str(points), **extra}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return HistoryArchive(str(tmp_path / "history"))
+
+
+def test_reingest_replaces_rows_and_last_batch_row_wins(archive):
+    assert archive.ingest(SEASON, [row(1, "Pedri", "Barcelona", 5), row(2, "Pedri", "Barcelona", 3)]) == 2
+    # Gameweek 2 is sent twice in one batch: the later row is kept
+    assert archive.ingest(SEASON, [row(2, "Pedri", "Barcelona", 7), row(2, "Pedri", "Barcelona", 9)]) == 2
+    stats = archive.season(SEASON).stats
+    assert stats["gameweek"].tolist() == [1, 2]
+    assert stats["points"].tolist() == [5, 9]
+
+
+def test_namesakes_at_different_clubs_stay_separate(archive):
+    archive.ingest(SEASON, [row(1, "Rodri", "Manchester City", 6), row(1, "Rodri", "Real Betis", 2)])
+    players = archive.players
+    assert sorted(info["club"] for info in players.values()) == ["Manchester City", "Real Betis"]
+
+    # Matching ignores case and accents but not the club
+    archive.ingest(SEASON, [row(2, "RODRI", "manchester city", 8)])
+    assert len(archive.players) == 2
+    assert len(archive.season(SEASON).player(min(archive.players))) == 2
+
+
+def test_missing_fields_are_named(archive):
+    undated = {"name": "Pedri", "club": "Barcelona", "position": "MID"}
+    with pytest.raises(ValueError, match="'gameweek' or 'date'"):
+        archive.ingest(SEASON, [undated])
+    with pytest.raises(ValueError, match="'club'"):
+        archive.ingest(SEASON, [{"gameweek": "1", "name": "Pedri", "position": "MID"}])
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+from crewai.utilities.constants import NOT_SPECIFIED
+
+from fpl_expert.invalidation import InvalidationEngine, downstream, task_graph
+
+
+def make_crew(contexts):
+    """Crew stand-in: task name -> names of its context tasks, or NOT_SPECIFIED."""
+    tasks = {name: SimpleNamespace(name=name, context=NOT_SPECIFIED) for name in contexts}
+    for name, context in contexts.items():
+        if context is not NOT_SPECIFIED:
+            tasks[name].context = None if context is None else [tasks[dep] for dep in context]
+    return SimpleNamespace(tasks=list(tasks.values()))
+
+
+def test_implicit_context_is_every_earlier_task():
+    crew = make_crew({
+        "scout": NOT_SPECIFIED,
+        "tactics": NOT_SPECIFIED,
+        "fixtures": ["scout"],
+        "team": None,
+    })
+    assert task_graph(crew) == {
+        "scout": [],
+        "tactics": ["scout"],
+        "fixtures": ["scout"],
+        "team": [],
+    }
+
+
+def test_downstream_follows_implicit_context():
+    crew = make_crew({
+        "scout": NOT_SPECIFIED,
+        "injuries": [],
+        "tactics": NOT_SPECIFIED,
+        "fixtures": ["injuries"],
+        "team": ["fixtures"],
+    })
+    graph = task_graph(crew)
+    assert downstream(graph, ["scout"]) == {"scout", "tactics"}
+    assert downstream(graph, ["injuries"]) == {"injuries", "tactics", "fixtures", "team"}
+    assert downstream(graph, []) == set()
+
+
+def make_prompted_crew():
+    """Research task with a search tool, a captain task for the manager, and a team task after both."""
+    search = SimpleNamespace(name="Search")
+
+    def task(name, description, context, backstory="Scout", tools=()):
+        agent = SimpleNamespace(
+            role="Analyst", goal="Win", backstory=backstory, tools=list(tools),
+            _original_role=None, _original_goal=None, _original_backstory=None,
+        )
+        return SimpleNamespace(
+            name=name, description=description, expected_output="Report", context=context, agent=agent, tools=None,
+            _original_description=None, _original_expected_output=None,
+        )
+
+    research = task("research", "Research {matchweek}", NOT_SPECIFIED, tools=[search])
+    captain = task("captain", "Pick a captain", [research], backstory="Works for {manager_profile}")
+    team = task("team", "Build the team for {budget}", [captain])
+    return SimpleNamespace(tasks=[research, captain, team])
+
+
+INPUTS = {"matchweek": "Matchweek 3", "budget": "100", "profile": "aaron", "manager_profile": "Aggressive"}
+
+
+def store_state(engine, crew, inputs, signals):
+    prints = engine.fingerprints(crew, inputs, signals)
+    keys = engine.state_keys(crew, inputs)
+    engine.save_state({
+        "tasks": {keys[name]: {"fingerprint": print_} for name, print_ in prints.items()},
+        "signals": signals,
+    })
+
+
+def test_profile_tasks_are_stored_per_profile(tmp_path):
+    engine = InvalidationEngine(str(tmp_path / "last_run.json"))
+    crew = make_prompted_crew()
+    assert engine.state_keys(crew, INPUTS) == {"research": "research", "captain": "captain@aaron", "team": "team@aaron"}
+
+    store_state(engine, crew, INPUTS, {"Search": "news-1"})
+    state = engine.load_state()
+    other = {**INPUTS, "profile": "beth", "manager_profile": "Cautious"}
+    for name, print_ in engine.fingerprints(crew, other, {"Search": "news-1"}).items():
+        state["tasks"][engine.state_keys(crew, other)[name]] = {"fingerprint": print_}
+    engine.save_state(state)
+
+    # Running for one profile keeps the other's outputs
+    assert engine.plan(crew, INPUTS, {"Search": "news-1"}) == set()
+    assert engine.plan(crew, other, {"Search": "news-1"}) == set()
+
+
+def test_missing_signals_reuse_the_last_run(tmp_path):
+    engine = InvalidationEngine(str(tmp_path / "last_run.json"))
+    crew = make_prompted_crew()
+    store_state(engine, crew, INPUTS, {"Search": "news-1"})
+
+    assert engine.plan(crew, INPUTS) == set()
+    assert engine.plan(crew, INPUTS, {"Search": "news-2"}) == {"research", "captain", "team"}
+    assert engine.plan(crew, {**INPUTS, "budget": "95"}) == {"team"}
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from fpl_expert import main
+from fpl_expert.history import HistoryArchive
+from fpl_expert.lineup import LineupModel
+from fpl_expert.store import RecommendationStore
+
+SEASON = "2025/26"
+NOW = datetime(2026, 10, 19)
+
+
+def ingest(archive, gameweek, minutes):
+    archive.ingest(SEASON, [
+        {"gameweek": str(gameweek), "player_id": str(pid), "name": f"Player {pid}", "club": f"Club {pid % 3}",
+         "position": "MID", "price": "5.0", "minutes": str(minutes), "points": "2"}
+        for pid in range(1, 7)
+    ])
+
+
+def test_signature_sees_a_reingested_gameweek(tmp_path):
+    archive = HistoryArchive(str(tmp_path / "history"))
+    model = LineupModel(archive=archive, store=RecommendationStore(str(tmp_path / "store.sqlite3")))
+    ingest(archive, 1, minutes=90)
+    before = model.signature(SEASON, now=NOW)
+    assert model.signature(SEASON, now=NOW) == before
+
+    # Corrected stats replace the gameweek's rows: same row count, new signature
+    ingest(archive, 1, minutes=20)
+    after = model.signature(SEASON, now=NOW)
+    assert after[0] == before[0] and after != before
+
+
+def test_commands_are_dispatched_from_the_table(monkeypatch):
+    calls = []
+    monkeypatch.setitem(main.COMMANDS, "lineups", (0, calls.append))
+    monkeypatch.setitem(main.COMMANDS, "ingest", (1, lambda args: calls.append(("ingest", args))))
+    monkeypatch.setattr(main, "run", lambda: calls.append("run"))
+
+    main.main(["lineups", "Mbappe", "--top", "5"])
+    main.main(["ingest"])
+    assert calls == [["Mbappe", "--top", "5"], "run"]
@@ -0,0 +1,64 @@
+import json
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from fpl_expert import loadtest
+from fpl_expert.loadtest import FakeBackend, LevelResult, fake_completion, format_load_report
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"), method="POST",
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_fake_backend_serves_searches_within_its_quota():
+    backend = FakeBackend(search_latency=0.0, llm_latency=0.0, search_qps=2).start()
+    try:
+        statuses = [post(f"{backend.url}/search", {"q": "Kane injury", "num": 3})[0] for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        status, reply = post(f"{backend.url}/v1/chat/completions", {"messages": [{"role": "user", "content": "Hi"}]})
+        assert status == 200 and "Final Answer:" in reply["choices"][0]["message"]["content"]
+    finally:
+        backend.stop()
+    assert backend.requests == {"search": 2, "rate_limited": 1, "llm": 1}
+
+
+def test_fake_model_calls_one_tool_then_answers():
+    tool, argument = loadtest.FAKE_TOOL_CALLS[0]
+    messages = [{"role": "system", "content": f"Tool Name: {tool}"}, {"role": "user", "content": "Scout players"}]
+    first = fake_completion(messages)
+    assert f"Action: {tool}" in first and argument in first
+    messages.append({"role": "assistant", "content": first + "\nObservation: done"})
+    assert fake_completion(messages).startswith("Thought: I now know the final answer\nFinal Answer:")
+
+
+def test_events_are_recorded_into_the_active_level(monkeypatch):
+    level = LevelResult(concurrency=2, runs=2, wall_seconds=30.0, run_seconds=[10.0, 12.0])
+    monkeypatch.setattr(loadtest, "_active", level)
+    task = SimpleNamespace(name="scout_players_task", output_file="output/player_analysis.md")
+    monkeypatch.setitem(loadtest._task_runs, id(task), 1)
+
+    for handler in (loadtest._on_task_started, loadtest._on_task_completed):
+        handler(None, SimpleNamespace(task=task))
+    started = datetime(2026, 10, 19, 12)
+    loadtest._on_tool_finished(None, SimpleNamespace(tool_name="Injury Report Tool", started_at=started,
+                                                     finished_at=started + timedelta(seconds=2)))
+    loadtest._on_tool_failed(None, SimpleNamespace())
+
+    assert len(level.task_seconds["scout_players_task"]) == 1
+    assert level.tool_seconds["Injury Report Tool"] == [2.0]
+    assert level.errors["tool"] == 1
+    assert level.output_writers == {"output/player_analysis.md": {1}}
+    summary = level.summary()
+    assert summary["throughput_per_minute"] == pytest.approx(4.0)
+    assert summary["run_latency"]["p50"] == pytest.approx(11.0)
+    assert "| 2 |" in format_load_report([level])
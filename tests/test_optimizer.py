@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from fpl_expert.optimizer import IncrementalOptimizer, SquadConstraints, is_legal, select_squad
+from fpl_expert.player_table import POSITIONS, PlayerTable
+
+
+def make_table(n_players=150, n_clubs=12, seed=0):
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(n_players):
+        price = round(float(rng.uniform(4.0, 11.0)), 1)
+        records.append({
+            "player_id": 1000 + i,
+            "name": f"Player {i}",
+            "club": f"Club {i % n_clubs}",
+            "position": POSITIONS[i % len(POSITIONS)],
+            "price": price,
+            "projections": [float(price * rng.uniform(0.5, 1.0))],
+        })
+    return PlayerTable.from_records(records, n_gameweeks=1)
+
+
+@pytest.fixture
+def table():
+    return make_table()
+
+
+@pytest.mark.parametrize("constraints", [
+    SquadConstraints(),
+    SquadConstraints(budget=80.0),
+    # Each club only has players of one position here, so the greedy fill runs over budget and is repaired
+    SquadConstraints(max_per_club=2),
+    SquadConstraints(locked=frozenset({1003, 1010}), banned=frozenset({1001})),
+])
+def test_select_squad_is_legal(table, constraints):
+    squad = select_squad(table, constraints=constraints)
+    assert is_legal(table, squad.rows, constraints)
+    assert len(squad.starting) == 11 and len(squad.bench) == 4
+    assert squad.captain in squad.starting and squad.vice_captain in squad.starting
+    assert squad.cost <= constraints.budget + 1e-6
+
+
+def test_infeasible_budget_raises(table):
+    with pytest.raises(ValueError):
+        select_squad(table, constraints=SquadConstraints(budget=40.0))
+
+
+def test_is_legal_rejects_broken_squads(table):
+    constraints = SquadConstraints()
+    rows = select_squad(table, constraints=constraints).rows
+    # Wrong position mix
+    same_position = [row for row in range(len(table)) if table.position_codes[row] == 0][:15]
+    assert not is_legal(table, same_position, constraints)
+    # Over budget
+    assert not is_legal(table, rows, SquadConstraints(budget=10.0))
+    # Banned player in the squad
+    banned = frozenset({int(table.player_ids[rows[0]])})
+    assert not is_legal(table, rows, SquadConstraints(banned=banned))
+
+
+def test_incremental_update_matches_cold_solve(table):
+    constraints = SquadConstraints()
+    optimizer = IncrementalOptimizer(table, constraints=constraints)
+    squad = optimizer.solve()
+
+    outside = next(row for row in range(len(table)) if row not in squad.rows)
+    dropped = squad.starting[0]
+    changes = {int(table.player_ids[outside]): 50.0, int(table.player_ids[dropped]): -10.0}
+    updated = optimizer.update(changes)
+
+    assert is_legal(table, updated.rows, constraints)
+    assert outside in updated.rows and dropped not in updated.rows
+    assert updated.captain == outside
+
+    cold = select_squad(table, optimizer.scores, constraints)
+    assert updated.score >= 0.98 * cold.score
+
+
+def test_set_constraints_keeps_squad_legal(table):
+    optimizer = IncrementalOptimizer(table)
+    optimizer.solve()
+    for budget in (70.0, 85.0, 100.0):
+        constraints = SquadConstraints(budget=budget)
+        squad = optimizer.set_constraints(constraints)
+        assert is_legal(table, squad.rows, constraints)
@@ -0,0 +1,77 @@
+import os
+from datetime import datetime, timedelta
+
+from fpl_expert.output_index import OutputIndex
+
+REPORT = """# Captain analysis
+
+Haaland faces a weak defence at home and is the safest captain this gameweek.
+
+# Differentials
+
+Kvaratskhelia is owned by few managers and takes penalties.
+"""
+
+
+def write(path, text, when):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.utime(path, (when.timestamp(), when.timestamp()))
+
+
+def make_index(tmp_path, **kwargs):
+    return OutputIndex(root=str(tmp_path / "index"), patterns=[str(tmp_path / "*.md")], **kwargs)
+
+
+def test_refresh_appends_and_reloads(tmp_path):
+    now = datetime(2026, 10, 19, 12)
+    captain = tmp_path / "captain_analysis_1.md"
+    write(captain, REPORT, now)
+    index = make_index(tmp_path)
+    assert index.refresh(now) == 1
+    vectors = tmp_path / "index" / "vectors.0.f16"
+    first = vectors.read_bytes()
+
+    write(tmp_path / "player_analysis_1.md", "# Players\n\nSalah is in form.", now)
+    write(tmp_path / "backtest_1.md", "Not a crew report.", now)
+    write(captain, REPORT + "\nSaka is a doubt.\n", now + timedelta(minutes=1))
+    assert index.refresh(now) == 2
+    # Earlier rows are never rewritten: the changed report is dropped in the log and appended again
+    assert vectors.read_bytes().startswith(first)
+    assert '{"drop": ' in (tmp_path / "index" / "chunks.0.jsonl").read_text(encoding="utf-8")
+
+    reloaded = make_index(tmp_path)
+    assert len(reloaded) == len(index) == 2
+    hit = reloaded.search("who should captain haaland", k=1)[0]
+    assert hit.source == str(captain) and "Saka is a doubt" in hit.text
+
+
+def test_eviction_compacts_into_a_new_segment(tmp_path):
+    now = datetime(2026, 10, 19, 12)
+    write(tmp_path / "captain_analysis_old.md", REPORT, now - timedelta(days=60))
+    write(tmp_path / "captain_analysis_new.md", "# Captain\n\nPalmer at home.", now)
+    index = make_index(tmp_path)
+    index.refresh(now)
+
+    assert len(index) == 1 and index.segment == 1
+    assert sorted(os.listdir(tmp_path / "index")) == ["chunks.1.jsonl", "manifest.json", "vectors.1.f16"]
+    assert [hit.source for hit in make_index(tmp_path).search("palmer captain")] == [
+        str(tmp_path / "captain_analysis_new.md")
+    ]
+
+
+def test_interrupted_append_is_repaired(tmp_path):
+    now = datetime(2026, 10, 19, 12)
+    write(tmp_path / "captain_analysis_1.md", REPORT, now)
+    make_index(tmp_path).refresh(now)
+    # A crash after the vectors were appended but mid-way through the chunk line
+    with open(tmp_path / "index" / "vectors.0.f16", "ab") as f:
+        f.write(b"\0" * 2048)
+    with open(tmp_path / "index" / "chunks.0.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"source": "captain_an')
+
+    index = make_index(tmp_path)
+    assert len(index) == 1 and index.segment == 1
+    write(tmp_path / "player_analysis_1.md", "# Players\n\nSalah is in form.", now)
+    index.refresh(now)
+    assert len(make_index(tmp_path)) == 2
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from fpl_expert import ownership
+from fpl_expert.optimizer import SQUAD_QUOTAS, XI_SIZE
+from fpl_expert.ownership import RivalField, build_field
+from fpl_expert.player_table import POSITIONS, PlayerTable
+
+
+def make_field(ownership_of_first_mid=60.0, n_rivals=20_000):
+    records = [
+        {"player_id": pid, "name": f"Player {pid}", "club": f"Club {pid % 10}", "position": POSITIONS[pid % 4],
+         "price": 6.0}
+        for pid in range(1, 81)
+    ]
+    table = PlayerTable.from_records(records, n_gameweeks=1)
+    # Ownership adding up to each position's squad quota, as published figures do
+    counts = np.bincount(table.position_codes)
+    owned = 100.0 * np.array([SQUAD_QUOTAS[p] for p in POSITIONS])[table.position_codes] / counts[table.position_codes]
+    mids = np.nonzero(table.position_codes == POSITIONS.index("MID"))[0]
+    owned[mids[0]] = ownership_of_first_mid
+    owned[mids[1]] = 2.0
+    return RivalField(table, owned, np.full(len(table), 5.0, dtype=np.float32), n_rivals=n_rivals, seed=1), mids
+
+
+def test_squads_match_ownership():
+    field, mids = make_field()
+    assert field.starters.shape == (field.n_rivals, XI_SIZE)
+    assert field.starting_share().sum() == pytest.approx(XI_SIZE)
+    # The template pick is in 60% of squads and, ranked high, usually starts
+    assert 0.4 < field.starting_share()[mids[0]] <= 0.62
+    assert field.starting_share()[mids[1]] < 0.05
+    eo = field.effective_ownership()
+    assert eo[mids[0]] > 5 * eo[mids[1]]
+
+
+def test_differentials_gain_on_the_field():
+    field, mids = make_field()
+    template, differential = field.rank_impact(mids[:2], n_scenarios=100)
+    assert template.effective_ownership > differential.effective_ownership
+    # Equal expected points, but most rivals get the template pick's points too
+    assert differential.relative_points > template.relative_points > 0
+
+    captain, _ = field.rank_impact(mids[:2], captain=True, n_scenarios=100)
+    assert captain.multiplier == 2.0 and captain.relative_points > template.relative_points
+
+
+def test_build_field_without_an_archive(monkeypatch):
+    monkeypatch.setattr(ownership, "_cached_pool", lambda: None)
+    field, rows = build_field(
+        [{"name": "Vinicius Junior", "position": "FWD", "ownership": 45.0},
+         {"name": "Unknown Mid", "expected_points": 7.0}],
+        n_rivals=2_000,
+    )
+    assert [field.table.names[row] for row in rows] == ["Vinicius Junior", "Unknown Mid"]
+    assert field.ownership[rows[0]] == 45.0 and field.projections[rows[1]] == 7.0
+    # Every position was topped up with anonymous players
+    assert (np.bincount(field.table.position_codes, minlength=4) >= [2, 5, 5, 3]).all()
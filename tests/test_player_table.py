@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from fpl_expert.player_table import PlayerTable
+
+RECORDS = [
+    {"player_id": 10, "name": "Keeper", "club": "Inter", "position": "Goalkeeper", "price": 5.0},
+    {"player_id": 11, "name": "Back", "club": "Arsenal", "position": "d", "price": 5.5, "projections": [4.0, 3.0]},
+    {"player_id": 12, "name": "Wing", "club": "Inter", "position": "MID", "price": 8.5, "projections": [6.0]},
+    {"player_id": 13, "name": "Playmaker", "club": "Arsenal", "position": "mid", "price": 9.0},
+    {"player_id": 14, "name": "Striker", "club": "Bayern", "position": "ST", "price": 10.5},
+    {"player_id": 15, "name": "Full Back", "club": "Bayern", "position": "DEF", "price": 4.5},
+]
+
+
+@pytest.fixture
+def table():
+    return PlayerTable.from_records(RECORDS, n_gameweeks=3)
+
+
+def test_from_records_sorts_by_position_then_price(table):
+    assert [row.name for row in table] == ["Keeper", "Back", "Full Back", "Playmaker", "Wing", "Striker"]
+    assert table.clubs == ("Arsenal", "Bayern", "Inter")
+    assert table.row_for_id(14).position == "FWD"
+    # Missing projections are zero-filled and long ones truncated to the table's gameweeks
+    assert table.row_for_id(11).projections.tolist() == [4.0, 3.0, 0.0]
+    assert table.row_for_id(12).projections.tolist() == [6.0, 0.0, 0.0]
+    assert table.to_records()[0] == {
+        "player_id": 10, "name": "Keeper", "club": "Inter", "position": "GK", "price": 5.0,
+        "projections": [0.0, 0.0, 0.0],
+    }
+
+
+def test_by_position_is_a_view(table):
+    defenders = table.by_position("defender")
+    assert [row.player_id for row in defenders] == [11, 15]
+    assert np.shares_memory(defenders.prices, table.prices)
+    assert len(table.by_position("FWD")) == 1
+
+
+def test_by_club_and_price_band(table):
+    assert sorted(table.by_club("Arsenal").player_ids.tolist()) == [11, 13]
+    assert set(table.by_club("Inter").club_codes.tolist()) == {table.club_code("Inter")}
+    with pytest.raises(KeyError):
+        table.by_club("Celtic")
+
+    band = table.by_price(5.0, 9.0)
+    assert sorted(band.player_ids.tolist()) == [10, 11, 12, 13]
+    assert band.prices.tolist() == sorted(band.prices.tolist())
+    assert len(table.by_price(min_price=11.0)) == 0
+
+
+def test_set_and_total_projections(table):
+    table.set_projections(2, np.arange(len(table), dtype=np.float32))
+    table.set_projections(3, np.ones(len(table)))
+    back = table.index_of(11)
+    assert table.total_projection()[back] == pytest.approx(4.0 + back + 1.0)
+    assert table.total_projection(start_gameweek=2, horizon=1)[back] == pytest.approx(back)
+    # A horizon past the last gameweek is clipped
+    assert table.total_projection(start_gameweek=3, horizon=5).tolist() == [1.0] * len(table)
+
+
+def test_rejects_bad_columns():
+    with pytest.raises(ValueError):
+        PlayerTable([1, 1], ["A", "B"], ["X", "Y"], ["GK", "DEF"], [4.0, 4.5])
+    with pytest.raises(ValueError):
+        PlayerTable([1, 2], ["A", "B"], ["X", "Y"], ["GK", "Libero"], [4.0, 4.5])
+    with pytest.raises(ValueError):
+        PlayerTable([1], ["A", "B"], ["X", "Y"], ["GK", "DEF"], [4.0, 4.5])
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from fpl_expert.entities import CLUB, PLAYER
+from fpl_expert.prefetch import Prefetcher, PrefetchMetrics, PrefetchTarget
+from fpl_expert.tools.search_cache import SearchCache, search_key
+
+OUTPUT = "Start Mbappe and Vinicius Jr; Inter may rest Lautaro."
+
+
+class StubSerper:
+    """Serper tool stand-in answering from a given cache, like CachedSerperDevTool."""
+    search_type = "search"
+    n_results = 10
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.searches = []
+        self.lock = threading.Lock()
+
+    def _run(self, search_query):
+        def fetch():
+            with self.lock:
+                self.searches.append(search_query)
+            return {"organic": [{"title": search_query}]}
+
+        return self.cache.get_or_fetch(search_key(search_query, self.search_type, self.n_results), fetch)
+
+
+class StubTool:
+    def __init__(self, name, template, cache):
+        self.name = name
+        self.template = template
+        self.serper_tool = StubSerper(cache)
+
+    def search_query(self, name):
+        return self.template.format(name)
+
+
+def make_prefetcher(cache):
+    verify = StubTool("verify", "{} current team", cache)
+    injuries = StubTool("injuries", "{} injury news", cache)
+    prefetcher = Prefetcher(
+        [PrefetchTarget(verify, PLAYER), PrefetchTarget(injuries, CLUB)], cache=cache, metrics=PrefetchMetrics(),
+    )
+    return prefetcher, verify, injuries
+
+
+def settle(prefetcher):
+    """Wait for the background searches to finish."""
+    while prefetcher._queued:
+        time.sleep(0.01)
+
+
+def test_task_output_warms_the_searches_agents_make_next():
+    cache = SearchCache()
+    prefetcher, verify, injuries = make_prefetcher(cache)
+    assert prefetcher.prefetch_text(OUTPUT) == 5
+    settle(prefetcher)
+    assert sorted(verify.serper_tool.searches) == [
+        "Kylian Mbappe current team", "Lautaro Martinez current team", "Vinicius Junior current team",
+    ]
+    assert sorted(injuries.serper_tool.searches) == ["Inter Milan injury news", "Real Madrid injury news"]
+
+    # The agent's own search is answered from the cache
+    verify.serper_tool._run(search_query=verify.search_query("Kylian Mbappe"))
+    verify.serper_tool._run(search_query=verify.search_query("Jude Bellingham"))
+    summary = prefetcher.metrics.summary()
+    assert len(verify.serper_tool.searches) == 4
+    assert summary["issued"] == 5 and summary["used"] == 1 and summary["lookups"] == 2
+    assert summary["coverage"] == 0.5
+
+
+def test_cached_and_expired_searches():
+    cache = SearchCache()
+    prefetcher, verify, _ = make_prefetcher(cache)
+    prefetcher.prefetch_text(OUTPUT)
+    settle(prefetcher)
+
+    # Everything is cached: nothing new is issued
+    assert prefetcher.prefetch_text(OUTPUT) == 0
+    assert prefetcher.metrics.summary()["tools"]["verify"]["skipped"] == 3
+
+    cache.clear()
+    assert prefetcher.prefetch_text(OUTPUT) == 5
+    settle(prefetcher)
+    assert len(verify.serper_tool.searches) == 6
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from fpl_expert.history import STATS_DTYPE, HistoryArchive
+from fpl_expert.price_changes import FEATURES, TREND_WEIGHT, PriceFeatures, PricePredictor
+from fpl_expert.store import RecommendationStore
+
+SEASON = "2025/26"
+
+
+def make_rows(gameweek, players):
+    """STATS_DTYPE rows for (player_id, price, ownership, transfers_in, transfers_out, minutes, points)."""
+    rows = np.zeros(len(players), dtype=STATS_DTYPE)
+    for i, (pid, price, ownership, tin, tout, minutes, points) in enumerate(sorted(players)):
+        rows[i] = (gameweek, 1, 0, pid, minutes, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, points, price, ownership, tin, tout)
+    return rows
+
+
+def test_fold_tracks_changes_between_gameweeks():
+    first = PriceFeatures.empty().fold(make_rows(1, [
+        (1, 6.0, 10.0, 500, 0, 90, 8),
+        (2, 5.0, 20.0, 0, 500, 90, 2),
+    ]), 1)
+    assert first.gameweek == 1
+    assert first.columns["last_change"].tolist() == [0.0, 0.0]
+    assert first.columns["ownership_delta"].tolist() == [0.0, 0.0]
+    assert first.columns["net_transfers"][0] > 0 > first.columns["net_transfers"][1]
+
+    # Player 1 rose 0.1m, player 2 sat the gameweek out, player 3 is new
+    second = first.fold(make_rows(2, [
+        (1, 6.1, 12.5, 500, 0, 90, 6),
+        (3, 4.5, 1.0, 0, 0, 0, 0),
+    ]), 2)
+    assert second.player_ids.tolist() == [1, 2, 3]
+    columns = second.columns
+    assert columns["last_change"].tolist() == [1.0, 0.0, 0.0]
+    assert columns["price"] == pytest.approx([6.1, 5.0, 4.5])
+    assert columns["ownership_delta"] == pytest.approx([2.5, 0.0, 0.0])
+    assert columns["net_trend"][1] == pytest.approx((1 - TREND_WEIGHT) * first.columns["net_trend"][1])
+    assert columns["minutes_share"][1] < first.columns["minutes_share"][1]
+    assert second.matrix().shape == (3, len(FEATURES))
+
+
+def test_store_round_trip():
+    features = PriceFeatures.empty().fold(make_rows(1, [(4, 7.5, 3.0, 10, 5, 60, 4)]), 1)
+    restored = PriceFeatures.from_store(features.to_store(), features.gameweek)
+    assert restored.player_ids.tolist() == [4]
+    assert restored.matrix() == pytest.approx(features.matrix(), abs=1e-4)
+
+
+def ingest(archive, gameweek, prices):
+    archive.ingest(SEASON, [
+        {
+            "gameweek": str(gameweek), "player_id": str(pid), "name": f"Player {pid}", "club": f"Club {pid % 3}",
+            "position": "MID", "price": str(price), "ownership": str(5.0 + pid), "transfers_in": str(100 * pid),
+            "transfers_out": "50", "minutes": "90", "points": str(pid % 5),
+        }
+        for pid, price in prices.items()
+    ])
+
+
+def test_refresh_folds_new_gameweeks_like_a_rebuild(tmp_path):
+    archive = HistoryArchive(str(tmp_path / "history"))
+    store = RecommendationStore(str(tmp_path / "incremental.sqlite3"))
+    predictor = PricePredictor(archive=archive, store=store)
+
+    ingest(archive, 1, {pid: 5.0 for pid in range(1, 7)})
+    features, _ = predictor.refresh(SEASON)
+    assert features.gameweek == 1
+    ingest(archive, 2, {pid: 5.0 + 0.1 * (pid % 2) for pid in range(1, 7)})
+    incremental, _ = predictor.refresh(SEASON)
+    assert store.price_state(SEASON)["gameweek"] == 2
+
+    rebuilt, _ = PricePredictor(archive=archive, store=RecommendationStore(str(tmp_path / "full.sqlite3"))).refresh(SEASON)
+    assert incremental.player_ids.tolist() == rebuilt.player_ids.tolist()
+    assert incremental.matrix() == pytest.approx(rebuilt.matrix(), abs=1e-3)
+    assert incremental.columns["last_change"].tolist() == [1.0, 0.0, 1.0, 0.0, 1.0, 0.0]
+
+    # Re-ingesting a folded gameweek rebuilds the season
+    ingest(archive, 1, {pid: 4.5 for pid in range(1, 7)})
+    refolded, _ = predictor.refresh(SEASON)
+    assert refolded.columns["last_change"].tolist() == [6.0, 5.0, 6.0, 5.0, 6.0, 5.0]
@@ -0,0 +1,33 @@
+import time
+
+from crewai.tools import BaseTool
+
+from fpl_expert.profiler import PYTHON_CATEGORY, SamplingProfiler
+
+
+class BusyTool(BaseTool):
+    name: str = "Busy Tool"
+    description: str = "Spins for a while."
+
+    def _run(self, seconds: float = 0.2) -> str:
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            sum(range(1000))
+        return "done"
+
+
+def test_samples_are_attributed_to_the_running_tool(tmp_path):
+    with SamplingProfiler(interval=0.002) as profiler:
+        BusyTool()._run()
+
+    assert profiler.total_samples > 10
+    assert profiler.contexts["tool"].most_common(1)[0][0] == "Busy Tool"
+    assert profiler.categories.most_common(1)[0][0] == PYTHON_CATEGORY
+    assert 0.15 < profiler.wall_seconds < 5
+
+    paths = profiler.write(str(tmp_path))
+    folded = open(paths["folded"], encoding="utf-8").read().splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+    assert any(line.startswith("tool:Busy Tool;") for line in folded)
+    assert open(paths["flame_graph"], encoding="utf-8").read().lstrip().startswith("<svg")
+    assert "Busy Tool" in open(paths["hotspots"], encoding="utf-8").read()
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+import yaml
+
+from fpl_expert.profiles import PROFILE_TASKS, PROFILES_FILE, RESEARCH_TASKS, get_profile, load_profiles
+
+CONFIG_DIR = os.path.dirname(PROFILES_FILE)
+
+
+def test_load_profiles_appends_preferences(tmp_path):
+    preferences = tmp_path / "prefs.txt"
+    preferences.write_text("Likes strikers.\n\nHates goalkeepers.\n", encoding="utf-8")
+    path = tmp_path / "profiles.yaml"
+    path.write_text(yaml.safe_dump({
+        "risky": {"manager_profile": "You work for   a gambler.", "preferences_file": str(preferences), "budget": 95},
+        "steady": {"manager_profile": "You work for a planner."},
+    }), encoding="utf-8")
+
+    profiles = load_profiles(str(path))
+    assert profiles["risky"].manager_profile == (
+        "You work for a gambler. Their stated preferences: Likes strikers. Hates goalkeepers."
+    )
+    inputs = profiles["risky"].inputs({"matchweek": "3", "budget": "100"})
+    assert inputs == {
+        "matchweek": "3", "budget": "95", "profile": "risky", "manager_profile": profiles["risky"].manager_profile,
+    }
+    assert profiles["steady"].inputs({"budget": "100"})["budget"] == "100"
+
+    with pytest.raises(KeyError):
+        get_profile("nobody", path=str(path))
+
+
+def test_only_profile_task_agents_work_for_the_manager():
+    with open(os.path.join(CONFIG_DIR, "tasks.yaml"), encoding="utf-8") as f:
+        tasks = yaml.safe_load(f)
+    with open(os.path.join(CONFIG_DIR, "agents.yaml"), encoding="utf-8") as f:
+        agents = yaml.safe_load(f)
+
+    assert set(tasks) == set(RESEARCH_TASKS) | set(PROFILE_TASKS)
+    for name, task in tasks.items():
+        agent = agents[task["agent"]]
+        prompt = " ".join([task["description"], task["expected_output"], agent["role"], agent["goal"], agent["backstory"]])
+        assert ("{manager_profile}" in prompt) == (name in PROFILE_TASKS), name
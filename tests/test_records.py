@@ -0,0 +1,43 @@
+import pytest
+
+from fpl_expert.store import RecommendationStore
+from fpl_expert.tools.records import PlayerRecord, _extract_player
+
+
+def extract(*texts):
+    record = PlayerRecord(subject="Bukayo Saka", season="2025/26")
+    _extract_player(record, list(texts))
+    return record
+
+
+@pytest.mark.parametrize("text, price", [
+    ("Saka is priced at 9.5m in Fantasy.", 9.5),
+    ("Saka costs €10.0m after his rise.", 10.0),
+    ("Saka, 9.5m price tag, is a must-have.", 9.5),
+    ("Saka sprinted 9.5m clear of his marker.", None),
+    ("Saka covered 11.2 m in the build-up.", None),
+])
+def test_bare_millions_need_price_wording(text, price):
+    assert extract(text).price == price
+
+
+def test_extraction_reads_player_stats():
+    record = extract("Bukayo Saka has 5 goals and 3 assists in 810 minutes, owned by 34.5% of managers.")
+    assert (record.goals, record.assists, record.minutes, record.ownership) == (5, 3, 810, 34.5)
+
+
+def test_records_are_replaced_per_tool_and_season(tmp_path):
+    store = RecommendationStore(str(tmp_path / "store.sqlite3"))
+    for goals in (1, 2, 3):
+        store.save_record("player", "Bukayo Saka", "2025/26", {"goals": goals}, tool="player_stats")
+    store.save_record("player", "bukayo saka", "2025/26", {"assists": 4}, tool="fpl_news")
+    store.save_record("player", "Bukayo Saka", "2024/25", {"goals": 9}, tool="player_stats")
+    version = store.records_version(["player"])
+
+    assert store._conn.execute("SELECT COUNT(*) FROM tool_records").fetchone()[0] == 3
+    assert store.merged_record("player", "Bukayo Saka", "2025/26")["goals"] == 3
+
+    # A replaced record still counts as a change
+    store.save_record("player", "Bukayo Saka", "2025/26", {"goals": 4}, tool="player_stats")
+    assert store.records_version(["player"]) > version
+    store.close()
@@ -0,0 +1,60 @@
+import os
+from types import SimpleNamespace
+
+from fpl_expert.crew import FplExpert
+from fpl_expert.reports import SquadPick, TeamSelection, squad_checks
+
+# 2-5-5-3 from 15 clubs, starting 1-4-4-2
+SQUAD = (
+    [("GK", True), ("GK", False)]
+    + [("DEF", i < 4) for i in range(5)]
+    + [("MID", i < 4) for i in range(5)]
+    + [("FWD", i < 2) for i in range(3)]
+)
+
+
+def make_selection(**changes):
+    players = [
+        SquadPick(name=f"Player {i}", club=f"Club {i}", position=position, price=6.0, starting=starting,
+                  justification="In form.")
+        for i, (position, starting) in enumerate(SQUAD)
+    ]
+    fields = dict(summary="Balanced.", players=players, captain="Player 13", vice_captain="Player 7",
+                  transfer_strategy="Hold.", risk_assessment="Low.")
+    fields.update(changes)
+    return TeamSelection(**fields)
+
+
+def test_valid_squad_passes():
+    assert squad_checks(make_selection(), budget=100.0) == []
+
+
+def test_rule_violations_are_listed():
+    selection = make_selection(captain="Player 1")
+    for pick in selection.players[:4]:
+        pick.club = "Real Madrid"
+    selection.players[2].starting = False
+    assert squad_checks(selection, budget=80.0) == [
+        "10 starters instead of 11",
+        "4 players from Real Madrid (at most 3)",
+        "squad costs €90.0m, over the €80.0m budget",
+        "Captain Player 1 is not in the starting XI",
+    ]
+
+
+def test_reports_are_rendered_after_kickoff(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    crew = SimpleNamespace(
+        run_inputs={"profile": "aaron", "current_date": "2026-10-19", "budget": "100"},
+        team_report_file=str(tmp_path / "latest.md"),
+        team_report_paths=[],
+    )
+    team = SimpleNamespace(name="build_optimal_team_task", pydantic=None, json_dict=make_selection().model_dump())
+    other = SimpleNamespace(name="select_captain_task", pydantic=None, json_dict=None)
+    result = SimpleNamespace(tasks_output=[other, team])
+
+    assert FplExpert.render_team_reports(crew, result) is result
+    assert sorted(os.path.basename(path) for path in crew.team_report_paths) == [
+        "champions_league_team_aaron_2026-10-19.md", "team_summary_aaron_2026-10-19.txt",
+    ]
+    assert "Player 13" in (tmp_path / "latest.md").read_text(encoding="utf-8")
@@ -0,0 +1,60 @@
+from crewai.llms.base_llm import BaseLLM
+
+from fpl_expert.routing import FORCED_FINAL_ANSWER, EXTRACTION, TOOL_RESULT, RoutedLLM, RoutingMetrics, classify_step
+
+TIERS = {"fast": {"model": "fast-model"}, "smart": {"model": "smart-model"}}
+ROUTES = {TOOL_RESULT: "fast", EXTRACTION: "fast"}
+
+SYSTEM = {"role": "system", "content": "You are a scout."}
+TASK = {"role": "user", "content": "Find the best forwards."}
+TOOL_STEP = {"role": "assistant", "content": "Action: search\nAction Input: {}\nObservation: Haaland scored twice"}
+
+
+class ScriptedLLM(BaseLLM):
+    """LLM returning a fixed reply, cut at the first stop word like a provider would."""
+
+    def __init__(self, model, reply):
+        super().__init__(model=model)
+        self.reply = reply
+        self.calls = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        self.calls.append(list(self.stop))
+        cut = min((self.reply.find(s) for s in self.stop if s in self.reply), default=len(self.reply))
+        return self.reply[:cut]
+
+
+def routed(fast_reply):
+    primary = ScriptedLLM("smart-model", "Thought: done\nFinal Answer: Haaland")
+    llm = RoutedLLM(primary, ROUTES, TIERS, metrics=RoutingMetrics())
+    llm.stop = ["\nObservation:"]
+    fast = llm._tier_llms["fast"] = ScriptedLLM("fast-model", fast_reply)
+    return llm, primary, fast
+
+
+def test_tool_steps_go_to_the_fast_tier():
+    llm, primary, fast = routed("Thought: search more\nAction: search\nAction Input: {}\nObservation: made up")
+    assert classify_step([SYSTEM, TASK, TOOL_STEP]) == TOOL_RESULT
+    assert llm.call([SYSTEM, TASK, TOOL_STEP]) == "Thought: search more\nAction: search\nAction Input: {}"
+    assert not primary.calls
+    # Stop words are passed per call, never written to the shared tier LLM
+    assert fast.calls == [["\nObservation:", "Final Answer:"]] and fast.stop == []
+
+
+def test_final_answers_are_only_written_by_the_agent_model():
+    llm, primary, fast = routed("Thought: I now know the final answer\nFinal Answer: Salah")
+    assert llm.call([SYSTEM, TASK, TOOL_STEP]) == "Thought: done\nFinal Answer: Haaland"
+    assert llm.metrics.summary()["fast"]["escalations"] == 1
+    # The fast tier stopped before writing its answer
+    assert llm.metrics.summary()["fast"]["output_tokens"] < 10
+
+    forced = {"role": "assistant", "content": f"Now it's time you {FORCED_FINAL_ANSWER}."}
+    llm.call([SYSTEM, TASK, TOOL_STEP, forced])
+    assert len(fast.calls) == 1 and len(primary.calls) == 2
+    assert primary.calls[-1] == ["\nObservation:"] and primary.stop == []
+
+
+def test_synthesis_stays_on_the_agent_model():
+    llm, primary, fast = routed("unused")
+    llm.call([SYSTEM, TASK])
+    assert len(primary.calls) == 1 and not fast.calls
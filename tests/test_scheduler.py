@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from fpl_expert.scheduler import PreDeadlineScheduler, poll_interval, watched_clubs
+from fpl_expert.store import RecommendationStore
+
+DEADLINE = datetime(2026, 10, 21, 18, 45)
+
+
+class ScriptedScheduler(PreDeadlineScheduler):
+    """Scheduler whose news polls and crew runs are replaced by a script."""
+
+    def __init__(self, tmp_path, news):
+        self.now = DEADLINE - timedelta(days=5)
+        super().__init__(
+            build_inputs=lambda now: {"matchweek": "Matchweek 3"},
+            clubs=["Inter", "Arsenal"],
+            deadline_for=lambda now: DEADLINE,
+            clock=lambda: self.now,
+            store=RecommendationStore(str(tmp_path / "store.sqlite3")),
+        )
+        self.news = news
+        self.runs = []
+
+    def prefetch(self):
+        return {club: set(items) for club, items in self.news.items()}
+
+    def run_crew(self, inputs):
+        self.runs.append(self.now)
+
+
+def test_poll_interval_tightens_towards_the_deadline():
+    assert poll_interval(timedelta(hours=2)) == timedelta(minutes=10)
+    assert poll_interval(timedelta(hours=20)) == timedelta(minutes=60)
+    assert poll_interval(timedelta(days=10)) == timedelta(minutes=720)
+
+
+def test_reruns_only_on_material_change_near_the_deadline(tmp_path):
+    scheduler = ScriptedScheduler(tmp_path, {"Inter": {"a", "b", "c", "d"}, "Arsenal": {"x"}})
+    # A new matchweek always runs
+    assert scheduler.tick() == timedelta(minutes=720)
+    assert len(scheduler.runs) == 1
+
+    # Same news: nothing to do
+    scheduler.tick()
+    assert len(scheduler.runs) == 1
+
+    # Material change, but outside the optimize window
+    scheduler.news["Arsenal"] = {"x", "y"}
+    scheduler.tick()
+    assert len(scheduler.runs) == 1
+
+    # One new item in four is under the 30% threshold
+    scheduler.now = DEADLINE - timedelta(hours=6)
+    scheduler.news = {"Inter": {"a", "b", "c", "e"}, "Arsenal": {"x"}}
+    scheduler.tick()
+    assert len(scheduler.runs) == 1
+
+    scheduler.news["Arsenal"] = {"x", "y"}
+    scheduler.tick()
+    assert scheduler.runs == [DEADLINE - timedelta(days=5), DEADLINE - timedelta(hours=6)]
+    assert scheduler.state.runs == 2
+
+
+def test_watched_clubs_from_environment(monkeypatch):
+    monkeypatch.setenv("FPL_WATCH_CLUBS", "PSG, Paris Saint-Germain, Inter")
+    assert len(watched_clubs()) == 2
@@ -0,0 +1,37 @@
+import numpy as np
+
+from fpl_expert.history import STATS_DTYPE
+from fpl_expert.player_table import POSITIONS
+from fpl_expert.scoring import score_stats
+
+
+def make_stats(*rows):
+    stats = np.zeros(len(rows), dtype=STATS_DTYPE)
+    for i, row in enumerate(rows):
+        for field, value in row.items():
+            stats[i][field] = POSITIONS.index(value) if field == "position" else value
+    return stats
+
+
+def test_score_stats():
+    stats = make_stats(
+        # 2 (60+ minutes) + 2 goals x4 + assist 3 - yellow 1
+        {"position": "FWD", "minutes": 90, "goals": 2, "assists": 1, "yellow_cards": 1},
+        # 2 + clean sheet 1 + 7 saves // 3 + 3 recoveries // 3
+        {"position": "GK", "minutes": 90, "clean_sheet": 1, "saves": 7, "ball_recoveries": 3},
+        # 2 - 5 conceded // 2 - red 3
+        {"position": "DEF", "minutes": 90, "goals_conceded": 5, "red_cards": 1},
+        # 1 (under 60, so no clean sheet) + goal 5 + player of the match 3
+        {"position": "MID", "minutes": 45, "clean_sheet": 1, "goals": 1, "player_of_match": 1},
+        # Saves only count for goalkeepers
+        {"position": "MID", "minutes": 90, "saves": 6},
+        # Did not play
+        {"position": "DEF", "minutes": 0, "clean_sheet": 1},
+    )
+    points = score_stats(stats)
+    assert points.dtype == np.int16
+    assert points.tolist() == [12, 6, -3, 9, 2, 0]
+
+
+def test_score_stats_empty():
+    assert score_stats(np.zeros(0, dtype=STATS_DTYPE)).tolist() == []
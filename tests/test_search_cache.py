@@ -0,0 +1,63 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fpl_expert.tools.search_cache import SearchCache, search_key
+
+
+def test_concurrent_lookups_fetch_once():
+    cache = SearchCache()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"organic": ["result"]}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get_or_fetch, "key", fetch) for _ in range(8)]
+        while not cache.in_flight("key"):
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result == {"organic": ["result"]} for result in results)
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 7
+
+
+def test_failures_are_not_cached():
+    cache = SearchCache()
+
+    def fail():
+        raise RuntimeError("Serper down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("key", fail)
+    assert cache.get("key") is None and not cache.in_flight("key")
+    assert cache.get_or_fetch("key", lambda: "fresh") == "fresh"
+
+
+def test_expiry_eviction_and_refresh():
+    cache = SearchCache(ttl=0.05, max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    # "b" was least recently used
+    assert cache.get("b") is None and cache.get("a") == 1
+
+    with cache.refreshing():
+        assert cache.get_or_fetch("a", lambda: 10) == 10
+    assert cache.get_or_fetch("a", lambda: 20) == 10
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+def test_search_key_normalizes_queries():
+    assert search_key("  Kane   INJURY ") == search_key("kane injury")
+    assert search_key("kane injury", "news") != search_key("kane injury")